@@ -1,6 +1,7 @@
 
 from .objects import IntegraSystem, Events, IntegraItem, IntegraStateEvent
 from .client import IntegraClientOpts, IntegraClient, IntegraClientStatus
+from .channel_tcp import IntegraTcpTransport
 from .notify import (
     IntegraZonesNotifyEvents, IntegraPartsNotifyEvents, IntegraOutputsNotifyEvents, IntegraDoorsNotifyEvents, IntegraOthersNotifyEvents, IntegraTroublesNotifyEvents,
     IntegraTroublesMemoryNotifyEvents, IntegraAllNotifyEvents)
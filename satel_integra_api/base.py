@@ -1,6 +1,8 @@
 import asyncio
 import logging
 import queue
+import random
+import time
 import traceback
 
 from asyncio import CancelledError as AsyncCancelledError
@@ -144,8 +146,23 @@ class IntegraDispatcher:
         self._event: asyncio.Event = asyncio.Event()
         self._queue: queue.Queue = queue.Queue()
         self._process_fn: Callable[ ..., Awaitable[ None ] ] = process_fn
+        self._queued: int = 0
+        self._processed: int = 0
         self._task = asyncio.create_task( self._dispatcher_task(), name=self._name )
 
+    @property
+    def queue_depth( self ) -> int:
+        """Number of events waiting for processing"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def queued( self ) -> int:
+        return self._queued
+
+    @property
+    def processed( self ) -> int:
+        return self._processed
+
     async def _dispatcher_task( self ) -> None:
 
         _LOGGER.debug( f"[{self._name}] STARTED" )
@@ -159,6 +176,7 @@ class IntegraDispatcher:
                         # noinspection PyBroadException
                         try:
                             await self._process_fn( **event_item )
+                            self._processed += 1
                         except Exception as err:
                             _LOGGER.error( f"[{self._name}] {traceback.format_exc()}" )
                             _LOGGER.error( f"[{self._name}] task process exception, {err}" )
@@ -207,6 +225,7 @@ class IntegraDispatcher:
         async with self._lock:
             if self._queue is not None:
                 self._queue.put( kwargs )
+                self._queued += 1
                 self._event.set()
             else:
                 _LOGGER.error( f"[{self._name}] queue not found, discarding" )
@@ -231,6 +250,115 @@ class IntegraDispatcher:
         return result
 
 
+class IntegraDispatcherPool:
+    """Fixed number of worker tasks shared by event queues of many clients.
+
+    Every queue created by create() is bound to single worker (round-robin), so events of one queue keep their order
+    while number of tasks does not grow with number of clients. Queues provide interface of IntegraDispatcher, so
+    client uses them in its place (see IntegraClient.dispatcher_factory). Slow event processing of one client delays
+    other clients sharing the same worker.
+    """
+
+    class Queue:
+
+        def __init__( self, pool: 'IntegraDispatcherPool', worker: int, process_fn: Callable[ ..., Awaitable[ None ] ] ) -> None:
+            self._pool: IntegraDispatcherPool = pool
+            self._worker: int = worker
+            self._process_fn: Callable[ ..., Awaitable[ None ] ] = process_fn
+            self._closed: bool = False
+            self._pending: int = 0
+            self._queued: int = 0
+            self._processed: int = 0
+
+        @property
+        def worker( self ) -> int:
+            return self._worker
+
+        @property
+        def queue_depth( self ) -> int:
+            return self._pending
+
+        @property
+        def queued( self ) -> int:
+            return self._queued
+
+        @property
+        def processed( self ) -> int:
+            return self._processed
+
+        async def put( self, **kwargs ) -> None:
+            if self._closed or not self._pool._queues:
+                _LOGGER.error( f"[event_queue_pool-{self._worker}] queue closed, discarding" )
+                return
+            self._pending += 1
+            self._queued += 1
+            self._pool._queues[ self._worker ].put_nowait( (self, kwargs) )
+
+        async def shutdown( self, owner: object = None, attr_name: str = None ) -> None:
+            """Events still waiting in worker queue are dropped, worker itself keeps running"""
+            if owner is not None and attr_name is not None and hasattr( owner, attr_name ):
+                setattr( owner, attr_name, None )
+            self._closed = True
+
+    def __init__( self, workers: int = 4 ) -> None:
+        super().__init__()
+        self._workers: int = max( 1, workers )
+        self._queues: list[ asyncio.Queue ] = [ ]
+        self._tasks: list[ asyncio.Task ] = [ ]
+        self._next: int = 0
+
+    @property
+    def workers( self ) -> int:
+        return self._workers
+
+    @property
+    def queue_depth( self ) -> int:
+        return sum( event_queue.qsize() for event_queue in self._queues )
+
+    async def _worker_task( self, worker: int ) -> None:
+        name = f"event_queue_pool-{worker}"
+        event_queue = self._queues[ worker ]
+        _LOGGER.debug( f"[{name}] STARTED" )
+        try:
+            while True:
+                owner, event_item = await event_queue.get()
+                owner._pending -= 1
+                if owner._closed:
+                    continue
+                # noinspection PyBroadException
+                try:
+                    await owner._process_fn( **event_item )
+                    owner._processed += 1
+                except Exception as err:
+                    _LOGGER.error( f"[{name}] {traceback.format_exc()}" )
+                    _LOGGER.error( f"[{name}] task process exception, {err}" )
+
+        except AsyncCancelledError:
+            pass
+
+        finally:
+            _LOGGER.debug( f"[{name}]: FINISHED" )
+
+    def create( self, process_fn: Callable[ ..., Awaitable[ None ] ] ) -> 'IntegraDispatcherPool.Queue':
+        if not self._tasks:
+            # workers are started on first use, pool may be created outside of running event loop
+            for worker in range( self._workers ):
+                self._queues.append( asyncio.Queue() )
+                self._tasks.append( asyncio.create_task( self._worker_task( worker ), name=f"event_queue_pool-{worker}" ) )
+        result = IntegraDispatcherPool.Queue( self, self._next, process_fn )
+        self._next = (self._next + 1) % self._workers
+        return result
+
+    async def shutdown( self ) -> None:
+        tasks = self._tasks
+        self._tasks = [ ]
+        self._queues = [ ]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather( *tasks, return_exceptions=True )
+
+
 class IntegraEntity( object ):
 
     def __str__( self ):
@@ -333,6 +461,136 @@ class IntegraTaskContextRefCnt( IntegraEntity ):
 
 
 
+class IntegraConnectLimiter( IntegraEntity ):
+    """Paces connection attempts of many clients sharing this limiter.
+
+    Attempts are admitted at most 'rate' per second (token bucket holding up to 'burst' tokens, rate 0 means no
+    limit) and at most 'concurrency' attempts open their connection at once. Slot covers only opening of the channel
+    (TCP connect), version reads and resync which follow run outside of it. Reconnect attempts are delayed by random
+    time up to 'jitter' seconds first, so clients dropped together do not come back together.
+    """
+
+    class Slot:
+
+        def __init__( self, limiter: 'IntegraConnectLimiter', reconnect: bool ):
+            self._limiter = limiter
+            self._reconnect = reconnect
+
+        async def __aenter__( self ):
+            await self._limiter.acquire( self._reconnect )
+            return self
+
+        async def __aexit__( self, exc_type, exc_val, exc_tb ):
+            self._limiter.release()
+
+    def __init__( self, rate: float = 10.0, burst: int = 1, concurrency: int = 16, jitter: float = 0.0, seed: int | None = None ):
+        super().__init__()
+        self._rate: float = rate
+        self._burst: float = float( max( 1, burst ) )
+        self._concurrency: int = max( 1, concurrency )
+        self._jitter: float = jitter
+        self._random: random.Random = random.Random( seed )
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore( self._concurrency )
+        self._lock: asyncio.Lock = asyncio.Lock()
+        self._tokens: float = self._burst
+        self._last: float = time.monotonic()
+        self._waiting: int = 0
+        self._active: int = 0
+        self._attempts: int = 0
+        self._reconnects: int = 0
+        self._wait_total: float = 0.0
+        self._wait_max: float = 0.0
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        fields.update( {
+            "Rate": f"{self._rate}",
+            "Concurrency": f"{self._concurrency}",
+            "Waiting": f"{self._waiting}",
+            "Active": f"{self._active}",
+            "Attempts": f"{self._attempts}",
+            "WaitMax": f"{self._wait_max:.3f}",
+        } )
+
+    @property
+    def rate( self ) -> float:
+        return self._rate
+
+    @property
+    def concurrency( self ) -> int:
+        return self._concurrency
+
+    @property
+    def jitter( self ) -> float:
+        return self._jitter
+
+    @property
+    def waiting( self ) -> int:
+        return self._waiting
+
+    @property
+    def active( self ) -> int:
+        return self._active
+
+    @property
+    def attempts( self ) -> int:
+        return self._attempts
+
+    @property
+    def reconnects( self ) -> int:
+        return self._reconnects
+
+    @property
+    def wait_total( self ) -> float:
+        return self._wait_total
+
+    @property
+    def wait_max( self ) -> float:
+        return self._wait_max
+
+    def slot( self, reconnect: bool = False ) -> 'IntegraConnectLimiter.Slot':
+        return IntegraConnectLimiter.Slot( self, reconnect )
+
+    async def _async_take_token( self ) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min( self._burst, self._tokens + (now - self._last) * self._rate )
+            self._last = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+            else:
+                await asyncio.sleep( (1.0 - self._tokens) / self._rate )
+                self._tokens = 0.0
+                self._last = time.monotonic()
+
+    async def acquire( self, reconnect: bool = False ) -> None:
+        begin = time.monotonic()
+        self._waiting += 1
+        try:
+            if reconnect and self._jitter > 0:
+                await asyncio.sleep( self._random.uniform( 0, self._jitter ) )
+            await self._semaphore.acquire()
+            try:
+                if self._rate > 0:
+                    await self._async_take_token()
+            except BaseException:
+                self._semaphore.release()
+                raise
+        finally:
+            self._waiting -= 1
+
+        wait_time = time.monotonic() - begin
+        self._active += 1
+        self._attempts += 1
+        self._reconnects += 1 if reconnect else 0
+        self._wait_total += wait_time
+        self._wait_max = max( self._wait_max, wait_time )
+
+    def release( self ) -> None:
+        self._active -= 1
+        self._semaphore.release()
+
+
 class IntegraCaps:
 
     def __str__( self ):
@@ -0,0 +1,141 @@
+import logging
+import struct
+import time
+
+from enum import IntEnum
+from typing import BinaryIO, Iterator
+
+from .base import IntegraEntity, IntegraError
+
+_LOGGER = logging.getLogger( __name__ )
+
+CAPTURE_MAGIC = b"SICP"
+CAPTURE_VERSION = 1
+CAPTURE_BUFFER_SIZE = 64 * 1024
+
+# file header: magic, version, wall clock time of capture start
+_HEADER = struct.Struct( "<4sBd" )
+# record header: monotonic time in ns since capture start, direction, command, payload length
+_RECORD = struct.Struct( "<QBBH" )
+
+
+class IntegraCaptureDirection( IntEnum ):
+    TX = 0
+    RX = 1
+
+
+class IntegraCaptureError( IntegraError ):
+    pass
+
+
+class IntegraCaptureRecord:
+    """Single decrypted frame, payload is frame data without command byte and checksum"""
+    __slots__ = ("timestamp", "direction", "command", "data")
+
+    def __init__( self, timestamp: float, direction: IntegraCaptureDirection, command: int, data: bytes ):
+        self.timestamp: float = timestamp
+        self.direction: IntegraCaptureDirection = direction
+        self.command: int = command
+        self.data: bytes = data
+
+    def __repr__( self ):
+        return f"{self.__class__.__name__}[ {self.timestamp:.6f} {self.direction.name} 0x{self.command:02X} ({len( self.data )}) ]"
+
+
+class IntegraCaptureWriter( IntegraEntity ):
+    """Writes frames passing through channel to binary log.
+
+    Log starts with header (magic, version, capture start time) followed by records of fixed 12 bytes header and
+    payload. Writes are buffered, cost of single record is one struct pack and buffered file write.
+    """
+
+    def __init__( self, file_name: str ):
+        super().__init__()
+        self._file_name: str = file_name
+        self._file: BinaryIO | None = open( file_name, "wb", buffering=CAPTURE_BUFFER_SIZE )
+        self._started_ns: int = time.monotonic_ns()
+        self._records: int = 0
+        self._file.write( _HEADER.pack( CAPTURE_MAGIC, CAPTURE_VERSION, time.time() ) )
+
+    def __enter__( self ) -> 'IntegraCaptureWriter':
+        return self
+
+    def __exit__( self, exc_type, exc_val, exc_tb ):
+        self.close()
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        fields.update( {
+            "File": f"{self._file_name}",
+            "Records": f"{self._records}",
+        } )
+
+    @property
+    def file_name( self ) -> str:
+        return self._file_name
+
+    @property
+    def records( self ) -> int:
+        return self._records
+
+    @property
+    def closed( self ) -> bool:
+        return self._file is None
+
+    def record( self, direction: IntegraCaptureDirection, command: int, data: bytes ) -> None:
+        if self._file is None:
+            return
+        self._file.write( _RECORD.pack( time.monotonic_ns() - self._started_ns, direction, command, len( data ) ) )
+        self._file.write( data )
+        self._records += 1
+
+    def flush( self ) -> None:
+        if self._file is not None:
+            self._file.flush()
+
+    def close( self ) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class IntegraCaptureReader( IntegraEntity ):
+    """Reads records of binary log written by IntegraCaptureWriter"""
+
+    def __init__( self, file_name: str ):
+        super().__init__()
+        self._file_name: str = file_name
+        with open( file_name, "rb" ) as f:
+            self._data: bytes = f.read()
+        if len( self._data ) < _HEADER.size:
+            raise IntegraCaptureError( f"Capture file {file_name} is too short" )
+        magic, version, self._started = _HEADER.unpack_from( self._data )
+        if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION:
+            raise IntegraCaptureError( f"Capture file {file_name} has unsupported format" )
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        fields.update( {
+            "File": f"{self._file_name}",
+            "Started": f"{self._started}",
+        } )
+
+    @property
+    def started( self ) -> float:
+        """Wall clock time (as returned by time.time) of capture start"""
+        return self._started
+
+    def __iter__( self ) -> Iterator[ IntegraCaptureRecord ]:
+        data = self._data
+        pos = _HEADER.size
+        while pos + _RECORD.size <= len( data ):
+            timestamp, direction, command, length = _RECORD.unpack_from( data, pos )
+            pos += _RECORD.size
+            if pos + length > len( data ):
+                _LOGGER.warning( f"Capture file {self._file_name} truncated, last record dropped" )
+                break
+            yield IntegraCaptureRecord( timestamp / 1e9, IntegraCaptureDirection( direction ), command, data[ pos:pos + length ] )
+            pos += length
+
+    def records( self ) -> list[ IntegraCaptureRecord ]:
+        return list( self )
@@ -1,36 +1,45 @@
 import os
+import time
 import traceback
 import logging
 import asyncio
 
 from datetime import datetime
-from asyncio import CancelledError as AsyncCancelledError, Lock, Task, TimeoutError as AsyncTimeoutError
+from asyncio import CancelledError as AsyncCancelledError, Future, Lock, Task, TimeoutError as AsyncTimeoutError
 from asyncio.events import AbstractEventLoop
+from collections import deque
 from enum import IntEnum, StrEnum
 from typing import Any, Awaitable, Callable
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 
 from .base import IntegraEntity, IntegraError
+from .capture import IntegraCaptureDirection, IntegraCaptureWriter
+from .cipher import IntegraCipher
 from .const import (
     DEFAULT_CODE_PAGE,
     DEFAULT_CONN_TIMEOUT,
     DEFAULT_KEEP_ALIVE,
     DEFAULT_RESP_TIMEOUT,
-    DEBUG_SHOW_REQUESTS,
-    DEBUG_SHOW_REQUESTS_RAW,
-    DEBUG_SHOW_REQUESTS_ENC,
-    DEBUG_SHOW_RESPONSES,
-    DEBUG_SHOW_RESPONSES_TIME,
-    DEBUG_SHOW_RESPONSES_RAW,
-    DEBUG_SHOW_RESPONSES_ENC,
-    FRAME_SYNC,
-    FRAME_SYNC_ESC,
-    FRAME_SYNC_END
+    FRAME_READ_CHUNK
 )
 from .commands import IntegraCommand, IntegraCmdData, IntegraCmdReadElementData
+from .debug import (
+    DEBUG_REQUESTS,
+    DEBUG_REQUESTS_RAW,
+    DEBUG_RESPONSES,
+    DEBUG_RESPONSES_RAW,
+    DEBUG_RESPONSES_TIME,
+    DEBUG_ENCRYPTED,
+    DEBUG_ENC_REQUESTS,
+    DEBUG_ENC_RESPONSES,
+    IntegraLazyHex
+)
 from .elements import IntegraZoneElement
-from .messages import IntegraRequest, IntegraResponse, IntegraResponseErrorCode
-from .tools import IntegraHelper
+from .frames import IntegraFrameDecoder
+from .messages import IntegraPreparedRequest, IntegraRequest, IntegraResponse, IntegraResponseErrorCode
+from .router import IntegraResponseRouter
+from .scheduler import IntegraRequestPriority, IntegraRequestScheduler, IntegraSchedulerStats
+from .stats import IntegraHistogram
+from .tracing import IntegraTraceCallback, IntegraTraceEvent, IntegraTraceOutcome, IntegraTraceSpan
 
 _LOGGER = logging.getLogger( __name__ )
 
@@ -45,51 +54,213 @@ IntegraChannelType = 'IntegraChannel'
 IntegraChannelEventCallback = Callable[ [ IntegraChannelType, IntegraChannelEvent, Any ], Awaitable ] | None
 
 
+class IntegraCommandStats( IntegraEntity ):
+    """Requests, timeouts, error codes and round trip latency of single command"""
+
+    def __init__( self, command: IntegraCommand ):
+        super().__init__()
+        self._command: IntegraCommand = command
+        self._requests: int = 0
+        self._timeouts: int = 0
+        self._errors: dict[ int, int ] = { }
+        self._latency: IntegraHistogram = IntegraHistogram()
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        fields.update( {
+            "Command": f"{self._command.name}",
+            "Requests": f"{self._requests}",
+            "Timeouts": f"{self._timeouts}",
+            "Errors": f"{self.errors_total}",
+            "Latency": f"{self._latency}",
+        } )
+
+    @property
+    def command( self ) -> IntegraCommand:
+        return self._command
+
+    @property
+    def requests( self ) -> int:
+        return self._requests
+
+    @property
+    def timeouts( self ) -> int:
+        return self._timeouts
+
+    @property
+    def errors( self ) -> dict[ int, int ]:
+        """Number of responses per error code (READ_RESULT other than success)"""
+        return self._errors
+
+    @property
+    def errors_total( self ) -> int:
+        return sum( self._errors.values() )
+
+    @property
+    def latency( self ) -> IntegraHistogram:
+        return self._latency
+
+
 class IntegraChannelStats( IntegraEntity ):
+    """Channel counters, bytes and uptime are counted per connection, byte totals and other counters for channel lifetime"""
 
     def __init__( self ):
         super().__init__()
-        self._date = datetime.min
+        self._started: float = time.monotonic()
         self._rx_bytes = 0
         self._rx_enc_bytes = 0
         self._tx_bytes = 0
         self._tx_enc_bytes = 0
+        self._rx_bytes_total: int = 0
+        self._tx_bytes_total: int = 0
+        self._connects: int = 0
+        self._commands: dict[ IntegraCommand, IntegraCommandStats ] = { }
+        self._latency: IntegraHistogram = IntegraHistogram()
+        self._lock_wait: IntegraHistogram = IntegraHistogram()
+        self._decoder: IntegraFrameDecoder | None = None
+        self._scheduler: IntegraSchedulerStats | None = None
+
+    @property
+    def uptime( self ) -> float:
+        """Seconds since connection was established"""
+        return time.monotonic() - self._started
 
     @property
     def rx_bytes( self ) -> int:
         return self._rx_bytes
 
+    @property
+    def rx_enc_bytes( self ) -> int:
+        return self._rx_enc_bytes
+
     @property
     def tx_bytes( self ) -> int:
         return self._tx_bytes
 
+    @property
+    def tx_enc_bytes( self ) -> int:
+        return self._tx_enc_bytes
+
+    @property
+    def rx_bytes_total( self ) -> int:
+        """Bytes received over all connections"""
+        return self._rx_bytes_total
+
+    @property
+    def tx_bytes_total( self ) -> int:
+        """Bytes sent over all connections"""
+        return self._tx_bytes_total
+
+    @property
+    def connects( self ) -> int:
+        return self._connects
+
+    @property
+    def reconnects( self ) -> int:
+        return max( 0, self._connects - 1 )
+
+    @property
+    def commands( self ) -> dict[ IntegraCommand, IntegraCommandStats ]:
+        return self._commands
+
+    @property
+    def requests( self ) -> int:
+        return sum( stats.requests for stats in self._commands.values() )
+
+    @property
+    def timeouts( self ) -> int:
+        return sum( stats.timeouts for stats in self._commands.values() )
+
+    @property
+    def errors( self ) -> int:
+        return sum( stats.errors_total for stats in self._commands.values() )
+
+    @property
+    def latency( self ) -> IntegraHistogram:
+        """Round trip latency of all answered requests"""
+        return self._latency
+
+    @property
+    def lock_wait( self ) -> IntegraHistogram:
+        """Time spent waiting for channel write lock"""
+        return self._lock_wait
+
+    @property
+    def scheduler( self ) -> IntegraSchedulerStats | None:
+        """Queue depth and wait time per priority class in request scheduler"""
+        return self._scheduler
+
+    @property
+    def frames( self ) -> int:
+        return self._decoder.frames if self._decoder is not None else 0
+
+    @property
+    def resyncs( self ) -> int:
+        return self._decoder.resyncs if self._decoder is not None else 0
+
+    @property
+    def discards( self ) -> int:
+        return self._decoder.discards if self._decoder is not None else 0
+
+    def __getitem__( self, command: IntegraCommand ) -> IntegraCommandStats | None:
+        return self._commands.get( command )
+
     def _write_fields( self, fields: dict[ str, str ] ) -> None:
         super()._write_fields( fields )
         fields.update( {
-            "Uptime": f"{(datetime.now() - self._date).seconds}",
+            "Uptime": f"{int( self.uptime )}",
             "RX": f"{self._rx_bytes} / {self._rx_enc_bytes}",
             "TX": f"{self._tx_bytes} / {self._tx_enc_bytes}",
+            "Requests": f"{self.requests} / {self.timeouts} / {self.errors}",
+            "Frames": f"{self.frames} / {self.resyncs} / {self.discards}",
+            "Reconnects": f"{self.reconnects}",
+            "Latency": f"{self._latency.p50 * 1000:.1f}ms / {self._latency.p95 * 1000:.1f}ms / {self._latency.p99 * 1000:.1f}ms",
+            "LockWait": f"{self._lock_wait.avg * 1000:.1f}ms / {self._lock_wait.max * 1000:.1f}ms",
         } )
 
+    def _attach( self, decoder: IntegraFrameDecoder, scheduler: IntegraSchedulerStats ) -> None:
+        self._decoder = decoder
+        self._scheduler = scheduler
+
     def restart( self ):
-        self._date = datetime.now()
+        self._started = time.monotonic()
         self._rx_bytes = 0
         self._rx_enc_bytes = 0
         self._tx_bytes = 0
         self._tx_enc_bytes = 0
+        self._connects += 1
 
     def update_rx_bytes( self, delta: int = 1 ):
         self._rx_bytes += delta
+        self._rx_bytes_total += delta
 
     def update_rx_enc_bytes( self, delta: int = 1 ):
         self._rx_enc_bytes += delta
 
     def update_tx_bytes( self, delta: int = 1 ):
         self._tx_bytes += delta
+        self._tx_bytes_total += delta
 
     def update_tx_enc_bytes( self, delta: int = 1 ):
         self._tx_enc_bytes += delta
 
+    def update_lock_wait( self, wait_time: float ) -> None:
+        self._lock_wait.add( wait_time )
+
+    def update_request( self, command: IntegraCommand, latency: float | None, error_code: int = IntegraResponseErrorCode.NO_ERROR ) -> None:
+        """Count finished request, latency is None when request timed out"""
+        stats = self._commands.get( command )
+        if stats is None:
+            stats = self._commands[ command ] = IntegraCommandStats( command )
+        stats._requests += 1
+        if latency is None:
+            stats._timeouts += 1
+            return
+        stats._latency.add( latency )
+        self._latency.add( latency )
+        if error_code != IntegraResponseErrorCode.NO_ERROR and error_code != IntegraResponseErrorCode.COMMAND_ACCEPTED:
+            stats._errors[ error_code ] = stats._errors.get( error_code, 0 ) + 1
+
 
 class IntegraChannelErrorCode( IntEnum ):
     NOT_CONNECTED = 0
@@ -164,26 +335,22 @@ class IntegraChannel:
         REQUEST = "request"
 
     class EncryptionHandler( IntegraEntity ):
-        _BLOCK_LENGTH = 16
         next_id_s: int = 0
 
-        @staticmethod
-        def _get_cipher( key: str | None ) -> Cipher | None:
-
-            if key is None or key == "":
-                return None
-
-            key_bytes = bytes( key, "ascii" )
-            key_data = [ 0 ] * 24
-            for i in range( 12 ):
-                key_data[ i ] = key_data[ i + 12 ] = key_bytes[ i ] if i < len( key_bytes ) else 0x20
-
-            return Cipher( algorithms.AES( bytes( key_data ) ), modes.ECB() )
-
         def __init__( self, channel: 'IntegraChannel', integration_key: str | None = None ):
             super().__init__()
             self._channel = channel
-            self._cipher = self._get_cipher( integration_key )
+            self._cipher: IntegraCipher | None = IntegraCipher.create( integration_key )
+
+            self._decoder: IntegraFrameDecoder = IntegraFrameDecoder()
+            self._frames: deque[ bytes ] = deque()
+            self._enc_buffer: bytes = bytes()
+
+            # tracing only, arrival time of chunk being decoded, of chunk holding start of partial frame and of
+            # chunks holding start of queued frames (entries belong to the last frames in queue)
+            self._rx_time: float | None = None
+            self._rx_first: float | None = None
+            self._frames_rx: deque[ float ] = deque()
 
             self._rolling_counter: int = 0
             self._id_r: int = 0
@@ -198,47 +365,6 @@ class IntegraChannel:
         def channel_id( self ) -> str:
             return self._channel.channel_id
 
-        @staticmethod
-        def _data_blocks( data: bytes, block_len: int ):
-            return [ data[ i:i + block_len ] for i in range( 0, len( data ), block_len ) ]
-
-        def _data_decrypt( self, data: bytes ) -> bytes:
-
-            decrypted_data = [ ]
-            decryptor = self._cipher.decryptor()
-            encryptor = self._cipher.encryptor()
-            cv = list( encryptor.update( bytes( [ 0 ] * self._BLOCK_LENGTH ) ) )
-            for block in self._data_blocks( data, self._BLOCK_LENGTH ):
-                temp = list( block )
-                c = list( block )
-                if len( block ) == self._BLOCK_LENGTH:
-                    c = list( decryptor.update( bytes( c ) ) )
-                    c = [ a ^ b for a, b in zip( c, cv ) ]
-                    cv = list( temp )
-                else:
-                    cv = list( encryptor.update( bytes( cv ) ) )
-                    c = [ a ^ b for a, b in zip( c, cv ) ]
-                decrypted_data += c
-            return bytes( decrypted_data )
-
-        def _data_encrypt( self, data: bytes ) -> bytes:
-            if len( data ) < self._BLOCK_LENGTH:
-                data += b'\x00' * (self._BLOCK_LENGTH - len( data ))
-            encrypted_data = [ ]
-            encryptor = self._cipher.encryptor()
-            cv = list( encryptor.update( bytes( [ 0 ] * self._BLOCK_LENGTH ) ) )
-            for block in self._data_blocks( data, self._BLOCK_LENGTH ):
-                p = list( block )
-                if len( block ) == self._BLOCK_LENGTH:
-                    p = [ a ^ b for a, b in zip( p, cv ) ]
-                    p = list( encryptor.update( bytes( p ) ) )
-                    cv = list( p )
-                else:
-                    cv = list( encryptor.update( bytes( cv ) ) )
-                    p = [ a ^ b for a, b in zip( p, cv ) ]
-                encrypted_data += p
-            return bytes( encrypted_data )
-
         def _write_data_with_pdu( self, data: bytes ) -> bytes:
             pdu = (
                     os.urandom( 2 ) +
@@ -250,10 +376,10 @@ class IntegraChannel:
             self._rolling_counter &= 0xFFFF
             self._id_s = pdu[ 4 ]
 
-            return self._data_encrypt( pdu + data )
+            return self._cipher.encrypt( pdu + data )
 
         def _read_data_from_pdu( self, pdu: bytes ) -> bytes:
-            decrypted_pdu = self._data_decrypt( pdu )
+            decrypted_pdu = self._cipher.decrypt( pdu )
             header = decrypted_pdu[ :6 ]
             data = decrypted_pdu[ 6: ]
             self._id_r = header[ 4 ]
@@ -261,90 +387,97 @@ class IntegraChannel:
                 raise IntegraChannelError( self.channel_id, IntegraChannelErrorCode.INVALID_ENCRYPTION_KEY, f"Incorrect value of ID_S, received 0x{decrypted_pdu[ 5 ]:02x}, expected 0x{self._id_s:02x}" )
             return bytes( data )
 
-        async def _async_read_encrypted( self ) -> bytes:
-
-            read_chunk = await self.channel._async_channel_read( 1 )
-            self._channel._stats.update_rx_enc_bytes( 1 )
-            if len( read_chunk ) == 0 or read_chunk[ 0 ] == 0:
-                raise IntegraChannelError( self.channel_id, IntegraChannelErrorCode.REMOTE_CLOSED )
-
-            size: int = read_chunk[ 0 ]
-            pdu = await self.channel._async_channel_read( size )
-            if DEBUG_SHOW_RESPONSES_ENC:
-                _LOGGER.debug( f"_async_read_encrypted[{self.channel_id}]: <E< ({size}) [ {IntegraHelper.hex_str( pdu )} ]" )
-            data = self._read_data_from_pdu( pdu )
+        def reset( self ) -> None:
+            self._decoder.reset()
+            self._frames.clear()
+            self._enc_buffer = bytes()
+            self._rx_first = None
+            self._frames_rx.clear()
+
+        def _feed_plain( self, data: bytes ) -> None:
+            self._channel._stats.update_rx_bytes( len( data ) )
+            frames = self._decoder.feed( data )
+            if frames:
+                self._frames.extend( frames )
+            if self._rx_time is not None:
+                self._trace_frames( len( frames ) )
+
+        def _trace_frames( self, count: int ) -> None:
+            rx_time = self._rx_time
+            first = self._rx_first if self._rx_first is not None else rx_time
+            for _ in range( count ):
+                self._frames_rx.append( first )
+                first = rx_time
+            if not self._decoder.partial:
+                self._rx_first = None
+            elif count > 0 or self._rx_first is None:
+                self._rx_first = rx_time
+
+        def _feed_encrypted( self, data: bytes ) -> None:
+            self._channel._stats.update_rx_enc_bytes( len( data ) )
+            buffer = self._enc_buffer + data if self._enc_buffer else data
+            buffer_len = len( buffer )
+            pos = 0
+            while pos < buffer_len:
+                size: int = buffer[ pos ]
+                if size == 0:
+                    raise IntegraChannelError( self.channel_id, IntegraChannelErrorCode.REMOTE_CLOSED )
+                if pos + 1 + size > buffer_len:
+                    break
+                pdu = buffer[ pos + 1:pos + 1 + size ]
+                pos += 1 + size
+                if DEBUG_ENCRYPTED[ DEBUG_ENC_RESPONSES ]:
+                    _LOGGER.debug( "_feed_encrypted[%s]: <E< (%d) [ %s ]", self.channel_id, size, IntegraLazyHex( pdu ) )
+                self._feed_plain( self._read_data_from_pdu( pdu ) )
+            self._enc_buffer = buffer[ pos: ]
+
+        def feed( self, data: bytes ) -> None:
+            """Consume chunk of data received from channel, complete frames are queued for async_read"""
+            self._rx_time = time.monotonic() if self._channel._tracer is not None else None
+            if self._cipher is not None:
+                self._feed_encrypted( data )
+            else:
+                self._feed_plain( data )
 
-            return data
+        def _raw_tail( self ) -> bytes:
+            return self._enc_buffer if self._cipher is not None else self._decoder.raw_tail
 
-        async def _async_read_plain( self, source: bytes | None ) -> bytes:
+        def closed_error( self, exception: BaseException | None = None ) -> 'IntegraChannelError':
+            """Error describing end of input, remote endpoint may send textual 'Busy' reply before closing"""
+            raw = self._raw_tail()
+            if len( raw ) > 0 and raw[ 1: ].decode( DEFAULT_CODE_PAGE ).startswith( "Busy" ):
+                return IntegraChannelError( self.channel_id, IntegraChannelErrorCode.REMOTE_BUSY, exception )
+            return IntegraChannelError( self.channel_id, IntegraChannelErrorCode.REMOTE_CLOSED, exception )
 
-            in_message: bool = False
-            sync_bytes: int = 0
-            buffer: bytes = bytes()
-            raw: bytes = bytes()
-            read_index = 0
+        @property
+        def pending( self ) -> bool:
+            return len( self._frames ) > 0
+
+        def pop_response( self ) -> IntegraResponse | None:
+            buffer = self._frames.popleft()
+            recorder = self._channel._recorder
+            if recorder is not None:
+                recorder.record( IntegraCaptureDirection.RX, buffer[ 0 ], buffer[ 1:-2 ] )
+            if DEBUG_RESPONSES_RAW[ buffer[ 0 ] ]:
+                _LOGGER.debug( "async_channel_read[%s]: <<< %s", self.channel_id, IntegraLazyHex( buffer ) )
+
+            if len( self._frames_rx ) > len( self._frames ):
+                first_byte = self._frames_rx.popleft()
+                response = IntegraResponse.from_bytes( buffer )
+                if response is not None:
+                    response.rx_times = (first_byte, time.monotonic())
+                return response
 
-            while True:
-                if source is None:
-                    read_chunk = await self.channel._async_channel_read( 1 )
-                    if len( read_chunk ) == 0:
-                        if len( raw ) > 0 and raw[ 1: ].decode( DEFAULT_CODE_PAGE ).startswith( "Busy" ):
-                            raise IntegraChannelError( self.channel_id, IntegraChannelErrorCode.REMOTE_BUSY )
-                        raise IntegraChannelError( self.channel_id, IntegraChannelErrorCode.REMOTE_CLOSED )
-                    raw += read_chunk
-                    read_byte = read_chunk[ 0 ]
-                else:
-                    read_byte = source[ read_index ]
-                    read_index += 1
-                    if read_index > len( source ):
-                        raise IntegraChannelError( self.channel_id, IntegraChannelErrorCode.REMOTE_CLOSED )
-                self._channel._stats.update_rx_bytes()
-
-                if read_byte == FRAME_SYNC:
-                    if in_message:
-                        # syncBytes == 0 means special sequence or end of message
-                        # otherwise we discard all received bytes
-                        if sync_bytes != 0:
-                            _LOGGER.warning( f"Received frame sync bytes, discarding input: {IntegraHelper.hex_str( buffer )}" )
-                            # clear gathered bytes, we wait for new message
-                            in_message = False
-                            buffer = bytes()
-                            raw = bytes()
-                    sync_bytes += 1
-                else:
-                    if in_message:
-                        if sync_bytes == 0:
-                            # in sync, we have next messaged byte
-                            buffer += bytes( [ read_byte ] )
-                        elif sync_bytes == 1:
-                            if read_byte == FRAME_SYNC_ESC:
-                                buffer += bytes( [ FRAME_SYNC ] )
-                            elif read_byte == FRAME_SYNC_END:
-                                break
-                            else:
-                                _LOGGER.warning(
-                                    f"Received invalid byte {read_byte}, discarding input: {IntegraHelper.hex_str( buffer )}" )
-                                in_message = False
-                                buffer = bytes()
-                                raw = bytes()
-                        else:
-                            _LOGGER.error( f"Sync bytes in message: {len( buffer )}" )
-                    elif sync_bytes >= 2:
-                        in_message = True
-                        buffer += bytes( [ read_byte ] )
-                    # otherwise we ignore all bytes until synced
-                    sync_bytes = 0
-
-            return buffer
+            return IntegraResponse.from_bytes( buffer )
 
         async def async_read( self ) -> IntegraResponse | None:
-            decrypted = await self._async_read_encrypted() if self._cipher is not None else None
-            buffer = await self._async_read_plain( decrypted )
+            while not self._frames:
+                read_chunk = await self.channel._async_channel_read( FRAME_READ_CHUNK )
+                if len( read_chunk ) == 0:
+                    raise self.closed_error()
+                self.feed( read_chunk )
 
-            if IntegraHelper.debug_message( buffer[ 0 ], DEBUG_SHOW_RESPONSES_RAW ):
-                _LOGGER.debug( f"async_channel_read[{self.channel_id}]: <<< {IntegraHelper.hex_str( buffer )}" )
-
-            return IntegraResponse.from_bytes( buffer )
+            return self.pop_response()
 
         async def async_write( self, data: bytes ) -> None:
 
@@ -353,8 +486,8 @@ class IntegraChannel:
                 data = self._write_data_with_pdu( data )
                 data = (len( data )).to_bytes( 1, "big" ) + data
                 self._channel._stats.update_tx_enc_bytes( len( data ) )
-                if DEBUG_SHOW_REQUESTS_ENC:
-                    _LOGGER.debug( f"async_write[{self.channel_id}]: >E> ({len( data )}) [ {IntegraHelper.hex_str( data )} ]" )
+                if DEBUG_ENCRYPTED[ DEBUG_ENC_REQUESTS ]:
+                    _LOGGER.debug( "async_write[%s]: >E> (%d) [ %s ]", self.channel_id, len( data ), IntegraLazyHex( data ) )
 
             return await self.channel._async_channel_write( data )
 
@@ -362,15 +495,20 @@ class IntegraChannel:
 
         self._eventloop = eventloop
         self._write_lock: Lock = Lock()
-        self._cmd_exec_lock: Lock = Lock()
+        self._scheduler: IntegraRequestScheduler = IntegraRequestScheduler( eventloop )
         self._ping_task: Task | None = None
         self._read_task: Task | None = None
         self._keepalive: float = DEFAULT_KEEP_ALIVE
         self._last_write = datetime.now()
-        self._response_handlers: list[ Callable[ [ IntegraResponse | BaseException ], bool ] ] = [ ]
+        self._router: IntegraResponseRouter = IntegraResponseRouter( eventloop )
         self._handler: IntegraChannel.EncryptionHandler = IntegraChannel.EncryptionHandler( self, integration_key )
         self._on_event: IntegraChannelEventCallback = on_event
         self._stats: IntegraChannelStats = IntegraChannelStats()
+        self._stats._attach( self._handler._decoder, self._scheduler.stats )
+        self._recorder: IntegraCaptureWriter | None = None
+        self._tracer: IntegraTraceCallback = None
+        # keyed by future of router entry, the same (prepared) request may be in flight more than once
+        self._traces: dict[ Future, IntegraTraceSpan ] = { }
 
     @property
     def connected( self ) -> bool:
@@ -384,6 +522,35 @@ class IntegraChannel:
     def stats( self ):
         return self._stats
 
+    @property
+    def recorder( self ) -> IntegraCaptureWriter | None:
+        return self._recorder
+
+    @recorder.setter
+    def recorder( self, value: IntegraCaptureWriter | None ) -> None:
+        self._recorder = value
+
+    @property
+    def tracer( self ) -> IntegraTraceCallback:
+        """Callback receiving IntegraTraceSpan of every finished request, None disables tracing"""
+        return self._tracer
+
+    @tracer.setter
+    def tracer( self, value: IntegraTraceCallback ) -> None:
+        self._tracer = value
+
+    @property
+    def scheduler( self ) -> IntegraRequestScheduler:
+        return self._scheduler
+
+    @property
+    def pipeline_window( self ) -> int:
+        return self._scheduler.size
+
+    @pipeline_window.setter
+    def pipeline_window( self, value: int ) -> None:
+        self._scheduler.size = value
+
     async def _async_channel_connect( self, timeout: float = DEFAULT_CONN_TIMEOUT ) -> bool:
         return False
 
@@ -396,59 +563,74 @@ class IntegraChannel:
     async def _async_channel_close( self ):
         pass
 
-    async def _async_post_data( self, data: bytes ) -> None:
+    async def _async_channel_read_response( self ) -> IntegraResponse | None:
+        return await self._handler.async_read()
+
+    async def _async_post_data( self, data: bytes, span: IntegraTraceSpan | None = None ) -> None:
 
         if not self.connected:
             raise IntegraChannelError( self.channel_id, IntegraChannelErrorCode.NOT_CONNECTED )
 
         try:
+            lock_begin = time.monotonic()
             async with self._write_lock:
+                lock_acquired = time.monotonic()
+                self._stats.update_lock_wait( lock_acquired - lock_begin )
                 await self._handler.async_write( data )
                 self._last_write = datetime.now()
+                if span is not None:
+                    span.mark( IntegraTraceEvent.LOCK_ACQUIRED, lock_acquired )
+                    span.mark( IntegraTraceEvent.WRITTEN )
 
         except OSError as err:
             await self._async_close( IntegraChannel.CloseSource.REQUEST )
             raise IntegraChannelError( self.channel_id, IntegraChannelErrorCode.WRITE_ERROR, err ) from None
 
-    async def _async_post_request( self, request: IntegraRequest ) -> None:
+    async def _async_post_request( self, request: IntegraRequest, span: IntegraTraceSpan | None = None ) -> None:
         payload = request.get_payload()
-        if IntegraHelper.debug_message( request.command, DEBUG_SHOW_REQUESTS ):
-            _LOGGER.debug( f"_async_post_request[{self.channel_id}]: >>> {request}" )
+        if self._recorder is not None:
+            self._recorder.record( IntegraCaptureDirection.TX, request.command, request.get_data_bytes() )
+        if DEBUG_REQUESTS[ request.command ]:
+            _LOGGER.debug( "_async_post_request[%s]: >>> %s", self.channel_id, request )
 
-        if IntegraHelper.debug_message( request.command, DEBUG_SHOW_REQUESTS_RAW ):
-            _LOGGER.debug( f"_async_post_request[{self.channel_id}]: >>> {IntegraHelper.hex_str( payload )}" )
+        if DEBUG_REQUESTS_RAW[ request.command ]:
+            _LOGGER.debug( "_async_post_request[%s]: >>> %s", self.channel_id, IntegraLazyHex( payload ) )
 
-        await self._async_post_data( payload )
+        await self._async_post_data( payload, span )
 
     async def _async_send_request(
-            self, request: IntegraRequest, timeout: float = DEFAULT_RESP_TIMEOUT
+            self, request: IntegraRequest, timeout: float = DEFAULT_RESP_TIMEOUT, priority: IntegraRequestPriority | None = None
     ) -> IntegraResponse:
         """ Send message to controller and await response """
 
-        # prevent controller overloading and command loss - wait until finished (lock released)
-        async with (self._cmd_exec_lock):
-
-            result: IntegraResponse | None = None
-            response_reader = self._eventloop.create_future()
-
-            def on_response( response: IntegraResponse | BaseException ) -> bool:
-
-                if not response_reader.done():
+        span: IntegraTraceSpan | None = None
+        if self._tracer is not None:
+            span = IntegraTraceSpan( self.channel_id, request.command, len( request.get_data_bytes() ), priority or IntegraRequestScheduler.get_priority( request.command ) )
+            try:
+                return await self._async_exec_request( request, timeout, priority, span )
+            finally:
+                if span.outcome == IntegraTraceOutcome.PENDING:
+                    span.finish( IntegraTraceOutcome.FAILED )
+                self._tracer( span )
 
-                    if isinstance( response, BaseException ):
-                        response_reader.set_result( response )
-                        return False
+        return await self._async_exec_request( request, timeout, priority, span )
 
-                    elif (request.command == response.command) or (request.result_allowed and response.command == IntegraCommand.READ_RESULT):
-                        response.bind_request( request )
-                        response_reader.set_result( response )
-                        return True
+    async def _async_exec_request(
+            self, request: IntegraRequest, timeout: float, priority: IntegraRequestPriority | None, span: IntegraTraceSpan | None
+    ) -> IntegraResponse:
 
-                return False
+        # prevent controller overloading and command loss - wait for free slot in request window (by priority), responses
+        # are matched in FIFO order by command, READ_RESULT goes to the oldest request which allows it
+        async with self._scheduler.slot( request.command, priority ):
 
-            self._response_handlers.append( on_response )
+            result: IntegraResponse | BaseException | None = None
+            response_reader = self._router.register( request )
+            request_begin = time.monotonic()
+            if span is not None:
+                span.mark( IntegraTraceEvent.SLOT_ACQUIRED, request_begin )
+                self._traces[ response_reader ] = span
             try:
-                await self._async_post_request( request )
+                await self._async_post_request( request, span )
 
                 while True:
                     try:
@@ -461,23 +643,33 @@ class IntegraChannel:
                     except AsyncCancelledError as err:
                         raise IntegraChannelError( self.channel_id, IntegraChannelErrorCode.READ_ERROR, err )
             finally:
-                try:
-                    self._response_handlers.remove( on_response )
-                except ValueError:
-                    pass
+                self._router.unregister( response_reader )
+                if span is not None:
+                    self._traces.pop( response_reader, None )
 
             if isinstance( result, BaseException ):
                 raise result
             else:
                 if result is None:
+                    self._stats.update_request( request.command, None )
                     result = IntegraResponse.error( request.command, IntegraResponseErrorCode.NO_RESPONSE )
                     result.bind_request( request )
+                    if span is not None:
+                        span.finish( IntegraTraceOutcome.TIMEOUT )
 
-                elif request.result_allowed and result.command == IntegraCommand.READ_RESULT:
+                elif result.command == IntegraCommand.READ_RESULT:
+                    self._stats.update_request( request.command, time.monotonic() - request_begin, result.data[ 0 ] )
                     result = IntegraResponse.result( request.command, result.data[ 0 ] )
                     result.bind_request( request )
-                    if IntegraHelper.debug_message( request.command, DEBUG_SHOW_RESPONSES ):
-                        _LOGGER.debug( f"_async_send_request[{self.channel_id}]: <<< {result}" )
+                    if span is not None:
+                        span.finish( IntegraTraceOutcome.RESULT, result.error_code_no )
+                    if DEBUG_RESPONSES[ request.command ]:
+                        _LOGGER.debug( "_async_send_request[%s]: <<< %s", self.channel_id, result )
+
+                else:
+                    self._stats.update_request( request.command, time.monotonic() - request_begin )
+                    if span is not None:
+                        span.finish( IntegraTraceOutcome.SUCCESS )
 
             return result
 
@@ -523,17 +715,22 @@ class IntegraChannel:
         try:
             _LOGGER.debug( f"_async_read_task[{self.channel_id}]: STARTED" )
             while True:
-                response = await  self._handler.async_read()
+                response = await self._async_channel_read_response()
                 if response:
-                    begin_ts = datetime.now()
-                    response_handled: bool = False
-                    for response_handler in self._response_handlers[ : ]:
-                        response_handled = response_handler( response )
-                        if response_handled:
-                            break
-
-                    if IntegraHelper.debug_message( response.command, DEBUG_SHOW_RESPONSES ):
-                        _LOGGER.debug( f"_async_read_task[{self.channel_id}]: <<< [{"H" if response_handled else " "}{"B" if response.broadcast else " "}] {response}" )
+                    show_time = DEBUG_RESPONSES_TIME[ response.command ]
+                    begin_ts = time.monotonic() if show_time else 0.0
+                    response_reader = self._router.route( response )
+                    response_handled: bool = response_reader is not None
+                    span = self._traces.get( response_reader ) if self._traces and response_handled else None
+                    if span is not None:
+                        span.mark( IntegraTraceEvent.RESOLVED )
+                        if response.rx_times is not None:
+                            span.mark( IntegraTraceEvent.FIRST_BYTE, response.rx_times[ 0 ] )
+                            span.mark( IntegraTraceEvent.DECODED, response.rx_times[ 1 ] )
+                        span.response_size = len( response.data ) if isinstance( response.data, bytes ) else 0
+
+                    if DEBUG_RESPONSES[ response.command ]:
+                        _LOGGER.debug( "_async_read_task[%s]: <<< [%s%s] %s", self.channel_id, "H" if response_handled else " ", "B" if response.broadcast else " ", response )
 
                     if not response_handled or response.broadcast:
                         try:
@@ -542,8 +739,11 @@ class IntegraChannel:
                             _LOGGER.error( f"_async_read_task[{self.channel_id}]: FAILURE - error while dispatching notification, {err}" )
                             print( traceback.format_exc() )
 
-                    if IntegraHelper.debug_message( response.command, DEBUG_SHOW_RESPONSES ) and DEBUG_SHOW_RESPONSES_TIME:
-                        _LOGGER.debug( f"_async_read_task[{self.channel_id}]:          Dispatch time = {(datetime.now() - begin_ts).total_seconds():.3f} seconds" )
+                    if span is not None:
+                        span.mark( IntegraTraceEvent.CALLBACK_DONE )
+
+                    if show_time:
+                        _LOGGER.debug( "_async_read_task[%s]:          Dispatch time = %.3f seconds", self.channel_id, time.monotonic() - begin_ts )
 
         except AsyncCancelledError:
             # _LOGGER.debug( f"_async_read_task[{self.channel_id}]: CANCELLED" )
@@ -558,8 +758,7 @@ class IntegraChannel:
             if task_err is None:
                 _LOGGER.debug( f"_async_read_task[{self.channel_id}]: FINISHED {'(Cancelled)' if task_self.cancelling() != 0 else ''}" )
             else:
-                for response_handler in self._response_handlers[ : ]:
-                    response_handler( task_err )
+                self._router.fail_all( task_err )
                 _LOGGER.debug( f"_async_read_task[{self.channel_id}]: FINISHED ({task_err})" )
 
     async def _async_ping_task( self ) -> None:
@@ -569,7 +768,7 @@ class IntegraChannel:
 
         try:
             _LOGGER.debug( f"_async_ping_task[{self.channel_id}]: STARTED" )
-            cmd_data = IntegraCmdReadElementData( IntegraZoneElement, 1 )
+            request = IntegraPreparedRequest( IntegraCommand.ELEMENT_READ_NAME, IntegraCmdReadElementData( IntegraZoneElement, 1 ) )
             while True:
                 last_write = (datetime.now() - self._last_write).total_seconds()
                 if last_write < self._keepalive:
@@ -577,7 +776,7 @@ class IntegraChannel:
                     await asyncio.sleep( period )
                 else:
                     self._last_write = datetime.now()
-                    await self.async_send_command( IntegraCommand.ELEMENT_READ_NAME, cmd_data )
+                    await self.async_send_request( request, priority = IntegraRequestPriority.KEEPALIVE )
 
         except AsyncCancelledError:
             # _LOGGER.debug( f"_async_ping_task[{self.channel_id}]: CANCELLED" )
@@ -618,11 +817,15 @@ class IntegraChannel:
             _LOGGER.warning( f"async_connect[{self.channel_id}] Already connected" )
             return True
 
+        return await self.async_open( timeout ) and await self.async_notify_connected()
+
+    async def async_open( self, timeout: float = 30.0 ) -> bool:
+        """Connect to remote endpoint and start read and ping tasks, CONNECTED is reported by async_notify_connected"""
         try:
+            self._handler.reset()
             if await self._async_channel_connect( timeout ):
                 self._read_task = self._eventloop.create_task( self._async_read_task(), name = IntegraChannel.CloseSource.READ_TASK.value )
                 self._ping_task = self._eventloop.create_task( self._async_ping_task(), name = IntegraChannel.CloseSource.PING_TASK.value )
-                await self._async_do_event( IntegraChannelEvent.CONNECTED, None )
                 return True
 
         except BaseException as err:
@@ -632,6 +835,17 @@ class IntegraChannel:
 
         return False
 
+    async def async_notify_connected( self ) -> bool:
+        """Report CONNECTED of channel opened by async_open, connection is closed when handling of it fails"""
+        try:
+            await self._async_do_event( IntegraChannelEvent.CONNECTED, None )
+            return True
+
+        except BaseException as err:
+            _LOGGER.error( f"async_connect[{self.channel_id}] channel connect failed, {err}" )
+            await self._async_close( IntegraChannel.CloseSource.CONNECT )
+            raise
+
     async def async_disconnect( self, reconnect: bool = False ) -> None:
         await self._async_close(
             IntegraChannel.CloseSource.REQUEST if reconnect else IntegraChannel.CloseSource.DISCONNECT )
@@ -640,9 +854,15 @@ class IntegraChannel:
         await self._async_post_request( IntegraRequest( command, data ) )
 
     async def async_send_command(
-            self, command: IntegraCommand, data: IntegraCmdData | bytes | None = None, timeout: float = DEFAULT_RESP_TIMEOUT
+            self, command: IntegraCommand, data: IntegraCmdData | bytes | None = None, timeout: float = DEFAULT_RESP_TIMEOUT,
+            priority: IntegraRequestPriority | None = None
     ) -> IntegraResponse:
 
         request = IntegraRequest( command, data )
-        response = await self._async_send_request( request, timeout )
+        response = await self._async_send_request( request, timeout, priority )
         return response
+
+    async def async_send_request(
+            self, request: IntegraRequest, timeout: float = DEFAULT_RESP_TIMEOUT, priority: IntegraRequestPriority | None = None
+    ) -> IntegraResponse:
+        return await self._async_send_request( request, timeout, priority )
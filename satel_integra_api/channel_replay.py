@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import os
+
+from asyncio import AbstractEventLoop, Queue, Task
+from collections import Counter
+
+from .capture import IntegraCaptureDirection, IntegraCaptureReader, IntegraCaptureRecord
+from .channel import IntegraChannel, IntegraChannelEventCallback
+from .commands import IntegraCommand
+from .const import DEFAULT_CONN_TIMEOUT, DEFAULT_RESP_TIMEOUT
+from .frames import IntegraFrameDecoder
+from .messages import IntegraRequest
+
+_LOGGER = logging.getLogger( __name__ )
+
+REPLAY_QUEUE_SIZE = 64
+
+
+class IntegraChannelReplay( IntegraChannel ):
+    """Channel playing back frames received from panel and stored in capture log.
+
+    Received (RX) frames are encoded again (and encrypted, if integration key is set) and passed to channel read
+    path, so they go through EncryptionHandler, read task and client notification handling as live traffic would.
+    Frames are delayed according to their timestamps divided by speed, speed 0 replays at maximum speed.
+
+    With follow_requests set, replay stops at every request (TX) record until client sends request with the same
+    command (or request timeout expires), so responses are delivered to requests which await them.
+    """
+
+    def __init__( self, eventloop: AbstractEventLoop, capture_file: str, integration_key: str = "", on_event: IntegraChannelEventCallback = None,
+                  speed: float = 1.0, follow_requests: bool = True, request_timeout: float = DEFAULT_RESP_TIMEOUT ) -> None:
+        super().__init__( eventloop, integration_key, on_event )
+        self._capture_file: str = capture_file
+        self._speed: float = max( 0.0, speed )
+        self._follow_requests: bool = follow_requests
+        self._request_timeout: float = request_timeout
+        self._connected: bool = False
+        self._replay_task: Task | None = None
+        self._rx_queue: Queue[ bytes ] = Queue( REPLAY_QUEUE_SIZE )
+        self._tx_decoder: IntegraFrameDecoder = IntegraFrameDecoder()
+        self._tx_enc_buffer: bytes = bytes()
+        self._requested: Counter[ int ] = Counter()
+        self._request_event: asyncio.Event = asyncio.Event()
+        self._finished: asyncio.Event = asyncio.Event()
+        self._rolling_counter: int = 0
+        self._replayed: int = 0
+        self._skipped: int = 0
+
+    @property
+    def channel_id( self ) -> str:
+        return f"replay:{os.path.basename( self._capture_file )}"
+
+    @property
+    def connected( self ) -> bool:
+        return self._connected
+
+    @property
+    def capture_file( self ) -> str:
+        return self._capture_file
+
+    @property
+    def speed( self ) -> float:
+        return self._speed
+
+    @property
+    def replayed( self ) -> int:
+        """Number of frames passed to channel read path"""
+        return self._replayed
+
+    @property
+    def skipped( self ) -> int:
+        """Number of request records client did not send in time"""
+        return self._skipped
+
+    @property
+    def finished( self ) -> bool:
+        return self._finished.is_set()
+
+    async def async_wait_finished( self, timeout: float | None = None ) -> bool:
+        """Wait until all records are replayed, returns False on timeout"""
+        try:
+            await asyncio.wait_for( self._finished.wait(), timeout )
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _encode( self, record: IntegraCaptureRecord ) -> bytes | None:
+        try:
+            command = IntegraCommand( record.command )
+        except ValueError:
+            _LOGGER.warning( f"_encode[{self.channel_id}]: unknown command 0x{record.command:02X}, record skipped" )
+            return None
+
+        frame = IntegraRequest.encode_frame( command, record.data )
+        cipher = self._handler._cipher
+        if cipher is None:
+            return frame
+        # reply as panel does, header carries id of client's last request
+        pdu = (
+                os.urandom( 2 ) +
+                self._rolling_counter.to_bytes( 2, byteorder="big" ) +
+                bytes( [ os.urandom( 1 )[ 0 ], self._handler._id_s & 0xFF ] )
+        )
+        self._rolling_counter = (self._rolling_counter + 1) & 0xFFFF
+        data = cipher.encrypt( pdu + frame )
+        return len( data ).to_bytes( 1, "big" ) + data
+
+    def _requests_from_data( self, data: bytes ) -> None:
+        cipher = self._handler._cipher
+        if cipher is not None:
+            buffer = self._tx_enc_buffer + data
+            plain = bytearray()
+            pos = 0
+            while pos < len( buffer ) and pos + 1 + buffer[ pos ] <= len( buffer ):
+                plain += cipher.decrypt( buffer[ pos + 1:pos + 1 + buffer[ pos ] ] )[ 6: ]
+                pos += 1 + buffer[ pos ]
+            self._tx_enc_buffer = buffer[ pos: ]
+            data = bytes( plain )
+
+        frames = self._tx_decoder.feed( data )
+        if frames:
+            for frame in frames:
+                self._requested[ frame[ 0 ] ] += 1
+            self._request_event.set()
+
+    async def _async_wait_request( self, command: int ) -> bool:
+        deadline = self._eventloop.time() + self._request_timeout
+        while self._requested[ command ] == 0:
+            remaining = deadline - self._eventloop.time()
+            if remaining <= 0:
+                return False
+            self._request_event.clear()
+            try:
+                await asyncio.wait_for( self._request_event.wait(), remaining )
+            except asyncio.TimeoutError:
+                return False
+        self._requested[ command ] -= 1
+        return True
+
+    async def _async_replay_task( self, records: list[ IntegraCaptureRecord ] ) -> None:
+        _LOGGER.debug( f"_async_replay_task[{self.channel_id}]: STARTED ({len( records )} records, speed {self._speed})" )
+        previous = records[ 0 ].timestamp if records else 0.0
+        for record in records:
+            if record.direction == IntegraCaptureDirection.TX:
+                if self._follow_requests:
+                    if not await self._async_wait_request( record.command ):
+                        self._skipped += 1
+                    previous = record.timestamp
+                continue
+
+            if self._speed > 0:
+                delay = (record.timestamp - previous) / self._speed
+                if delay > 0:
+                    await asyncio.sleep( delay )
+            previous = record.timestamp
+
+            chunk = self._encode( record )
+            if chunk is not None:
+                await self._rx_queue.put( chunk )
+                self._replayed += 1
+
+        _LOGGER.debug( f"_async_replay_task[{self.channel_id}]: FINISHED ({self._replayed} replayed, {self._skipped} skipped)" )
+        self._finished.set()
+
+    async def _async_channel_connect( self, timeout: float = DEFAULT_CONN_TIMEOUT ) -> bool:
+        records = IntegraCaptureReader( self._capture_file ).records()
+        self._rx_queue = Queue( REPLAY_QUEUE_SIZE )
+        self._tx_decoder.reset()
+        self._tx_enc_buffer = bytes()
+        self._requested.clear()
+        self._finished.clear()
+        self._replayed = 0
+        self._skipped = 0
+        self._connected = True
+        self._replay_task = self._eventloop.create_task( self._async_replay_task( records ), name="replay_task" )
+        return True
+
+    async def _async_channel_close( self ):
+        self._connected = False
+        if self._replay_task is not None:
+            self._replay_task.cancel()
+            try:
+                await self._replay_task
+            except asyncio.CancelledError:
+                pass
+            self._replay_task = None
+
+    async def _async_channel_read( self, count: int ) -> bytes:
+        return await self._rx_queue.get()
+
+    async def _async_channel_write( self, data: bytes ):
+        self._requests_from_data( data )
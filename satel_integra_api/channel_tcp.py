@@ -2,20 +2,106 @@ import asyncio
 import socket
 import logging
 
-from asyncio import StreamReader, StreamWriter, AbstractEventLoop
+from asyncio import StreamReader, StreamWriter, AbstractEventLoop, BaseProtocol, Future, Protocol, Queue, Transport
+from enum import StrEnum
 
 from .const import DEFAULT_CONN_TIMEOUT
 from .channel import IntegraChannel, IntegraChannelEventCallback, IntegraChannelError, IntegraChannelErrorCode
+from .messages import IntegraResponse
 
 _LOGGER = logging.getLogger( __name__ )
 
 
+class IntegraTcpTransport( StrEnum ):
+    STREAM = "stream"
+    PROTOCOL = "protocol"
+
+
+class IntegraChannelTCPProtocol( Protocol ):
+    """Callback based receiver, decodes frames directly in data_received and queues complete responses for read task"""
+
+    def __init__( self, channel: 'IntegraChannelTCP' ) -> None:
+        self._channel: IntegraChannelTCP = channel
+        self._transport: Transport | None = None
+        self._responses: Queue[ IntegraResponse | IntegraChannelError ] = Queue()
+        self._write_paused: bool = False
+        self._write_waiter: Future | None = None
+        self._closed: bool = False
+
+    @property
+    def transport( self ) -> Transport | None:
+        return self._transport
+
+    def connection_made( self, transport: BaseProtocol ) -> None:
+        self._transport = transport
+
+    def data_received( self, data: bytes ) -> None:
+        if self._closed:
+            return
+        handler = self._channel._handler
+        try:
+            handler.feed( data )
+            while handler.pending:
+                self._responses.put_nowait( handler.pop_response() )
+        except IntegraChannelError as err:
+            self._set_closed( err )
+
+    def eof_received( self ) -> bool:
+        self._set_closed( self._channel._handler.closed_error() )
+        return False
+
+    def connection_lost( self, exc: Exception | None ) -> None:
+        if exc is None:
+            self._set_closed( self._channel._handler.closed_error() )
+        else:
+            self._set_closed( IntegraChannelError( self._channel.channel_id, IntegraChannelErrorCode.READ_ERROR, exc ) )
+        self._wake_writer( exc )
+
+    def pause_writing( self ) -> None:
+        self._write_paused = True
+
+    def resume_writing( self ) -> None:
+        self._write_paused = False
+        self._wake_writer( None )
+
+    def _set_closed( self, err: IntegraChannelError ) -> None:
+        if not self._closed:
+            self._closed = True
+            self._responses.put_nowait( err )
+
+    def _wake_writer( self, exc: Exception | None ) -> None:
+        waiter, self._write_waiter = self._write_waiter, None
+        if waiter is not None and not waiter.done():
+            if exc is None:
+                waiter.set_result( None )
+            else:
+                waiter.set_exception( exc )
+
+    async def async_drain( self ) -> None:
+        if self._closed:
+            raise ConnectionResetError( "Connection lost" )
+        if self._write_paused:
+            self._write_waiter = self._channel._eventloop.create_future()
+            await self._write_waiter
+
+    async def async_read_response( self ) -> IntegraResponse | None:
+        result = await self._responses.get()
+        if isinstance( result, IntegraChannelError ):
+            # keep error queued, so every subsequent read fails the same way
+            self._responses.put_nowait( result )
+            raise result
+        return result
+
+
 class IntegraChannelTCP( IntegraChannel ):
 
-    def __init__( self, eventloop: AbstractEventLoop, host: str, port: int, integration_key: str, on_event: IntegraChannelEventCallback = None ) -> None:
+    def __init__( self, eventloop: AbstractEventLoop, host: str, port: int, integration_key: str, on_event: IntegraChannelEventCallback = None,
+                  transport: IntegraTcpTransport | str = IntegraTcpTransport.STREAM ) -> None:
         super().__init__( eventloop, integration_key, on_event )
         self._host: str = host
         self._port: int = port
+        self._transport: IntegraTcpTransport = IntegraTcpTransport( transport )
+        self._tcp_protocol: IntegraChannelTCPProtocol | None = None
 
         self._local_addr: str = ""
         self._local_port: int = -1
@@ -51,7 +137,10 @@ class IntegraChannelTCP( IntegraChannel ):
         _LOGGER.debug( f"async_connect[{self.host}] connection established ({self._local_addr}:{self._local_port} <==> "
                        f"{self._remote_addr}:{self._remote_port})" )
 
-        self._tcp_reader, self._tcp_writer = await asyncio.open_connection( sock=self._socket )
+        if self._transport == IntegraTcpTransport.PROTOCOL:
+            _, self._tcp_protocol = await self._eventloop.create_connection( lambda: IntegraChannelTCPProtocol( self ), sock=self._socket )
+        else:
+            self._tcp_reader, self._tcp_writer = await asyncio.open_connection( sock=self._socket )
         return True
 
     async def _async_channel_close( self ):
@@ -67,6 +156,11 @@ class IntegraChannelTCP( IntegraChannel ):
 
         self._tcp_reader = None
 
+        if self._tcp_protocol:
+            if self._tcp_protocol.transport is not None:
+                self._tcp_protocol.transport.close()
+            self._tcp_protocol = None
+
         self._socket.close()
         self._socket = None
 
@@ -76,9 +170,17 @@ class IntegraChannelTCP( IntegraChannel ):
         except Exception as err:
             raise IntegraChannelError( self.channel_id, IntegraChannelErrorCode.READ_ERROR, err ) from err
 
+    async def _async_channel_read_response( self ) -> IntegraResponse | None:
+        if self._tcp_protocol is None:
+            return await super()._async_channel_read_response()
+        return await self._tcp_protocol.async_read_response()
+
     async def _async_channel_write( self, data: bytes ):
         try:
-            if self._tcp_writer is not None:
+            if self._tcp_protocol is not None:
+                self._tcp_protocol.transport.write( data )
+                await self._tcp_protocol.async_drain()
+            elif self._tcp_writer is not None:
                 self._tcp_writer.write( data )
                 await self._tcp_writer.drain()
         except Exception as err:
@@ -88,6 +190,10 @@ class IntegraChannelTCP( IntegraChannel ):
     def channel_id( self ) -> str:
         return f"{self.host}:{self.port}"
 
+    @property
+    def transport( self ) -> IntegraTcpTransport:
+        return self._transport
+
     @property
     def connected( self ) -> bool:
         return self._socket is not None
@@ -0,0 +1,70 @@
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+
+class IntegraCipher:
+    """ETHM-1 encryption engine, AES-192 with integration key based chaining used by Satel integration protocol.
+
+    ECB encryptor and decryptor contexts are created once per key and reused for every frame. Chaining is done
+    on Python integers, all full blocks of received data are decrypted in a single call.
+    """
+    BLOCK_LENGTH = 16
+
+    @staticmethod
+    def key_bytes( key: str ) -> bytes:
+        key_data = bytes( key, "ascii" )[ :12 ].ljust( 12, b" " )
+        return key_data + key_data
+
+    @classmethod
+    def create( cls, key: str | None ) -> 'IntegraCipher | None':
+        if key is None or key == "":
+            return None
+        return cls( key )
+
+    def __init__( self, key: str ) -> None:
+        cipher = Cipher( algorithms.AES( self.key_bytes( key ) ), modes.ECB() )
+        self._encryptor = cipher.encryptor()
+        self._decryptor = cipher.decryptor()
+        self._cv0: bytes = self._encryptor.update( bytes( self.BLOCK_LENGTH ) )
+
+    def decrypt( self, data: bytes ) -> bytes:
+        block_len = self.BLOCK_LENGTH
+        data_len = len( data )
+        full_len = data_len - data_len % block_len
+
+        if full_len:
+            decrypted = self._decryptor.update( data[ :full_len ] )
+            chain = self._cv0 + data[ :full_len - block_len ]
+            result = (int.from_bytes( decrypted ) ^ int.from_bytes( chain )).to_bytes( full_len )
+            cv = data[ full_len - block_len:full_len ]
+        else:
+            result = b""
+            cv = self._cv0
+
+        if full_len < data_len:
+            tail_len = data_len - full_len
+            key_stream = self._encryptor.update( cv )[ :tail_len ]
+            result += (int.from_bytes( data[ full_len: ] ) ^ int.from_bytes( key_stream )).to_bytes( tail_len )
+
+        return result
+
+    def encrypt( self, data: bytes ) -> bytes:
+        block_len = self.BLOCK_LENGTH
+        if len( data ) < block_len:
+            data = data.ljust( block_len, b"\x00" )
+        data_len = len( data )
+        full_len = data_len - data_len % block_len
+
+        encrypt = self._encryptor.update
+        blocks = [ ]
+        cv = int.from_bytes( self._cv0 )
+        for pos in range( 0, full_len, block_len ):
+            block = encrypt( (int.from_bytes( data[ pos:pos + block_len ] ) ^ cv).to_bytes( block_len ) )
+            blocks.append( block )
+            cv = int.from_bytes( block )
+
+        if full_len < data_len:
+            tail_len = data_len - full_len
+            key_stream = encrypt( cv.to_bytes( block_len ) )[ :tail_len ]
+            blocks.append( (int.from_bytes( data[ full_len: ] ) ^ int.from_bytes( key_stream )).to_bytes( tail_len ) )
+
+        return b"".join( blocks )
@@ -3,23 +3,28 @@ import json
 import os
 import datetime
 import logging
+import time
 import traceback
 
 from enum import IntEnum
 
 _LOGGER = logging.getLogger( __name__ )
 
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from asyncio import AbstractEventLoop, Task
+from collections.abc import Mapping
 from typing import Any, Callable, Awaitable
 
 from .const import DEFAULT_CONN_TIMEOUT, DEFAULT_RESP_TIMEOUT, DEFAULT_KEEP_ALIVE
 from .base import (IntegraEntity, IntegraType, IntegraBaseType, IntegraCaps, IntegraTroubles,
-                   IntegraMap, IntegraArmMode, IntegraModuleCaps, Integra1stCodeAction, IntegraDispatcher, IntegraContextRefCnt, IntegraError, IntegraTaskContextRefCnt)
+                   IntegraMap, IntegraArmMode, IntegraModuleCaps, Integra1stCodeAction, IntegraDispatcher, IntegraContextRefCnt, IntegraError, IntegraTaskContextRefCnt,
+                   IntegraConnectLimiter, IntegraDispatcherPool)
+from .capture import IntegraCaptureDirection, IntegraCaptureWriter
 from .channel import IntegraChannelStats, IntegraChannel, IntegraChannelEvent
+from .channel_replay import IntegraChannelReplay
 from .channel_serial import IntegraChannelRS232
-from .channel_tcp import IntegraChannelTCP
+from .channel_tcp import IntegraChannelTCP, IntegraTcpTransport
 from .commands import (IntegraCommand, IntegraCmdData, IntegraCmdEventRecData, IntegraCmdEventTextData,
                        IntegraCmdUserCodeData, IntegraCmdUserParts1stCodeData, IntegraCmdUserPartsData, IntegraCmdUserPartsArmData,
                        IntegraCmdUserZonesData, IntegraCmdUserOutputsData, IntegraCmdUserOutputsExpandersData, IntegraCmdOutputData, IntegraCmdZoneData,
@@ -28,17 +33,23 @@ from .commands import (IntegraCommand, IntegraCmdData, IntegraCmdEventRecData, I
                        IntegraCmdPartsData, IntegraCmdZonesData, IntegraCmdOutputsData, IntegraCmdUserSetUserLocksData, IntegraCmdUserCodeNewCodePhoneData,
                        IntegraCmdUserCodeNewCodeUserData, IntegraCmdUserCodeUserData, IntegraCmdUserDevMgmtData,
                        IntegraUserDevMgmtList, IntegraCmdUserDevMgmtUserData, IntegraCmdUserDevMgmtDeviceData)
+from .diff import IntegraStateDiff
 from .elements import (IntegraElement, IntegraObjectElement, IntegraPartElement, IntegraPartWithObjElement,
                        IntegraPartWithObjOptsElement, IntegraPartWithObjOptsDepsElement, IntegraZoneElement, IntegraZoneWithPartsElement,
                        IntegraOutputElement, IntegraOutputWithDurationElement, IntegraUserElement, IntegraAdminElement,
                        IntegraExpanderElement, IntegraManipulatorElement, IntegraTimerElement, IntegraPhoneElement)
 from .events import IntegraEventSource, IntegraEventRecData, IntegraEventTextData, INTEGRA_EVENT_STD_LAST, INTEGRA_EVENT_GRADE_LAST, IntegraEventRecStdData, IntegraEventRecGradeData
-from .messages import IntegraResponse, IntegraResponseErrorCode, IntegraResponseErrorCodes, IntegraRequestError
+from .messages import IntegraPreparedRequest, IntegraRequest, IntegraResponse, IntegraResponseErrorCode, IntegraResponseErrorCodes, IntegraRequestError
 from .notify import (IntegraNotifyEvent, IntegraPartsNotifyEvents, IntegraZonesNotifyEvents, IntegraOutputsNotifyEvents,
                      IntegraOthersNotifyEvents, IntegraDoorsNotifyEvents, IntegraTroublesNotifyEvents, IntegraDataNotifyEvents,
                      IntegraTroublesMemoryNotifyEvents, IntegraNotifySource)
 from .users import (IntegraUserSelf, IntegraUserOther, IntegraUser, IntegraUserDeviceMgmtFunc, IntegraUserProximityCard, IntegraUserDallasDev, IntegraUserDeviceMgmtFuncs, IntegraUserIntRxKeyFob,
                     IntegraUserAbaxKeyFob, IntegraUsersList, IntegraUserLocks)
+from .poll import IntegraPollController, IntegraPollActiveEvents
+from .resync import IntegraResyncSnapshot
+from .scheduler import IntegraJobScheduler, IntegraRequestScheduler
+from .stats import IntegraHistogram, MONITOR_LAG_BUCKETS
+from .tracing import IntegraTraceCallback
 from .troubles import (IntegraTroublesRegionDef, IntegraTroublesSource, IntegraTroublesRegionId, IntegraTroublesRegionDefs, IntegraTroublesSystemMain,
                        IntegraTroublesSystemOther, IntegraTroublesDataType)
 
@@ -54,9 +65,14 @@ class IntegraClientStatus( IntEnum ):
 IntegraClientType = 'IntegraClient'
 
 IntegraClientEventCallback = Callable[ [ IntegraClientType, IntegraClientStatus ], Awaitable[ None ] ] | None
-IntegraClientStateChangedCallback = Callable[ [ IntegraClientType, IntegraNotifySource, IntegraNotifyEvent, dict[ int, bool ] ], Awaitable[ None ] ] | None
+IntegraClientStateChangedCallback = Callable[ [ IntegraClientType, IntegraNotifySource, IntegraNotifyEvent, Mapping[ int, bool ] ], Awaitable[ None ] ] | None
 IntegraClientDataChangedCallback = Callable[ [ IntegraClientType, IntegraNotifySource, IntegraNotifyEvent, IntegraCmdData ], Awaitable[ None ] ] | None
 IntegraClientTroublesChangedCallback = Callable[ [ IntegraClientType, IntegraTroublesRegionDef, IntegraTroublesDataType ], Awaitable[ None ] ] | None
+IntegraClientResyncedCallback = Callable[ [ IntegraClientType, int, float ], Awaitable[ None ] ] | None
+IntegraClientSnapshotStates = list[ tuple[ IntegraNotifySource, IntegraNotifyEvent, IntegraStateDiff ] ]
+IntegraClientSnapshotTroubles = list[ tuple[ IntegraTroublesRegionDef, IntegraStateDiff ] ]
+IntegraClientSnapshotCallback = Callable[ [ IntegraClientType, IntegraClientSnapshotStates, IntegraClientSnapshotTroubles ], Awaitable[ None ] ] | None
+IntegraClientDispatcherFactory = Callable[ [ Callable[ ..., Awaitable[ None ] ] ], IntegraDispatcher | IntegraDispatcherPool.Queue ]
 
 
 class IntegraClientError( IntegraError ):
@@ -82,6 +98,9 @@ class IntegraClientOpts( IntegraEntity ):
             "PrefixCode": f"{self.prefix_code}",
             "IntegrationKey": f"{self.integration_key}",
             "Reconnect": f"{self.reconnect}",
+            "TcpTransport": f"{self.tcp_transport}",
+            "PipelineWindow": f"{self.pipeline_window}",
+            "InitialSnapshot": f"{self.initial_snapshot}",
         } )
 
     def __init__( self ):
@@ -93,6 +112,9 @@ class IntegraClientOpts( IntegraEntity ):
         self._ro_keep_alive: float = DEFAULT_KEEP_ALIVE
         self._ro_integration_key: str = ""
         self._ro_reconnect: int = -1
+        self._ro_tcp_transport: IntegraTcpTransport = IntegraTcpTransport.STREAM
+        self._ro_pipeline_window: int = 1
+        self._ro_initial_snapshot: bool = True
 
     def get_user_code( self, user_code: str = "" ):
         if user_code.strip( " " ) == "":
@@ -127,6 +149,20 @@ class IntegraClientOpts( IntegraEntity ):
     def reconnect( self ) -> int:
         return self._ro_reconnect
 
+    @property
+    def tcp_transport( self ) -> IntegraTcpTransport:
+        return IntegraTcpTransport( self._ro_tcp_transport )
+
+    @property
+    def pipeline_window( self ) -> int:
+        return self._ro_pipeline_window
+
+    @property
+    def initial_snapshot( self ) -> bool:
+        """First state of each event is delivered in single snapshot instead of change of every item, when client
+        has on_snapshot set (IntegraSystem sets it), otherwise first state is reported item by item"""
+        return self._ro_initial_snapshot
+
     @classmethod
     def create( cls, **kwargs ) -> 'IntegraClientOpts':
         result = IntegraClientOpts()
@@ -151,7 +187,14 @@ class IntegraClient( IntegraEntity ):
     @classmethod
     def tcp( cls, host: str, port: int, eventloop: AbstractEventLoop, opts: IntegraClientOpts ) -> IntegraClientType:
         client = cls( eventloop, opts )
-        channel = IntegraChannelTCP( eventloop, host, port, opts.integration_key, client._async_channel_event_handler )
+        channel = IntegraChannelTCP( eventloop, host, port, opts.integration_key, client._async_channel_event_handler, opts.tcp_transport )
+        client._set_channel( channel )
+        return client
+
+    @classmethod
+    def replay( cls, capture_file: str, eventloop: AbstractEventLoop, opts: IntegraClientOpts, speed: float = 1.0, follow_requests: bool = True ) -> IntegraClientType:
+        client = cls( eventloop, opts )
+        channel = IntegraChannelReplay( eventloop, capture_file, opts.integration_key, client._async_channel_event_handler, speed, follow_requests, opts.resp_timeout )
         client._set_channel( channel )
         return client
 
@@ -165,8 +208,10 @@ class IntegraClient( IntegraEntity ):
         self._integra_version: IntegraCmdVersionData | None = None
         self._module_version: IntegraCmdModuleVersionData | None = None
         self._caps: IntegraCaps = IntegraMap.type_to_caps( IntegraType.INTEGRA_UNKNOWN )
-        self._notify_event_states: dict[ IntegraNotifyEvent, bytes ] = { }
-        self._event_dispatcher: IntegraDispatcher | None = None
+        self._notify_event_states: dict[ IntegraNotifyEvent, int ] = { }
+        self._event_dispatcher: IntegraDispatcher | IntegraDispatcherPool.Queue | None = None
+        self._dispatcher_factory: IntegraClientDispatcherFactory = IntegraDispatcher.create
+        self._connect_limiter: IntegraConnectLimiter | None = None
         self._system_monitor_task: Task | None = None
         self._system_monitor_cfg: IntegraContextRefCnt = IntegraContextRefCnt( self._system_monitor_reconfigure )
         self._request_no_error: IntegraTaskContextRefCnt = IntegraTaskContextRefCnt()
@@ -175,10 +220,23 @@ class IntegraClient( IntegraEntity ):
         self._on_state_changed: IntegraClientStateChangedCallback = None
         self._on_data_changed: IntegraClientDataChangedCallback = None
         self._on_troubles_changed: IntegraClientTroublesChangedCallback = None
-        self._cache_troubles: dict[ IntegraTroublesRegionId, bytes ] = { }
+        self._on_resynced: IntegraClientResyncedCallback = None
+        self._on_snapshot: IntegraClientSnapshotCallback = None
+        self._snapshot_states: IntegraClientSnapshotStates = [ ]
+        self._snapshot_troubles: IntegraClientSnapshotTroubles = [ ]
+        self._cache_troubles: dict[ IntegraTroublesRegionId, int ] = { }
+        self._monitor_lag: IntegraHistogram = IntegraHistogram( MONITOR_LAG_BUCKETS )
+        self._monitor_jobs: IntegraJobScheduler = IntegraJobScheduler()
+        self._resync: IntegraResyncSnapshot | None = None
+        self._resync_time: IntegraHistogram = IntegraHistogram()
+        self._poll_cycle: IntegraResyncSnapshot | None = None
+        self._notify_lock: asyncio.Lock = asyncio.Lock()
+        self._poll_cycle_time: IntegraHistogram = IntegraHistogram()
         self._poll_interval: float = 0.00
+        self._poll_controller: IntegraPollController | None = None
         self._power_monitor: dict[ int, float ] = { }
         self._temp_monitor: dict[ int, float ] = { }
+        self._prepared_requests: dict[ tuple[ IntegraCommand, bytes | int | None ], IntegraPreparedRequest ] = { }
         self._connect_task: Task | None = None
         self._changed_events: list[ IntegraNotifyEvent ] = [ ]
         self._rcvd_events: list[ IntegraNotifyEvent ] = [ ]
@@ -199,6 +257,62 @@ class IntegraClient( IntegraEntity ):
     def status( self ) -> IntegraClientStatus:
         return self._status
 
+    @property
+    def channel( self ) -> IntegraChannel:
+        return self._channel
+
+    @property
+    def dispatcher_factory( self ) -> IntegraClientDispatcherFactory:
+        """Creates event queue of connection, IntegraDispatcher.create by default, IntegraDispatcherPool.create shares workers"""
+        return self._dispatcher_factory
+
+    @dispatcher_factory.setter
+    def dispatcher_factory( self, value: IntegraClientDispatcherFactory | None ) -> None:
+        self._dispatcher_factory = value if value is not None else IntegraDispatcher.create
+
+    @property
+    def connect_limiter( self ) -> IntegraConnectLimiter | None:
+        """Limiter pacing connection attempts, shared by clients connecting to many panels"""
+        return self._connect_limiter
+
+    @connect_limiter.setter
+    def connect_limiter( self, value: IntegraConnectLimiter | None ) -> None:
+        self._connect_limiter = value
+
+    @property
+    def tracer( self ) -> IntegraTraceCallback:
+        """Callback receiving IntegraTraceSpan of every request finished by channel, e.g. IntegraTraceRing"""
+        return self._channel.tracer
+
+    @tracer.setter
+    def tracer( self, value: IntegraTraceCallback ) -> None:
+        self._channel.tracer = value
+
+    @property
+    def monitor_lag( self ) -> IntegraHistogram:
+        """Delay of system monitor requests (changes polling, temperature and power) against their schedule"""
+        return self._monitor_lag
+
+    @property
+    def poll_cycle_time( self ) -> IntegraHistogram:
+        """Time from sending 0x7F system changes read until all changed states it reported are processed"""
+        return self._poll_cycle_time
+
+    @property
+    def monitor_jobs( self ) -> IntegraJobScheduler:
+        """Schedule of system monitor requests, keyed by (command, element number)"""
+        return self._monitor_jobs
+
+    @property
+    def resync_time( self ) -> IntegraHistogram:
+        """Time from (re)connection until snapshot of monitored state is read and reported to subscribers"""
+        return self._resync_time
+
+    @property
+    def dispatcher_queue_depth( self ) -> int:
+        """Number of channel events waiting for processing in client event queue"""
+        return self._event_dispatcher.queue_depth if self._event_dispatcher is not None else 0
+
     @property
     def integra_version( self ) -> IntegraCmdVersionData | None:
         return self._integra_version
@@ -230,10 +344,37 @@ class IntegraClient( IntegraEntity ):
 
     @poll_interval.setter
     def poll_interval( self, value: float ):
+        self._poll_interval_apply( value, 0.0 )
+
+    @property
+    def poll_controller( self ) -> IntegraPollController | None:
+        """Adapts poll_interval to activity of the panel, when not set poll_interval stays as configured.
+
+        Entry / exit time and alarm are seen only for events of IntegraPollActiveEvents which are monitored, no extra
+        reads are made for the others, so without them the controller backs off while partition is in exit time.
+        """
+        return self._poll_controller
+
+    @poll_controller.setter
+    def poll_controller( self, value: IntegraPollController | None ):
+        self._poll_controller = value
+        if value is not None:
+            self._poll_interval_apply( value.interval, 0.0 )
+
+    def _poll_interval_apply( self, value: float, delay: float ) -> None:
         if self._poll_interval != value:
             self._poll_interval = value
+            self._monitor_jobs.schedule( (IntegraCommand.READ_SYSTEM_CHANGES, 0), value, delay=delay )
             self._system_monitor_reconfigure()
 
+    def _poll_active( self ) -> bool:
+        # known only for monitored events, state of event no longer monitored is stale
+        return any( self._notify_event_states.get( notify_event, 0 ) != 0 for notify_event in IntegraPollActiveEvents if notify_event in self._changed_events )
+
+    def _poll_control( self, command: IntegraCommand ) -> None:
+        if self._poll_controller is not None and IntegraRequestScheduler.is_exclusive( command ):
+            self._poll_interval_apply( self._poll_controller.control(), 0.0 )
+
     @property
     def on_event( self ) -> IntegraClientEventCallback:
         return self._on_event
@@ -266,45 +407,68 @@ class IntegraClient( IntegraEntity ):
     def on_data_changed( self, callback: IntegraClientDataChangedCallback ) -> None:
         self._on_data_changed = callback
 
-    def _get_diff_state( self, notify_event: IntegraNotifyEvent, current_state: bytes, max_length: int ) -> dict[ int, bool ]:
+    @property
+    def on_resynced( self ) -> IntegraClientResyncedCallback:
+        """Called with number of changed states and resync duration once state snapshot is applied"""
+        return self._on_resynced
 
-        max_length = min( int( max_length / 8 ), len( current_state ) )
-        current_state = current_state[ : max_length ]
+    @on_resynced.setter
+    def on_resynced( self, callback: IntegraClientResyncedCallback ) -> None:
+        self._on_resynced = callback
 
-        if not notify_event in self._notify_event_states:
-            prev_state = bytes( [ (~byte) & 0xFF for byte in current_state ] )
-        else:
-            prev_state = self._notify_event_states[ notify_event ]
-        self._notify_event_states.update( { notify_event: current_state } )
-
-        result = { }
-        for byte_index in range( max_length ):
-            byte_diff = prev_state[ byte_index ] ^ current_state[ byte_index ]
-            if byte_diff != 0:
-                for bit_index in range( 8 ):
-                    if (byte_diff & (1 << bit_index)) != 0:
-                        result.update( { (byte_index * 8) + (bit_index + 1): True if current_state[ byte_index ] & (1 << bit_index) else False } )
-        return result
+    @property
+    def on_snapshot( self ) -> IntegraClientSnapshotCallback:
+        """Called with first states seen of events and troubles regions, when initial_snapshot option is set"""
+        return self._on_snapshot
 
-    def _get_troubles_changed( self, region_id: IntegraTroublesRegionId, current: bytes ) -> dict[ int, bool ]:
+    @on_snapshot.setter
+    def on_snapshot( self, callback: IntegraClientSnapshotCallback ) -> None:
+        self._on_snapshot = callback
 
-        if region_id in self._cache_troubles:
-            previous = self._cache_troubles[ region_id ]
-        else:
-            previous = bytes( [ (~byte) & 0xFF for byte in current ] )
-        self._cache_troubles[ region_id ] = current
-
-        result = { }
-        for byte_index in range( len( current ) ):
-            byte_diff = current[ byte_index ] ^ previous[ byte_index ]
-            if byte_diff != 0:
-                for bit_index in range( 8 ):
-                    if (byte_diff & (1 << bit_index)) != 0:
-                        result.update( { (byte_index * 8) + (bit_index + 1): True if current[ byte_index ] & (1 << bit_index) else False } )
-        return result
+    @property
+    def _snapshot_wanted( self ) -> bool:
+        return self.opts.initial_snapshot and self._on_snapshot is not None
+
+    def capture_start( self, file_name: str ) -> IntegraCaptureWriter:
+        """Start recording frames sent and received by channel to binary log, see IntegraCaptureWriter"""
+        self.capture_stop()
+        recorder = IntegraCaptureWriter( file_name )
+        if self._integra_version is not None and self._module_version is not None:
+            # capture started on connected channel, store version replies, so replay is able to connect
+            for command, data in [ (IntegraCommand.READ_INTEGRA_VERSION, self._integra_version.bytes), (IntegraCommand.READ_MODULE_VERSION, self._module_version.bytes) ]:
+                recorder.record( IntegraCaptureDirection.TX, command, bytes() )
+                recorder.record( IntegraCaptureDirection.RX, command, data )
+        self._channel.recorder = recorder
+        return recorder
+
+    def capture_stop( self ) -> None:
+        recorder = self._channel.recorder
+        if recorder is not None:
+            self._channel.recorder = None
+            recorder.close()
+
+    def _get_diff_state( self, notify_event: IntegraNotifyEvent, current_state: bytes, max_length: int ) -> IntegraStateDiff:
+
+        current = IntegraStateDiff.to_int( current_state[ : min( max_length >> 3, len( current_state ) ) ] )
+        previous = self._notify_event_states.get( notify_event )
+        self._notify_event_states[ notify_event ] = current
+        if previous is None:
+            # first state seen, every item is reported
+            return IntegraStateDiff( (1 << (min( max_length >> 3, len( current_state ) ) << 3)) - 1, current )
+        return IntegraStateDiff.compute( previous, current )
+
+    def _get_troubles_changed( self, region_id: IntegraTroublesRegionId, current: bytes ) -> IntegraStateDiff:
+
+        state = IntegraStateDiff.to_int( current )
+        previous = self._cache_troubles.get( region_id )
+        self._cache_troubles[ region_id ] = state
+        if previous is None:
+            return IntegraStateDiff( (1 << (len( current ) << 3)) - 1, state )
+        return IntegraStateDiff.compute( previous, state )
 
     def _set_channel( self, channel: IntegraChannel ):
         self._channel = channel
+        self._channel.pipeline_window = self.opts.pipeline_window
 
     def _check_response( self, response: IntegraResponse | None ) -> bool:
         if response is None:
@@ -338,111 +502,90 @@ class IntegraClient( IntegraEntity ):
 
     def _request_data_for_zones( self ) -> bytes | None:
         if self.support_32bytes:
-            return bytes( [ 0xFF ] )
+            return b"\xff"
         return None
 
     def _request_data_for_outputs( self ) -> bytes | None:
         if self.support_32bytes:
-            return bytes( [ 0xFF ] )
+            return b"\xff"
         return None
 
+    def _state_request( self, command: IntegraCommand ) -> IntegraPreparedRequest:
+        notify_event = IntegraNotifyEvent.from_command( command )
+        if notify_event in IntegraZonesNotifyEvents:
+            return self._prepared_request( command, self._request_data_for_zones() )
+        if notify_event in IntegraOutputsNotifyEvents:
+            return self._prepared_request( command, self._request_data_for_outputs() )
+        return self._prepared_request( command )
+
+    async def _async_monitor_job( self, command: IntegraCommand, element_no: int ) -> None:
+        if command == IntegraCommand.READ_SYSTEM_CHANGES:
+            started = time.monotonic()
+            read_cmds = await self.async_read_system_changes()
+            if read_cmds:
+                await self._async_poll_cycle( started, read_cmds )
+            else:
+                self._poll_cycle_time.add( time.monotonic() - started )
+            if self._poll_controller is not None:
+                interval = self._poll_controller.update( len( read_cmds ) > 0, self._poll_active() )
+                self._poll_interval_apply( interval, interval )
+        elif command == IntegraCommand.READ_ZONE_TEMPERATURE:
+            await self.async_read_zone_temperature( element_no )
+        elif command == IntegraCommand.READ_OUTPUT_POWER:
+            await self.async_read_output_power( element_no )
+
+    async def _async_poll_cycle( self, started: float, commands: list[ IntegraCommand ] ) -> None:
+        """Read changed states reported by 0x7F in single pipelined batch, responses are processed together"""
+        if self._poll_cycle is not None:
+            # previous cycle still waits for notification of some response, whatever it has is processed now
+            async with self._notify_lock:
+                await self._async_poll_cycle_apply( self._poll_cycle )
+        # own copies of prepared requests, cycle holds only responses bound to them
+        requests = [ self._state_request( cmd ).clone() for cmd in commands ]
+        cycle = IntegraResyncSnapshot( started, requests )
+        self._poll_cycle = cycle
+        responses = await asyncio.gather( *[ self._async_send_request( request ) for request in requests ], return_exceptions=True )
+        if self._poll_cycle is not cycle:
+            return
+        cycle.expected = { IntegraNotifyEvent.from_command( cmd ) for cmd, response in zip( commands, responses ) if isinstance( response, IntegraResponse ) and response.success }
+        if cycle.complete:
+            # notifications wait meanwhile, newer state must not be reported before held one
+            async with self._notify_lock:
+                await self._async_poll_cycle_apply( cycle )
+
+    async def _async_poll_cycle_apply( self, cycle: IntegraResyncSnapshot ) -> None:
+        if self._poll_cycle is not cycle:
+            return
+        self._poll_cycle = None
+        for response in cycle.responses.values():
+            await self._async_process_notification( self._channel, response )
+        await self._async_flush_snapshot()
+        self._poll_cycle_time.add( time.monotonic() - cycle.started )
+
     async def _system_monitor_proc( self ):
 
         task_self = asyncio.current_task()
         task_name = task_self.get_name()
         _LOGGER.debug( f"[{task_name}] Starting system monitor" )
 
-        reconfigure: bool = True
-        poll_interval: float = 0.0
-        poll_last: datetime = datetime.min
-
-        power_mon: dict[ int, float ] = { }
-        power_last: dict[ int, datetime ] = { }
-
-        temp_mon: dict[ int, float ] = { }
-        temp_last: dict[ int, datetime ] = { }
+        # schedule starts again from now, time spent disconnected does not count as missed runs
+        self._monitor_jobs.restart()
 
         if len( self._changed_events ) > 0 or len( self._rcvd_events ) > 0:
             await self._async_system_changes_monitor( IntegraNotifyEvent.to_commands( self._changed_events ), IntegraNotifyEvent.to_commands( self._rcvd_events ) )
 
         while task_self.cancelling() == 0:
             try:
-                if reconfigure:
-                    reconfigure = False
-
-                    for output, interval in self._power_monitor.items():
-                        if output in power_mon:
-                            if power_mon[ output ] != interval:
-                                power_mon[ output ] = interval
-                                power_last[ output ] = datetime.min
-                        else:
-                            power_mon.setdefault( output, interval )
-                            power_last.setdefault( output, datetime.min )
-                    for output in list( power_mon.keys() ):
-                        if output not in self._power_monitor:
-                            power_mon.pop( output )
-                            power_last.pop( output )
-
-                    for zone, interval in self._temp_monitor.items():
-                        if zone in temp_mon:
-                            if temp_mon[ zone ] != interval:
-                                temp_mon[ zone ] = interval
-                                temp_last[ zone ] = datetime.min
-                        else:
-                            temp_mon.setdefault( zone, interval )
-                            temp_last.setdefault( zone, datetime.min )
-                    for zone in list( temp_mon.keys() ):
-                        if zone not in self._temp_monitor:
-                            temp_mon.pop( zone )
-                            temp_last.pop( zone )
-
-                    if poll_interval != self.poll_interval:
-                        poll_interval = self.poll_interval
-                        poll_last: datetime = datetime.min
-
-                    _LOGGER.debug( f"[{task_name}] RECONFIGURE: PollInterval={poll_interval}; TempMon={temp_mon}; PowerMon={power_mon}" )
-
-                sleep = 3600.0
-                if poll_interval > 0:
-                    if (datetime.now() - poll_last).total_seconds() > poll_interval:
-                        # _LOGGER.debug( f"[{task_name}] Polling changed events (last {(datetime.now() - poll_last).total_seconds()} ago)" )
-                        poll_last = datetime.now()
-                        read_cmds = await self.async_read_system_changes()
-                        for cmd in read_cmds:
-                            notify_event = IntegraNotifyEvent.from_command( cmd )
-                            if notify_event in IntegraZonesNotifyEvents:
-                                await self._async_send_command( cmd, self._request_data_for_zones() )
-                            elif notify_event in IntegraOutputsNotifyEvents:
-                                await self._async_send_command( cmd, self._request_data_for_outputs() )
-                            else:
-                                await self._async_send_command( cmd )
-                    poll_next = poll_last + timedelta( seconds=poll_interval )
-                    sleep = min( max( (poll_next - datetime.now()).total_seconds(), 0.00 ), sleep )
-
-                for zone, interval in temp_mon.items():
-                    if interval > 0:
-                        if (datetime.now() - temp_last[ zone ]).total_seconds() > interval:
-                            # _LOGGER.debug( f"[{task_name}] Polling temperature for zone {zone} (last {(datetime.now() - temp_last[ zone ]).total_seconds()} ago)" )
-                            temp_last[ zone ] = datetime.now()
-                            await self.async_read_zone_temperature( zone )
-                        poll_next = temp_last[ zone ] + timedelta( seconds=interval )
-                        sleep = min( max( (poll_next - datetime.now()).total_seconds(), 0.00 ), sleep )
-
-                for output, interval in power_mon.items():
-                    if interval > 0:
-                        if (datetime.now() - power_last[ output ]).total_seconds() > interval:
-                            # _LOGGER.debug( f"[{task_name}] Polling power for output {output} (last {(datetime.now() - power_last[ output ]).total_seconds()} ago)" )
-                            power_last[ output ] = datetime.now()
-                            await self.async_read_output_power( output )
-                        poll_next = power_last[ output ] + timedelta( seconds=interval )
-                        sleep = min( max( (poll_next - datetime.now()).total_seconds(), 0.00 ), sleep )
-
-                # _LOGGER.debug( f"[{task_name}] Next event pooling in {sleep} secs" )
+                while (due := self._monitor_jobs.take()) is not None:
+                    (command, element_no), lateness = due
+                    self._monitor_lag.add( lateness )
+                    await self._async_monitor_job( command, element_no )
+
+                sleep = self._monitor_jobs.next_delay()
                 if sleep > 0:
                     if await asyncio.wait_for( self._system_monitor_event.wait(), sleep ):
                         self._system_monitor_event.clear()
-                        # _LOGGER.debug( f"[{task_name}] Reconfigure request" )
-                        reconfigure = True
+                        _LOGGER.debug( f"[{task_name}] RECONFIGURE: {self._monitor_jobs}" )
                 else:
                     _LOGGER.warning( f"[{task_name}] Polling to short. Reconsider using longer intervals" )
 
@@ -498,7 +641,7 @@ class IntegraClient( IntegraEntity ):
             if self.on_event is not None:
                 await self.on_event( self, self._status )
 
-    async def _async_do_state_changed( self, source: IntegraNotifySource, notify_event: IntegraNotifyEvent, objects: dict[ int, bool ] ):
+    async def _async_do_state_changed( self, source: IntegraNotifySource, notify_event: IntegraNotifyEvent, objects: Mapping[ int, bool ] ):
         if self.on_state_changed is not None:
             await self.on_state_changed( self, source, notify_event, objects )
 
@@ -526,8 +669,11 @@ class IntegraClient( IntegraEntity ):
         regions = IntegraTroublesRegionDefs.get_regions( notify_event )
         for region in regions:
             if region.source in [ IntegraTroublesSource.ZONES, IntegraTroublesSource.EXPANDERS, IntegraTroublesSource.MANIPULATORS ]:
+                first = region.region_id not in self._cache_troubles
                 objects = self._get_troubles_changed( region.region_id, region.get_data( data ) )
-                if self.on_troubles_changed is not None and len( objects ) > 0:
+                if first and self._snapshot_wanted:
+                    self._snapshot_troubles.append( (region, objects) )
+                elif self.on_troubles_changed is not None and len( objects ) > 0:
                     await self.on_troubles_changed( self, region, objects )
             elif region.source == IntegraTroublesSource.SYSTEM_MAIN:
                 value = IntegraTroublesSystemMain( int.from_bytes( region.get_data( data ), byteorder="little" ) )
@@ -543,17 +689,23 @@ class IntegraClient( IntegraEntity ):
 
         if self._event_dispatcher is not None:
             await self._event_dispatcher.shutdown( self, "_event_dispatcher" )
-        self._event_dispatcher = IntegraDispatcher.create( self._async_process_channel_event )
+        self._event_dispatcher = self._dispatcher_factory( self._async_process_channel_event )
 
+        connected = time.monotonic()
+        self._prepared_requests.clear()
         self._integra_version = await self.async_read_integra_version()
         self._module_version = await self.async_read_module_version()
         self._caps = IntegraMap.type_to_caps( self.integra_version.integra_type )
         self._system_monitor_start()
 
         await self._async_set_status( IntegraClientStatus.CONNECTED )
+        await self._async_resync( connected )
 
     async def _async_do_channel_disconnected( self, channel: IntegraChannel, should_reconnect: bool ):
 
+        # responses collected so far are dropped, state known before disconnect stays as reference for next resync
+        self._resync = None
+        self._poll_cycle = None
         await self._system_monitor_stop()
 
         if self._event_dispatcher is not None:
@@ -564,22 +716,133 @@ class IntegraClient( IntegraEntity ):
         elif self._connect_task is None:
             await self._async_set_status( IntegraClientStatus.DISCONNECTED )
 
-    async def _async_do_channel_notification( self, channel: IntegraChannel, response: IntegraResponse ):
+    def _notify_state_source( self, notify_event: IntegraNotifyEvent ) -> tuple[ IntegraNotifySource, int ] | None:
+        """Source and number of items of bitmap state event, None for other events"""
+        if notify_event in IntegraPartsNotifyEvents:
+            return IntegraNotifySource.PARTS, self.caps.parts
+        if notify_event in IntegraZonesNotifyEvents:
+            return IntegraNotifySource.ZONES, self.caps.zones
+        if notify_event in IntegraOutputsNotifyEvents:
+            return IntegraNotifySource.OUTPUTS, self.caps.outputs
+        if notify_event in IntegraDoorsNotifyEvents:
+            return IntegraNotifySource.DOORS, self.caps.doors
+        return None
 
-        notify_event = IntegraNotifyEvent.from_command( response.command )
-        if notify_event is not None:
-            if notify_event in IntegraPartsNotifyEvents:
-                await self._async_do_state_changed( IntegraNotifySource.PARTS, notify_event, self._get_diff_state( notify_event, response.data, self.caps.parts ) )
+    def _take_state( self, state_source: tuple[ IntegraNotifySource, int ], notify_event: IntegraNotifyEvent, data: bytes ) -> IntegraStateDiff | None:
+        """Changes of state event, None when first state seen is held for initial snapshot"""
+        first = notify_event not in self._notify_event_states
+        objects = self._get_diff_state( notify_event, data, state_source[ 1 ] )
+        if first and self._snapshot_wanted:
+            self._snapshot_states.append( (state_source[ 0 ], notify_event, objects) )
+            return None
+        return objects
+
+    async def _async_flush_snapshot( self ) -> None:
+        if not self._snapshot_states and not self._snapshot_troubles:
+            return
+        states, troubles = self._snapshot_states, self._snapshot_troubles
+        self._snapshot_states, self._snapshot_troubles = [ ], [ ]
+        if self.on_snapshot is not None:
+            await self.on_snapshot( self, states, troubles )
+
+    async def _async_resync( self, started: float ) -> bool:
+        snapshot = IntegraResyncSnapshot( started )
+        self._resync = snapshot
+        commands = IntegraNotifyEvent.to_commands( [ notify_event for notify_event in self._changed_events if notify_event not in IntegraDataNotifyEvents ] )
+        # reads are sent at once, channel keeps up to pipeline_window of them in flight
+        responses = await asyncio.gather( *[ self._async_send_request( self._state_request( cmd ) ) for cmd in commands ], return_exceptions=True )
+        if self._resync is not snapshot:
+            # disconnected or superseded by another resync
+            return False
+        snapshot.expected = { IntegraNotifyEvent.from_command( cmd ) for cmd, response in zip( commands, responses ) if isinstance( response, IntegraResponse ) and response.success }
+        if snapshot.complete:
+            # notifications wait meanwhile, newer state must not be reported before snapshot
+            async with self._notify_lock:
+                await self._async_resync_apply( snapshot )
+        return True
 
-            elif notify_event in IntegraZonesNotifyEvents:
-                await self._async_do_state_changed( IntegraNotifySource.ZONES, notify_event, self._get_diff_state( notify_event, response.data, self.caps.zones ) )
+    async def _async_resync_apply( self, snapshot: IntegraResyncSnapshot ) -> None:
+        if self._resync is not snapshot:
+            return
+        self._resync = None
+
+        # all differences are computed before any subscriber runs, state unknown so far goes to initial snapshot or,
+        # when snapshot is not wanted, is compared with cleared bitmap
+        states: IntegraClientSnapshotStates = [ ]
+        others: list[ IntegraResponse ] = [ ]
+        for notify_event, response in snapshot.responses.items():
+            state_source = self._notify_state_source( notify_event )
+            if state_source is not None:
+                if not self._snapshot_wanted:
+                    self._notify_event_states.setdefault( notify_event, 0 )
+                objects = self._take_state( state_source, notify_event, response.data )
+                if objects is not None:
+                    states.append( (state_source[ 0 ], notify_event, objects) )
+            else:
+                if notify_event in IntegraTroublesNotifyEvents and not self._snapshot_wanted:
+                    for region in IntegraTroublesRegionDefs.get_regions( notify_event ):
+                        self._cache_troubles.setdefault( region.region_id, 0 )
+                others.append( response )
+
+        changes = 0
+        for source, notify_event, objects in states:
+            if objects:
+                changes += len( objects )
+                await self._async_do_state_changed( source, notify_event, objects )
+        for response in others:
+            await self._async_process_notification( self._channel, response )
+        await self._async_flush_snapshot()
+
+        duration = time.monotonic() - snapshot.started
+        self._resync_time.add( duration )
+        _LOGGER.debug( f"Resync finished in {duration * 1000:.1f}ms, {len( snapshot.responses )} reads, {changes} changes" )
+        if self.on_resynced is not None:
+            await self.on_resynced( self, changes, duration )
+
+    async def async_resync( self ) -> bool:
+        """Read monitored state in single pipelined batch, report differences to last known state and resynced marker"""
+        return await self._async_resync( time.monotonic() )
 
-            elif notify_event in IntegraOutputsNotifyEvents:
-                await self._async_do_state_changed( IntegraNotifySource.OUTPUTS, notify_event, self._get_diff_state( notify_event, response.data, self.caps.outputs ) )
+    async def _async_do_channel_notification( self, channel: IntegraChannel, response: IntegraResponse ):
 
-            elif notify_event in IntegraDoorsNotifyEvents:
-                await self._async_do_state_changed( IntegraNotifySource.DOORS, notify_event, self._get_diff_state( notify_event, response.data, self.caps.doors ) )
+        notify_event = IntegraNotifyEvent.from_command( response.command )
+        if notify_event is not None and notify_event not in IntegraDataNotifyEvents:
+            cycle = self._poll_cycle
+            if cycle is not None and cycle.owns( response ):
+                if self._resync is None:
+                    if response.success:
+                        cycle.add( notify_event, response )
+                    if cycle.complete:
+                        await self._async_poll_cycle_apply( cycle )
+                    return
+            elif cycle is not None:
+                # newer state read by somebody else, held response of the cycle would overwrite it
+                cycle.release( notify_event )
+
+            if self._resync is not None:
+                # resync takes the response, cycle does not wait for it anymore and is applied once the rest is there
+                if cycle is not None:
+                    cycle.release( notify_event )
+                    if cycle.complete:
+                        await self._async_poll_cycle_apply( cycle )
+                if response.success:
+                    self._resync.add( notify_event, response )
+                    if self._resync.complete:
+                        await self._async_resync_apply( self._resync )
+                return
+
+        await self._async_process_notification( channel, response )
+        await self._async_flush_snapshot()
+
+    async def _async_process_notification( self, channel: IntegraChannel, response: IntegraResponse ):
 
+        notify_event = IntegraNotifyEvent.from_command( response.command )
+        if notify_event is not None:
+            state_source = self._notify_state_source( notify_event )
+            if state_source is not None:
+                objects = self._take_state( state_source, notify_event, response.data )
+                if objects is not None:
+                    await self._async_do_state_changed( state_source[ 0 ], notify_event, objects )
 
             elif notify_event in IntegraDataNotifyEvents or notify_event in IntegraOthersNotifyEvents:
                 await self._async_do_data_changed( IntegraNotifySource.DATA, notify_event, response )
@@ -596,7 +859,8 @@ class IntegraClient( IntegraEntity ):
             await self._async_do_channel_connected( sender )
 
         elif event == IntegraChannelEvent.NOTIFICATION:
-            await self._async_do_channel_notification( sender, data )
+            async with self._notify_lock:
+                await self._async_do_channel_notification( sender, data )
 
         elif event == IntegraChannelEvent.DISCONNECTED:
             await self._async_do_channel_disconnected( sender, data )
@@ -622,15 +886,22 @@ class IntegraClient( IntegraEntity ):
         try:
             sleep = 5
             sleep_step = 3
+            reconnect = self._status == IntegraClientStatus.RECONNECTING
             while True:
-                self._channel._port = 17094 if (retries < 0 or retries > 0) and self.status == IntegraClientStatus.RECONNECTING else 7094
-
                 try:
-                    if await self._channel.async_connect( timeout ):
+                    if self._connect_limiter is None:
+                        connected = await self._channel.async_connect( timeout )
+                    else:
+                        # slot covers connection only, version reads and resync run after it is released
+                        async with self._connect_limiter.slot( reconnect ):
+                            connected = await self._channel.async_open( timeout )
+                        connected = connected and await self._channel.async_notify_connected()
+                    if connected:
                         task_err = None
                         break
                 except IntegraError as err:
                     task_err = err
+                reconnect = True
 
                 if retries > 0:
                     retries -= 1
@@ -678,11 +949,31 @@ class IntegraClient( IntegraEntity ):
         await self._channel.async_post_command( command, data )
 
     async def _async_send_command( self, command: IntegraCommand, data: IntegraCmdData | bytes | None = None ) -> IntegraResponse:
+        self._poll_control( command )
         return await self._channel.async_send_command( command, data, self.opts.resp_timeout )
 
+    async def _async_send_request( self, request: IntegraRequest ) -> IntegraResponse:
+        self._poll_control( request.command )
+        return await self._channel.async_send_request( request, self.opts.resp_timeout )
+
+    def _prepared_request( self, command: IntegraCommand, data: bytes | None = None ) -> IntegraPreparedRequest:
+        """Pre-encoded request reused by repeated reads (polling)"""
+        key = (command, data)
+        request = self._prepared_requests.get( key )
+        if request is None:
+            request = self._prepared_requests[ key ] = IntegraPreparedRequest( command, data )
+        return request
+
+    def _prepared_element_request( self, command: IntegraCommand, data_class: type[ IntegraCmdData ], element_no: int ) -> IntegraPreparedRequest:
+        key = (command, element_no)
+        request = self._prepared_requests.get( key )
+        if request is None:
+            request = self._prepared_requests[ key ] = IntegraPreparedRequest( command, data_class( element_no ) )
+        return request
+
     async def _async_read_parts_data( self, command: IntegraCommand ) -> list[ int ] | None:
         response: IntegraResponse = await self._async_send_command( command )
-        if self._check_response( response ) and isinstance( response.data, IntegraCmdUserPartsData ):
+        if self._check_response( response ):
             return IntegraCmdPartsData.from_bytes( response.data ).parts
         return None
 
@@ -709,25 +1000,25 @@ class IntegraClient( IntegraEntity ):
             return self._power_monitor[ output_no ]
         return 0.0
 
-    def power_monitor_set( self, outputs: dict[ int, float ] | None = None ) -> bool:
+    def _monitor_set( self, command: IntegraCommand, monitor: dict[ int, float ], elements: dict[ int, float ] | None ) -> bool:
+        """Apply monitor intervals of elements, interval 0 or missing elements dict removes monitors, O(log n) per change"""
         reconfigure = False
-        if outputs is None or len( outputs ) == 0:
-            if len( self._power_monitor ) != 0:
-                self._power_monitor = { }
-                reconfigure = True
-        else:
-            for output_no, interval in outputs.items():
-                if output_no in self._power_monitor:
-                    if interval > 0:
-                        if self._power_monitor[ output_no ] != interval:
-                            self._power_monitor[ output_no ] = interval
-                            reconfigure = True
-                    else:
-                        self._power_monitor.pop( output_no )
-                        reconfigure = True
-                elif interval > 0:
-                    self._power_monitor.setdefault( output_no, interval )
+        if elements is None or len( elements ) == 0:
+            elements = { element_no: 0.0 for element_no in monitor }
+        for element_no, interval in elements.items():
+            if interval > 0:
+                if monitor.get( element_no ) != interval:
+                    monitor[ element_no ] = interval
+                    self._monitor_jobs.schedule( (command, element_no), interval )
                     reconfigure = True
+            elif element_no in monitor:
+                monitor.pop( element_no )
+                self._monitor_jobs.unschedule( (command, element_no) )
+                reconfigure = True
+        return reconfigure
+
+    def power_monitor_set( self, outputs: dict[ int, float ] | None = None ) -> bool:
+        reconfigure = self._monitor_set( IntegraCommand.READ_OUTPUT_POWER, self._power_monitor, outputs )
 
         if reconfigure:
             self._system_monitor_reconfigure()
@@ -739,24 +1030,7 @@ class IntegraClient( IntegraEntity ):
         return 0.0
 
     def temp_monitor_set( self, zones: dict[ int, float ] | None = None ) -> bool:
-        reconfigure = False
-        if zones is None or len( zones ) == 0:
-            if len( self._temp_monitor ) != 0:
-                self._temp_monitor = { }
-                reconfigure = True
-        else:
-            for zone_no, interval in zones.items():
-                if zone_no in self._temp_monitor:
-                    if interval > 0:
-                        if self._temp_monitor[ zone_no ] != interval:
-                            self._temp_monitor[ zone_no ] = interval
-                            reconfigure = True
-                    else:
-                        self._temp_monitor.pop( zone_no )
-                        reconfigure = True
-                elif interval > 0:
-                    self._temp_monitor.setdefault( zone_no, interval )
-                    reconfigure = True
+        reconfigure = self._monitor_set( IntegraCommand.READ_ZONE_TEMPERATURE, self._temp_monitor, zones )
 
         if reconfigure:
             self._system_monitor_reconfigure()
@@ -997,8 +1271,8 @@ class IntegraClient( IntegraEntity ):
 
     # 0x7B
     async def async_read_output_power( self, output_no: int ) -> IntegraCmdOutputPower | None:
-        cmd_data = IntegraCmdOutputData( output_no )
-        response: IntegraResponse = await self._async_send_command( IntegraCommand.READ_OUTPUT_POWER, cmd_data )
+        request = self._prepared_element_request( IntegraCommand.READ_OUTPUT_POWER, IntegraCmdOutputData, output_no )
+        response: IntegraResponse = await self._async_send_request( request )
         if self._check_response( response ):
             return IntegraCmdOutputPower.from_bytes( response.data )
         return None
@@ -1012,9 +1286,8 @@ class IntegraClient( IntegraEntity ):
 
     # 0x7D READ: output temperature
     async def async_read_zone_temperature( self, zone_no: int ) -> IntegraCmdZoneTemp | None:
-        cmd_data = IntegraCmdZoneData( zone_no )
-        cmd_data.to_bytes()
-        response: IntegraResponse = await self._async_send_command( IntegraCommand.READ_ZONE_TEMPERATURE, cmd_data )
+        request = self._prepared_element_request( IntegraCommand.READ_ZONE_TEMPERATURE, IntegraCmdZoneData, zone_no )
+        response: IntegraResponse = await self._async_send_request( request )
         if self._check_response( response ):
             return IntegraCmdZoneTemp.from_bytes( response.data )
         return None
@@ -1033,7 +1306,7 @@ class IntegraClient( IntegraEntity ):
 
         cmd_data = bytes( 0 ) if not self.support_troubles67 else bytes( 2 ) if self.support_troubles8 else bytes( 1 )
 
-        response: IntegraResponse = await self._async_send_command( IntegraCommand.READ_SYSTEM_CHANGES, IntegraCmdRawData( cmd_data ) )
+        response: IntegraResponse = await self._async_send_request( self._prepared_request( IntegraCommand.READ_SYSTEM_CHANGES, cmd_data ) )
 
         if self._check_response( response ):
             result = IntegraCommandHelper.cmds_from_bytes( response.data, self._get_cmd_list_len() )
@@ -1048,13 +1321,17 @@ class IntegraClient( IntegraEntity ):
         cmd_data = IntegraCmdRawData( (IntegraCommandHelper.cmds_to_bytes( changed_cmds, cmd_list_len ) +
                                        IntegraCommandHelper.cmds_to_bytes( rcvd_cmds, cmd_list_len )) )
 
-        response: IntegraResponse = await self._async_send_command( IntegraCommand.READ_SYSTEM_CHANGES, cmd_data )
+        # monitor setup is answered with READ_RESULT
+        response: IntegraResponse = await self._async_send_request( IntegraRequest( IntegraCommand.READ_SYSTEM_CHANGES, cmd_data, result_allowed=True ) )
         return self._check_response( response )
 
     async def async_notify_events_setup( self, changed_events: list[ IntegraNotifyEvent ] | None, rcvd_events: list[ IntegraNotifyEvent ] | None = None ) -> bool:
         if await self._async_system_changes_monitor( IntegraNotifyEvent.to_commands( changed_events ), IntegraNotifyEvent.to_commands( rcvd_events ) ):
+            added = [ notify_event for notify_event in (changed_events or [ ]) if notify_event not in self._changed_events ]
             self._changed_events = changed_events if changed_events is not None else [ ]
             self._rcvd_events = rcvd_events if rcvd_events is not None else [ ]
+            if added:
+                await self.async_resync()
             return True
         return False
 
@@ -26,3 +26,6 @@ FRAME_SYNC_END = 0x0d
 FRAME_SYNC_ESC = 0xf0
 FRAME_START = [ FRAME_SYNC, FRAME_SYNC ]
 FRAME_END = [ FRAME_SYNC, FRAME_SYNC_END ]
+FRAME_READ_CHUNK = 4096
+FRAME_RAW_TAIL = 64
+FRAME_CACHE_SIZE = 512
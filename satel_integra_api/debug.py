@@ -0,0 +1,94 @@
+import logging
+
+from .const import (
+    DEBUG_SHOW_REQUESTS,
+    DEBUG_SHOW_REQUESTS_RAW,
+    DEBUG_SHOW_REQUESTS_ENC,
+    DEBUG_SHOW_RESPONSES,
+    DEBUG_SHOW_RESPONSES_TIME,
+    DEBUG_SHOW_RESPONSES_RAW,
+    DEBUG_SHOW_RESPONSES_ENC,
+)
+from .tools import IntegraHelper
+
+_LOGGER = logging.getLogger( __name__ )
+
+# lookup tables indexed by command code, non-zero entry enables debug output for the command. Tables are compiled from
+# DEBUG_SHOW_* filters and updated in place by IntegraDebug.configure(), so references imported by other modules stay valid
+DEBUG_REQUESTS = bytearray( 256 )
+DEBUG_REQUESTS_RAW = bytearray( 256 )
+DEBUG_RESPONSES = bytearray( 256 )
+DEBUG_RESPONSES_RAW = bytearray( 256 )
+DEBUG_RESPONSES_TIME = bytearray( 256 )
+
+# encrypted PDUs carry no readable command, single flag per direction
+DEBUG_ENCRYPTED = bytearray( 2 )
+DEBUG_ENC_REQUESTS = 0
+DEBUG_ENC_RESPONSES = 1
+
+IntegraDebugFilter = list[ int ] | bool
+
+
+class IntegraLazyHex:
+    """Hex dump of data formatted only when log record is emitted"""
+
+    __slots__ = ("_data",)
+
+    def __init__( self, data: bytes | bytearray ):
+        self._data = data
+
+    def __str__( self ) -> str:
+        return IntegraHelper.hex_str( self._data )
+
+
+class IntegraDebug:
+
+    _filters: dict[ str, IntegraDebugFilter ] = {
+        "requests": DEBUG_SHOW_REQUESTS,
+        "requests_raw": DEBUG_SHOW_REQUESTS_RAW,
+        "requests_enc": DEBUG_SHOW_REQUESTS_ENC,
+        "responses": DEBUG_SHOW_RESPONSES,
+        "responses_time": DEBUG_SHOW_RESPONSES_TIME,
+        "responses_raw": DEBUG_SHOW_RESPONSES_RAW,
+        "responses_enc": DEBUG_SHOW_RESPONSES_ENC,
+    }
+
+    @staticmethod
+    def compile_filter( msg_filter: IntegraDebugFilter ) -> bytes:
+        """256 entries lookup table for filter given as list of commands or as bool (all or none)"""
+        if type( msg_filter ) is bool:
+            return bytes( [ 1 if msg_filter else 0 ] * 256 )
+        table = bytearray( 256 )
+        for cmd in msg_filter:
+            table[ cmd ] = 1
+        return bytes( table )
+
+    @staticmethod
+    def configure(
+            requests: IntegraDebugFilter | None = None, requests_raw: IntegraDebugFilter | None = None, requests_enc: bool | None = None,
+            responses: IntegraDebugFilter | None = None, responses_time: bool | None = None, responses_raw: IntegraDebugFilter | None = None,
+            responses_enc: bool | None = None
+    ) -> None:
+        """Change debug output filters, filters not given keep their current value"""
+        for name, value in [ ("requests", requests), ("requests_raw", requests_raw), ("requests_enc", requests_enc), ("responses", responses),
+                             ("responses_time", responses_time), ("responses_raw", responses_raw), ("responses_enc", responses_enc) ]:
+            if value is not None:
+                IntegraDebug._filters[ name ] = value
+
+        filters = IntegraDebug._filters
+        responses_table = IntegraDebug.compile_filter( filters[ "responses" ] )
+        DEBUG_REQUESTS[ : ] = IntegraDebug.compile_filter( filters[ "requests" ] )
+        DEBUG_REQUESTS_RAW[ : ] = IntegraDebug.compile_filter( filters[ "requests_raw" ] )
+        DEBUG_RESPONSES[ : ] = responses_table
+        DEBUG_RESPONSES_RAW[ : ] = IntegraDebug.compile_filter( filters[ "responses_raw" ] )
+        # dispatch time is shown for responses shown anyway
+        DEBUG_RESPONSES_TIME[ : ] = responses_table if filters[ "responses_time" ] else bytes( 256 )
+        DEBUG_ENCRYPTED[ DEBUG_ENC_REQUESTS ] = 1 if filters[ "requests_enc" ] else 0
+        DEBUG_ENCRYPTED[ DEBUG_ENC_RESPONSES ] = 1 if filters[ "responses_enc" ] else 0
+
+    @staticmethod
+    def filters() -> dict[ str, IntegraDebugFilter ]:
+        return dict( IntegraDebug._filters )
+
+
+IntegraDebug.configure()
@@ -0,0 +1,75 @@
+import logging
+
+from collections.abc import Mapping
+from typing import Iterator
+
+_LOGGER = logging.getLogger( __name__ )
+
+
+class IntegraStateDiff( Mapping ):
+    """Changes between two state bitmaps, read-only mapping of item number to its new value.
+
+    Bitmaps are kept as ints built from little endian state data, so bit N - 1 stands for item N. Changes are computed
+    with single XOR of whole blocks, items are extracted only when iterated, by isolating lowest set bit of the mask.
+    """
+
+    __slots__ = ("_changed", "_state")
+
+    @staticmethod
+    def to_int( data: bytes ) -> int:
+        return int.from_bytes( data, "little" )
+
+    @classmethod
+    def compute( cls, previous: int, current: int ) -> 'IntegraStateDiff':
+        return cls( previous ^ current, current )
+
+    def __init__( self, changed: int, state: int ):
+        self._changed: int = changed
+        self._state: int = state
+
+    def __repr__( self ) -> str:
+        return f"IntegraStateDiff({self.as_dict()})"
+
+    def __len__( self ) -> int:
+        return self._changed.bit_count()
+
+    def __bool__( self ) -> bool:
+        return self._changed != 0
+
+    def __iter__( self ) -> Iterator[ int ]:
+        mask = self._changed
+        while mask:
+            low = mask & -mask
+            yield low.bit_length()
+            mask ^= low
+
+    def __contains__( self, item_no: object ) -> bool:
+        return isinstance( item_no, int ) and item_no > 0 and (self._changed >> (item_no - 1)) & 1 == 1
+
+    def __getitem__( self, item_no: int ) -> bool:
+        if item_no not in self:
+            raise KeyError( item_no )
+        return (self._state >> (item_no - 1)) & 1 == 1
+
+    @property
+    def changed( self ) -> int:
+        """Mask of changed items"""
+        return self._changed
+
+    @property
+    def state( self ) -> int:
+        """Current state of all items"""
+        return self._state
+
+    def items( self ) -> list[ tuple[ int, bool ] ]:
+        result = [ ]
+        mask = self._changed
+        state = self._state
+        while mask:
+            low = mask & -mask
+            result.append( (low.bit_length(), state & low != 0) )
+            mask ^= low
+        return result
+
+    def as_dict( self ) -> dict[ int, bool ]:
+        return dict( self.items() )
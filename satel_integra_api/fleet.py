@@ -0,0 +1,264 @@
+import asyncio
+import logging
+
+from asyncio import AbstractEventLoop
+
+from .base import IntegraConnectLimiter, IntegraDispatcherPool, IntegraEntity
+from .channel import IntegraChannelStats
+from .client import IntegraClientOpts, IntegraClientStatus
+from .objects import AsyncEventHandler, EventsDispatcher, IntegraSystem
+from .stats import IntegraHistogram
+
+_LOGGER = logging.getLogger( __name__ )
+
+DEFAULT_FLEET_CONNECT_RATE = 20.0
+DEFAULT_FLEET_CONNECT_CONCURRENCY = 32
+DEFAULT_FLEET_RECONNECT_JITTER = 5.0
+DEFAULT_FLEET_WORKERS = 4
+
+
+class IntegraFleetStats( IntegraEntity ):
+    """Aggregate of channel and client metrics over panels of fleet, taken at creation time"""
+
+    def __init__( self, fleet: 'IntegraFleet' ):
+        super().__init__()
+        self._panels: int = len( fleet )
+        self._status: dict[ IntegraClientStatus, int ] = { status: 0 for status in IntegraClientStatus }
+        self._rx_bytes: int = 0
+        self._tx_bytes: int = 0
+        self._connects: int = 0
+        self._requests: int = 0
+        self._timeouts: int = 0
+        self._errors: int = 0
+        self._frames: int = 0
+        self._latency: IntegraHistogram = IntegraHistogram()
+        self._dispatcher_queue_depth: int = 0
+        self._events: int = fleet.events
+        self._connect_waiting: int = fleet.limiter.waiting
+        self._connect_attempts: int = fleet.limiter.attempts
+
+        for system in fleet.systems.values():
+            self._status[ system.status ] += 1
+            client = system.client
+            if client is None:
+                continue
+            self._dispatcher_queue_depth += client.dispatcher_queue_depth
+            stats = client.stats
+            self._rx_bytes += stats.rx_bytes
+            self._tx_bytes += stats.tx_bytes
+            self._connects += stats.connects
+            self._requests += stats.requests
+            self._timeouts += stats.timeouts
+            self._errors += stats.errors
+            self._frames += stats.frames
+            self._latency.merge( stats.latency )
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        fields.update( {
+            "Panels": f"{self._panels}",
+            "Connected": f"{self.connected}",
+            "Requests": f"{self._requests}",
+            "Timeouts": f"{self._timeouts}",
+            "Errors": f"{self._errors}",
+            "Events": f"{self._events}",
+            "Latency": f"{self._latency}",
+        } )
+
+    @property
+    def panels( self ) -> int:
+        return self._panels
+
+    @property
+    def status( self ) -> dict[ IntegraClientStatus, int ]:
+        """Number of panels per client status"""
+        return self._status
+
+    @property
+    def connected( self ) -> int:
+        return self._status[ IntegraClientStatus.CONNECTED ]
+
+    @property
+    def rx_bytes( self ) -> int:
+        return self._rx_bytes
+
+    @property
+    def tx_bytes( self ) -> int:
+        return self._tx_bytes
+
+    @property
+    def connects( self ) -> int:
+        return self._connects
+
+    @property
+    def requests( self ) -> int:
+        return self._requests
+
+    @property
+    def timeouts( self ) -> int:
+        return self._timeouts
+
+    @property
+    def errors( self ) -> int:
+        return self._errors
+
+    @property
+    def frames( self ) -> int:
+        return self._frames
+
+    @property
+    def latency( self ) -> IntegraHistogram:
+        """Request latency merged over all panels"""
+        return self._latency
+
+    @property
+    def dispatcher_queue_depth( self ) -> int:
+        return self._dispatcher_queue_depth
+
+    @property
+    def events( self ) -> int:
+        """Events passed to fleet subscribers"""
+        return self._events
+
+    @property
+    def connect_waiting( self ) -> int:
+        return self._connect_waiting
+
+    @property
+    def connect_attempts( self ) -> int:
+        return self._connect_attempts
+
+
+class IntegraFleet( IntegraEntity ):
+    """Owns many IntegraSystem instances (panels) running on one event loop.
+
+    Panels share connect limiter (connection attempts are paced and reconnects after network outage are spread by
+    random jitter) and pool of event dispatch workers, so number of tasks does not grow by dispatcher task per panel.
+    Handlers subscribed to fleet receive events of every panel, with 'panel' argument holding its name.
+    """
+
+    def __init__(
+            self, eventloop: AbstractEventLoop, connect_rate: float = DEFAULT_FLEET_CONNECT_RATE, connect_concurrency: int = DEFAULT_FLEET_CONNECT_CONCURRENCY,
+            reconnect_jitter: float = DEFAULT_FLEET_RECONNECT_JITTER, workers: int = DEFAULT_FLEET_WORKERS, seed: int | None = None
+    ):
+        super().__init__()
+        self._eventloop: AbstractEventLoop = eventloop
+        self._limiter: IntegraConnectLimiter = IntegraConnectLimiter( connect_rate, 1, connect_concurrency, reconnect_jitter, seed )
+        self._pool: IntegraDispatcherPool = IntegraDispatcherPool( workers )
+        self._systems: dict[ str, IntegraSystem ] = { }
+        self._forwarders: dict[ str, AsyncEventHandler ] = { }
+        self._dispatcher: EventsDispatcher = EventsDispatcher()
+        self._event_names: set[ str ] = set()
+        self._events: int = 0
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        fields.update( {
+            "Panels": f"{len( self._systems )}",
+            "Limiter": f"{self._limiter}",
+            "Workers": f"{self._pool.workers}",
+        } )
+
+    def __len__( self ) -> int:
+        return len( self._systems )
+
+    def __contains__( self, name: str ) -> bool:
+        return name in self._systems
+
+    def __getitem__( self, name: str ) -> IntegraSystem:
+        return self._systems[ name ]
+
+    @property
+    def systems( self ) -> dict[ str, IntegraSystem ]:
+        return self._systems
+
+    @property
+    def limiter( self ) -> IntegraConnectLimiter:
+        return self._limiter
+
+    @property
+    def pool( self ) -> IntegraDispatcherPool:
+        return self._pool
+
+    @property
+    def events( self ) -> int:
+        return self._events
+
+    @property
+    def stats( self ) -> IntegraFleetStats:
+        return IntegraFleetStats( self )
+
+    def panel_stats( self, name: str ) -> IntegraChannelStats | None:
+        system = self._systems.get( name )
+        return system.get_channel_stats() if system is not None else None
+
+    def _forwarder( self, name: str ) -> AsyncEventHandler:
+
+        async def forward( event_name: str, **kwargs ) -> None:
+            self._events += 1
+            await self._dispatcher.async_dispatch( event_name, panel=name, **kwargs )
+
+        return forward
+
+    def add( self, name: str, system: IntegraSystem ) -> IntegraSystem:
+        if name in self._systems:
+            raise ValueError( f"Panel '{name}' already in fleet" )
+        client = system.client
+        client.connect_limiter = self._limiter
+        client.dispatcher_factory = self._pool.create
+        forwarder = self._forwarder( name )
+        for event_name in self._event_names:
+            system.subscribe( event_name, forwarder )
+        self._systems[ name ] = system
+        self._forwarders[ name ] = forwarder
+        return system
+
+    def add_tcp( self, name: str, host: str, port: int, opts: IntegraClientOpts ) -> IntegraSystem:
+        return self.add( name, IntegraSystem.tcp( host, port, self._eventloop, opts ) )
+
+    async def async_remove( self, name: str ) -> IntegraSystem | None:
+        """Disconnect panel and detach it from fleet"""
+        system = self._systems.pop( name, None )
+        if system is None:
+            return None
+        forwarder = self._forwarders.pop( name )
+        for event_name in self._event_names:
+            system.unsubscribe( event_name, forwarder )
+        await system.async_disconnect()
+        system.client.connect_limiter = None
+        system.client.dispatcher_factory = None
+        return system
+
+    def subscribe( self, event_name: str, handler: AsyncEventHandler ) -> None:
+        """Handler is called with event of any panel as handler( event_name, panel=name, sender=system, ... )"""
+        if event_name not in self._event_names:
+            self._event_names.add( event_name )
+            for name, system in self._systems.items():
+                system.subscribe( event_name, self._forwarders[ name ] )
+        self._dispatcher.subscribe( event_name, handler )
+
+    def unsubscribe( self, event_name: str, handler: AsyncEventHandler ) -> None:
+        self._dispatcher.unsubscribe( event_name, handler )
+
+    async def async_connect( self, names: list[ str ] | None = None, retries: int = 0, timeout: float | None = None ) -> dict[ str, bool ]:
+        """Connect panels (all by default), attempts are paced by fleet limiter, returns result per panel"""
+        names = list( self._systems.keys() ) if names is None else names
+
+        async def connect( name: str ) -> bool:
+            try:
+                return await self._systems[ name ].async_connect( retries=retries, timeout=timeout )
+            except Exception as err:
+                _LOGGER.warning( f"async_connect[{name}] failed, {err}" )
+                return False
+
+        results = await asyncio.gather( *[ connect( name ) for name in names ] )
+        return dict( zip( names, results ) )
+
+    async def async_disconnect( self, names: list[ str ] | None = None ) -> None:
+        names = list( self._systems.keys() ) if names is None else names
+        await asyncio.gather( *[ self._systems[ name ].async_disconnect() for name in names ], return_exceptions=True )
+
+    async def async_shutdown( self ) -> None:
+        """Disconnect every panel and stop shared dispatch workers"""
+        await self.async_disconnect()
+        await self._pool.shutdown()
@@ -0,0 +1,131 @@
+import logging
+
+from .base import IntegraEntity
+from .const import FRAME_SYNC, FRAME_SYNC_END, FRAME_SYNC_ESC, FRAME_RAW_TAIL
+from .debug import IntegraLazyHex
+
+_LOGGER = logging.getLogger( __name__ )
+
+
+class IntegraFrameDecoder( IntegraEntity ):
+    """Incremental decoder turning arbitrary sized chunks of raw channel data into unescaped frames.
+
+    The decoder keeps its sync state between calls, so a frame may be split across any number of chunks.
+    Bytes between sync sequences are copied in bulk, only FRAME_SYNC bytes are inspected one by one.
+    """
+
+    def __init__( self ) -> None:
+        super().__init__()
+        self._in_message: bool = False
+        self._sync_bytes: int = 0
+        self._buffer: bytearray = bytearray()
+        self._raw_tail: bytes = bytes()
+        self._frames: int = 0
+        self._discards: int = 0
+        self._resyncs: int = 0
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        fields.update( {
+            "Frames": f"{self._frames}",
+            "Discards": f"{self._discards}",
+            "Resyncs": f"{self._resyncs}",
+        } )
+
+    @property
+    def frames( self ) -> int:
+        return self._frames
+
+    @property
+    def discards( self ) -> int:
+        return self._discards
+
+    @property
+    def resyncs( self ) -> int:
+        return self._resyncs
+
+    @property
+    def partial( self ) -> bool:
+        """Beginning of frame (at least sync bytes) was received, but frame is not complete yet"""
+        return self._in_message or self._sync_bytes > 0
+
+    @property
+    def raw_tail( self ) -> bytes:
+        """Raw bytes received after the last complete frame (bounded), used to recognize textual replies like 'Busy'"""
+        return self._raw_tail
+
+    def reset( self ) -> None:
+        self._in_message = False
+        self._sync_bytes = 0
+        self._buffer = bytearray()
+        self._raw_tail = bytes()
+
+    def _discard( self, reason: str ) -> None:
+        _LOGGER.warning( "%s, discarding input: %s", reason, IntegraLazyHex( self._buffer ) )
+        self._discards += 1
+        self._in_message = False
+        self._buffer = bytearray()
+
+    def feed( self, data: bytes ) -> list[ bytes ]:
+        """Consume chunk of raw data, returns list of complete frames (may be empty)"""
+
+        result: list[ bytes ] = [ ]
+        data_len = len( data )
+        frame_end = 0
+        pos = 0
+
+        while pos < data_len:
+            if self._in_message and self._sync_bytes == 0:
+                # in sync, copy everything up to next sync byte in one go
+                sync_pos = data.find( FRAME_SYNC, pos )
+                if sync_pos < 0:
+                    self._buffer += data[ pos: ]
+                    break
+                if sync_pos > pos:
+                    self._buffer += data[ pos:sync_pos ]
+                pos = sync_pos
+
+            elif not self._in_message and self._sync_bytes == 0:
+                # not synced, skip everything up to next sync byte
+                sync_pos = data.find( FRAME_SYNC, pos )
+                if sync_pos < 0:
+                    break
+                pos = sync_pos
+
+            read_byte = data[ pos ]
+            pos += 1
+
+            if read_byte == FRAME_SYNC:
+                if self._in_message:
+                    # sync_bytes == 0 means special sequence or end of message
+                    # otherwise we discard all received bytes and wait for new message
+                    if self._sync_bytes != 0:
+                        self._discard( "Received frame sync bytes" )
+                        self._resyncs += 1
+                self._sync_bytes += 1
+
+            else:
+                if self._in_message:
+                    # sync_bytes is 1 here, escaped sync byte or end of message
+                    if read_byte == FRAME_SYNC_ESC:
+                        self._buffer.append( FRAME_SYNC )
+                    elif read_byte == FRAME_SYNC_END:
+                        result.append( bytes( self._buffer ) )
+                        self._frames += 1
+                        self._in_message = False
+                        self._buffer = bytearray()
+                        frame_end = pos
+                    else:
+                        self._discard( f"Received invalid byte {read_byte}" )
+                elif self._sync_bytes >= 2:
+                    self._in_message = True
+                    self._buffer.append( read_byte )
+                # otherwise we ignore all bytes until synced
+                self._sync_bytes = 0
+
+        if result:
+            self._raw_tail = data[ frame_end: frame_end + FRAME_RAW_TAIL ]
+        elif len( self._raw_tail ) < FRAME_RAW_TAIL:
+            self._raw_tail = (self._raw_tail + data)[ :FRAME_RAW_TAIL ]
+
+        return result
@@ -1,6 +1,9 @@
+import copy
+
+from collections import OrderedDict
 from enum import IntEnum
 
-from .const import FRAME_START, FRAME_END, FRAME_SYNC, FRAME_SYNC_ESC, FRAME_LEN_MIN
+from .const import FRAME_START, FRAME_END, FRAME_SYNC, FRAME_SYNC_ESC, FRAME_LEN_MIN, FRAME_CACHE_SIZE
 from .base import IntegraEntity, IntegraError
 from .commands import IntegraCommand, IntegraCmdData
 from .tools import IntegraHelper
@@ -74,10 +77,11 @@ class IntegraMessage( IntegraEntity ):
 
 class IntegraRequest( IntegraMessage ):
 
-    def __init__( self, command: IntegraCommand, data: IntegraCmdData | None = None ):
+    def __init__( self, command: IntegraCommand, data: IntegraCmdData | None = None, result_allowed: bool | None = None ):
         super().__init__( command, data )
         self._broadcast: bool = False
-        self._result_allowed = True
+        # control, user and element commands are answered with READ_RESULT, reads answer with their own command
+        self._result_allowed: bool = result_allowed if result_allowed is not None else command >= IntegraCommand.EXEC_ARM_MODE_0
 
     @property
     def broadcast( self ) -> bool:
@@ -85,24 +89,87 @@ class IntegraRequest( IntegraMessage ):
 
     @property
     def result_allowed( self ) -> bool:
+        """Request is expected to be answered with READ_RESULT, other requests get READ_RESULT only when none of these
+        waits (panel rejected the read)"""
         return self._result_allowed
 
-    def get_payload( self ) -> bytes:
-        payload: bytes = bytes( [ self.command.value ] )
+    _frame_cache: OrderedDict[ tuple[ IntegraCommand, bytes ], bytes ] = OrderedDict()
+    _frame_cache_size: int = FRAME_CACHE_SIZE
+    _frame_cache_hits: int = 0
+    _frame_cache_misses: int = 0
+
+    @staticmethod
+    def encode_frame( command: IntegraCommand, data: bytes ) -> bytes:
+        payload = bytes( [ command.value ] ) + data
+        crc = IntegraHelper.checksum( payload )
+        payload += bytes( [ (crc >> 8) & 0xff, crc & 0xff ] )
+        payload = payload.replace( bytes( [ FRAME_SYNC ] ), bytes( [ FRAME_SYNC, FRAME_SYNC_ESC ] ) )
+        return bytes( FRAME_START ) + payload + bytes( FRAME_END )
 
+    @classmethod
+    def get_frame( cls, command: IntegraCommand, data: bytes ) -> bytes:
+        """Encoded frame for command and data, recently used frames are kept in bounded LRU cache"""
+        key = (command, data)
+        cache = IntegraRequest._frame_cache
+        frame = cache.get( key )
+        if frame is not None:
+            cache.move_to_end( key )
+            IntegraRequest._frame_cache_hits += 1
+            return frame
+
+        IntegraRequest._frame_cache_misses += 1
+        frame = cls.encode_frame( command, data )
+        cache[ key ] = frame
+        if len( cache ) > IntegraRequest._frame_cache_size:
+            cache.popitem( last=False )
+        return frame
+
+    @classmethod
+    def frame_cache_info( cls ) -> dict[ str, int ]:
+        return {
+            "size": len( IntegraRequest._frame_cache ),
+            "max_size": IntegraRequest._frame_cache_size,
+            "hits": IntegraRequest._frame_cache_hits,
+            "misses": IntegraRequest._frame_cache_misses,
+        }
+
+    @classmethod
+    def frame_cache_setup( cls, max_size: int ) -> None:
+        IntegraRequest._frame_cache_size = max( 0, max_size )
+        while len( IntegraRequest._frame_cache ) > IntegraRequest._frame_cache_size:
+            IntegraRequest._frame_cache.popitem( last=False )
+
+    def get_data_bytes( self ) -> bytes:
         data_type = type( self.data )
         if issubclass( data_type, IntegraCmdData ):
-            payload += self.data.to_bytes()
+            return self.data.to_bytes()
         elif data_type is bytes:
-            payload += self.data
-            raise IntegraError( "Invalid data type (bytes) in IntegraRequest." )
+            return self.data
         elif data_type is bytearray:
             raise IntegraError( "Invalid data type (bytearray) in IntegraRequest." )
+        return bytes()
+
+    def get_payload( self ) -> bytes:
+        return self.get_frame( self.command, self.get_data_bytes() )
 
-        crc = IntegraHelper.checksum( payload )
-        payload += bytes( [ (crc >> 8) & 0xff, crc & 0xff ] )
-        payload = payload.replace( bytes( [ FRAME_SYNC ] ), bytes( [ FRAME_SYNC, FRAME_SYNC_ESC ] ) )
-        return bytes( FRAME_START ) + payload + bytes( FRAME_END )
+
+class IntegraPreparedRequest( IntegraRequest ):
+    """Immutable request with frame encoded once, meant to be reused for repeated requests (polling, keepalive).
+
+    Data given as IntegraCmdData is encoded at construction and kept as bytes, so data property returns bytes.
+    """
+
+    def __init__( self, command: IntegraCommand, data: IntegraCmdData | bytes | None = None ):
+        super().__init__( command, data )
+        self._data: bytes = self.get_data_bytes()
+        self._payload: bytes = self.encode_frame( command, self._data )
+
+    def get_payload( self ) -> bytes:
+        return self._payload
+
+    def clone( self ) -> 'IntegraPreparedRequest':
+        """Copy sharing encoded frame, responses are bound to request object so the copy identifies single use"""
+        return copy.copy( self )
 
 
 class IntegraRequestError( IntegraError ):
@@ -152,6 +219,7 @@ class IntegraResponse( IntegraMessage ):
     def __init__( self, command: IntegraCommand, data: bytes | None = None ):
         super().__init__( command, data if data is not None else bytes() )
         self._request: IntegraRequest | None = None
+        self._rx_times: tuple[ float, float ] | None = None
         self._error_code: IntegraResponseErrorCode = IntegraResponseErrorCode.NO_ERROR
         self._error_code_no: int = self._error_code.value
 
@@ -167,6 +235,15 @@ class IntegraResponse( IntegraMessage ):
     def request( self ) -> IntegraRequest | None:
         return self._request
 
+    @property
+    def rx_times( self ) -> tuple[ float, float ] | None:
+        """Monotonic time first byte of frame was received and time frame was decoded, set by channel when tracing"""
+        return self._rx_times
+
+    @rx_times.setter
+    def rx_times( self, value: tuple[ float, float ] | None ) -> None:
+        self._rx_times = value
+
     @property
     def error_code( self ) -> IntegraResponseErrorCode:
         return self._error_code
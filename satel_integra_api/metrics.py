@@ -0,0 +1,217 @@
+import asyncio
+import logging
+
+from asyncio import StreamReader, StreamWriter
+
+from .base import IntegraEntity
+from .client import IntegraClientStatus
+from .fleet import IntegraFleet
+from .objects import IntegraSystem
+from .scheduler import IntegraRequestPriority
+from .stats import IntegraHistogram
+
+_LOGGER = logging.getLogger( __name__ )
+
+DEFAULT_METRICS_PORT = 9464
+DEFAULT_METRICS_PREFIX = "satel_integra"
+METRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+class IntegraMetricsWriter:
+    """Collects samples of metric families and renders them in OpenMetrics text format"""
+
+    def __init__( self, prefix: str ):
+        self._prefix: str = prefix
+        self._families: dict[ str, tuple[ str, str, list[ str ] ] ] = { }
+
+    @staticmethod
+    def _escape( value: str ) -> str:
+        return value.replace( "\\", "\\\\" ).replace( "\"", "\\\"" ).replace( "\n", "\\n" )
+
+    @staticmethod
+    def _labels( labels: dict[ str, str ] ) -> str:
+        if not labels:
+            return ""
+        return "{" + ",".join( f"{key}=\"{IntegraMetricsWriter._escape( str( value ) )}\"" for key, value in labels.items() ) + "}"
+
+    @staticmethod
+    def _number( value: float ) -> str:
+        if isinstance( value, int ):
+            return str( value )
+        if value == float( "inf" ):
+            return "+Inf"
+        return repr( float( value ) )
+
+    def _family( self, name: str, metric_type: str, help_text: str ) -> list[ str ]:
+        name = f"{self._prefix}_{name}"
+        family = self._families.get( name )
+        if family is None:
+            family = self._families[ name ] = (metric_type, help_text, [ ])
+        return family[ 2 ]
+
+    def gauge( self, name: str, help_text: str, value: float, labels: dict[ str, str ] ) -> None:
+        self._family( name, "gauge", help_text ).append( f"{self._prefix}_{name}{self._labels( labels )} {self._number( value )}" )
+
+    def counter( self, name: str, help_text: str, value: float, labels: dict[ str, str ] ) -> None:
+        self._family( name, "counter", help_text ).append( f"{self._prefix}_{name}_total{self._labels( labels )} {self._number( value )}" )
+
+    def stateset( self, name: str, help_text: str, states: list[ str ], current: str, labels: dict[ str, str ] ) -> None:
+        samples = self._family( name, "stateset", help_text )
+        for state in states:
+            samples.append( f"{self._prefix}_{name}{self._labels( { **labels, name: state } )} {1 if state == current else 0}" )
+
+    def histogram( self, name: str, help_text: str, histogram: IntegraHistogram, labels: dict[ str, str ] ) -> None:
+        samples = self._family( name, "histogram", help_text )
+        full_name = f"{self._prefix}_{name}"
+        cumulative = 0
+        for bound, count in zip( histogram.bounds, histogram.counts ):
+            cumulative += count
+            samples.append( f"{full_name}_bucket{self._labels( { **labels, 'le': self._number( float( bound ) ) } )} {cumulative}" )
+        samples.append( f"{full_name}_bucket{self._labels( { **labels, 'le': '+Inf' } )} {histogram.count}" )
+        samples.append( f"{full_name}_count{self._labels( labels )} {histogram.count}" )
+        samples.append( f"{full_name}_sum{self._labels( labels )} {self._number( histogram.sum )}" )
+
+    def render( self ) -> str:
+        lines: list[ str ] = [ ]
+        for name, (metric_type, help_text, samples) in self._families.items():
+            lines.append( f"# TYPE {name} {metric_type}" )
+            lines.append( f"# HELP {name} {help_text}" )
+            lines.extend( samples )
+        lines.append( "# EOF\n" )
+        return "\n".join( lines )
+
+
+class IntegraMetricsExporter( IntegraEntity ):
+    """Exports health of registered systems (panels) in OpenMetrics text format.
+
+    Every sample carries label 'panel' with name of system given at registration, extra labels given there are
+    added as well. Metrics are rendered on demand from counters kept by channel, client and system objects, so
+    rendering costs only formatting of current values. Exporter may serve metrics on local HTTP listener
+    (GET /metrics) or metrics can be rendered to string with render().
+    """
+
+    def __init__( self, prefix: str = DEFAULT_METRICS_PREFIX ):
+        super().__init__()
+        self._prefix: str = prefix
+        self._systems: dict[ str, tuple[ IntegraSystem, dict[ str, str ] ] ] = { }
+        self._server: asyncio.Server | None = None
+        self._scrapes: int = 0
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        fields.update( {
+            "Systems": f"{len( self._systems )}",
+            "Port": f"{self.port}",
+            "Scrapes": f"{self._scrapes}",
+        } )
+
+    @property
+    def systems( self ) -> dict[ str, IntegraSystem ]:
+        return { name: system for name, (system, _) in self._systems.items() }
+
+    @property
+    def port( self ) -> int | None:
+        if self._server is not None and self._server.sockets:
+            return self._server.sockets[ 0 ].getsockname()[ 1 ]
+        return None
+
+    def add( self, name: str, system: IntegraSystem, **labels: str ) -> None:
+        self._systems[ name ] = (system, { "panel": name, **labels })
+
+    def add_fleet( self, fleet: IntegraFleet, **labels: str ) -> None:
+        """Register every panel of fleet under its fleet name"""
+        for name, system in fleet.systems.items():
+            self.add( name, system, **labels )
+
+    def remove( self, name: str ) -> None:
+        self._systems.pop( name, None )
+
+    def _collect( self, writer: IntegraMetricsWriter, system: IntegraSystem, labels: dict[ str, str ] ) -> None:
+        client = system.client
+        status = system.status
+        writer.gauge( "up", "Panel connection is established", 1 if status == IntegraClientStatus.CONNECTED else 0, labels )
+        writer.stateset( "client_status", "Client connection status", [ item.name for item in IntegraClientStatus ], status.name, labels )
+        if client is None:
+            return
+
+        writer.gauge( "dispatcher_queue_depth", "Channel events waiting in client event queue", client.dispatcher_queue_depth, labels )
+        writer.histogram( "monitor_lag_seconds", "Delay of system monitor requests against their schedule", client.monitor_lag, labels )
+        writer.counter( "monitor_missed", "System monitor runs skipped because they were due more than one interval ago", client.monitor_jobs.missed, labels )
+        writer.histogram( "poll_cycle_seconds", "Time of 0x7F poll together with reads of changed states", client.poll_cycle_time, labels )
+        writer.gauge( "poll_interval_seconds", "Current interval of 0x7F system changes polling", client.poll_interval, labels )
+        if client.poll_controller is not None:
+            for decision, count in client.poll_controller.decisions.items():
+                writer.counter( "poll_decisions", "Poll interval decisions of adaptive poll controller", count, { **labels, "decision": decision.name.lower() } )
+        writer.histogram( "resync_seconds", "Time from connection until monitored state is consistent", client.resync_time, labels )
+
+        progress = system.system_info_progress
+        if progress is not None:
+            writer.gauge( "elements_loaded", "Elements loaded by system info load", progress[ 0 ], labels )
+            writer.gauge( "elements", "Elements to load by system info load", progress[ 1 ], labels )
+
+        stats = system.get_channel_stats()
+        if stats is None:
+            return
+        writer.gauge( "channel_uptime_seconds", "Time since connection was established", stats.uptime, labels )
+        writer.counter( "channel_rx_bytes", "Bytes received", stats.rx_bytes_total, labels )
+        writer.counter( "channel_tx_bytes", "Bytes sent", stats.tx_bytes_total, labels )
+        writer.gauge( "channel_connection_rx_bytes", "Bytes received in current connection", stats.rx_bytes, labels )
+        writer.gauge( "channel_connection_tx_bytes", "Bytes sent in current connection", stats.tx_bytes, labels )
+        writer.counter( "channel_connects", "Connections established", stats.connects, labels )
+        writer.counter( "channel_frames", "Frames decoded", stats.frames, labels )
+        writer.counter( "channel_resyncs", "Frame decoder resynchronizations", stats.resyncs, labels )
+        writer.counter( "channel_discards", "Frames discarded by decoder", stats.discards, labels )
+        writer.gauge( "channel_in_flight", "Requests awaiting response", client.channel.scheduler.in_flight, labels )
+        writer.histogram( "channel_lock_wait_seconds", "Time spent waiting for channel write lock", stats.lock_wait, labels )
+
+        for command, command_stats in stats.commands.items():
+            command_labels = { **labels, "command": command.name }
+            writer.counter( "channel_requests", "Requests sent", command_stats.requests, command_labels )
+            writer.counter( "channel_timeouts", "Requests without response", command_stats.timeouts, command_labels )
+            for error_code, count in command_stats.errors.items():
+                writer.counter( "channel_errors", "Responses with error code", count, { **command_labels, "code": f"{error_code}" } )
+            writer.histogram( "channel_request_latency_seconds", "Request round trip time", command_stats.latency, command_labels )
+
+        scheduler = stats.scheduler
+        if scheduler is not None:
+            for priority in IntegraRequestPriority:
+                counters = scheduler[ priority ]
+                priority_labels = { **labels, "priority": priority.name }
+                writer.gauge( "scheduler_queue_depth", "Requests waiting for request window", counters.waiting, priority_labels )
+                writer.counter( "scheduler_requests", "Requests admitted to request window", counters.requests, priority_labels )
+                writer.counter( "scheduler_wait_seconds", "Time requests waited for request window", counters.wait_total, priority_labels )
+
+    def render( self ) -> str:
+        writer = IntegraMetricsWriter( self._prefix )
+        for system, labels in self._systems.values():
+            self._collect( writer, system, labels )
+        self._scrapes += 1
+        return writer.render()
+
+    async def _async_handle( self, reader: StreamReader, writer: StreamWriter ) -> None:
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode( "latin-1" ).split()
+            if len( parts ) >= 2 and parts[ 0 ] == "GET" and parts[ 1 ].split( "?" )[ 0 ] in ("/metrics", "/"):
+                status, content_type, body = "200 OK", METRICS_CONTENT_TYPE, self.render().encode( "utf-8" )
+            else:
+                status, content_type, body = "404 Not Found", "text/plain; charset=utf-8", b"Not found\n"
+            writer.write( f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len( body )}\r\nConnection: close\r\n\r\n".encode( "latin-1" ) + body )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError) as err:
+            _LOGGER.debug( f"Metrics request failed, {err}" )
+        finally:
+            writer.close()
+
+    async def async_start( self, host: str = "127.0.0.1", port: int = DEFAULT_METRICS_PORT ) -> None:
+        if self._server is None:
+            self._server = await asyncio.start_server( self._async_handle, host, port )
+            _LOGGER.info( f"Metrics exporter listening on {host}:{self.port}" )
+
+    async def async_stop( self ) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
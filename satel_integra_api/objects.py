@@ -8,6 +8,7 @@ import json
 from datetime import datetime
 from asyncio import AbstractEventLoop
 from enum import StrEnum, Flag, IntEnum
+from collections.abc import Mapping
 from typing import Any, SupportsIndex, TypeVar, Iterator, Callable, Awaitable
 
 from .channel import IntegraChannelStats
@@ -19,6 +20,8 @@ from .elements import (IntegraElement, IntegraElementType, IntegraElementTypes,
                        IntegraPartWithObjOptsDepsElement, IntegraOutputWithDurationElement, IntegraExpanderElement, IntegraPartOptions, IntegraOutputElementSwitchable, IntegraOutputElementType, IntegraExpanderType, IntegraZoneReactionType,
                        IntegraManipulatorType, IntegraManipulatorElement)
 from .notify import IntegraNotifyEvent, IntegraNotifyObject, IntegraNotifySource
+from .diff import IntegraStateDiff
+from .store import IntegraStateSet, IntegraStateStore
 from .troubles import IntegraTroublesRegionDef, IntegraTroublesSource, IntegraTroublesZone, IntegraTroublesExp, IntegraTroublesMan, IntegraTroublesSystemMain, IntegraTroublesSystemOther, IntegraTroublesDataType
 
 _LOGGER = logging.getLogger( __name__ )
@@ -29,6 +32,9 @@ class Events( StrEnum ):
     EVENT_SYS_EVENT = "event_sys_event"
     EVENT_SYS_STATE_CHANGED = "event_sys_state_changed"
     EVENT_SYS_ITEM_CHANGED = "event_sys_item_changed"
+    EVENT_SYS_RESYNCED = "event_sys_resynced"
+    EVENT_SYS_SNAPSHOT = "event_sys_snapshot"
+    EVENT_SYS_ITEMS_CHANGED = "event_sys_items_changed"
 
 
 AsyncEventHandler = Callable[ [ str, dict[ str, Any ] ], Awaitable[ None ] ]
@@ -46,6 +52,9 @@ class EventsDispatcher:
     def unsubscribe( self, event_name: str, handler: AsyncEventHandler ) -> None:
         self._handlers[ event_name ].remove( handler )
 
+    def __contains__( self, event_name: str ) -> bool:
+        return bool( self._handlers.get( event_name ) )
+
     async def async_dispatch( self, event_name: str, **kwargs ):
         handlers = self._handlers[ event_name ]
         if handlers:
@@ -70,9 +79,13 @@ class IntegraStateBase( IntegraEntity ):
     def _write_fields( self, fields: dict[ str, str ] ) -> None:
         super()._write_fields( fields )
         fields.update( {
-            "Value": f"{self._value}",
+            "Value": f"{self.value}",
         } )
 
+    def assign( self, value: IntegraTypeVal ) -> None:
+        """Set value without notification of owner"""
+        self._value = value
+
     async def update( self, current: IntegraTypeVal ):
         previous = self._value
         self._value = current
@@ -97,6 +110,38 @@ class IntegraStateEvent( IntegraStateBase ):
         } )
 
 
+class IntegraStateBit( IntegraStateEvent ):
+    """State of item kept in bitmap of system store, local value is used only until store is sized for the item"""
+
+    def _in_store( self ) -> IntegraStateStore | None:
+        store = self._owner.store if self._owner is not None else None
+        if store is not None and 0 < self._owner.no <= store.size( self._notify_event ):
+            return store
+        return None
+
+    @property
+    def value( self ) -> IntegraTypeVal:
+        store = self._in_store()
+        if store is not None:
+            return store.get( self._notify_event, self._owner.no )
+        return self._value
+
+    def assign( self, value: IntegraTypeVal ) -> None:
+        super().assign( value )
+        store = self._in_store()
+        if store is not None:
+            store.set( self._notify_event, self._owner.no, bool( value ) )
+
+    async def update( self, current: IntegraTypeVal ):
+        previous = self.value
+        self._value = current
+        store = self._in_store()
+        if store is not None:
+            store.set( self._notify_event, self._owner.no, bool( current ) )
+        if previous != current and self.owner is not None:
+            await self.owner._async_state_changed( self, previous )
+
+
 class IntegraStateFlag( IntegraStateBase ):
 
     def __init__( self, owner: IntegraNotifyObject, flag: Flag, value: IntegraTypeVal ):
@@ -113,6 +158,27 @@ class IntegraStateFlag( IntegraStateBase ):
         await super().update( current & self._flag == self._flag )
 
 
+class IntegraChangeBatch:
+    """Changes of items made while single notification frame is processed, delivered together after the frame"""
+
+    def __init__( self ) -> None:
+        self._changes: list[ tuple[ 'IntegraItem', IntegraStateBase, IntegraTypeVal, IntegraTypeVal ] ] = [ ]
+
+    def __len__( self ) -> int:
+        return len( self._changes )
+
+    def __iter__( self ) -> Iterator[ tuple[ 'IntegraItem', IntegraStateBase, IntegraTypeVal, IntegraTypeVal ] ]:
+        return iter( self._changes )
+
+    def add( self, item: 'IntegraItem', state: IntegraStateBase, previous: IntegraTypeVal ) -> None:
+        self._changes.append( (item, state, previous, state.value) )
+
+    @property
+    def changes( self ) -> list[ tuple[ 'IntegraItem', IntegraNotifyEvent | None, IntegraTypeVal, IntegraTypeVal ] ]:
+        """Compact list of (item, event, old, new), event is None for states not bound to notify event (troubles)"""
+        return [ (item, state.notify_event if isinstance( state, IntegraStateEvent ) else None, previous, current) for item, state, previous, current in self._changes ]
+
+
 DATA = TypeVar( "DATA", bound=IntegraElement )
 
 IntegraSetType = 'IntegraSet'
@@ -131,6 +197,7 @@ class IntegraItem[ DATA ]( IntegraNotifyObject ):
         self._owner: IntegraSetType = owner
         self._no: int = no
         self._states: dict[ IntegraNotifyEvent, IntegraStateEvent ] = { }
+        self._troubles: IntegraStateBase | None = None
         self._data: DATA | None = None
         self._dispatcher: EventsDispatcher = EventsDispatcher()
 
@@ -138,6 +205,10 @@ class IntegraItem[ DATA ]( IntegraNotifyObject ):
     def no( self ):
         return self._no
 
+    @property
+    def owner( self ) -> IntegraSetType:
+        return self._owner
+
     @property
     def id_str( self ) -> str:
         return f"{self.item_name}_{self.no}"
@@ -150,6 +221,14 @@ class IntegraItem[ DATA ]( IntegraNotifyObject ):
     def client( self ) -> IntegraClient | None:
         return self._owner.client if self._owner is not None else None
 
+    @property
+    def store( self ) -> IntegraStateStore | None:
+        return self._owner.store if self._owner is not None else None
+
+    @property
+    def batch( self ) -> IntegraChangeBatch | None:
+        return self._owner.batch if self._owner is not None else None
+
     def _write_fields( self, fields: dict[ str, str ] ) -> None:
         super()._write_fields( fields )
         fields.update( {
@@ -158,7 +237,10 @@ class IntegraItem[ DATA ]( IntegraNotifyObject ):
         } )
 
     def _add_state( self, notify_event: IntegraNotifyEvent, value: IntegraTypeVal ) -> IntegraStateEvent:
-        result = IntegraStateEvent( self, notify_event, value )
+        if IntegraStateStore.is_bitmap( notify_event ):
+            result = IntegraStateBit( self, notify_event, value )
+        else:
+            result = IntegraStateEvent( self, notify_event, value )
         self._states.update( { notify_event: result } )
         return result
 
@@ -166,6 +248,27 @@ class IntegraItem[ DATA ]( IntegraNotifyObject ):
         if notify_event in self._states:
             await self._states[ notify_event ].update( value )
 
+    def load_state( self, notify_event: IntegraNotifyEvent, value: IntegraTypeVal ) -> None:
+        """Take state of initial snapshot, nobody is notified"""
+        if notify_event in self._states:
+            self._states[ notify_event ].assign( value )
+
+    async def async_do_state_applied( self, notify_event: IntegraNotifyEvent, previous: IntegraTypeVal ) -> None:
+        """State was already written to system store by bulk update, only notification of change is left"""
+        state = self._states.get( notify_event )
+        if isinstance( state, IntegraStateBit ):
+            await self._async_state_changed( state, previous )
+        elif state is not None:
+            await state.update( not previous )
+
+    def batch_state_applied( self, batch: IntegraChangeBatch, notify_event: IntegraNotifyEvent, previous: IntegraTypeVal ) -> bool:
+        """Record change of state already written to system store, False when state has to be updated by its owner"""
+        state = self._states.get( notify_event )
+        if isinstance( state, IntegraStateBit ):
+            batch.add( self, state, previous )
+            return True
+        return state is None
+
     def _get_troubles_value( self, values: dict[IntEnum, Flag] ) -> Flag | None:
         pass
 
@@ -177,8 +280,18 @@ class IntegraItem[ DATA ]( IntegraNotifyObject ):
         if value is not None:
             await self._async_do_troubles_change( set_value, value )
 
+    def load_troubles( self, set_value: bool, values: dict[ IntEnum, Flag ] ) -> None:
+        """Take troubles of initial snapshot, nobody is notified"""
+        value = self._get_troubles_value( values )
+        if value is not None and self._troubles is not None:
+            self._troubles.assign( self._troubles.value | value if set_value else self._troubles.value & ~value )
+
     async def _async_state_changed( self, sender: IntegraStateBase, previous: IntegraTypeVal ) -> None:
         await super()._async_state_changed( sender, previous )
+        batch = self.batch
+        if batch is not None:
+            batch.add( self, sender, previous )
+            return
         if self._owner is not None:
             await self._owner.async_item_changed( self, sender, previous )
         await self._dispatcher.async_dispatch( Events.EVENT_SYS_STATE_CHANGED, sender=self, source=sender, previous=previous )
@@ -240,6 +353,14 @@ class IntegraSet[ ITEM ]( SupportsIndex ):
     def client( self ) -> IntegraClient | None:
         return self._owner.client if self._owner is not None else None
 
+    @property
+    def store( self ) -> IntegraStateStore | None:
+        return self._owner.store if self._owner is not None else None
+
+    @property
+    def batch( self ) -> IntegraChangeBatch | None:
+        return self._owner.batch if self._owner is not None else None
+
     def init( self, caps: IntegraCaps ) -> None:
         if self.item_class is None or not hasattr( caps, self.set_name ):
             return
@@ -255,14 +376,44 @@ class IntegraSet[ ITEM ]( SupportsIndex ):
             return self._items[ item_no ]
         return None
 
-    async def process_state_change( self, notify_event: IntegraNotifyEvent, state_change: dict[ int, IntegraTypeVal ] ) -> None:
+    def select( self, predicate: Callable[ [ ITEM ], bool ] ) -> IntegraStateSet:
+        """Numbers of items matching predicate, as set combinable with state sets of store"""
+        return IntegraStateSet.of( [ item.no for item in self._items.values() if predicate( item ) ], len( self._items ) )
+
+    async def process_state_change( self, notify_event: IntegraNotifyEvent, state_change: Mapping[ int, IntegraTypeVal ] ) -> None:
+        store = self.store
+        if isinstance( state_change, IntegraStateDiff ) and store is not None and notify_event in store:
+            batch = self.batch
+            for item_no, value in store.apply( notify_event, state_change ).items():
+                item = self.get( item_no )
+                if item is not None and (batch is None or not item.batch_state_applied( batch, notify_event, not value )):
+                    await item.async_do_state_applied( notify_event, not value )
+            return
 
         for item_no, state_value in state_change.items():
             item = self.get( item_no )
             if item is not None:
                 await item.async_do_state_change( notify_event, state_value )
 
-    async def process_troubles_change( self, region: IntegraTroublesRegionDef, objects: dict[ int, bool ] ):
+    def load_state( self, notify_event: IntegraNotifyEvent, state: Mapping[ int, IntegraTypeVal ] ) -> None:
+        """Take state of initial snapshot without notification of items changed"""
+        store = self.store
+        if isinstance( state, IntegraStateDiff ) and store is not None and notify_event in store:
+            store.apply( notify_event, state )
+            return
+
+        for item_no, state_value in state.items():
+            item = self.get( item_no )
+            if item is not None:
+                item.load_state( notify_event, state_value )
+
+    def load_troubles( self, region: IntegraTroublesRegionDef, objects: Mapping[ int, bool ] ) -> None:
+        for item_no, trouble_value in objects.items():
+            item = self.get( item_no )
+            if item is not None:
+                item.load_troubles( trouble_value, region.values )
+
+    async def process_troubles_change( self, region: IntegraTroublesRegionDef, objects: Mapping[ int, bool ] ):
         for item_no, trouble_change in objects.items():
             item = self.get( item_no )
             if item is not None:
@@ -494,6 +645,10 @@ class IntegraZone( IntegraItem[ IntegraZoneWithPartsElement ] ):
         self._temperature: IntegraStateEvent = super()._add_state( IntegraNotifyEvent.ZONE_TEMPERATURE, 0.0 )
         self._troubles: IntegraStateBase = IntegraStateBase(self, IntegraTroublesZone.NONE )
 
+    @property
+    def part_no( self ) -> int:
+        return self._data.part_no if self._data is not None else 0
+
     @property
     def violation( self ) -> bool:
         return self._violation.value
@@ -605,6 +760,9 @@ class IntegraZones( IntegraSet[ IntegraZone ] ):
     def __init__( self, owner: IntegraSystemType ) -> None:
         super().__init__( owner )
 
+    def in_part( self, part_no: int ) -> IntegraStateSet:
+        return self.select( lambda zone: zone.part_no == part_no )
+
 
 class IntegraOutput( IntegraItem[ IntegraOutputWithDurationElement ] ):
     item_name = "output"
@@ -926,11 +1084,20 @@ class IntegraSystem( IntegraNotifyObject ):
         system._set_client( IntegraClient.tcp( host, port, eventloop, opts ) )
         return system
 
+    @classmethod
+    def replay( cls, capture_file: str, eventloop: AbstractEventLoop, opts: IntegraClientOpts, speed: float = 1.0, follow_requests: bool = True ) -> 'IntegraSystem':
+        system = cls( eventloop )
+        system._set_client( IntegraClient.replay( capture_file, eventloop, opts, speed, follow_requests ) )
+        return system
+
     def __init__( self, eventloop: AbstractEventLoop ) -> None:
         super().__init__()
         self._eventloop: AbstractEventLoop = eventloop
         self._client: IntegraClient | None = None
         self._client_event: EventsDispatcher = EventsDispatcher()
+        self._store: IntegraStateStore = IntegraStateStore()
+        self._batch: IntegraChangeBatch | None = None
+        self._batch_changes: bool = True
 
         self._sets: dict = {  }
         for set_id, set_class in IntegraSetFactory.get_all().items():
@@ -959,6 +1126,25 @@ class IntegraSystem( IntegraNotifyObject ):
     def client( self ) -> IntegraClient:
         return self._client
 
+    @property
+    def store( self ) -> IntegraStateStore:
+        return self._store
+
+    @property
+    def batch( self ) -> IntegraChangeBatch | None:
+        """Batch collecting changes of notification frame being processed"""
+        return self._batch
+
+    @property
+    def batch_changes( self ) -> bool:
+        """Changes of single notification frame are delivered in one EVENT_SYS_ITEMS_CHANGED, EVENT_SYS_ITEM_CHANGED
+        subscribers still receive every change, after the frame is processed"""
+        return self._batch_changes
+
+    @batch_changes.setter
+    def batch_changes( self, value: bool ) -> None:
+        self._batch_changes = value
+
     @property
     def status( self ) -> IntegraClientStatus:
         return IntegraClientStatus.DISCONNECTED if self._client is None else self._client.status
@@ -994,11 +1180,14 @@ class IntegraSystem( IntegraNotifyObject ):
     def subscribe( self, event_name: str, event_handler: AsyncEventHandler ) -> None:
         self._dispatcher.subscribe( event_name, event_handler )
 
+    def unsubscribe( self, event_name: str, event_handler: AsyncEventHandler ) -> None:
+        self._dispatcher.unsubscribe( event_name, event_handler )
+
     async def _async_system_info_load( self, elements_cache: dict[ str, Any ] | None, instance: IntegraSet, task_data: TaskDataInfoLoad ) -> bool:
 
-        result = False
         reload = True if task_data.reload is not None and (len( task_data.reload ) == 0 or instance.set_name in task_data.reload) else False
-        for item in instance:
+
+        async def load_item( item: IntegraItem ) -> bool:
             element_data: IntegraElement | None = None
             item_id_str = item.id_str
             if not reload and item_id_str in elements_cache:
@@ -1010,11 +1199,23 @@ class IntegraSystem( IntegraNotifyObject ):
                         element_data = element_class.from_json( element_json )
 
             loaded_element_data = await item.load_data( self._client, element_data )
+            task_data.current += 1
             if loaded_element_data != element_data:
                 elements_cache.update( { item_id_str: loaded_element_data.to_json() } )
-                result = True
+                return True
+            return False
 
-            task_data.current += 1
+        # with pipelined channel, up to window size elements are requested at once
+        result = False
+        items = list( instance )
+        batch_size = self._client.opts.pipeline_window
+        for index in range( 0, len( items ), batch_size ):
+            batch = items[ index:index + batch_size ]
+            if batch_size == 1:
+                loaded = [ await load_item( batch[ 0 ] ) ]
+            else:
+                loaded = await asyncio.gather( *[ load_item( item ) for item in batch ] )
+            result = any( loaded ) or result
 
         return result
 
@@ -1065,6 +1266,7 @@ class IntegraSystem( IntegraNotifyObject ):
         return result
 
     def _init_system( self ) -> None:
+        self._store.configure( self.caps )
         for _, set_instance in self._sets.items():
             set_instance.init( self.caps )
 
@@ -1078,6 +1280,8 @@ class IntegraSystem( IntegraNotifyObject ):
             self._client.on_state_changed = None
             self._client.on_data_changed = None
             self._client.on_troubles_changed = None
+            self._client.on_resynced = None
+            self._client.on_snapshot = None
 
         self._client = client
 
@@ -1086,18 +1290,70 @@ class IntegraSystem( IntegraNotifyObject ):
             self._client.on_state_changed = self._async_client_state_changed_handler
             self._client.on_data_changed = self._async_client_data_changed_handler
             self._client.on_troubles_changed = self._async_client_troubles_changed_handler
+            self._client.on_resynced = self._async_client_resynced_handler
+            self._client.on_snapshot = self._async_client_snapshot_handler
 
     async def _async_client_event_handler( self, client: IntegraClient, event: IntegraClientStatus ) -> None:
         await self._dispatcher.async_dispatch( Events.EVENT_SYS_CLIENT_EVENT, sender=self, event=event )
         if event == IntegraClientStatus.CONNECTED:
             self._init_system()
 
-    async def _async_client_state_changed_handler( self, client: IntegraClient, source: IntegraNotifySource, notify_event: IntegraNotifyEvent, state: dict[ int, bool ] ) -> None:
-        for _, instance in self._sets.items():
-            if instance.handle_notify_source == source:
-                await instance.process_state_change( notify_event, state )
+    async def _async_client_resynced_handler( self, client: IntegraClient, changes: int, duration: float ) -> None:
+        await self._dispatcher.async_dispatch( Events.EVENT_SYS_RESYNCED, sender=self, changes=changes, duration=duration )
+
+    async def _async_client_snapshot_handler( self, client: IntegraClient, states: list[ tuple[ IntegraNotifySource, IntegraNotifyEvent, IntegraStateDiff ] ],
+                                              troubles: list[ tuple[ IntegraTroublesRegionDef, IntegraStateDiff ] ] ) -> None:
+        for source, notify_event, state in states:
+            for _, instance in self._sets.items():
+                if instance.handle_notify_source == source:
+                    instance.load_state( notify_event, state )
+        for region, objects in troubles:
+            for _, instance in self._sets.items():
+                if instance.handle_troubles_source == region.source:
+                    instance.load_troubles( region, objects )
+        await self._dispatcher.async_dispatch( Events.EVENT_SYS_SNAPSHOT, sender=self, events=[ notify_event for _, notify_event, _ in states ],
+                                               regions=[ region for region, _ in troubles ], store=self._store )
+
+    def _batch_begin( self ) -> IntegraChangeBatch | None:
+        """Start batch of notification frame, None when batching is off or batch of outer frame is running"""
+        if not self._batch_changes or self._batch is not None:
+            return None
+        self._batch = IntegraChangeBatch()
+        return self._batch
+
+    async def _async_batch_end( self, batch: IntegraChangeBatch | None ) -> None:
+        if batch is None or batch is not self._batch:
+            return
+        self._batch = None
+        if not batch:
+            return
+        if Events.EVENT_SYS_ITEMS_CHANGED in self._dispatcher:
+            await self._dispatcher.async_dispatch( Events.EVENT_SYS_ITEMS_CHANGED, sender=self, changes=batch.changes )
+        # adapter for subscribers of single item changes
+        item_changed = Events.EVENT_SYS_ITEM_CHANGED in self._dispatcher
+        for item, state, previous, _ in batch:
+            if item_changed:
+                await self._dispatcher.async_dispatch( Events.EVENT_SYS_ITEM_CHANGED, sender=self, item=item, state=state, previous=previous )
+            if Events.EVENT_SYS_STATE_CHANGED in item._dispatcher:
+                await item._dispatcher.async_dispatch( Events.EVENT_SYS_STATE_CHANGED, sender=item, source=state, previous=previous )
+
+    async def _async_client_state_changed_handler( self, client: IntegraClient, source: IntegraNotifySource, notify_event: IntegraNotifyEvent, state: Mapping[ int, bool ] ) -> None:
+        batch = self._batch_begin()
+        try:
+            for _, instance in self._sets.items():
+                if instance.handle_notify_source == source:
+                    await instance.process_state_change( notify_event, state )
+        finally:
+            await self._async_batch_end( batch )
 
     async def _async_client_data_changed_handler( self, client: IntegraClient, source: IntegraNotifySource, notify_event: IntegraNotifyEvent, data: IntegraCmdData ) -> None:
+        batch = self._batch_begin()
+        try:
+            await self._async_do_data_changed( notify_event, data )
+        finally:
+            await self._async_batch_end( batch )
+
+    async def _async_do_data_changed( self, notify_event: IntegraNotifyEvent, data: IntegraCmdData ) -> None:
 
         if notify_event == IntegraNotifyEvent.OUTPUT_POWER and isinstance( data, IntegraCmdOutputPower ):
             await self.outputs.get( data.output_no ).async_do_state_change( notify_event, data.power )
@@ -1113,9 +1369,13 @@ class IntegraSystem( IntegraNotifyObject ):
         elif region.source == IntegraTroublesSource.SYSTEM_OTHER:
             await self._troubles_other.update(objects)
         else:
-            for _, instance in self._sets.items():
-                if instance.handle_troubles_source == region.source:
-                    await instance.process_troubles_change( region, objects )
+            batch = self._batch_begin()
+            try:
+                for _, instance in self._sets.items():
+                    if instance.handle_troubles_source == region.source:
+                        await instance.process_troubles_change( region, objects )
+            finally:
+                await self._async_batch_end( batch )
 
     async def _async_do_flag_change( self, flag : Flag ) -> None:
         if flag.__class__ in self._flags:
@@ -1125,6 +1385,13 @@ class IntegraSystem( IntegraNotifyObject ):
     async def async_item_changed( self, item: IntegraItem, state: IntegraStateBase, previous: IntegraTypeVal ) -> None:
         await self._dispatcher.async_dispatch( Events.EVENT_SYS_ITEM_CHANGED, sender=self, item=item, state=state, previous=previous )
 
+    @property
+    def system_info_progress( self ) -> tuple[ int, int ] | None:
+        """Number of loaded and all elements of running (or finished) system info load"""
+        if self._system_info_load is not None:
+            return self._system_info_load.current, self._system_info_load.total
+        return None
+
     def get_channel_stats( self ) -> IntegraChannelStats | None:
         if self._client is not None:
             return self._client.stats
@@ -0,0 +1,102 @@
+import logging
+
+from enum import IntEnum
+
+from .base import IntegraEntity
+from .notify import IntegraNotifyEvent
+
+_LOGGER = logging.getLogger( __name__ )
+
+# partitions in any of these states are about to change, poll runs fast until they leave them
+IntegraPollActiveEvents = [
+    IntegraNotifyEvent.PARTS_ENTRY_TIME,
+    IntegraNotifyEvent.PARTS_EXIT_TIME_ABOVE_10,
+    IntegraNotifyEvent.PARTS_EXIT_TIME_BELOW_10,
+    IntegraNotifyEvent.PARTS_ALARM,
+    IntegraNotifyEvent.PARTS_FIRE_ALARM,
+]
+
+
+class IntegraPollDecision( IntEnum ):
+    CHANGED = 0
+    ACTIVE = 1
+    CONTROL = 2
+    HOLD = 3
+    BACKOFF = 4
+
+
+class IntegraPollController( IntegraEntity ):
+    """Adapts interval of 0x7F polling to activity of the panel.
+
+    Poll runs at fast interval after any change, while some partition is in entry / exit time or alarm and after
+    control command is issued. Once 0x7F reports no changes for hold polls in a row, interval is multiplied by
+    backoff after every empty poll, up to the ceiling. Activity comes from states of monitored events listed in
+    IntegraPollActiveEvents, client makes no reads of its own to learn it.
+    """
+
+    def __init__( self, fast: float = 0.25, ceiling: float = 5.0, backoff: float = 2.0, hold: int = 3 ) -> None:
+        super().__init__()
+        self._fast: float = fast
+        self._ceiling: float = max( fast, ceiling )
+        self._backoff: float = max( 1.0, backoff )
+        self._hold: int = hold
+        self._interval: float = fast
+        self._idle: int = 0
+        self._decision: IntegraPollDecision = IntegraPollDecision.CHANGED
+        self._decisions: dict[ IntegraPollDecision, int ] = { decision: 0 for decision in IntegraPollDecision }
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        fields.update( {
+            "Interval": f"{self._interval}",
+            "Fast": f"{self._fast}",
+            "Ceiling": f"{self._ceiling}",
+            "Decision": f"{self._decision.name}",
+        } )
+
+    @property
+    def interval( self ) -> float:
+        return self._interval
+
+    @property
+    def fast( self ) -> float:
+        return self._fast
+
+    @property
+    def ceiling( self ) -> float:
+        return self._ceiling
+
+    @property
+    def decision( self ) -> IntegraPollDecision:
+        """Reason of the last interval decision"""
+        return self._decision
+
+    @property
+    def decisions( self ) -> dict[ IntegraPollDecision, int ]:
+        return self._decisions
+
+    def _decide( self, decision: IntegraPollDecision, interval: float ) -> float:
+        self._decision = decision
+        self._decisions[ decision ] += 1
+        if interval != self._interval:
+            _LOGGER.debug( f"Poll interval {self._interval:.3f}s -> {interval:.3f}s ({decision.name})" )
+            self._interval = interval
+        return interval
+
+    def update( self, changed: bool, active: bool ) -> float:
+        """Decide interval after poll, changed tells 0x7F reported changes, active that some partition needs attention"""
+        if changed:
+            self._idle = 0
+            return self._decide( IntegraPollDecision.CHANGED, self._fast )
+        if active:
+            self._idle = 0
+            return self._decide( IntegraPollDecision.ACTIVE, self._fast )
+        self._idle += 1
+        if self._idle <= self._hold:
+            return self._decide( IntegraPollDecision.HOLD, self._interval )
+        return self._decide( IntegraPollDecision.BACKOFF, min( self._interval * self._backoff, self._ceiling ) )
+
+    def control( self ) -> float:
+        """Control command was issued, its effect is expected to be seen soon"""
+        self._idle = 0
+        return self._decide( IntegraPollDecision.CONTROL, self._fast )
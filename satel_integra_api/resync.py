@@ -0,0 +1,69 @@
+import logging
+import time
+
+from .base import IntegraEntity
+from .messages import IntegraRequest, IntegraResponse
+from .notify import IntegraNotifyEvent
+
+_LOGGER = logging.getLogger( __name__ )
+
+
+class IntegraResyncSnapshot( IntegraEntity ):
+    """State responses collected while resync (or pipelined poll cycle) is in progress.
+
+    Responses are held back from subscribers until every read of the batch is answered, then the whole snapshot is
+    compared with state known before the connection was lost, so only real differences are reported. Poll cycle uses
+    it the same way to pass responses of all states changed since previous 0x7F read together, it holds only
+    responses to its own requests.
+    """
+
+    def __init__( self, started: float | None = None, requests: list[ IntegraRequest ] | None = None ):
+        super().__init__()
+        self._started: float = started if started is not None else time.monotonic()
+        self._requests: set[ IntegraRequest ] | None = set( requests ) if requests is not None else None
+        self._responses: dict[ IntegraNotifyEvent, IntegraResponse ] = { }
+        self._released: set[ IntegraNotifyEvent ] = set()
+        self._expected: set[ IntegraNotifyEvent ] | None = None
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        fields.update( {
+            "Responses": f"{len( self._responses )}",
+            "Expected": f"{len( self._expected ) if self._expected is not None else '?'}",
+        } )
+
+    @property
+    def started( self ) -> float:
+        """Monotonic time resync started at, time of connection when resync follows (re)connect"""
+        return self._started
+
+    @property
+    def responses( self ) -> dict[ IntegraNotifyEvent, IntegraResponse ]:
+        return self._responses
+
+    @property
+    def expected( self ) -> set[ IntegraNotifyEvent ] | None:
+        """Events answered successfully, None until all reads of the batch are finished"""
+        return self._expected
+
+    @expected.setter
+    def expected( self, value: set[ IntegraNotifyEvent ] ) -> None:
+        self._expected = value
+
+    @property
+    def complete( self ) -> bool:
+        return self._expected is not None and self._expected.issubset( self._responses.keys() | self._released )
+
+    def owns( self, response: IntegraResponse ) -> bool:
+        """Response answers request of this batch, batch created without requests takes every response"""
+        return self._requests is None or response.request in self._requests
+
+    def add( self, notify_event: IntegraNotifyEvent, response: IntegraResponse ) -> None:
+        """Keep response, newer response of the same event replaces older one"""
+        self._responses[ notify_event ] = response
+
+    def release( self, notify_event: IntegraNotifyEvent ) -> None:
+        """Newer state of event was passed elsewhere (taken by resync or read by user), held response is dropped
+        and batch does not wait for it anymore"""
+        self._responses.pop( notify_event, None )
+        self._released.add( notify_event )
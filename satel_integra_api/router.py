@@ -0,0 +1,105 @@
+import logging
+
+from asyncio import AbstractEventLoop, Future
+from collections import deque
+
+from .base import IntegraEntity
+from .commands import IntegraCommand
+from .messages import IntegraRequest, IntegraResponse
+
+_LOGGER = logging.getLogger( __name__ )
+
+
+class IntegraResponseRouter( IntegraEntity ):
+    """Matches received responses with requests awaiting them.
+
+    Pending requests are kept in FIFO queue per command, requests which accept READ_RESULT are also queued in
+    separate result queue, the other ones in read queue. READ_RESULT goes to the oldest request of result queue,
+    when none waits the panel rejected a read and it goes to the oldest request of read queue. Each response is routed
+    in O(1), entries of requests which timed out or were cancelled (future already done) are dropped lazily when they
+    reach head of queue.
+    """
+
+    class Pending:
+        __slots__ = ("request", "future")
+
+        def __init__( self, request: IntegraRequest, future: Future ):
+            self.request: IntegraRequest = request
+            self.future: Future = future
+
+    def __init__( self, eventloop: AbstractEventLoop ) -> None:
+        super().__init__()
+        self._eventloop: AbstractEventLoop = eventloop
+        self._commands: dict[ IntegraCommand, deque[ IntegraResponseRouter.Pending ] ] = { }
+        self._results: deque[ IntegraResponseRouter.Pending ] = deque()
+        self._reads: deque[ IntegraResponseRouter.Pending ] = deque()
+        self._pending: int = 0
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        fields.update( {
+            "Pending": f"{self._pending}",
+        } )
+
+    @property
+    def pending( self ) -> int:
+        return self._pending
+
+    @staticmethod
+    def _pop_active( queue: deque[ 'IntegraResponseRouter.Pending' ] ) -> 'IntegraResponseRouter.Pending | None':
+        while queue:
+            pending = queue.popleft()
+            if not pending.future.done():
+                return pending
+        return None
+
+    @staticmethod
+    def _purge( queue: deque[ 'IntegraResponseRouter.Pending' ] ) -> None:
+        while queue and queue[ 0 ].future.done():
+            queue.popleft()
+
+    def register( self, request: IntegraRequest ) -> Future:
+        """Register request awaiting response, returned future receives IntegraResponse or BaseException"""
+        pending = IntegraResponseRouter.Pending( request, self._eventloop.create_future() )
+        queue = self._commands.get( request.command )
+        if queue is None:
+            queue = self._commands[ request.command ] = deque()
+        else:
+            self._purge( queue )
+        queue.append( pending )
+        results = self._results if request.result_allowed else self._reads
+        self._purge( results )
+        results.append( pending )
+        self._pending += 1
+        return pending.future
+
+    def unregister( self, future: Future ) -> None:
+        """Request finished (answered, timed out or cancelled), its queue entries are dropped lazily"""
+        if not future.done():
+            future.cancel()
+        self._pending -= 1
+
+    def route( self, response: IntegraResponse ) -> Future | None:
+        """Pass response to the oldest request awaiting it, returns future of that request, None when nobody waits for it"""
+        if response.command == IntegraCommand.READ_RESULT:
+            pending = self._pop_active( self._results ) or self._pop_active( self._reads )
+        else:
+            queue = self._commands.get( response.command )
+            pending = self._pop_active( queue ) if queue is not None else None
+
+        if pending is None:
+            return None
+
+        response.bind_request( pending.request )
+        pending.future.set_result( response )
+        return pending.future
+
+    def fail_all( self, error: BaseException ) -> None:
+        """Pass error to every request awaiting response"""
+        for queue in self._commands.values():
+            while queue:
+                pending = queue.popleft()
+                if not pending.future.done():
+                    pending.future.set_result( error )
+        self._results.clear()
+        self._reads.clear()
@@ -0,0 +1,368 @@
+import heapq
+import logging
+import math
+import random
+import time
+
+from asyncio import AbstractEventLoop, CancelledError as AsyncCancelledError, Future
+from enum import IntEnum
+from typing import Callable, Hashable
+
+from .base import IntegraEntity
+from .commands import IntegraCommand
+
+_LOGGER = logging.getLogger( __name__ )
+
+
+class IntegraRequestPriority( IntEnum ):
+    CONTROL = 0
+    STATE = 1
+    SENSOR = 2
+    CONFIG = 3
+    KEEPALIVE = 4
+
+
+class IntegraSchedulerStats( IntegraEntity ):
+    """Queue depth and wait time (time from enqueue until request is admitted) per priority class"""
+
+    class Counters:
+        __slots__ = ("requests", "waiting", "waiting_max", "wait_total", "wait_max")
+
+        def __init__( self ):
+            self.requests: int = 0
+            self.waiting: int = 0
+            self.waiting_max: int = 0
+            self.wait_total: float = 0.0
+            self.wait_max: float = 0.0
+
+        @property
+        def wait_avg( self ) -> float:
+            return self.wait_total / self.requests if self.requests else 0.0
+
+    def __init__( self ):
+        super().__init__()
+        self._counters: dict[ IntegraRequestPriority, IntegraSchedulerStats.Counters ] = {
+            priority: IntegraSchedulerStats.Counters() for priority in IntegraRequestPriority
+        }
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        for priority, counters in self._counters.items():
+            fields.update( {
+                priority.name: f"{counters.requests} / {counters.waiting} / {counters.wait_avg * 1000:.1f}ms / {counters.wait_max * 1000:.1f}ms"
+            } )
+
+    def __getitem__( self, priority: IntegraRequestPriority ) -> 'IntegraSchedulerStats.Counters':
+        return self._counters[ priority ]
+
+    def queue_depth( self, priority: IntegraRequestPriority | None = None ) -> int:
+        if priority is None:
+            return sum( counters.waiting for counters in self._counters.values() )
+        return self._counters[ priority ].waiting
+
+    def _enqueued( self, priority: IntegraRequestPriority ) -> None:
+        counters = self._counters[ priority ]
+        counters.waiting += 1
+        counters.waiting_max = max( counters.waiting_max, counters.waiting )
+
+    def _dequeued( self, priority: IntegraRequestPriority ) -> None:
+        self._counters[ priority ].waiting -= 1
+
+    def _admitted( self, priority: IntegraRequestPriority, wait_time: float ) -> None:
+        counters = self._counters[ priority ]
+        counters.requests += 1
+        counters.wait_total += wait_time
+        counters.wait_max = max( counters.wait_max, wait_time )
+
+
+class IntegraRequestScheduler( IntegraEntity ):
+    """Decides when request may be sent to the channel.
+
+    Up to window size requests may await response (be in flight) at once. Waiting requests are admitted by priority
+    class (control > state reads > sensor polls > configuration loads > keepalive) and in FIFO order within class.
+    Control and user commands are exclusive - they wait until all in flight requests are answered and nothing else
+    is sent until they are answered too. While request of higher class waits, no lower class request is admitted,
+    so control command waits at most for the current window to drain.
+    """
+
+    class Slot:
+
+        def __init__( self, scheduler: 'IntegraRequestScheduler', command: IntegraCommand, priority: IntegraRequestPriority | None ):
+            self._scheduler = scheduler
+            self._command = command
+            self._priority = priority
+
+        async def __aenter__( self ):
+            await self._scheduler.acquire( self._command, self._priority )
+            return self
+
+        async def __aexit__( self, exc_type, exc_val, exc_tb ):
+            self._scheduler.release( self._command )
+
+    @staticmethod
+    def is_exclusive( command: IntegraCommand ) -> bool:
+        """Control and user commands are ordering sensitive, they are never pipelined with other requests"""
+        return IntegraCommand.EXEC_ARM_MODE_0 <= command < IntegraCommand.ELEMENT_READ_NAME
+
+    @staticmethod
+    def get_priority( command: IntegraCommand ) -> IntegraRequestPriority:
+        if IntegraRequestScheduler.is_exclusive( command ):
+            return IntegraRequestPriority.CONTROL
+        if command <= IntegraCommand.READ_TROUBLES_MEMORY_PART8 or command == IntegraCommand.READ_SYSTEM_CHANGES:
+            return IntegraRequestPriority.STATE
+        if command == IntegraCommand.READ_OUTPUT_POWER or command == IntegraCommand.READ_ZONE_TEMPERATURE:
+            return IntegraRequestPriority.SENSOR
+        return IntegraRequestPriority.CONFIG
+
+    def __init__( self, eventloop: AbstractEventLoop, size: int = 1 ) -> None:
+        super().__init__()
+        self._eventloop: AbstractEventLoop = eventloop
+        self._size: int = max( 1, size )
+        self._in_flight: int = 0
+        self._exclusive: bool = False
+        self._sequence: int = 0
+        self._waiters: list[ tuple[ IntegraRequestPriority, int, bool, float, Future ] ] = [ ]
+        self._stats: IntegraSchedulerStats = IntegraSchedulerStats()
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        fields.update( {
+            "Size": f"{self._size}",
+            "InFlight": f"{self._in_flight}",
+            "Waiting": f"{len( self._waiters )}",
+        } )
+
+    @property
+    def size( self ) -> int:
+        return self._size
+
+    @size.setter
+    def size( self, value: int ) -> None:
+        self._size = max( 1, value )
+        self._wakeup()
+
+    @property
+    def in_flight( self ) -> int:
+        return self._in_flight
+
+    @property
+    def waiting( self ) -> int:
+        return len( self._waiters )
+
+    @property
+    def stats( self ) -> IntegraSchedulerStats:
+        return self._stats
+
+    def _can_enter( self, exclusive: bool ) -> bool:
+        if self._exclusive:
+            return False
+        if exclusive:
+            return self._in_flight == 0
+        return self._in_flight < self._size
+
+    def _enter( self, exclusive: bool ) -> None:
+        self._in_flight += 1
+        self._exclusive = exclusive
+
+    def _wakeup( self ) -> None:
+        while self._waiters:
+            priority, _, exclusive, enqueue_ts, waiter = self._waiters[ 0 ]
+            if waiter.done():
+                heapq.heappop( self._waiters )
+                self._stats._dequeued( priority )
+                continue
+            if not self._can_enter( exclusive ):
+                break
+            heapq.heappop( self._waiters )
+            self._stats._dequeued( priority )
+            self._stats._admitted( priority, self._eventloop.time() - enqueue_ts )
+            self._enter( exclusive )
+            waiter.set_result( True )
+
+    def slot( self, command: IntegraCommand, priority: IntegraRequestPriority | None = None ) -> 'IntegraRequestScheduler.Slot':
+        return IntegraRequestScheduler.Slot( self, command, priority )
+
+    async def acquire( self, command: IntegraCommand, priority: IntegraRequestPriority | None = None ) -> None:
+        exclusive = self.is_exclusive( command )
+        if priority is None:
+            priority = self.get_priority( command )
+
+        if not self._waiters and self._can_enter( exclusive ):
+            self._stats._admitted( priority, 0.0 )
+            self._enter( exclusive )
+            return
+
+        waiter = self._eventloop.create_future()
+        self._sequence += 1
+        heapq.heappush( self._waiters, (priority, self._sequence, exclusive, self._eventloop.time(), waiter) )
+        self._stats._enqueued( priority )
+        try:
+            await waiter
+        except AsyncCancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # slot was granted just before cancellation, give it back
+                self.release( command )
+            else:
+                self._waiters = [ entry for entry in self._waiters if entry[ 4 ] is not waiter ]
+                heapq.heapify( self._waiters )
+                self._stats._dequeued( priority )
+                self._wakeup()
+            raise
+
+    def release( self, command: IntegraCommand ) -> None:
+        if self._in_flight > 0:
+            self._in_flight -= 1
+        self._exclusive = False
+        self._wakeup()
+
+
+class IntegraJobScheduler( IntegraEntity ):
+    """Periodic jobs kept in heap ordered by monotonic due time.
+
+    Jobs are keyed by any hashable value. (Re)scheduling and removal cost O(log n) - replaced entries are left in heap
+    and skipped when they reach its top. Next run is counted from previous due time, not from the time job finished,
+    so schedule does not drift. Runs which could not be made in time are skipped and counted as missed. First run of
+    jobs sharing the same interval is spread over the interval (golden ratio sequence), optional jitter delays every
+    run by random part of interval without moving the schedule itself.
+    """
+
+    class Job:
+        __slots__ = ("key", "interval", "base", "due", "generation")
+
+        def __init__( self, key: Hashable, interval: float, due: float, generation: int ):
+            self.key: Hashable = key
+            self.interval: float = interval
+            self.base: float = due
+            self.due: float = due
+            self.generation: int = generation
+
+    PHASE_STEP = (math.sqrt( 5 ) - 1) / 2
+
+    def __init__( self, jitter: float = 0.0, seed: int | None = None, clock: Callable[ [ ], float ] = time.monotonic ) -> None:
+        super().__init__()
+        self._jitter: float = max( 0.0, min( jitter, 0.5 ) )
+        self._random: random.Random = random.Random( seed )
+        self._clock: Callable[ [ ], float ] = clock
+        self._jobs: dict[ Hashable, IntegraJobScheduler.Job ] = { }
+        self._heap: list[ tuple[ float, int, int, Hashable ] ] = [ ]
+        self._sequence: int = 0
+        self._phases: dict[ float, int ] = { }
+        self._runs: int = 0
+        self._missed: int = 0
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        fields.update( {
+            "Jobs": f"{len( self._jobs )}",
+            "Runs": f"{self._runs}",
+            "Missed": f"{self._missed}",
+        } )
+
+    def __len__( self ) -> int:
+        return len( self._jobs )
+
+    def __contains__( self, key: Hashable ) -> bool:
+        return key in self._jobs
+
+    @property
+    def runs( self ) -> int:
+        return self._runs
+
+    @property
+    def missed( self ) -> int:
+        """Runs skipped because job was due more than one interval ago"""
+        return self._missed
+
+    def interval( self, key: Hashable ) -> float:
+        job = self._jobs.get( key )
+        return job.interval if job is not None else 0.0
+
+    def _push( self, job: 'IntegraJobScheduler.Job' ) -> None:
+        self._sequence += 1
+        heapq.heappush( self._heap, (job.due, self._sequence, job.generation, job.key) )
+        # replaced and removed entries are dropped once they outnumber live ones
+        if len( self._heap ) > 2 * len( self._jobs ) + 64:
+            self._heap = [ entry for entry in self._heap if entry[ 3 ] in self._jobs and self._jobs[ entry[ 3 ] ].generation == entry[ 2 ] ]
+            heapq.heapify( self._heap )
+
+    def _spread( self, interval: float ) -> float:
+        count = self._phases.get( interval, 0 )
+        self._phases[ interval ] = count + 1
+        return (count * self.PHASE_STEP) % 1.0 * interval
+
+    def _jittered( self, interval: float ) -> float:
+        if self._jitter <= 0.0:
+            return 0.0
+        return self._random.uniform( 0.0, self._jitter ) * interval
+
+    def schedule( self, key: Hashable, interval: float, delay: float | None = None ) -> bool:
+        """Add job or change its interval, returns False when job already runs with that interval.
+
+        First run comes after delay, when delay is not given it is spread over the interval.
+        """
+        if interval <= 0:
+            return self.unschedule( key )
+        job = self._jobs.get( key )
+        if job is not None and job.interval == interval:
+            return False
+        now = self._clock()
+        due = now + (delay if delay is not None else self._spread( interval ))
+        job = IntegraJobScheduler.Job( key, interval, due, job.generation + 1 if job is not None else 0 )
+        self._jobs[ key ] = job
+        self._push( job )
+        return True
+
+    def unschedule( self, key: Hashable ) -> bool:
+        return self._jobs.pop( key, None ) is not None
+
+    def restart( self ) -> None:
+        """Schedule every job again from now, first runs spread over their intervals"""
+        now = self._clock()
+        self._heap.clear()
+        self._phases.clear()
+        for job in self._jobs.values():
+            job.generation += 1
+            job.base = job.due = now + self._spread( job.interval )
+            self._push( job )
+
+    def clear( self ) -> None:
+        self._jobs.clear()
+        self._heap.clear()
+        self._phases.clear()
+
+    def _top( self ) -> 'IntegraJobScheduler.Job | None':
+        while self._heap:
+            _, _, generation, key = self._heap[ 0 ]
+            job = self._jobs.get( key )
+            if job is not None and job.generation == generation:
+                return job
+            heapq.heappop( self._heap )
+        return None
+
+    def next_delay( self, default: float = 3600.0 ) -> float:
+        """Seconds until the earliest job is due, 0.0 when it is due already"""
+        job = self._top()
+        if job is None:
+            return default
+        return min( max( job.due - self._clock(), 0.0 ), default )
+
+    def take( self ) -> tuple[ Hashable, float ] | None:
+        """Key and lateness of job which is due now, job is rescheduled to its next run. None when nothing is due"""
+        job = self._top()
+        if job is None:
+            return None
+        now = self._clock()
+        if job.due > now:
+            return None
+        heapq.heappop( self._heap )
+        lateness = now - job.due
+        base = job.base + job.interval
+        if base <= now:
+            skipped = math.floor( (now - base) / job.interval ) + 1
+            self._missed += skipped
+            base += skipped * job.interval
+        job.base = base
+        job.due = base + self._jittered( job.interval )
+        self._runs += 1
+        self._push( job )
+        return job.key, lateness
@@ -0,0 +1,636 @@
+import asyncio
+import itertools
+import logging
+import marshal
+import multiprocessing
+import os
+import pickle
+import socket
+import struct
+import time
+
+from asyncio import AbstractEventLoop, Future, StreamReader, StreamWriter, Task, TimerHandle
+from enum import Enum
+from multiprocessing.process import BaseProcess
+from typing import Any
+
+from .base import IntegraEntity, IntegraTypeVal
+from .client import IntegraClientOpts, IntegraClientStatus
+from .fleet import DEFAULT_FLEET_CONNECT_CONCURRENCY, DEFAULT_FLEET_CONNECT_RATE, DEFAULT_FLEET_RECONNECT_JITTER, DEFAULT_FLEET_WORKERS, IntegraFleet
+from .notify import IntegraNotifyEvent
+from .objects import AsyncEventHandler, Events, EventsDispatcher, IntegraItem, IntegraSetFactory, IntegraStateBase, IntegraStateEvent
+
+_LOGGER = logging.getLogger( __name__ )
+
+DEFAULT_SHARD_BATCH_INTERVAL = 0.01
+DEFAULT_SHARD_BATCH_SIZE = 512
+DEFAULT_SHARD_STOP_TIMEOUT = 10.0
+
+# IPC frame is length and kind header followed by payload. Events travel in batches of tuples of plain values serialized
+# with marshal, control requests and their results are rare and carry arbitrary arguments, so they are pickled
+SHARD_FRAME_HEADER = struct.Struct( "<IB" )
+SHARD_FRAME_EVENTS = 1
+SHARD_FRAME_CONTROL = 2
+
+# event tuples ( kind, panel_id, ... )
+SHARD_EVENT_CLIENT = 1  # ( kind, panel_id, status )
+SHARD_EVENT_ITEM = 2  # ( kind, panel_id, set_id, item_no, notify_event or -1, value, previous )
+
+# control requests ( op, request_id, ... ), answered with ( request_id, ok, result or exception )
+SHARD_OP_ADD = 1
+SHARD_OP_REMOVE = 2
+SHARD_OP_CONNECT = 3
+SHARD_OP_DISCONNECT = 4
+SHARD_OP_CALL = 5
+SHARD_OP_FORWARD = 6
+SHARD_OP_STATS = 7
+SHARD_OP_STOP = 8
+SHARD_OP_SET = 9
+
+
+class IntegraShardLink( IntegraEntity ):
+    """Framed duplex IPC stream between coordinator and shard process"""
+
+    def __init__( self, reader: StreamReader, writer: StreamWriter ):
+        super().__init__()
+        self._reader: StreamReader = reader
+        self._writer: StreamWriter = writer
+        self._rx_bytes: int = 0
+        self._tx_bytes: int = 0
+        self._rx_frames: int = 0
+        self._tx_frames: int = 0
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        fields.update( {
+            "RxBytes": f"{self._rx_bytes}",
+            "TxBytes": f"{self._tx_bytes}",
+        } )
+
+    @classmethod
+    async def create( cls, sock: socket.socket ) -> 'IntegraShardLink':
+        reader, writer = await asyncio.open_connection( sock=sock )
+        return cls( reader, writer )
+
+    @property
+    def rx_bytes( self ) -> int:
+        return self._rx_bytes
+
+    @property
+    def tx_bytes( self ) -> int:
+        return self._tx_bytes
+
+    @property
+    def rx_frames( self ) -> int:
+        return self._rx_frames
+
+    @property
+    def tx_frames( self ) -> int:
+        return self._tx_frames
+
+    def send( self, kind: int, payload: bytes ) -> None:
+        self._writer.write( SHARD_FRAME_HEADER.pack( len( payload ), kind ) + payload )
+        self._tx_bytes += SHARD_FRAME_HEADER.size + len( payload )
+        self._tx_frames += 1
+
+    def send_events( self, events: list[ tuple ] ) -> None:
+        self.send( SHARD_FRAME_EVENTS, marshal.dumps( events ) )
+
+    def send_control( self, message: tuple ) -> None:
+        self.send( SHARD_FRAME_CONTROL, pickle.dumps( message, pickle.HIGHEST_PROTOCOL ) )
+
+    async def drain( self ) -> None:
+        await self._writer.drain()
+
+    async def receive( self ) -> tuple[ int, Any ] | None:
+        """Next frame as ( kind, decoded payload ), None when peer closed link"""
+        try:
+            header = await self._reader.readexactly( SHARD_FRAME_HEADER.size )
+            size, kind = SHARD_FRAME_HEADER.unpack( header )
+            payload = await self._reader.readexactly( size )
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return None
+        self._rx_bytes += SHARD_FRAME_HEADER.size + size
+        self._rx_frames += 1
+        return kind, marshal.loads( payload ) if kind == SHARD_FRAME_EVENTS else pickle.loads( payload )
+
+    async def close( self ) -> None:
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+class IntegraFleetShard( IntegraEntity ):
+    """Worker side of sharded fleet, runs IntegraFleet of its panels on event loop of shard process.
+
+    Client status and item state changes are queued as compact tuples and sent to coordinator in batches, batch is sent
+    when it reaches batch_size events or batch_interval seconds after its first event.
+    """
+
+    @staticmethod
+    def compact( value: IntegraTypeVal ) -> int | float | str | bool | None:
+        return value.value if isinstance( value, Enum ) else value
+
+    def __init__(
+            self, eventloop: AbstractEventLoop, link: IntegraShardLink, shard_no: int, fleet_options: dict[ str, Any ],
+            batch_interval: float = DEFAULT_SHARD_BATCH_INTERVAL, batch_size: int = DEFAULT_SHARD_BATCH_SIZE
+    ):
+        super().__init__()
+        self._eventloop: AbstractEventLoop = eventloop
+        self._link: IntegraShardLink = link
+        self._shard_no: int = shard_no
+        self._fleet: IntegraFleet = IntegraFleet( eventloop, **fleet_options )
+        self._batch_interval: float = batch_interval
+        self._batch_size: int = batch_size
+        self._batch: list[ tuple ] = [ ]
+        self._batch_timer: TimerHandle | None = None
+        self._batches: int = 0
+        self._panel_ids: dict[ str, int ] = { }
+        self._forwarded: set[ str ] = set()
+        self._tasks: set[ Task ] = set()
+        self._fleet.subscribe( Events.EVENT_SYS_CLIENT_EVENT, self._async_client_event )
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        fields.update( {
+            "Shard": f"{self._shard_no}",
+            "Panels": f"{len( self._fleet )}",
+        } )
+
+    @property
+    def fleet( self ) -> IntegraFleet:
+        return self._fleet
+
+    def _emit( self, event: tuple ) -> None:
+        self._batch.append( event )
+        if len( self._batch ) >= self._batch_size:
+            self.flush()
+        elif self._batch_timer is None:
+            self._batch_timer = self._eventloop.call_later( self._batch_interval, self.flush )
+
+    def flush( self ) -> None:
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        if self._batch:
+            self._link.send_events( self._batch )
+            self._batch = [ ]
+            self._batches += 1
+
+    async def _async_client_event( self, _, panel: str, event: IntegraClientStatus, **__ ) -> None:
+        self._emit( (SHARD_EVENT_CLIENT, self._panel_ids[ panel ], event.value) )
+
+    async def _async_item_changed( self, _, panel: str, item: IntegraItem, state: IntegraStateBase, previous: IntegraTypeVal, **__ ) -> None:
+        notify_event = state.notify_event.value if isinstance( state, IntegraStateEvent ) else -1
+        self._emit( (SHARD_EVENT_ITEM, self._panel_ids[ panel ], item.owner.set_id, item.no, notify_event, self.compact( state.value ), self.compact( previous )) )
+
+    def _resolve( self, name: str, path: tuple[ str | int, ... ] ) -> Any:
+        target = self._fleet[ name ]
+        for key in path:
+            if isinstance( key, int ):
+                target = target[ key ]
+            elif key.startswith( "_" ):
+                raise AttributeError( f"Private attribute '{key}' not accessible" )
+            else:
+                target = getattr( target, key )
+            if target is None:
+                raise KeyError( f"Panel '{name}' has no {'.'.join( str( key ) for key in path )}" )
+        return target
+
+    async def _async_call( self, name: str, path: tuple[ str | int, ... ], method: str, args: tuple, kwargs: dict[ str, Any ] ) -> Any:
+        if method.startswith( "_" ):
+            raise AttributeError( f"Private method '{method}' not accessible" )
+        result = getattr( self._resolve( name, path ), method )( *args, **kwargs )
+        if asyncio.iscoroutine( result ):
+            result = await result
+        return result
+
+    def _set( self, name: str, path: tuple[ str | int, ... ], attr_name: str, value: Any ) -> None:
+        if attr_name.startswith( "_" ):
+            raise AttributeError( f"Private attribute '{attr_name}' not accessible" )
+        setattr( self._resolve( name, path ), attr_name, value )
+
+    def _stats( self ) -> dict[ str, Any ]:
+        stats = self._fleet.stats
+        return {
+            "shard": self._shard_no,
+            "pid": os.getpid(),
+            "panels": stats.panels,
+            "connected": stats.connected,
+            "requests": stats.requests,
+            "timeouts": stats.timeouts,
+            "errors": stats.errors,
+            "events": stats.events,
+            "batches": self._batches,
+            "cpu_time": time.process_time(),
+        }
+
+    async def _async_execute( self, op: int, args: tuple ) -> Any:
+        if op == SHARD_OP_ADD:
+            panel_id, name, host, port, opts = args
+            self._fleet.add_tcp( name, host, port, opts )
+            self._panel_ids[ name ] = panel_id
+            return None
+        if op == SHARD_OP_REMOVE:
+            await self._fleet.async_remove( args[ 0 ] )
+            self._panel_ids.pop( args[ 0 ], None )
+            return None
+        if op == SHARD_OP_CONNECT:
+            return await self._fleet.async_connect( *args )
+        if op == SHARD_OP_DISCONNECT:
+            return await self._fleet.async_disconnect( *args )
+        if op == SHARD_OP_CALL:
+            return await self._async_call( *args )
+        if op == SHARD_OP_SET:
+            return self._set( *args )
+        if op == SHARD_OP_FORWARD:
+            for event_name in set( args[ 0 ] ) - self._forwarded:
+                if event_name == Events.EVENT_SYS_ITEM_CHANGED:
+                    self._fleet.subscribe( event_name, self._async_item_changed )
+                    self._forwarded.add( event_name )
+            return None
+        if op == SHARD_OP_STATS:
+            return self._stats()
+        raise ValueError( f"Unknown shard operation {op}" )
+
+    async def _async_request( self, request_id: int, op: int, args: tuple ) -> None:
+        try:
+            message = (request_id, True, await self._async_execute( op, args ))
+        except Exception as err:
+            message = (request_id, False, err)
+        # events caused by request reach coordinator before its result
+        self.flush()
+        try:
+            self._link.send_control( message )
+        except (pickle.PicklingError, TypeError, AttributeError) as err:
+            self._link.send_control( (request_id, False, RuntimeError( f"Result not transferable, {err}" )) )
+
+    async def async_run( self ) -> None:
+        """Serve coordinator requests until stop request or closed link"""
+        stop_id: int | None = None
+        while stop_id is None:
+            frame = await self._link.receive()
+            if frame is None:
+                break
+            op, request_id, *args = frame[ 1 ]
+            if op == SHARD_OP_STOP:
+                stop_id = request_id
+                continue
+            task = self._eventloop.create_task( self._async_request( request_id, op, tuple( args ) ), name=f"shard_request-{request_id}" )
+            self._tasks.add( task )
+            task.add_done_callback( self._tasks.discard )
+
+        for task in list( self._tasks ):
+            task.cancel()
+        await self._fleet.async_shutdown()
+        self.flush()
+        if stop_id is not None:
+            self._link.send_control( (stop_id, True, self._stats()) )
+            await self._link.drain()
+        await self._link.close()
+
+    @staticmethod
+    def main( sock: socket.socket, shard_no: int, fleet_options: dict[ str, Any ], batch_interval: float, batch_size: int ) -> None:
+        """Entry point of shard process"""
+
+        async def async_main():
+            link = await IntegraShardLink.create( sock )
+            shard = IntegraFleetShard( asyncio.get_running_loop(), link, shard_no, fleet_options, batch_interval, batch_size )
+            await shard.async_run()
+
+        asyncio.run( async_main() )
+
+
+class IntegraRemoteObject:
+    """Path to object of panel owned by shard process, calling its async_* method routes call to the shard.
+
+        await sharded.remote( "panel-1" ).parts[ 1 ].async_arm( IntegraArmMode.MODE_0 )
+        await sharded.remote( "panel-1" ).client.async_set( "poll_interval", 1.0 )
+    """
+
+    def __init__( self, fleet: 'IntegraShardedFleet', panel: str, path: tuple[ str | int, ... ] = () ):
+        self._fleet: IntegraShardedFleet = fleet
+        self._panel: str = panel
+        self._path: tuple[ str | int, ... ] = path
+
+    def __repr__( self ) -> str:
+        return f"IntegraRemoteObject({self._panel}:{'.'.join( str( key ) for key in self._path )})"
+
+    def __getattr__( self, name: str ) -> Any:
+        if name.startswith( "_" ):
+            raise AttributeError( name )
+        if name == "async_set":
+
+            async def set_value( attr_name: str, value: Any ) -> None:
+                await self._fleet.async_set( self._panel, self._path, attr_name, value )
+
+            return set_value
+        if name.startswith( "async_" ):
+
+            async def call( *args, **kwargs ) -> Any:
+                return await self._fleet.async_call( self._panel, self._path, name, *args, **kwargs )
+
+            return call
+        return IntegraRemoteObject( self._fleet, self._panel, self._path + (name,) )
+
+    def __getitem__( self, item_no: int ) -> 'IntegraRemoteObject':
+        return IntegraRemoteObject( self._fleet, self._panel, self._path + (item_no,) )
+
+
+class IntegraShardedFleet( IntegraEntity ):
+    """Spreads panels over pool of worker processes, each running own event loop and IntegraFleet of its panels.
+
+    Client status and item changes of every panel are merged back and dispatched to coordinator subscribers as
+    handler( event_name, panel=name, event=status ) and handler( event_name, panel=name, set_name=..., item_no=...,
+    notify_event=..., value=..., previous=... ). Control calls are routed to process owning the panel.
+    """
+
+    def __init__(
+            self, eventloop: AbstractEventLoop, processes: int | None = None, connect_rate: float = DEFAULT_FLEET_CONNECT_RATE,
+            connect_concurrency: int = DEFAULT_FLEET_CONNECT_CONCURRENCY, reconnect_jitter: float = DEFAULT_FLEET_RECONNECT_JITTER,
+            workers: int = DEFAULT_FLEET_WORKERS, seed: int | None = None, batch_interval: float = DEFAULT_SHARD_BATCH_INTERVAL,
+            batch_size: int = DEFAULT_SHARD_BATCH_SIZE
+    ):
+        super().__init__()
+        self._eventloop: AbstractEventLoop = eventloop
+        self._processes: int = processes if processes is not None else (os.cpu_count() or 1)
+        # connect limits are shared by the fleet, every shard gets its part
+        self._shard_options: list[ dict[ str, Any ] ] = [ {
+            "connect_rate": connect_rate / self._processes,
+            "connect_concurrency": max( 1, connect_concurrency // self._processes ),
+            "reconnect_jitter": reconnect_jitter,
+            "workers": workers,
+            "seed": seed + shard_no if seed is not None else None,
+        } for shard_no in range( self._processes ) ]
+        self._batch_interval: float = batch_interval
+        self._batch_size: int = batch_size
+
+        self._panels: dict[ str, tuple[ int, str, int, IntegraClientOpts ] ] = { }
+        self._panel_names: list[ str ] = [ ]
+        self._panel_shard: dict[ str, int ] = { }
+        self._shard_panels: list[ int ] = [ 0 ] * self._processes
+        self._status: dict[ str, IntegraClientStatus ] = { }
+
+        self._workers: list[ BaseProcess ] = [ ]
+        self._links: list[ IntegraShardLink ] = [ ]
+        self._receivers: list[ Task ] = [ ]
+        self._pending: dict[ int, tuple[ int, Future ] ] = { }
+        self._lost: set[ int ] = set()
+        self._request_ids = itertools.count( 1 )
+        self._dispatcher: EventsDispatcher = EventsDispatcher()
+        self._forwarded: set[ str ] = set()
+        self._events: int = 0
+        self._batches: int = 0
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        fields.update( {
+            "Processes": f"{self._processes}",
+            "Panels": f"{len( self._panels )}",
+            "Running": f"{self.running}",
+        } )
+
+    def __len__( self ) -> int:
+        return len( self._panels )
+
+    def __contains__( self, name: str ) -> bool:
+        return name in self._panels
+
+    @property
+    def processes( self ) -> int:
+        return self._processes
+
+    @property
+    def running( self ) -> bool:
+        return len( self._links ) > 0
+
+    @property
+    def panels( self ) -> list[ str ]:
+        return list( self._panels.keys() )
+
+    @property
+    def status( self ) -> dict[ str, IntegraClientStatus ]:
+        """Last client status reported for every panel"""
+        return self._status
+
+    @property
+    def connected( self ) -> int:
+        return sum( 1 for status in self._status.values() if status == IntegraClientStatus.CONNECTED )
+
+    @property
+    def events( self ) -> int:
+        """Events merged from shards"""
+        return self._events
+
+    @property
+    def batches( self ) -> int:
+        return self._batches
+
+    @property
+    def ipc_rx_bytes( self ) -> int:
+        return sum( link.rx_bytes for link in self._links )
+
+    @property
+    def ipc_tx_bytes( self ) -> int:
+        return sum( link.tx_bytes for link in self._links )
+
+    def shard_of( self, name: str ) -> int:
+        return self._panel_shard[ name ]
+
+    def remote( self, name: str ) -> IntegraRemoteObject:
+        """IntegraSystem of panel as seen from coordinator"""
+        if name not in self._panels:
+            raise KeyError( f"Panel '{name}' not in fleet" )
+        return IntegraRemoteObject( self, name )
+
+    def _request( self, shard_no: int, op: int, *args ) -> Future:
+        future = self._eventloop.create_future()
+        if shard_no in self._lost:
+            future.set_exception( ConnectionError( f"Shard {shard_no} link lost" ) )
+            return future
+        request_id = next( self._request_ids )
+        self._pending[ request_id ] = (shard_no, future)
+        self._links[ shard_no ].send_control( (op, request_id, *args) )
+        return future
+
+    def _add_request( self, name: str ) -> Future:
+        panel_id, host, port, opts = self._panels[ name ]
+        return self._request( self._panel_shard[ name ], SHARD_OP_ADD, panel_id, name, host, port, opts )
+
+    async def async_add_tcp( self, name: str, host: str, port: int, opts: IntegraClientOpts ) -> int:
+        """Assign panel to least loaded shard, returns shard number"""
+        if name in self._panels:
+            raise ValueError( f"Panel '{name}' already in fleet" )
+        shard_no = min( range( self._processes ), key=lambda index: self._shard_panels[ index ] )
+        self._panels[ name ] = (len( self._panel_names ), host, port, opts)
+        self._panel_names.append( name )
+        self._panel_shard[ name ] = shard_no
+        self._shard_panels[ shard_no ] += 1
+        self._status[ name ] = IntegraClientStatus.DISCONNECTED
+        if self.running:
+            await self._add_request( name )
+        return shard_no
+
+    async def async_remove( self, name: str ) -> None:
+        if name not in self._panels:
+            return
+        if self.running:
+            await self._request( self._panel_shard[ name ], SHARD_OP_REMOVE, name )
+        self._panels.pop( name )
+        self._status.pop( name )
+        self._shard_panels[ self._panel_shard.pop( name ) ] -= 1
+
+    def subscribe( self, event_name: str, handler: AsyncEventHandler ) -> None:
+        """Only EVENT_SYS_CLIENT_EVENT and EVENT_SYS_ITEM_CHANGED are merged from shards"""
+        if event_name not in self._forwarded:
+            self._forwarded.add( event_name )
+            for shard_no in range( len( self._links ) ):
+                self._request( shard_no, SHARD_OP_FORWARD, list( self._forwarded ) )
+        self._dispatcher.subscribe( event_name, handler )
+
+    def unsubscribe( self, event_name: str, handler: AsyncEventHandler ) -> None:
+        self._dispatcher.unsubscribe( event_name, handler )
+
+    async def _async_dispatch_events( self, events: list[ tuple ] ) -> None:
+        set_names = IntegraSetFactory.get_all()
+        for event in events:
+            self._events += 1
+            name = self._panel_names[ event[ 1 ] ]
+            if event[ 0 ] == SHARD_EVENT_CLIENT:
+                status = IntegraClientStatus( event[ 2 ] )
+                self._status[ name ] = status
+                await self._dispatcher.async_dispatch( Events.EVENT_SYS_CLIENT_EVENT, panel=name, event=status )
+            elif event[ 0 ] == SHARD_EVENT_ITEM:
+                _, _, set_id, item_no, notify_event, value, previous = event
+                await self._dispatcher.async_dispatch(
+                    Events.EVENT_SYS_ITEM_CHANGED, panel=name, set_name=set_names[ set_id ].set_name, item_no=item_no,
+                    notify_event=IntegraNotifyEvent( notify_event ) if notify_event >= 0 else None, value=value, previous=previous
+                )
+
+    async def _async_receive_proc( self, shard_no: int ) -> None:
+        link = self._links[ shard_no ]
+        while True:
+            frame = await link.receive()
+            if frame is None:
+                break
+            kind, message = frame
+            if kind == SHARD_FRAME_EVENTS:
+                self._batches += 1
+                try:
+                    await self._async_dispatch_events( message )
+                except Exception as err:
+                    _LOGGER.error( f"Shard {shard_no} event handler failed, {err}" )
+            elif kind == SHARD_FRAME_CONTROL:
+                request_id, ok, result = message
+                _, future = self._pending.pop( request_id, (shard_no, None) )
+                if future is not None and not future.done():
+                    if ok:
+                        future.set_result( result )
+                    else:
+                        future.set_exception( result )
+        _LOGGER.debug( f"Shard {shard_no} link closed" )
+        await self._async_shard_lost( shard_no )
+
+    async def _async_shard_lost( self, shard_no: int ) -> None:
+        """Shard process died or its link closed, requests sent there fail and its panels are reported disconnected"""
+        self._lost.add( shard_no )
+        for request_id, (request_shard_no, future) in list( self._pending.items() ):
+            if request_shard_no == shard_no:
+                self._pending.pop( request_id )
+                if not future.done():
+                    future.set_exception( ConnectionError( f"Shard {shard_no} link lost" ) )
+        for name, panel_shard_no in self._panel_shard.items():
+            if panel_shard_no == shard_no and self._status.get( name ) != IntegraClientStatus.DISCONNECTED:
+                self._status[ name ] = IntegraClientStatus.DISCONNECTED
+                try:
+                    await self._dispatcher.async_dispatch( Events.EVENT_SYS_CLIENT_EVENT, panel=name, event=IntegraClientStatus.DISCONNECTED )
+                except Exception as err:
+                    _LOGGER.error( f"Shard {shard_no} event handler failed, {err}" )
+
+    async def async_start( self ) -> None:
+        """Start shard processes and hand them panels added so far"""
+        if self.running:
+            return
+        context = multiprocessing.get_context( "spawn" )
+        for shard_no in range( self._processes ):
+            parent_sock, child_sock = socket.socketpair()
+            worker = context.Process(
+                target=IntegraFleetShard.main, args=(child_sock, shard_no, self._shard_options[ shard_no ], self._batch_interval, self._batch_size),
+                name=f"integra_shard-{shard_no}", daemon=True
+            )
+            worker.start()
+            child_sock.close()
+            self._workers.append( worker )
+            self._links.append( await IntegraShardLink.create( parent_sock ) )
+            self._receivers.append( self._eventloop.create_task( self._async_receive_proc( shard_no ), name=f"shard_receive-{shard_no}" ) )
+
+        requests = [ self._add_request( name ) for name in self._panels ]
+        if self._forwarded:
+            requests += [ self._request( shard_no, SHARD_OP_FORWARD, list( self._forwarded ) ) for shard_no in range( self._processes ) ]
+        await asyncio.gather( *requests )
+
+    async def async_connect( self, names: list[ str ] | None = None, retries: int = 0, timeout: float | None = None ) -> dict[ str, bool ]:
+        """Connect panels (all by default) in their shards, returns result per panel"""
+        names = list( self._panels.keys() ) if names is None else names
+        by_shard: dict[ int, list[ str ] ] = { }
+        for name in names:
+            by_shard.setdefault( self._panel_shard[ name ], [ ] ).append( name )
+        results: dict[ str, bool ] = { }
+        for shard_results in await asyncio.gather( *[ self._request( shard_no, SHARD_OP_CONNECT, shard_names, retries, timeout ) for shard_no, shard_names in by_shard.items() ] ):
+            results.update( shard_results )
+        return { name: results[ name ] for name in names }
+
+    async def async_disconnect( self, names: list[ str ] | None = None ) -> None:
+        by_shard: dict[ int, list[ str ] | None ] = { shard_no: None for shard_no in range( len( self._links ) ) }
+        if names is not None:
+            by_shard = { }
+            for name in names:
+                by_shard.setdefault( self._panel_shard[ name ], [ ] ).append( name )
+        await asyncio.gather( *[ self._request( shard_no, SHARD_OP_DISCONNECT, shard_names ) for shard_no, shard_names in by_shard.items() ] )
+
+    async def async_call( self, name: str, path: tuple[ str | int, ... ], method: str, *args, **kwargs ) -> Any:
+        """Call method of object at path of panel IntegraSystem in shard owning the panel, coroutines are awaited there"""
+        return await self._request( self._panel_shard[ name ], SHARD_OP_CALL, name, tuple( path ), method, args, kwargs )
+
+    async def async_set( self, name: str, path: tuple[ str | int, ... ], attr_name: str, value: Any ) -> None:
+        """Set attribute (property) of object at path of panel IntegraSystem in shard owning the panel"""
+        await self._request( self._panel_shard[ name ], SHARD_OP_SET, name, tuple( path ), attr_name, value )
+
+    async def async_stats( self ) -> list[ dict[ str, Any ] ]:
+        """Counters of every shard, requests and events of its fleet, batches sent and process CPU time"""
+        return list( await asyncio.gather( *[ self._request( shard_no, SHARD_OP_STATS ) for shard_no in range( len( self._links ) ) ] ) )
+
+    async def async_stop( self, timeout: float = DEFAULT_SHARD_STOP_TIMEOUT ) -> None:
+        """Disconnect panels and stop shard processes"""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for( asyncio.gather( *[ self._request( shard_no, SHARD_OP_STOP ) for shard_no in range( len( self._links ) ) if shard_no not in self._lost ] ), timeout )
+        except (asyncio.TimeoutError, ConnectionError) as err:
+            _LOGGER.warning( f"async_stop: shards did not stop in time, {err}" )
+        for link in self._links:
+            await link.close()
+        await asyncio.gather( *self._receivers, return_exceptions=True )
+        for worker in self._workers:
+            await self._eventloop.run_in_executor( None, worker.join, timeout )
+            if worker.is_alive():
+                worker.terminate()
+        for _, future in self._pending.values():
+            if not future.done():
+                future.set_exception( ConnectionError( "Shard stopped" ) )
+        self._pending.clear()
+        self._lost.clear()
+        self._workers.clear()
+        self._links.clear()
+        self._receivers.clear()
+        for name in self._status:
+            self._status[ name ] = IntegraClientStatus.DISCONNECTED
+
+    async def __aenter__( self ) -> 'IntegraShardedFleet':
+        await self.async_start()
+        return self
+
+    async def __aexit__( self, exc_type, exc_val, exc_tb ) -> None:
+        await self.async_stop()
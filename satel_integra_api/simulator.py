@@ -0,0 +1,908 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+
+from asyncio import AbstractEventLoop, Server, StreamReader, StreamWriter, Task, TimerHandle
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterable
+
+from .base import IntegraEntity, IntegraCaps, IntegraMap, IntegraType, IntegraLang
+from .cipher import IntegraCipher
+from .commands import IntegraCommand, IntegraPartsCommands, IntegraZonesCommands
+from .const import DEFAULT_CODE_PAGE, FRAME_LEN_MIN, FRAME_READ_CHUNK
+from .elements import IntegraElementType, IntegraExpanderType, IntegraManipulatorType, IntegraOutputElementType, IntegraPartType, IntegraZoneReactionType
+from .frames import IntegraFrameDecoder
+from .messages import IntegraRequest, IntegraResponseErrorCode
+from .tools import IntegraHelper
+
+_LOGGER = logging.getLogger( __name__ )
+
+DEFAULT_SIMULATOR_PORT = 7094
+
+IntegraSimulatorStep = tuple[ float, IntegraCommand, int, bool ]
+
+_TROUBLES_SIZES: dict[ IntegraCommand, int ] = {
+    IntegraCommand.READ_TROUBLES_PART1: 47,
+    IntegraCommand.READ_TROUBLES_PART2: 26,
+    IntegraCommand.READ_TROUBLES_PART3: 60,
+    IntegraCommand.READ_TROUBLES_PART4: 30,
+    IntegraCommand.READ_TROUBLES_PART5: 16,
+    IntegraCommand.READ_TROUBLES_PART6: 45,
+    IntegraCommand.READ_TROUBLES_PART7: 47,
+    IntegraCommand.READ_TROUBLES_PART8: 64,
+    IntegraCommand.READ_TROUBLES_MEMORY_PART1: 47,
+    IntegraCommand.READ_TROUBLES_MEMORY_PART2: 26,
+    IntegraCommand.READ_TROUBLES_MEMORY_PART3: 60,
+    IntegraCommand.READ_TROUBLES_MEMORY_PART4: 30,
+    IntegraCommand.READ_TROUBLES_MEMORY_PART5: 16,
+    IntegraCommand.READ_TROUBLES_MEMORY_PART6: 45,
+    IntegraCommand.READ_TROUBLES_MEMORY_PART7: 47,
+    IntegraCommand.READ_TROUBLES_MEMORY_PART8: 64,
+}
+
+_TROUBLES_MEMORY: dict[ IntegraCommand, IntegraCommand ] = {
+    IntegraCommand.READ_TROUBLES_PART1: IntegraCommand.READ_TROUBLES_MEMORY_PART1,
+    IntegraCommand.READ_TROUBLES_PART2: IntegraCommand.READ_TROUBLES_MEMORY_PART2,
+    IntegraCommand.READ_TROUBLES_PART3: IntegraCommand.READ_TROUBLES_MEMORY_PART3,
+    IntegraCommand.READ_TROUBLES_PART4: IntegraCommand.READ_TROUBLES_MEMORY_PART4,
+    IntegraCommand.READ_TROUBLES_PART5: IntegraCommand.READ_TROUBLES_MEMORY_PART5,
+    IntegraCommand.READ_TROUBLES_PART6: IntegraCommand.READ_TROUBLES_MEMORY_PART6,
+    IntegraCommand.READ_TROUBLES_PART7: IntegraCommand.READ_TROUBLES_MEMORY_PART7,
+    IntegraCommand.READ_TROUBLES_PART8: IntegraCommand.READ_TROUBLES_MEMORY_PART8,
+}
+
+_BASE_TYPES: dict[ IntegraType, int ] = {
+    IntegraType.INTEGRA_24: 0,
+    IntegraType.INTEGRA_32: 1,
+    IntegraType.INTEGRA_64: 2,
+    IntegraType.INTEGRA_128: 3,
+    IntegraType.INTEGRA_128_WRL_SIM300: 4,
+    IntegraType.INTEGRA_64_PLUS: 2,
+    IntegraType.INTEGRA_128_PLUS: 3,
+    IntegraType.INTEGRA_256_PLUS: 8,
+    IntegraType.INTEGRA_128_WRL_LEON: 4,
+}
+
+_PARTS_ARMED_COMMANDS = [
+    IntegraCommand.READ_PARTS_ARMED_SUPPRESSED,
+    IntegraCommand.READ_PARTS_ARMED_REALLY,
+    IntegraCommand.READ_PARTS_ARMED_MODE_1,
+    IntegraCommand.READ_PARTS_ARMED_MODE_2,
+    IntegraCommand.READ_PARTS_ARMED_MODE_3,
+]
+
+_PARTS_ARM_MODE_COMMAND = {
+    1: IntegraCommand.READ_PARTS_ARMED_MODE_1,
+    2: IntegraCommand.READ_PARTS_ARMED_MODE_2,
+    3: IntegraCommand.READ_PARTS_ARMED_MODE_3,
+}
+
+
+class IntegraSimulatorState( IntegraEntity ):
+    """Panel state kept as bitmaps per state command (0x00 - 0x31), bit n-1 of the bitmap is item n"""
+
+    def __init__( self, on_changed: Callable[ [ IntegraCommand ], None ] | None = None ) -> None:
+        super().__init__()
+        self._on_changed: Callable[ [ IntegraCommand ], None ] | None = on_changed
+        self._bitmaps: dict[ IntegraCommand, bytearray ] = { }
+        for command in IntegraZonesCommands:
+            self._bitmaps[ command ] = bytearray( 32 )
+        for command in IntegraPartsCommands:
+            self._bitmaps[ command ] = bytearray( 4 )
+        self._bitmaps[ IntegraCommand.READ_OUTPUTS_STATE ] = bytearray( 32 )
+        self._bitmaps[ IntegraCommand.READ_DOORS_OPENED ] = bytearray( 8 )
+        self._bitmaps[ IntegraCommand.READ_DOORS_OPENED_LONG ] = bytearray( 8 )
+        for command, size in _TROUBLES_SIZES.items():
+            self._bitmaps[ command ] = bytearray( size )
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        for command, bitmap in self._bitmaps.items():
+            items = IntegraHelper.list_from_bytes( bitmap, None )
+            if items:
+                fields.update( { command.name: f"{items}" } )
+
+    @property
+    def commands( self ) -> list[ IntegraCommand ]:
+        return list( self._bitmaps.keys() )
+
+    def has_troubles( self ) -> bool:
+        return any( any( self._bitmaps[ command ] ) for command in _TROUBLES_MEMORY.keys() )
+
+    def get( self, command: IntegraCommand, item_no: int ) -> bool:
+        bitmap = self._bitmaps[ command ]
+        index = item_no - 1
+        return (bitmap[ index >> 3 ] & (1 << (index & 7))) != 0
+
+    def set( self, command: IntegraCommand, item_no: int, value: bool ) -> bool:
+        """Set state of single item, returns True when state changed"""
+        bitmap = self._bitmaps[ command ]
+        index = item_no - 1
+        if index < 0 or (index >> 3) >= len( bitmap ):
+            return False
+        mask = 1 << (index & 7)
+        current = bitmap[ index >> 3 ]
+        updated = (current | mask) if value else (current & ~mask)
+        if updated == current:
+            return False
+        bitmap[ index >> 3 ] = updated
+        if self._on_changed is not None:
+            self._on_changed( command )
+        return True
+
+    def set_items( self, command: IntegraCommand, items: Iterable[ int ], value: bool ) -> bool:
+        changed = False
+        for item_no in items:
+            changed = self.set( command, item_no, value ) or changed
+        return changed
+
+    def items( self, command: IntegraCommand ) -> list[ int ]:
+        return IntegraHelper.list_from_bytes( self._bitmaps[ command ], None )
+
+    def clear( self, command: IntegraCommand ) -> bool:
+        bitmap = self._bitmaps[ command ]
+        if not any( bitmap ):
+            return False
+        bitmap[ : ] = bytes( len( bitmap ) )
+        if self._on_changed is not None:
+            self._on_changed( command )
+        return True
+
+    def data( self, command: IntegraCommand, size: int | None = None ) -> bytes:
+        bitmap = self._bitmaps[ command ]
+        return bytes( bitmap[ :size ] if size is not None else bitmap )
+
+
+class IntegraSimulatorSession( IntegraEntity ):
+    """Single client connection, handles framing and encryption and keeps per connection 0x7F change flags"""
+
+    def __init__( self, simulator: 'IntegraSimulator', session_id: int, reader: StreamReader, writer: StreamWriter ) -> None:
+        super().__init__()
+        self._simulator: IntegraSimulator = simulator
+        self._session_id: int = session_id
+        self._reader: StreamReader = reader
+        self._writer: StreamWriter = writer
+        self._cipher: IntegraCipher | None = IntegraCipher.create( simulator.integration_key )
+        self._decoder: IntegraFrameDecoder = IntegraFrameDecoder()
+        self._enc_buffer: bytes = bytes()
+        self._rolling_counter: int = 0
+        self._id_s: int = 0
+        self._id_r: int = 0
+        self._busy_until: float = 0.0
+        self._changed: set[ IntegraCommand ] = set( simulator.state.commands )
+        self._changed.add( IntegraCommand.READ_RTC_AND_STATUS )
+        self._monitored: set[ int ] = set()
+        self._pushed: set[ int ] = set()
+        self._wide: bool = False
+        self._requests: int = 0
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        fields.update( {
+            "Id": f"{self._session_id}",
+            "Encrypted": f"{self._cipher is not None}",
+            "Requests": f"{self._requests}",
+            "Changed": f"{len( self._changed )}",
+        } )
+
+    @property
+    def session_id( self ) -> int:
+        return self._session_id
+
+    @property
+    def requests( self ) -> int:
+        return self._requests
+
+    @property
+    def wide( self ) -> bool:
+        """Client asked for 32 bytes zones/outputs state (256 items)"""
+        return self._wide
+
+    def mark_changed( self, command: IntegraCommand ) -> None:
+        self._changed.add( command )
+        if command.value in self._pushed:
+            self.send( command, self._simulator._state_data( self, command ) )
+
+    def pop_changed( self, bit_length: int ) -> list[ int ]:
+        result = [ command.value for command in self._changed if command.value < bit_length and (not self._monitored or command.value in self._monitored) ]
+        for command in result:
+            self._changed.discard( IntegraCommand( command ) )
+        return result
+
+    def setup_monitor( self, monitored: list[ int ], pushed: list[ int ] ) -> None:
+        self._monitored = set( monitored )
+        self._pushed = set( pushed )
+
+    def _wrap( self, frame: bytes ) -> bytes:
+        if self._cipher is None:
+            return frame
+        self._id_s = os.urandom( 1 )[ 0 ]
+        pdu = (
+                os.urandom( 2 ) +
+                self._rolling_counter.to_bytes( 2, byteorder="big" ) +
+                bytes( [ self._id_s, self._id_r ] )
+        )
+        self._rolling_counter = (self._rolling_counter + 1) & 0xFFFF
+        data = self._cipher.encrypt( pdu + frame )
+        return len( data ).to_bytes( 1, "big" ) + data
+
+    def _unwrap( self, chunk: bytes ) -> bytes:
+        if self._cipher is None:
+            return chunk
+        buffer = self._enc_buffer + chunk if self._enc_buffer else chunk
+        buffer_len = len( buffer )
+        result = bytearray()
+        pos = 0
+        while pos < buffer_len:
+            size = buffer[ pos ]
+            if pos + 1 + size > buffer_len:
+                break
+            decrypted = self._cipher.decrypt( buffer[ pos + 1:pos + 1 + size ] )
+            pos += 1 + size
+            if len( decrypted ) < 6:
+                continue
+            self._id_r = decrypted[ 4 ]
+            result += decrypted[ 6: ]
+        self._enc_buffer = buffer[ pos: ]
+        return bytes( result )
+
+    def _write( self, data: bytes ) -> None:
+        if not self._writer.is_closing():
+            self._writer.write( data )
+
+    def send( self, command: int, data: bytes ) -> None:
+        payload = self._wrap( IntegraRequest.encode_frame( IntegraCommand( command ), data ) )
+        rtt, processing = self._simulator.rtt, self._simulator.processing
+        if rtt <= 0 and processing <= 0:
+            self._write( payload )
+            return
+        # panel answers in order, each request takes processing time, response is delivered after network round trip
+        eventloop = self._simulator.eventloop
+        self._busy_until = max( self._busy_until, eventloop.time() + rtt / 2 ) + processing
+        eventloop.call_at( self._busy_until + rtt / 2, self._write, payload )
+
+    def _handle_frame( self, frame: bytes ) -> None:
+        if len( frame ) < FRAME_LEN_MIN or IntegraHelper.checksum( frame[ :-2 ] ) != ((frame[ -2 ] << 8) | frame[ -1 ]):
+            self._simulator._bad_frames += 1
+            return
+        self._requests += 1
+        reply = self._simulator._handle_request( self, frame[ 0 ], frame[ 1:-2 ] )
+        if reply is not None:
+            self.send( *reply )
+
+    async def async_run( self ) -> None:
+        try:
+            while chunk := await self._reader.read( FRAME_READ_CHUNK ):
+                for frame in self._decoder.feed( self._unwrap( chunk ) ):
+                    self._handle_frame( frame )
+                await self._writer.drain()
+        except (ConnectionError, OSError) as err:
+            _LOGGER.debug( f"Session {self._session_id} finished with {err}" )
+        finally:
+            self._writer.close()
+
+    def close( self ) -> None:
+        self._writer.close()
+
+
+class IntegraSimulator( IntegraEntity ):
+    """Local stand-in for Integra panel with ETHM-1 module, speaks integration protocol over TCP.
+
+    Element names are served for every element allowed by caps profile, state is kept as bitmaps and changes are
+    reported with 0x7F per connection. Control and user commands are validated against configured user codes and
+    answered with READ_RESULT codes. State may be changed from code, by script or randomly at configured rate.
+    Responses may be delayed to model network round trip and panel processing time.
+    """
+
+    def __init__(
+            self, eventloop: AbstractEventLoop | None = None, host: str = "127.0.0.1", port: int = 0,
+            integra_type: IntegraType = IntegraType.INTEGRA_128_PLUS, caps: IntegraCaps | None = None,
+            integration_key: str = "", user_codes: dict[ str, int ] | None = None, prefix_code: str = "",
+            max_connections: int | None = 1, rtt: float = 0.0, processing: float = 0.0,
+            churn_rate: float = 0.0, seed: int | None = None, exit_delay: float = 0.0, entry_delay: float = 0.0
+    ) -> None:
+        super().__init__()
+        self._eventloop: AbstractEventLoop | None = eventloop
+        self._host: str = host
+        self._port: int = port
+        self._integra_type: IntegraType = integra_type
+        self._caps: IntegraCaps = caps if caps is not None else IntegraMap.type_to_caps( integra_type )
+        self._integration_key: str = integration_key
+        self._prefix_code: str = prefix_code
+        self._user_codes: dict[ bytes, int ] = { }
+        for user_code, user_no in (user_codes if user_codes is not None else { "1234": 1 }).items():
+            self._user_codes[ IntegraHelper.user_code_to_bytes( user_code, prefix_code ) ] = user_no
+        self._max_connections: int | None = max_connections
+        self._rtt: float = rtt
+        self._processing: float = processing
+        self._churn_rate: float = churn_rate
+        self._exit_delay: float = exit_delay
+        self._entry_delay: float = entry_delay
+        self._random: random.Random = random.Random( seed )
+
+        self._state: IntegraSimulatorState = IntegraSimulatorState( self._state_changed )
+        self._temperatures: dict[ int, float ] = { }
+        self._powers: dict[ int, float ] = { }
+        self._rtc_offset: timedelta = timedelta()
+        self._timers: dict[ int, TimerHandle ] = { }
+
+        self._server: Server | None = None
+        self._sessions: dict[ int, IntegraSimulatorSession ] = { }
+        self._session_tasks: set[ Task ] = set()
+        self._next_session_id: int = 1
+        self._churn_task: Task | None = None
+        self._script_tasks: set[ Task ] = set()
+
+        self._connections: int = 0
+        self._rejected: int = 0
+        self._bad_frames: int = 0
+        self._changes: int = 0
+
+        self._handlers: dict[ int, Callable[ [ IntegraSimulatorSession, int, bytes ], tuple[ int, bytes ] | None ] ] = { }
+        for command in self._state.commands:
+            self._handlers[ command.value ] = self._read_state
+        self._handlers.update( {
+            IntegraCommand.READ_RTC_AND_STATUS.value: self._read_rtc_and_status,
+            IntegraCommand.READ_OUTPUT_POWER.value: self._read_output_power,
+            IntegraCommand.READ_MODULE_VERSION.value: self._read_module_version,
+            IntegraCommand.READ_ZONE_TEMPERATURE.value: self._read_zone_temperature,
+            IntegraCommand.READ_INTEGRA_VERSION.value: self._read_integra_version,
+            IntegraCommand.READ_SYSTEM_CHANGES.value: self._read_system_changes,
+            IntegraCommand.ELEMENT_READ_NAME.value: self._read_element_name,
+        } )
+        for command in IntegraCommand:
+            if IntegraCommand.EXEC_ARM_MODE_0 <= command < IntegraCommand.ELEMENT_READ_NAME:
+                self._handlers[ command.value ] = self._exec_control
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        fields.update( {
+            "Address": f"{self._host}:{self.port}",
+            "Type": f"{self._integra_type.name}",
+            "Encrypted": f"{self._integration_key != ''}",
+            "Sessions": f"{len( self._sessions )}",
+            "Connections": f"{self._connections}",
+            "Rejected": f"{self._rejected}",
+            "BadFrames": f"{self._bad_frames}",
+            "Changes": f"{self._changes}",
+        } )
+
+    @property
+    def eventloop( self ) -> AbstractEventLoop:
+        return self._eventloop
+
+    @property
+    def host( self ) -> str:
+        return self._host
+
+    @property
+    def port( self ) -> int:
+        if self._server is not None and self._server.sockets:
+            return self._server.sockets[ 0 ].getsockname()[ 1 ]
+        return self._port
+
+    @property
+    def caps( self ) -> IntegraCaps:
+        return self._caps
+
+    @property
+    def integra_type( self ) -> IntegraType:
+        return self._integra_type
+
+    @property
+    def integration_key( self ) -> str:
+        return self._integration_key
+
+    @property
+    def state( self ) -> IntegraSimulatorState:
+        return self._state
+
+    @property
+    def rtt( self ) -> float:
+        return self._rtt
+
+    @rtt.setter
+    def rtt( self, value: float ) -> None:
+        self._rtt = max( 0.0, value )
+
+    @property
+    def processing( self ) -> float:
+        return self._processing
+
+    @processing.setter
+    def processing( self, value: float ) -> None:
+        self._processing = max( 0.0, value )
+
+    @property
+    def sessions( self ) -> list[ IntegraSimulatorSession ]:
+        return list( self._sessions.values() )
+
+    @property
+    def connections( self ) -> int:
+        return self._connections
+
+    @property
+    def rejected( self ) -> int:
+        return self._rejected
+
+    @property
+    def bad_frames( self ) -> int:
+        return self._bad_frames
+
+    @property
+    def changes( self ) -> int:
+        return self._changes
+
+    @property
+    def churn_rate( self ) -> float:
+        return self._churn_rate
+
+    @churn_rate.setter
+    def churn_rate( self, value: float ) -> None:
+        self._churn_rate = max( 0.0, value )
+        if self._server is not None:
+            self._churn_restart()
+
+    async def async_start( self ) -> None:
+        if self._server is not None:
+            return
+        if self._eventloop is None:
+            self._eventloop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server( self._on_client, self._host, self._port )
+        self._churn_restart()
+        _LOGGER.info( f"Simulator of {self._integra_type.name} listening on {self._host}:{self.port}" )
+
+    async def async_stop( self ) -> None:
+        if self._server is None:
+            return
+        server = self._server
+        self._server = None
+        server.close()
+        for task in [ self._churn_task, *self._script_tasks ]:
+            if task is not None:
+                task.cancel()
+        self._churn_task = None
+        self._script_tasks.clear()
+        for handle in self._timers.values():
+            handle.cancel()
+        self._timers.clear()
+        for session in list( self._sessions.values() ):
+            session.close()
+        if self._session_tasks:
+            await asyncio.gather( *self._session_tasks, return_exceptions=True )
+        await server.wait_closed()
+
+    async def __aenter__( self ) -> 'IntegraSimulator':
+        await self.async_start()
+        return self
+
+    async def __aexit__( self, exc_type, exc_val, exc_tb ) -> None:
+        await self.async_stop()
+
+    async def _on_client( self, reader: StreamReader, writer: StreamWriter ) -> None:
+        if self._max_connections is not None and len( self._sessions ) >= self._max_connections:
+            # ETHM-1 serves limited number of integration connections, others get textual reply
+            self._rejected += 1
+            writer.write( b"\x10Busy!\r\n" )
+            writer.close()
+            return
+
+        self._connections += 1
+        session = IntegraSimulatorSession( self, self._next_session_id, reader, writer )
+        self._next_session_id += 1
+        self._sessions[ session.session_id ] = session
+        task = asyncio.current_task()
+        self._session_tasks.add( task )
+        try:
+            await session.async_run()
+        finally:
+            self._sessions.pop( session.session_id, None )
+            self._session_tasks.discard( task )
+
+    # state changes
+
+    def _state_changed( self, command: IntegraCommand ) -> None:
+        self._changes += 1
+        for session in self._sessions.values():
+            session.mark_changed( command )
+
+    def _state_data( self, session: IntegraSimulatorSession, command: IntegraCommand ) -> bytes:
+        if command in IntegraZonesCommands or command == IntegraCommand.READ_OUTPUTS_STATE:
+            return self._state.data( command, 32 if session.wide else 16 )
+        return self._state.data( command )
+
+    def part_of_zone( self, zone_no: int ) -> int:
+        zones_per_part = max( 1, -(-self._caps.zones // max( 1, self._caps.parts )) )
+        return min( (zone_no - 1) // zones_per_part + 1, max( 1, self._caps.parts ) )
+
+    def zones_of_parts( self, parts: Iterable[ int ] ) -> list[ int ]:
+        parts = set( parts )
+        return [ zone_no for zone_no in range( 1, self._caps.zones + 1 ) if self.part_of_zone( zone_no ) in parts ]
+
+    def set_state( self, command: IntegraCommand, item_no: int, value: bool ) -> bool:
+        """Set state bit of item, zones violation goes through set_zone_violation so alarms are raised"""
+        if command == IntegraCommand.READ_ZONES_VIOLATION:
+            return self.set_zone_violation( item_no, value )
+        changed = self._state.set( command, item_no, value )
+        if value and command in _TROUBLES_MEMORY:
+            self._state.set( _TROUBLES_MEMORY[ command ], item_no, True )
+        return changed
+
+    def get_state( self, command: IntegraCommand, item_no: int ) -> bool:
+        return self._state.get( command, item_no )
+
+    def set_zone_violation( self, zone_no: int, violated: bool ) -> bool:
+        if not self._state.set( IntegraCommand.READ_ZONES_VIOLATION, zone_no, violated ):
+            return False
+        part_no = self.part_of_zone( zone_no )
+        violated_zones = any( self._state.get( IntegraCommand.READ_ZONES_VIOLATION, zone ) for zone in self.zones_of_parts( [ part_no ] ) )
+        self._state.set( IntegraCommand.READ_PARTS_WITH_VIOLATED_ZONES, part_no, violated_zones )
+        if violated and self._state.get( IntegraCommand.READ_PARTS_ARMED_REALLY, part_no ) and not self._state.get( IntegraCommand.READ_ZONES_BYPASS, zone_no ):
+            if self._entry_delay > 0:
+                if part_no not in self._timers:
+                    self._state.set( IntegraCommand.READ_PARTS_ENTRY_TIME, part_no, True )
+                    self._timers[ part_no ] = self._eventloop.call_later( self._entry_delay, self._entry_expired, part_no, zone_no )
+            else:
+                self._raise_alarm( part_no, zone_no )
+        return True
+
+    def set_output( self, output_no: int, value: bool ) -> bool:
+        return self._state.set( IntegraCommand.READ_OUTPUTS_STATE, output_no, value )
+
+    def set_temperature( self, zone_no: int, value: float ) -> None:
+        self._temperatures[ zone_no ] = value
+
+    def set_power( self, output_no: int, value: float ) -> None:
+        self._powers[ output_no ] = value
+
+    def _raise_alarm( self, part_no: int, zone_no: int ) -> None:
+        self._state.set( IntegraCommand.READ_ZONES_ALARM, zone_no, True )
+        self._state.set( IntegraCommand.READ_ZONES_ALARM_MEMORY, zone_no, True )
+        self._state.set( IntegraCommand.READ_PARTS_ALARM, part_no, True )
+        self._state.set( IntegraCommand.READ_PARTS_ALARM_MEMORY, part_no, True )
+
+    def _entry_expired( self, part_no: int, zone_no: int ) -> None:
+        self._timers.pop( part_no, None )
+        self._state.set( IntegraCommand.READ_PARTS_ENTRY_TIME, part_no, False )
+        self._raise_alarm( part_no, zone_no )
+
+    def _exit_expired( self, part_no: int, mode: int ) -> None:
+        self._timers.pop( part_no, None )
+        self._state.set( IntegraCommand.READ_PARTS_EXIT_TIME_ABOVE_10, part_no, False )
+        self._arm_part( part_no, mode )
+
+    def _arm_part( self, part_no: int, mode: int ) -> None:
+        self._state.set( IntegraCommand.READ_PARTS_ARMED_SUPPRESSED, part_no, True )
+        self._state.set( IntegraCommand.READ_PARTS_ARMED_REALLY, part_no, True )
+        if mode in _PARTS_ARM_MODE_COMMAND:
+            self._state.set( _PARTS_ARM_MODE_COMMAND[ mode ], part_no, True )
+
+    def _disarm_part( self, part_no: int ) -> None:
+        handle = self._timers.pop( part_no, None )
+        if handle is not None:
+            handle.cancel()
+        for command in [ *_PARTS_ARMED_COMMANDS, IntegraCommand.READ_PARTS_EXIT_TIME_ABOVE_10, IntegraCommand.READ_PARTS_EXIT_TIME_BELOW_10,
+                         IntegraCommand.READ_PARTS_ENTRY_TIME, IntegraCommand.READ_PARTS_ALARM, IntegraCommand.READ_PARTS_FIRE_ALARM ]:
+            self._state.set( command, part_no, False )
+
+    def _clear_alarm( self, parts: list[ int ] ) -> None:
+        for part_no in parts:
+            for command in [ IntegraCommand.READ_PARTS_ALARM, IntegraCommand.READ_PARTS_FIRE_ALARM, IntegraCommand.READ_PARTS_ALARM_MEMORY,
+                             IntegraCommand.READ_PARTS_FIRE_ALARM_MEMORY, IntegraCommand.READ_PARTS_WITH_VERIFIED_ALARMS,
+                             IntegraCommand.READ_PARTS_WITH_WARNING_ALARMS ]:
+                self._state.set( command, part_no, False )
+        for zone_no in self.zones_of_parts( parts ):
+            for command in [ IntegraCommand.READ_ZONES_ALARM, IntegraCommand.READ_ZONES_ALARM_MEMORY, IntegraCommand.READ_ZONES_TAMPER_ALARM,
+                             IntegraCommand.READ_ZONES_TAMPER_ALARM_MEMORY ]:
+                self._state.set( command, zone_no, False )
+
+    # churn and scripts
+
+    def churn_step( self ) -> None:
+        """Apply single random state change, mostly zone violations and outputs"""
+        rnd = self._random
+        choice = rnd.random()
+        if choice < 0.6 and self._caps.zones:
+            zone_no = rnd.randint( 1, self._caps.zones )
+            self.set_zone_violation( zone_no, not self._state.get( IntegraCommand.READ_ZONES_VIOLATION, zone_no ) )
+        elif choice < 0.8 and self._caps.outputs:
+            output_no = rnd.randint( 1, self._caps.outputs )
+            self.set_output( output_no, not self._state.get( IntegraCommand.READ_OUTPUTS_STATE, output_no ) )
+        elif choice < 0.9 and self._caps.doors:
+            door_no = rnd.randint( 1, self._caps.doors )
+            self._state.set( IntegraCommand.READ_DOORS_OPENED, door_no, not self._state.get( IntegraCommand.READ_DOORS_OPENED, door_no ) )
+        elif choice < 0.95 and self._caps.zones:
+            zone_no = rnd.randint( 1, self._caps.zones )
+            self.set_state( IntegraCommand.READ_ZONES_TAMPER, zone_no, not self._state.get( IntegraCommand.READ_ZONES_TAMPER, zone_no ) )
+        elif self._caps.zones:
+            zone_no = rnd.randint( 1, min( self._caps.zones, 128 ) )
+            self.set_state( IntegraCommand.READ_TROUBLES_PART1, zone_no, not self._state.get( IntegraCommand.READ_TROUBLES_PART1, zone_no ) )
+            zone_no = rnd.randint( 1, self._caps.zones )
+            self._temperatures[ zone_no ] = self._temperature( zone_no ) + rnd.choice( [ -0.5, 0.5 ] )
+
+    def _churn_restart( self ) -> None:
+        if self._churn_task is not None:
+            self._churn_task.cancel()
+            self._churn_task = None
+        if self._churn_rate > 0:
+            self._churn_task = self._eventloop.create_task( self._churn_proc(), name="simulator_churn" )
+
+    async def _churn_proc( self ) -> None:
+        while True:
+            await asyncio.sleep( self._random.expovariate( self._churn_rate ) )
+            self.churn_step()
+
+    def run_script( self, steps: Iterable[ IntegraSimulatorStep ] ) -> Task:
+        """Apply (delay, command, item_no, value) steps in background, delay is counted from previous step"""
+        task = self._eventloop.create_task( self._script_proc( list( steps ) ), name="simulator_script" )
+        self._script_tasks.add( task )
+        task.add_done_callback( self._script_tasks.discard )
+        return task
+
+    async def _script_proc( self, steps: list[ IntegraSimulatorStep ] ) -> None:
+        for delay, command, item_no, value in steps:
+            if delay > 0:
+                await asyncio.sleep( delay )
+            self.set_state( IntegraCommand( command ), item_no, value )
+
+    # request handlers
+
+    @staticmethod
+    def _result( error_code: IntegraResponseErrorCode ) -> tuple[ int, bytes ]:
+        return IntegraCommand.READ_RESULT.value, bytes( [ error_code.value ] )
+
+    def _handle_request( self, session: IntegraSimulatorSession, command: int, data: bytes ) -> tuple[ int, bytes ] | None:
+        handler = self._handlers.get( command )
+        if handler is None:
+            return self._result( IntegraResponseErrorCode.OTHER_ERROR )
+        return handler( session, command, data )
+
+    def _read_state( self, session: IntegraSimulatorSession, command: int, data: bytes ) -> tuple[ int, bytes ]:
+        command = IntegraCommand( command )
+        if command in IntegraZonesCommands or command == IntegraCommand.READ_OUTPUTS_STATE:
+            if data[ :1 ] == b"\xff":
+                session._wide = True
+            return command.value, self._state.data( command, 32 if data[ :1 ] == b"\xff" else 16 )
+        return command.value, self._state.data( command )
+
+    def _read_rtc_and_status( self, session: IntegraSimulatorSession, command: int, data: bytes ) -> tuple[ int, bytes ]:
+        now = datetime.now() + self._rtc_offset
+
+        def bcd( value: int ) -> int:
+            return ((value // 10) << 4) | (value % 10)
+
+        status = now.weekday() | (0x40 if self._state.has_troubles() else 0x00)
+        return command, bytes( [
+            bcd( now.year // 100 ), bcd( now.year % 100 ), bcd( now.month ), bcd( now.day ), bcd( now.hour ), bcd( now.minute ), bcd( now.second ),
+            status, _BASE_TYPES.get( self._integra_type, 0 )
+        ] )
+
+    def _temperature( self, zone_no: int ) -> float:
+        return self._temperatures.get( zone_no, 20.0 + (zone_no % 5) )
+
+    def _read_output_power( self, session: IntegraSimulatorSession, command: int, data: bytes ) -> tuple[ int, bytes ]:
+        output_no = IntegraHelper.output_from_byte( data[ 0 ] ) if data else -1
+        if not 0 < output_no <= self._caps.outputs:
+            return self._result( IntegraResponseErrorCode.OTHER_ERROR )
+        value = int( self._powers.get( output_no, 0.0 ) * 10 ) & 0xFFFF
+        return command, bytes( [ data[ 0 ] ] ) + value.to_bytes( 2, "big" )
+
+    def _read_zone_temperature( self, session: IntegraSimulatorSession, command: int, data: bytes ) -> tuple[ int, bytes ]:
+        zone_no = IntegraHelper.output_from_byte( data[ 0 ] ) if data else -1
+        if not 0 < zone_no <= self._caps.zones:
+            return self._result( IntegraResponseErrorCode.OTHER_ERROR )
+        value = int( self._temperature( zone_no ) * 2 + 0x6E ) & 0xFFFF
+        return command, bytes( [ data[ 0 ] ] ) + value.to_bytes( 2, "big" )
+
+    def _read_integra_version( self, session: IntegraSimulatorSession, command: int, data: bytes ) -> tuple[ int, bytes ]:
+        return command, bytes( [ self._integra_type.value ] ) + b"12320240315" + bytes( [ IntegraLang.EN.value, 0xFF ] )
+
+    def _read_module_version( self, session: IntegraSimulatorSession, command: int, data: bytes ) -> tuple[ int, bytes ]:
+        # 32 bytes zones / outputs, troubles part 8 and arming without bypass
+        caps = (0x01 if self._caps.zones > 128 else 0x00) | 0x02 | 0x04
+        return command, b"21020240101" + bytes( [ caps ] )
+
+    def _read_system_changes( self, session: IntegraSimulatorSession, command: int, data: bytes ) -> tuple[ int, bytes ]:
+        if len( data ) > 2:
+            # monitor setup, commands to report as changed and commands to push on change
+            half = len( data ) // 2
+            session.setup_monitor( IntegraHelper.list_from_bytes( data[ :half ], None, False ),
+                                   IntegraHelper.list_from_bytes( data[ half: ], None, False ) )
+            return self._result( IntegraResponseErrorCode.NO_ERROR )
+        size = 5 + len( data )
+        return command, IntegraHelper.list_to_bytes( session.pop_changed( size * 8 ), size * 8, False )
+
+    def element_name( self, element_set: str, element_no: int ) -> str:
+        names = {
+            "objects": "Object", "parts": "Partition", "zones": "Zone", "outputs": "Output", "expanders": "Expander",
+            "manipulators": "Keypad", "users": "User", "admins": "Admin", "timers": "Timer", "phones": "Phone",
+        }
+        return f"{names.get( element_set, element_set )} {element_no}"
+
+    def _read_element_name( self, session: IntegraSimulatorSession, command: int, data: bytes ) -> tuple[ int, bytes ]:
+        if len( data ) < 2:
+            return self._result( IntegraResponseErrorCode.OTHER_ERROR )
+
+        element_type, element_id = data[ 0 ], data[ 1 ]
+        kind: int = 0
+        extra: bytes = bytes()
+        if element_type in [ IntegraElementType.PARTITION, IntegraElementType.PARTITION_WITH_OBJ, IntegraElementType.PARTITION_WITH_OBJ_OPTS,
+                             IntegraElementType.PARTITION_WITH_OBJ_OPTS_DEPS ]:
+            element_set, element_no, kind = "parts", element_id, IntegraPartType.PASSWORD_PROTECTED.value
+            if element_type != IntegraElementType.PARTITION:
+                extra = bytes( [ (element_no - 1) * max( 1, self._caps.objects ) // max( 1, self._caps.parts ) + 1 ] )
+            if element_type in [ IntegraElementType.PARTITION_WITH_OBJ_OPTS, IntegraElementType.PARTITION_WITH_OBJ_OPTS_DEPS ]:
+                extra += bytes( 4 )
+            if element_type == IntegraElementType.PARTITION_WITH_OBJ_OPTS_DEPS:
+                extra += bytes( 5 )
+        elif element_type in [ IntegraElementType.ZONE, IntegraElementType.ZONE_WITH_PARTS ]:
+            element_set, element_no, kind = "zones", IntegraHelper.output_from_byte( element_id ), IntegraZoneReactionType.INSTANT__5.value
+            if element_type == IntegraElementType.ZONE_WITH_PARTS:
+                extra = bytes( [ self.part_of_zone( element_no ) ] )
+        elif element_type in [ IntegraElementType.OUTPUT, IntegraElementType.OUTPUT_WITH_DURATION ]:
+            element_set, element_no, kind = "outputs", IntegraHelper.output_from_byte( element_id ), IntegraOutputElementType.ALARM_BURGLARY__1.value
+            if element_type == IntegraElementType.OUTPUT_WITH_DURATION:
+                extra = (100).to_bytes( 2, "big" )
+        elif element_type == IntegraElementType.USER:
+            element_set, element_no = ("admins", element_id - 0xF0) if element_id > 0xF0 else ("users", element_id)
+            extra = bytes( [ 0 ] )
+        elif element_type == IntegraElementType.EXPANDER:
+            if element_id > 0xC0:
+                element_set, element_no, kind = "manipulators", element_id - 0xC0, IntegraManipulatorType.INT_KLCD.value
+            else:
+                element_set, element_no, kind = "expanders", element_id - 0x80, IntegraExpanderType.CA_64_PP.value
+        elif element_type == IntegraElementType.TIMER:
+            element_set, element_no = "timers", element_id
+        elif element_type == IntegraElementType.TELEPHONE:
+            element_set, element_no = "phones", element_id
+        elif element_type == IntegraElementType.OBJECT:
+            element_set, element_no = "objects", element_id
+        else:
+            return self._result( IntegraResponseErrorCode.OTHER_ERROR )
+
+        if not 0 < element_no <= getattr( self._caps, element_set ):
+            return self._result( IntegraResponseErrorCode.OTHER_ERROR )
+
+        name = self.element_name( element_set, element_no ).encode( DEFAULT_CODE_PAGE, "replace" )[ :16 ].ljust( 16, b" " )
+        return command, bytes( [ element_type, element_id, kind ] ) + name + extra
+
+    def _user_no( self, data: bytes ) -> int | None:
+        return self._user_codes.get( bytes( data[ :8 ] ) ) if len( data ) >= 8 else None
+
+    def _exec_control( self, session: IntegraSimulatorSession, command: int, data: bytes ) -> tuple[ int, bytes ]:
+        if command in [ IntegraCommand.EXEC_READ_EVENT, IntegraCommand.EXEC_GET_EVENT_TEXT ]:
+            # event log is not simulated
+            return self._result( IntegraResponseErrorCode.OTHER_ERROR )
+
+        user_no = self._user_no( data )
+        if user_no is None:
+            return self._result( IntegraResponseErrorCode.USER_CODE_NOT_FOUND )
+
+        payload = data[ 8: ]
+        if IntegraCommand.EXEC_ARM_MODE_0 <= command <= IntegraCommand.EXEC_ARM_MODE_3 or IntegraCommand.EXEC_FORCE_ARM_MODE_0 <= command <= IntegraCommand.EXEC_FORCE_ARM_MODE_3:
+            mode = command & 0x03
+            force = command >= IntegraCommand.EXEC_FORCE_ARM_MODE_0
+            parts = [ part_no for part_no in IntegraHelper.parts_from_bytes( payload[ :4 ] ) if part_no <= self._caps.parts ]
+            if not force and any( self._state.get( IntegraCommand.READ_ZONES_VIOLATION, zone_no ) and not self._state.get( IntegraCommand.READ_ZONES_BYPASS, zone_no )
+                                  for zone_no in self.zones_of_parts( parts ) ):
+                return self._result( IntegraResponseErrorCode.CANNOT_ARM_USE_FORCE )
+            for part_no in parts:
+                if self._exit_delay > 0:
+                    if part_no not in self._timers:
+                        self._state.set( IntegraCommand.READ_PARTS_EXIT_TIME_ABOVE_10, part_no, True )
+                        self._timers[ part_no ] = self._eventloop.call_later( self._exit_delay, self._exit_expired, part_no, mode )
+                else:
+                    self._arm_part( part_no, mode )
+
+        elif command == IntegraCommand.EXEC_DISARM:
+            for part_no in IntegraHelper.parts_from_bytes( payload[ :4 ] ):
+                self._disarm_part( part_no )
+
+        elif command == IntegraCommand.EXEC_CLEAR_ALARM:
+            self._clear_alarm( IntegraHelper.parts_from_bytes( payload[ :4 ] ) )
+
+        elif command in [ IntegraCommand.EXEC_ZONES_BYPASS_SET, IntegraCommand.EXEC_ZONES_BYPASS_UNSET, IntegraCommand.EXEC_ZONES_ISOLATE ]:
+            state = IntegraCommand.READ_ZONES_ISOLATE if command == IntegraCommand.EXEC_ZONES_ISOLATE else IntegraCommand.READ_ZONES_BYPASS
+            zones = [ zone_no for zone_no in IntegraHelper.zones_from_bytes( payload[ :32 ] ) if zone_no <= self._caps.zones ]
+            self._state.set_items( state, zones, command != IntegraCommand.EXEC_ZONES_BYPASS_UNSET )
+
+        elif command in [ IntegraCommand.EXEC_OUTPUTS_ON, IntegraCommand.EXEC_OUTPUTS_OFF, IntegraCommand.EXEC_OUTPUTS_SWITCH ]:
+            for output_no in IntegraHelper.outputs_from_bytes( payload[ :32 ] ):
+                if output_no <= self._caps.outputs:
+                    value = command == IntegraCommand.EXEC_OUTPUTS_ON if command != IntegraCommand.EXEC_OUTPUTS_SWITCH else not self._state.get( IntegraCommand.READ_OUTPUTS_STATE, output_no )
+                    self._state.set( IntegraCommand.READ_OUTPUTS_STATE, output_no, value )
+
+        elif command == IntegraCommand.EXEC_CLEAR_TROUBLE_MEMORY:
+            for memory_command in _TROUBLES_MEMORY.values():
+                self._state.clear( memory_command )
+
+        elif command == IntegraCommand.EXEC_SET_RTC_CLOCK:
+            rtc = IntegraHelper.decode_date_hex( payload[ :7 ] )
+            if rtc == datetime.min:
+                return self._result( IntegraResponseErrorCode.OTHER_ERROR )
+            self._rtc_offset = rtc - datetime.now()
+
+        elif command in [ IntegraCommand.USER_READ_SELF_INFO, IntegraCommand.USER_READ_OTHER_INFO, IntegraCommand.USER_READ_USERS_LIST,
+                          IntegraCommand.USER_READ_USER_LOCKS, IntegraCommand.USER_MANAGE_DEVS ]:
+            # user records are not simulated, only code verification
+            return self._result( IntegraResponseErrorCode.OTHER_ERROR )
+
+        elif command == IntegraCommand.USER_CHANGE_CODE:
+            if len( payload ) < 4:
+                return self._result( IntegraResponseErrorCode.OTHER_ERROR )
+            new_code = IntegraHelper.user_code_to_bytes( payload[ :4 ].hex().upper().rstrip( "F" ), self._prefix_code )
+            if new_code in self._user_codes:
+                return self._result( IntegraResponseErrorCode.CHANGED_CODE_IS_THE_SAME if self._user_codes[ new_code ] == user_no else
+                                     IntegraResponseErrorCode.WRONG_CODE_OR_CODE_ALREADY_EXISTS )
+            self._user_codes.pop( bytes( data[ :8 ] ) )
+            self._user_codes[ new_code ] = user_no
+
+        return self._result( IntegraResponseErrorCode.NO_ERROR )
+
+
+def _parse_script( path: str ) -> list[ IntegraSimulatorStep ]:
+    """Script is JSON list of [delay, command name or value, item_no, value] steps"""
+    with open( path ) as f:
+        steps = json.load( f )
+    result: list[ IntegraSimulatorStep ] = [ ]
+    for delay, command, item_no, value in steps:
+        command = IntegraCommand[ command ] if isinstance( command, str ) else IntegraCommand( command )
+        result.append( (float( delay ), command, int( item_no ), bool( value )) )
+    return result
+
+
+def _parse_user_codes( codes: list[ str ] | None ) -> dict[ str, int ] | None:
+    if not codes:
+        return None
+    result: dict[ str, int ] = { }
+    for index, code in enumerate( codes ):
+        user_code, _, user_no = code.partition( ":" )
+        result[ user_code ] = int( user_no ) if user_no else index + 1
+    return result
+
+
+async def async_main( args: Any ) -> None:
+    simulator = IntegraSimulator(
+        host=args.host, port=args.port, integra_type=IntegraType[ args.type ], integration_key=args.key,
+        user_codes=_parse_user_codes( args.code ), prefix_code=args.prefix, max_connections=args.max_connections or None,
+        rtt=args.rtt, processing=args.processing, churn_rate=args.churn_rate, seed=args.seed,
+        exit_delay=args.exit_delay, entry_delay=args.entry_delay
+    )
+    async with simulator:
+        if args.script:
+            await simulator.run_script( _parse_script( args.script ) )
+        while True:
+            await asyncio.sleep( 3600 )
+
+
+def main( argv: list[ str ] | None = None ) -> None:
+    parser = argparse.ArgumentParser( prog="python -m satel_integra_api.simulator", description="Satel Integra / ETHM-1 panel simulator" )
+    parser.add_argument( "--host", default="127.0.0.1" )
+    parser.add_argument( "--port", type=int, default=DEFAULT_SIMULATOR_PORT )
+    parser.add_argument( "--type", default=IntegraType.INTEGRA_128_PLUS.name, choices=[ item.name for item in IntegraType if item != IntegraType.INTEGRA_UNKNOWN ] )
+    parser.add_argument( "--key", default="", help="integration key, empty for unencrypted connection" )
+    parser.add_argument( "--code", action="append", help="user code, optionally with user number (CODE[:NO]), may be repeated" )
+    parser.add_argument( "--prefix", default="", help="prefix code" )
+    parser.add_argument( "--max-connections", type=int, default=1, help="0 for unlimited" )
+    parser.add_argument( "--rtt", type=float, default=0.0, help="network round trip time in seconds" )
+    parser.add_argument( "--processing", type=float, default=0.0, help="panel processing time per request in seconds" )
+    parser.add_argument( "--churn-rate", type=float, default=0.0, help="random state changes per second" )
+    parser.add_argument( "--seed", type=int, default=None )
+    parser.add_argument( "--script", default=None, help="JSON file with [delay, command, item_no, value] steps" )
+    parser.add_argument( "--exit-delay", type=float, default=0.0 )
+    parser.add_argument( "--entry-delay", type=float, default=0.0 )
+    parser.add_argument( "--log-level", default="INFO" )
+    args = parser.parse_args( argv )
+
+    logging.basicConfig( level=args.log_level.upper(), format="%(asctime)s %(levelname)s [%(name)s] %(message)s" )
+    try:
+        asyncio.run( async_main( args ) )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
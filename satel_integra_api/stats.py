@@ -0,0 +1,127 @@
+import logging
+
+from bisect import bisect_left
+
+from .base import IntegraEntity
+
+_LOGGER = logging.getLogger( __name__ )
+
+# upper bounds (seconds) of latency buckets, last bucket collects everything above
+LATENCY_BUCKETS: tuple[ float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# upper bounds (seconds) of delay of scheduled requests
+MONITOR_LAG_BUCKETS: tuple[ float, ...] = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class IntegraHistogram( IntegraEntity ):
+    """Fixed buckets histogram, adding sample costs one bisect over bucket bounds.
+
+    Percentiles are estimated by linear interpolation inside the bucket holding requested rank, samples above the
+    last bound are represented by the largest sample seen.
+    """
+
+    def __init__( self, bounds: tuple[ float, ...] = LATENCY_BUCKETS ):
+        super().__init__()
+        self._bounds: tuple[ float, ...] = bounds
+        self._counts: list[ int ] = [ 0 ] * (len( bounds ) + 1)
+        self._count: int = 0
+        self._sum: float = 0.0
+        self._min: float = 0.0
+        self._max: float = 0.0
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        fields.update( {
+            "Count": f"{self._count}",
+            "Avg": f"{self.avg * 1000:.1f}ms",
+            "P50": f"{self.percentile( 50 ) * 1000:.1f}ms",
+            "P95": f"{self.percentile( 95 ) * 1000:.1f}ms",
+            "P99": f"{self.percentile( 99 ) * 1000:.1f}ms",
+            "Max": f"{self._max * 1000:.1f}ms",
+        } )
+
+    def add( self, value: float ) -> None:
+        self._counts[ bisect_left( self._bounds, value ) ] += 1
+        if self._count == 0 or value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
+        self._count += 1
+        self._sum += value
+
+    def merge( self, other: 'IntegraHistogram' ) -> None:
+        """Add samples of histogram with the same bounds"""
+        if other._bounds != self._bounds:
+            raise ValueError( "Histograms with different bounds can not be merged" )
+        if other._count == 0:
+            return
+        for index, bucket_count in enumerate( other._counts ):
+            self._counts[ index ] += bucket_count
+        self._min = other._min if self._count == 0 else min( self._min, other._min )
+        self._max = max( self._max, other._max )
+        self._count += other._count
+        self._sum += other._sum
+
+    def clear( self ) -> None:
+        self._counts = [ 0 ] * (len( self._bounds ) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._min = 0.0
+        self._max = 0.0
+
+    @property
+    def bounds( self ) -> tuple[ float, ...]:
+        return self._bounds
+
+    @property
+    def counts( self ) -> list[ int ]:
+        """Samples per bucket (not cumulative), one more entry than bounds"""
+        return self._counts
+
+    @property
+    def count( self ) -> int:
+        return self._count
+
+    @property
+    def sum( self ) -> float:
+        return self._sum
+
+    @property
+    def min( self ) -> float:
+        return self._min
+
+    @property
+    def max( self ) -> float:
+        return self._max
+
+    @property
+    def avg( self ) -> float:
+        return self._sum / self._count if self._count else 0.0
+
+    def percentile( self, percent: float ) -> float:
+        if self._count == 0:
+            return 0.0
+        rank = self._count * percent / 100.0
+        cumulative = 0
+        for index, bucket_count in enumerate( self._counts ):
+            if bucket_count == 0:
+                continue
+            if cumulative + bucket_count >= rank:
+                lower = self._bounds[ index - 1 ] if index > 0 else 0.0
+                upper = self._bounds[ index ] if index < len( self._bounds ) else self._max
+                lower = max( lower, self._min )
+                upper = min( upper, self._max )
+                return lower + (upper - lower) * max( 0.0, rank - cumulative ) / bucket_count
+            cumulative += bucket_count
+        return self._max
+
+    @property
+    def p50( self ) -> float:
+        return self.percentile( 50 )
+
+    @property
+    def p95( self ) -> float:
+        return self.percentile( 95 )
+
+    @property
+    def p99( self ) -> float:
+        return self.percentile( 99 )
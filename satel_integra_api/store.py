@@ -0,0 +1,183 @@
+import logging
+
+from typing import Iterable, Iterator
+
+from .base import IntegraCaps, IntegraEntity
+from .diff import IntegraStateDiff
+from .notify import IntegraDoorsNotifyEvents, IntegraNotifyEvent, IntegraOutputsNotifyEvents, IntegraPartsNotifyEvents, IntegraZonesNotifyEvents
+
+_LOGGER = logging.getLogger( __name__ )
+
+
+class IntegraStateSet:
+    """Set of item numbers kept as int bitmap, bit N - 1 stands for item N.
+
+    Sets of the same kind of items combine with &, |, ^, - and ~ (complement within size) in single int operation.
+    """
+
+    __slots__ = ("_bits", "_size")
+
+    @classmethod
+    def of( cls, items: Iterable[ int ], size: int ) -> 'IntegraStateSet':
+        bits = 0
+        for item_no in items:
+            if 0 < item_no <= size:
+                bits |= 1 << (item_no - 1)
+        return cls( bits, size )
+
+    def __init__( self, bits: int, size: int ):
+        self._bits: int = bits
+        self._size: int = size
+
+    def __repr__( self ) -> str:
+        return f"IntegraStateSet({list( self )})"
+
+    def __len__( self ) -> int:
+        return self._bits.bit_count()
+
+    def __bool__( self ) -> bool:
+        return self._bits != 0
+
+    def __iter__( self ) -> Iterator[ int ]:
+        bits = self._bits
+        while bits:
+            low = bits & -bits
+            yield low.bit_length()
+            bits ^= low
+
+    def __contains__( self, item_no: object ) -> bool:
+        return isinstance( item_no, int ) and item_no > 0 and (self._bits >> (item_no - 1)) & 1 == 1
+
+    def __eq__( self, other: object ) -> bool:
+        if isinstance( other, IntegraStateSet ):
+            return self._bits == other._bits
+        if isinstance( other, (set, frozenset) ):
+            return set( self ) == other
+        return NotImplemented
+
+    def __hash__( self ) -> int:
+        return hash( self._bits )
+
+    def __and__( self, other: 'IntegraStateSet' ) -> 'IntegraStateSet':
+        return IntegraStateSet( self._bits & other._bits, max( self._size, other._size ) )
+
+    def __or__( self, other: 'IntegraStateSet' ) -> 'IntegraStateSet':
+        return IntegraStateSet( self._bits | other._bits, max( self._size, other._size ) )
+
+    def __xor__( self, other: 'IntegraStateSet' ) -> 'IntegraStateSet':
+        return IntegraStateSet( self._bits ^ other._bits, max( self._size, other._size ) )
+
+    def __sub__( self, other: 'IntegraStateSet' ) -> 'IntegraStateSet':
+        return IntegraStateSet( self._bits & ~other._bits, self._size )
+
+    def __invert__( self ) -> 'IntegraStateSet':
+        return IntegraStateSet( ~self._bits & ((1 << self._size) - 1), self._size )
+
+    @property
+    def bits( self ) -> int:
+        return self._bits
+
+    @property
+    def size( self ) -> int:
+        return self._size
+
+
+class IntegraStateStore( IntegraEntity ):
+    """State of all items of panel, single bitmap per notify event, sized by IntegraCaps.
+
+    Every change of store increments its version, version of last change is kept per event, so consumers are able to
+    tell which events changed since the version they saw.
+    """
+
+    _sources: dict[ IntegraNotifyEvent, str ] = {
+        **{ notify_event: "parts" for notify_event in IntegraPartsNotifyEvents },
+        **{ notify_event: "zones" for notify_event in IntegraZonesNotifyEvents },
+        **{ notify_event: "outputs" for notify_event in IntegraOutputsNotifyEvents },
+        **{ notify_event: "doors" for notify_event in IntegraDoorsNotifyEvents },
+    }
+
+    @staticmethod
+    def is_bitmap( notify_event: IntegraNotifyEvent ) -> bool:
+        return notify_event in IntegraStateStore._sources
+
+    def __init__( self ):
+        super().__init__()
+        self._bits: dict[ IntegraNotifyEvent, int ] = { }
+        self._sizes: dict[ IntegraNotifyEvent, int ] = { }
+        self._masks: dict[ IntegraNotifyEvent, int ] = { }
+        self._versions: dict[ IntegraNotifyEvent, int ] = { }
+        self._version: int = 0
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        fields.update( {
+            "Events": f"{len( self._sizes )}",
+            "Version": f"{self._version}",
+        } )
+
+    def __contains__( self, notify_event: IntegraNotifyEvent ) -> bool:
+        return notify_event in self._sizes
+
+    def __getitem__( self, notify_event: IntegraNotifyEvent ) -> IntegraStateSet:
+        """Items having state of event set"""
+        return IntegraStateSet( self._bits.get( notify_event, 0 ), self._sizes.get( notify_event, 0 ) )
+
+    @property
+    def version( self ) -> int:
+        return self._version
+
+    def configure( self, caps: IntegraCaps ) -> None:
+        """Size bitmaps by number of items of panel, states of items beyond new size are dropped"""
+        for notify_event, set_name in self._sources.items():
+            size = getattr( caps, set_name )
+            self._sizes[ notify_event ] = size
+            self._masks[ notify_event ] = (1 << size) - 1
+            bits = self._bits.get( notify_event, 0 ) & self._masks[ notify_event ]
+            if bits != self._bits.get( notify_event, 0 ):
+                self._touch( notify_event )
+            self._bits[ notify_event ] = bits
+
+    def size( self, notify_event: IntegraNotifyEvent ) -> int:
+        return self._sizes.get( notify_event, 0 )
+
+    def bits( self, notify_event: IntegraNotifyEvent ) -> int:
+        return self._bits.get( notify_event, 0 )
+
+    def version_of( self, notify_event: IntegraNotifyEvent ) -> int:
+        """Store version of last change of event, 0 when it never changed"""
+        return self._versions.get( notify_event, 0 )
+
+    def changed_since( self, version: int ) -> list[ IntegraNotifyEvent ]:
+        return [ notify_event for notify_event, event_version in self._versions.items() if event_version > version ]
+
+    def _touch( self, notify_event: IntegraNotifyEvent ) -> None:
+        self._version += 1
+        self._versions[ notify_event ] = self._version
+
+    def get( self, notify_event: IntegraNotifyEvent, item_no: int ) -> bool:
+        return (self._bits.get( notify_event, 0 ) >> (item_no - 1)) & 1 == 1
+
+    def set( self, notify_event: IntegraNotifyEvent, item_no: int, value: bool ) -> bool:
+        """Set state of single item, returns True when it changed"""
+        if notify_event not in self._sizes or not 0 < item_no <= self._sizes[ notify_event ]:
+            return False
+        bits = self._bits[ notify_event ]
+        bit = 1 << (item_no - 1)
+        current = bits | bit if value else bits & ~bit
+        if current == bits:
+            return False
+        self._bits[ notify_event ] = current
+        self._touch( notify_event )
+        return True
+
+    def apply( self, notify_event: IntegraNotifyEvent, diff: IntegraStateDiff ) -> IntegraStateDiff:
+        """Take values of changed items of diff, returns items which really changed in store"""
+        if notify_event not in self._sizes:
+            return IntegraStateDiff( 0, 0 )
+        previous = self._bits[ notify_event ]
+        changed = diff.changed & self._masks[ notify_event ]
+        current = (previous & ~changed) | (diff.state & changed)
+        if current != previous:
+            self._bits[ notify_event ] = current
+            self._touch( notify_event )
+        return IntegraStateDiff( previous ^ current, current )
@@ -1,3 +1,4 @@
+from array import array
 from datetime import datetime
 from enum import IntEnum
 
@@ -35,16 +36,29 @@ class IntegraHelper:
 
         return bytes( result )
 
+    _checksum_table: array | None = None
+
+    @staticmethod
+    def _checksum_table_build() -> array:
+        """Transition table, for every crc value holds rotated, inverted and folded value before adding data byte.
+        Table is extended by 256 entries, so crc may be left unmasked after adding byte (crc + byte <= 0xFFFF + 0xFF).
+        Values are kept as 16-bit array (128 KiB), list of ints would take about 2 MB in every process"""
+        table = array( "H", bytes( 0x10100 * 2 ) )
+        for crc in range( 0x10000 ):
+            value = (((crc << 1) & 0xFFFF) | (crc & 0x8000) >> 15) ^ 0xFFFF
+            table[ crc ] = (value + (value >> 8)) & 0xFFFF
+        table[ 0x10000: ] = table[ :0x100 ]
+        IntegraHelper._checksum_table = table
+        return table
+
     @staticmethod
     def checksum( payload ) -> int:
         """Function to calculate checksum as per Satel manual."""
+        table = IntegraHelper._checksum_table or IntegraHelper._checksum_table_build()
         crc = 0x147A
         for b in payload:
-            # rotate (crc 1 bit left)
-            crc = ((crc << 1) & 0xFFFF) | (crc & 0x8000) >> 15
-            crc = crc ^ 0xFFFF
-            crc = (crc + (crc >> 8) + b) & 0xFFFF
-        return crc
+            crc = table[ crc ] + b
+        return crc & 0xFFFF
 
     @staticmethod
     def decode_date_hex( date: bytes ) -> datetime:
@@ -152,12 +166,13 @@ class IntegraHelper:
             return msg_filter
         return cmd in msg_filter
 
+    _hex_table: tuple[ str, ...] = tuple( f"0x{value:02X}" for value in range( 256 ) )
+
     @staticmethod
     def hex_str( data, fmt: str = "02X", prefix: str = "0x", separator: str = ", " ) -> str:
-        hex_msg = ""
-        for c in data:
-            hex_msg += prefix + format( c, fmt ) + separator
-        return hex_msg.rstrip( ', ' )
+        if fmt == "02X" and prefix == "0x":
+            return separator.join( map( IntegraHelper._hex_table.__getitem__, data ) )
+        return separator.join( [ prefix + format( c, fmt ) for c in data ] )
 
     @staticmethod
     def users_no_from_bytes( users_data: bytes, bit_length: int = None, is_admin: bool = False ) -> list[ int ]:
@@ -0,0 +1,189 @@
+import logging
+import time
+
+from collections import deque
+from enum import IntEnum
+from typing import Any, Callable
+
+from .base import IntegraEntity
+from .commands import IntegraCommand
+from .scheduler import IntegraRequestPriority
+
+_LOGGER = logging.getLogger( __name__ )
+
+DEFAULT_TRACE_RING_SIZE = 1024
+
+
+class IntegraTraceEvent( IntEnum ):
+    ENQUEUED = 0
+    SLOT_ACQUIRED = 1
+    LOCK_ACQUIRED = 2
+    WRITTEN = 3
+    FIRST_BYTE = 4
+    DECODED = 5
+    RESOLVED = 6
+    CALLBACK_DONE = 7
+    FINISHED = 8
+
+
+class IntegraTraceOutcome( IntEnum ):
+    PENDING = 0
+    SUCCESS = 1
+    RESULT = 2
+    TIMEOUT = 3
+    FAILED = 4
+
+
+class IntegraTraceSpan( IntegraEntity ):
+    """Lifecycle of single request sent by channel.
+
+    Events are stored as time.monotonic() timestamps, 'started' holds wall clock time of ENQUEUED event, so wall clock
+    time of any event is available from timestamp(). Events which did not happen (e.g. no response) stay None.
+      ENQUEUED       request entered request scheduler
+      SLOT_ACQUIRED  request window slot granted
+      LOCK_ACQUIRED  channel write lock acquired
+      WRITTEN        request bytes passed to transport
+      FIRST_BYTE     chunk holding first byte of response frame received
+      DECODED        response frame parsed into IntegraResponse by read task
+      RESOLVED       response passed to awaiting request
+      CALLBACK_DONE  read task finished dispatching response (notification callbacks of state responses)
+      FINISHED       requester resumed with result
+    """
+
+    def __init__( self, channel_id: str, command: IntegraCommand, size: int, priority: IntegraRequestPriority ):
+        super().__init__()
+        self._channel_id: str = channel_id
+        self._command: IntegraCommand = command
+        self._size: int = size
+        self._priority: IntegraRequestPriority = priority
+        self._started: float = time.time()
+        self._events: list[ float | None ] = [ None ] * len( IntegraTraceEvent )
+        self._events[ IntegraTraceEvent.ENQUEUED ] = time.monotonic()
+        self._response_size: int = 0
+        self._outcome: IntegraTraceOutcome = IntegraTraceOutcome.PENDING
+        self._error_code: int = 0
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        fields.update( {
+            "Command": f"{self._command.name}",
+            "Size": f"{self._size}",
+            "Outcome": f"{self._outcome.name}",
+            "Total": f"{self.total * 1000:.1f}ms",
+        } )
+
+    @property
+    def channel_id( self ) -> str:
+        return self._channel_id
+
+    @property
+    def command( self ) -> IntegraCommand:
+        return self._command
+
+    @property
+    def size( self ) -> int:
+        """Size of request payload (data bytes without command and checksum)"""
+        return self._size
+
+    @property
+    def response_size( self ) -> int:
+        return self._response_size
+
+    @response_size.setter
+    def response_size( self, value: int ) -> None:
+        self._response_size = value
+
+    @property
+    def priority( self ) -> IntegraRequestPriority:
+        return self._priority
+
+    @property
+    def started( self ) -> float:
+        return self._started
+
+    @property
+    def outcome( self ) -> IntegraTraceOutcome:
+        return self._outcome
+
+    @property
+    def error_code( self ) -> int:
+        """Error code of READ_RESULT response, valid for outcome RESULT"""
+        return self._error_code
+
+    @property
+    def total( self ) -> float:
+        return self.duration( IntegraTraceEvent.ENQUEUED, IntegraTraceEvent.FINISHED ) or 0.0
+
+    def __getitem__( self, event: IntegraTraceEvent ) -> float | None:
+        return self._events[ event ]
+
+    def mark( self, event: IntegraTraceEvent, timestamp: float | None = None ) -> None:
+        self._events[ event ] = time.monotonic() if timestamp is None else timestamp
+
+    def timestamp( self, event: IntegraTraceEvent ) -> float | None:
+        """Wall clock time of event"""
+        value = self._events[ event ]
+        return None if value is None else self._started + (value - self._events[ IntegraTraceEvent.ENQUEUED ])
+
+    def duration( self, begin: IntegraTraceEvent, end: IntegraTraceEvent ) -> float | None:
+        if self._events[ begin ] is None or self._events[ end ] is None:
+            return None
+        return self._events[ end ] - self._events[ begin ]
+
+    def finish( self, outcome: IntegraTraceOutcome, error_code: int = 0 ) -> None:
+        self._events[ IntegraTraceEvent.FINISHED ] = time.monotonic()
+        self._outcome = outcome
+        self._error_code = error_code
+
+    def as_dict( self ) -> dict[ str, Any ]:
+        """Span as plain values, event times are offsets (seconds) from 'start'"""
+        begin = self._events[ IntegraTraceEvent.ENQUEUED ]
+        return {
+            "channel": self._channel_id,
+            "command": self._command.name,
+            "size": self._size,
+            "response_size": self._response_size,
+            "priority": self._priority.name,
+            "outcome": self._outcome.name,
+            "error_code": self._error_code,
+            "start": self._started,
+            "events": { event.name: value - begin for event, value in zip( IntegraTraceEvent, self._events ) if value is not None },
+        }
+
+
+IntegraTraceCallback = Callable[ [ IntegraTraceSpan ], None ] | None
+
+
+class IntegraTraceRing( IntegraEntity ):
+    """Tracer keeping the most recent finished spans in ring buffer, instance is used as channel/client tracer"""
+
+    def __init__( self, size: int = DEFAULT_TRACE_RING_SIZE ):
+        super().__init__()
+        self._spans: deque[ IntegraTraceSpan ] = deque( maxlen = size )
+        self._total: int = 0
+
+    def _write_fields( self, fields: dict[ str, str ] ) -> None:
+        super()._write_fields( fields )
+        fields.update( {
+            "Spans": f"{len( self._spans )}",
+            "Total": f"{self._total}",
+        } )
+
+    def __call__( self, span: IntegraTraceSpan ) -> None:
+        self._spans.append( span )
+        self._total += 1
+
+    def __len__( self ) -> int:
+        return len( self._spans )
+
+    @property
+    def spans( self ) -> list[ IntegraTraceSpan ]:
+        return list( self._spans )
+
+    @property
+    def total( self ) -> int:
+        """Number of spans traced, including ones already dropped from ring"""
+        return self._total
+
+    def clear( self ) -> None:
+        self._spans.clear()
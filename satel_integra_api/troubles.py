@@ -1,4 +1,5 @@
 from enum import Flag, IntEnum
+from collections.abc import Mapping
 from typing import Union
 
 from .base import IntegraEntity
@@ -47,7 +48,7 @@ class IntegraTroublesSystemOther( Flag ):
     MON_IP_STA2 = 0x80
 
 
-IntegraTroublesDataType = Union[dict[ int, bool ]|IntegraTroublesSystemMain|IntegraTroublesSystemOther]
+IntegraTroublesDataType = Union[Mapping[ int, bool ]|IntegraTroublesSystemMain|IntegraTroublesSystemOther]
 
 class IntegraTroublesZone( Flag ):
     NONE = 0x00
@@ -0,0 +1,133 @@
+"""Runs benchmark suite and writes results as JSON.
+
+    python test/bench.py [-o results.json] [--only frames cipher] [--repeat 3] [--compare baseline.json]
+
+Every test/bench_*.py module providing run() is part of the suite. Results are stored together with git commit,
+python version, platform and seed, so files produced on different commits can be compared with --compare.
+"""
+import argparse
+import datetime
+import glob
+import importlib
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+TEST_DIR = os.path.dirname( os.path.abspath( __file__ ) )
+sys.path.insert( 0, TEST_DIR )
+sys.path.insert( 0, os.path.join( TEST_DIR, ".." ) )
+
+DEFAULT_SEED = 1
+
+
+def available() -> list[ str ]:
+    return sorted( os.path.basename( path )[ len( "bench_" ):-len( ".py" ) ] for path in glob.glob( os.path.join( TEST_DIR, "bench_*.py" ) ) )
+
+
+def git_info() -> dict[ str, str | bool | None ]:
+    def git( *args ) -> str | None:
+        try:
+            return subprocess.run( [ "git", *args ], cwd=TEST_DIR, capture_output=True, text=True, check=True ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    status = git( "status", "--porcelain", "--untracked-files=no" )
+    return {
+        "commit": git( "rev-parse", "HEAD" ),
+        "subject": git( "log", "-1", "--format=%s" ),
+        "dirty": bool( status ) if status is not None else None,
+    }
+
+
+def environment( seed: int, repeat: int ) -> dict[ str, object ]:
+    return {
+        "git": git_info(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "seed": seed,
+        "repeat": repeat,
+        "timestamp": datetime.datetime.now( datetime.timezone.utc ).isoformat( timespec="seconds" ),
+    }
+
+
+def flatten( metrics: dict[ str, object ], prefix: str = "" ) -> dict[ str, float ]:
+    """Metrics of benchmark as flat dict, keys of nested levels are joined by underscore (stream_latency_p50_us)"""
+    result: dict[ str, float ] = { }
+    for key, value in metrics.items():
+        if isinstance( value, dict ):
+            result.update( flatten( value, f"{prefix}{key}_" ) )
+        else:
+            result[ f"{prefix}{key}" ] = value
+    return result
+
+
+def run_bench( name: str, seed: int, repeat: int ) -> dict[ str, object ]:
+    """Run benchmark given number of times, median of every metric is reported"""
+    module = importlib.import_module( f"bench_{name}" )
+    kwargs = { "seed": seed } if "seed" in inspect.signature( module.run ).parameters else { }
+
+    samples: list[ dict[ str, float ] ] = [ ]
+    begin = time.perf_counter()
+    for _ in range( repeat ):
+        samples.append( flatten( module.run( **kwargs ) ) )
+    elapsed = time.perf_counter() - begin
+
+    metrics = { key: statistics.median( sample[ key ] for sample in samples ) for key in samples[ 0 ] }
+    return { "metrics": metrics, "elapsed_sec": elapsed }
+
+
+def compare( results: dict[ str, object ], baseline: dict[ str, object ] ) -> None:
+    """Print ratio current / baseline of every metric present in both results"""
+    base_commit = (baseline[ "environment" ][ "git" ][ "commit" ] or "?")[ :10 ]
+    this_commit = (results[ "environment" ][ "git" ][ "commit" ] or "?")[ :10 ]
+    print( f"\n{'':>40}  {base_commit:>14}  {this_commit:>14}  ratio" )
+    for name, bench in results[ "benchmarks" ].items():
+        base_bench = baseline[ "benchmarks" ].get( name )
+        if base_bench is None:
+            continue
+        # baseline may come from runner which stored nested metrics
+        base_metrics = flatten( base_bench[ "metrics" ] )
+        for key, value in bench[ "metrics" ].items():
+            base_value = base_metrics.get( key )
+            if base_value is None:
+                continue
+            ratio = f"{value / base_value:6.3f}" if base_value else "     -"
+            print( f"{name + '.' + key:>40}  {base_value:>14,.2f}  {value:>14,.2f}  {ratio}" )
+
+
+def main( argv: list[ str ] | None = None ) -> None:
+    parser = argparse.ArgumentParser( description="Run satel_integra_api benchmarks" )
+    parser.add_argument( "--only", nargs="+", choices=available(), help="benchmarks to run, all by default" )
+    parser.add_argument( "-o", "--output", help="write JSON results to file instead of stdout" )
+    parser.add_argument( "--seed", type=int, default=DEFAULT_SEED, help="seed passed to benchmarks accepting it" )
+    parser.add_argument( "--repeat", type=int, default=1, help="runs of every benchmark, median is reported" )
+    parser.add_argument( "--compare", help="JSON results of previous run to compare with" )
+    args = parser.parse_args( argv )
+
+    results: dict[ str, object ] = { "environment": environment( args.seed, args.repeat ), "benchmarks": { } }
+    for name in args.only or available():
+        print( f"running {name} ...", file=sys.stderr )
+        results[ "benchmarks" ][ name ] = run_bench( name, args.seed, max( 1, args.repeat ) )
+
+    output = json.dumps( results, indent=2 )
+    if args.output:
+        with open( args.output, "w" ) as f:
+            f.write( output )
+    else:
+        print( output )
+
+    if args.compare:
+        with open( args.compare ) as f:
+            compare( results, json.load( f ) )
+
+
+if __name__ == "__main__":
+    main()
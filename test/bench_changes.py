@@ -0,0 +1,109 @@
+import asyncio
+import inspect
+import os
+import random
+import sys
+import time
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.base import IntegraType
+from satel_integra_api.client import IntegraClientOpts
+from satel_integra_api.diff import IntegraStateDiff
+from satel_integra_api.notify import IntegraNotifyEvent, IntegraNotifySource
+from satel_integra_api.objects import Events, IntegraSystem
+from satel_integra_api.simulator import IntegraSimulator
+
+INTEGRA_TYPE = IntegraType.INTEGRA_128_PLUS
+FRAMES = 500
+FLIPS = 32
+SEED = 1
+TOOL_ID = 5
+
+
+class AwaitCounter:
+    """Counts coroutines started, each of them is one await of propagation chain"""
+
+    def __init__( self ) -> None:
+        self.count: int = 0
+
+    def _on_start( self, code, _ ):
+        if code.co_flags & inspect.CO_COROUTINE:
+            self.count += 1
+
+    def __enter__( self ) -> 'AwaitCounter':
+        sys.monitoring.use_tool_id( TOOL_ID, "bench_changes" )
+        sys.monitoring.register_callback( TOOL_ID, sys.monitoring.events.PY_START, self._on_start )
+        sys.monitoring.set_events( TOOL_ID, sys.monitoring.events.PY_START )
+        return self
+
+    def __exit__( self, *_ ) -> None:
+        sys.monitoring.set_events( TOOL_ID, 0 )
+        sys.monitoring.register_callback( TOOL_ID, sys.monitoring.events.PY_START, None )
+        sys.monitoring.free_tool_id( TOOL_ID )
+
+
+def frames_sequence( rnd: random.Random, count: int, zones: int, flips: int ) -> list[ IntegraStateDiff ]:
+    state = 0
+    result = [ ]
+    for _ in range( count ):
+        previous = state
+        for zone_no in rnd.sample( range( zones ), flips ):
+            state ^= 1 << zone_no
+        result.append( IntegraStateDiff.compute( previous, state ) )
+    return result
+
+
+async def bench_mode( system: IntegraSystem, frames: list[ IntegraStateDiff ], batched: bool, event_name: str ) -> dict[ str, float ]:
+    received = 0
+
+    async def handler( *_, **__ ):
+        nonlocal received
+        received += 1
+
+    system.batch_changes = batched
+    system.subscribe( event_name, handler )
+    try:
+        with AwaitCounter() as counter:
+            begin = time.perf_counter()
+            for frame in frames:
+                await system._async_client_state_changed_handler( system.client, IntegraNotifySource.ZONES, IntegraNotifyEvent.ZONES_VIOLATION, frame )
+            elapsed = time.perf_counter() - begin
+    finally:
+        system.unsubscribe( event_name, handler )
+    return { "awaits_per_frame": counter.count / len( frames ), "frame_us": elapsed / len( frames ) * 1e6, "callbacks": received }
+
+
+async def bench_changes( frames_count: int, flips: int, seed: int ) -> dict[ str, float ]:
+    async with IntegraSimulator( integra_type=INTEGRA_TYPE, seed=seed ) as simulator:
+        system = IntegraSystem.tcp( simulator.host, simulator.port, asyncio.get_running_loop(), IntegraClientOpts.create( reconnect=0 ) )
+        if not await system.async_connect():
+            raise AssertionError( "Unable to connect to simulator" )
+        try:
+            frames = frames_sequence( random.Random( seed ), frames_count, system.caps.zones, flips )
+            results = { }
+            for mode, batched, event_name in [ ("per_item", False, Events.EVENT_SYS_ITEM_CHANGED), ("batched", True, Events.EVENT_SYS_ITEMS_CHANGED),
+                                               ("adapter", True, Events.EVENT_SYS_ITEM_CHANGED) ]:
+                # every mode starts from cleared zones, so it sees the same changes
+                system.store.apply( IntegraNotifyEvent.ZONES_VIOLATION, IntegraStateDiff( (1 << system.caps.zones) - 1, 0 ) )
+                for name, value in (await bench_mode( system, frames, batched, event_name )).items():
+                    results[ f"{mode}_{name}" ] = value
+        finally:
+            await system.async_disconnect()
+
+    results[ "awaits_reduction" ] = results[ "per_item_awaits_per_frame" ] / results[ "batched_awaits_per_frame" ]
+    results[ "frame_speedup" ] = results[ "per_item_frame_us" ] / results[ "batched_frame_us" ]
+    return results
+
+
+def run( frames: int = FRAMES, flips: int = FLIPS, seed: int = SEED ) -> dict[ str, float ]:
+    return asyncio.run( bench_changes( frames, flips, seed ) )
+
+
+def main():
+    for name, value in run().items():
+        print( f"{name:>28}: {value:,.4f}" )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.tools import IntegraHelper
+from test_checksum import checksum_reference
+
+ITERATIONS = 20000
+# checksummed part of frame: command + data, troubles frame has 47 data bytes, zones frame 32
+FRAME_SIZES = { "troubles_48": 48, "zones_33": 33 }
+
+
+def bench( function, payloads: list[ bytes ], iterations: int ) -> float:
+    begin = time.perf_counter()
+    for index in range( iterations ):
+        function( payloads[ index % len( payloads ) ] )
+    return time.perf_counter() - begin
+
+
+def run( iterations: int = ITERATIONS ) -> dict[ str, float ]:
+    rnd = random.Random( 1 )
+    IntegraHelper.checksum( b"" )  # build table outside of measurement
+    result: dict[ str, float ] = { }
+    for name, size in FRAME_SIZES.items():
+        payloads = [ rnd.randbytes( size ) for _ in range( 64 ) ]
+        reference = bench( checksum_reference, payloads, iterations )
+        table = bench( IntegraHelper.checksum, payloads, iterations )
+        result[ f"{name}_reference_per_sec" ] = iterations / reference
+        result[ f"{name}_table_per_sec" ] = iterations / table
+        result[ f"{name}_speedup" ] = reference / table
+    return result
+
+
+def main():
+    for name, value in run().items():
+        print( f"{name:>32}: {value:,.2f}" )
+
+
+if __name__ == "__main__":
+    main()
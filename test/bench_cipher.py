@@ -0,0 +1,122 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from satel_integra_api.cipher import IntegraCipher
+
+INTEGRATION_KEY = "IntegraKey12"
+BLOCK_LENGTH = 16
+FRAMES_COUNT = 20000
+FRAME_LENGTH = 6 + 2 + 1 + 32 + 2 + 2  # PDU header + frame sync + command + zones data + crc + frame end
+
+
+class LegacyCipher:
+    """Reference implementation as used by EncryptionHandler before IntegraCipher, new context per frame"""
+
+    def __init__( self, key: str ):
+        key_bytes = bytes( key, "ascii" )
+        key_data = [ 0 ] * 24
+        for i in range( 12 ):
+            key_data[ i ] = key_data[ i + 12 ] = key_bytes[ i ] if i < len( key_bytes ) else 0x20
+        self._cipher = Cipher( algorithms.AES( bytes( key_data ) ), modes.ECB() )
+
+    @staticmethod
+    def _data_blocks( data: bytes, block_len: int ):
+        return [ data[ i:i + block_len ] for i in range( 0, len( data ), block_len ) ]
+
+    def decrypt( self, data: bytes ) -> bytes:
+        decrypted_data = [ ]
+        decryptor = self._cipher.decryptor()
+        encryptor = self._cipher.encryptor()
+        cv = list( encryptor.update( bytes( [ 0 ] * BLOCK_LENGTH ) ) )
+        for block in self._data_blocks( data, BLOCK_LENGTH ):
+            temp = list( block )
+            c = list( block )
+            if len( block ) == BLOCK_LENGTH:
+                c = list( decryptor.update( bytes( c ) ) )
+                c = [ a ^ b for a, b in zip( c, cv ) ]
+                cv = list( temp )
+            else:
+                cv = list( encryptor.update( bytes( cv ) ) )
+                c = [ a ^ b for a, b in zip( c, cv ) ]
+            decrypted_data += c
+        return bytes( decrypted_data )
+
+    def encrypt( self, data: bytes ) -> bytes:
+        if len( data ) < BLOCK_LENGTH:
+            data += b'\x00' * (BLOCK_LENGTH - len( data ))
+        encrypted_data = [ ]
+        encryptor = self._cipher.encryptor()
+        cv = list( encryptor.update( bytes( [ 0 ] * BLOCK_LENGTH ) ) )
+        for block in self._data_blocks( data, BLOCK_LENGTH ):
+            p = list( block )
+            if len( block ) == BLOCK_LENGTH:
+                p = [ a ^ b for a, b in zip( p, cv ) ]
+                p = list( encryptor.update( bytes( p ) ) )
+                cv = list( p )
+            else:
+                cv = list( encryptor.update( bytes( cv ) ) )
+                p = [ a ^ b for a, b in zip( p, cv ) ]
+            encrypted_data += p
+        return bytes( encrypted_data )
+
+
+def verify( seed: int = 1 ) -> int:
+    """Check that both implementations produce identical output, returns number of checked buffers"""
+    rnd = random.Random( seed )
+    checked = 0
+    for key in [ INTEGRATION_KEY, "short", "x" * 20 ]:
+        legacy = LegacyCipher( key )
+        cipher = IntegraCipher( key )
+        for length in range( 0, 130 ):
+            for _ in range( 4 ):
+                data = rnd.randbytes( length )
+                if legacy.encrypt( data ) != cipher.encrypt( data ):
+                    raise AssertionError( f"encrypt mismatch, key={key}, length={length}" )
+                if legacy.decrypt( data ) != cipher.decrypt( data ):
+                    raise AssertionError( f"decrypt mismatch, key={key}, length={length}" )
+                if length >= BLOCK_LENGTH and cipher.decrypt( cipher.encrypt( data ) ) != data:
+                    raise AssertionError( f"round trip mismatch, key={key}, length={length}" )
+                checked += 1
+    return checked
+
+
+def bench( engine, frames: list[ bytes ] ) -> tuple[ float, float ]:
+    begin = time.perf_counter()
+    encrypted = [ engine.encrypt( frame ) for frame in frames ]
+    encrypt_time = time.perf_counter() - begin
+    begin = time.perf_counter()
+    for frame in encrypted:
+        engine.decrypt( frame )
+    decrypt_time = time.perf_counter() - begin
+    return encrypt_time, decrypt_time
+
+
+def run( count: int = FRAMES_COUNT, length: int = FRAME_LENGTH ) -> dict[ str, float ]:
+    checked = verify()
+    rnd = random.Random( 2 )
+    frames = [ rnd.randbytes( length ) for _ in range( count ) ]
+    total_mb = count * length / 1e6
+
+    result: dict[ str, float ] = { "verified_buffers": checked, "frame_length": length }
+    for name, engine in ( ("legacy", LegacyCipher( INTEGRATION_KEY )), ("cipher", IntegraCipher( INTEGRATION_KEY )) ):
+        encrypt_time, decrypt_time = bench( engine, frames )
+        result[ f"{name}_encrypt_mb_per_sec" ] = total_mb / encrypt_time
+        result[ f"{name}_decrypt_mb_per_sec" ] = total_mb / decrypt_time
+        result[ f"{name}_encrypt_frames_per_sec" ] = count / encrypt_time
+        result[ f"{name}_decrypt_frames_per_sec" ] = count / decrypt_time
+    return result
+
+
+def main():
+    for name, value in run().items():
+        print( f"{name:>32}: {value:,.2f}" )
+
+
+if __name__ == "__main__":
+    main()
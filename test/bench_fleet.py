@@ -0,0 +1,122 @@
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.client import IntegraClientOpts
+from satel_integra_api.fleet import IntegraFleet
+from satel_integra_api.notify import IntegraNotifyEvent
+from satel_integra_api.objects import Events
+from satel_integra_api.simulator import IntegraSimulator
+
+PANELS = 500
+DURATION = 5.0
+CHURN_RATE = 0.5
+POLL_INTERVAL = 1.0
+CONNECT_RATE = 250.0
+CONNECT_CONCURRENCY = 64
+RECONNECT_JITTER = 2.0
+WORKERS = 4
+SEED = 1
+
+
+async def loop_lag( stop: asyncio.Event, samples: list[ float ], period: float = 0.01 ) -> None:
+    """Event loop responsiveness, how late short sleeps wake up"""
+    while not stop.is_set():
+        begin = time.perf_counter()
+        await asyncio.sleep( period )
+        samples.append( time.perf_counter() - begin - period )
+
+
+async def wait_connected( fleet: IntegraFleet, count: int, timeout: float ) -> float:
+    begin = time.perf_counter()
+    while fleet.stats.connected < count and time.perf_counter() - begin < timeout:
+        await asyncio.sleep( 0.05 )
+    return time.perf_counter() - begin
+
+
+async def bench_fleet( panels: int, duration: float, seed: int ) -> dict[ str, float ]:
+    eventloop = asyncio.get_running_loop()
+    simulators = [ IntegraSimulator( churn_rate=CHURN_RATE, seed=seed + index ) for index in range( panels ) ]
+    for simulator in simulators:
+        await simulator.async_start()
+
+    fleet = IntegraFleet( eventloop, CONNECT_RATE, CONNECT_CONCURRENCY, RECONNECT_JITTER, WORKERS, seed )
+    for index, simulator in enumerate( simulators ):
+        fleet.add_tcp( f"panel-{index:03}", simulator.host, simulator.port, IntegraClientOpts.create( reconnect=-1 ) )
+
+    changes = [ 0 ]
+
+    async def on_item_changed( _, **__ ):
+        changes[ 0 ] += 1
+
+    fleet.subscribe( Events.EVENT_SYS_ITEM_CHANGED, on_item_changed )
+
+    tasks_before = len( asyncio.all_tasks() )
+    begin = time.perf_counter()
+    results = await fleet.async_connect()
+    connect_time = time.perf_counter() - begin
+    connect_wait_max = fleet.limiter.wait_max
+    tasks_per_panel = (len( asyncio.all_tasks() ) - tasks_before - panels) / panels  # simulator session task excluded
+
+    for system in fleet.systems.values():
+        await system.client.async_notify_events_setup( [ IntegraNotifyEvent.ZONES_VIOLATION, IntegraNotifyEvent.OUTPUTS_STATE ] )
+        system.client.poll_interval = POLL_INTERVAL
+    await asyncio.sleep( POLL_INTERVAL * 1.5 )
+
+    stop = asyncio.Event()
+    lag: list[ float ] = [ ]
+    lag_task = eventloop.create_task( loop_lag( stop, lag ) )
+    changes[ 0 ] = 0
+    requests_begin = fleet.stats.requests
+    await asyncio.sleep( duration )
+    events = changes[ 0 ]
+    requests = fleet.stats.requests - requests_begin
+    stop.set()
+    await lag_task
+    stats = fleet.stats
+
+    # network outage, every panel loses connection at once
+    for simulator in simulators:
+        for session in simulator.sessions:
+            session.close()
+    await asyncio.sleep( 0.1 )
+    recovery_time = await wait_connected( fleet, panels, 60.0 ) + 0.1
+    recovered = fleet.stats.connected
+
+    await fleet.async_shutdown()
+    for simulator in simulators:
+        await simulator.async_stop()
+
+    lag.sort()
+    return {
+        "panels": panels,
+        "connected": sum( 1 for result in results.values() if result ),
+        "connect_all_sec": connect_time,
+        "connect_wait_max_sec": connect_wait_max,
+        "tasks_per_panel": tasks_per_panel,
+        "item_events_per_sec": events / duration,
+        "requests_per_sec": requests / duration,
+        "request_latency_p50_ms": stats.latency.p50 * 1000,
+        "request_latency_p99_ms": stats.latency.p99 * 1000,
+        "loop_lag_p50_ms": lag[ len( lag ) // 2 ] * 1000 if lag else 0.0,
+        "loop_lag_p99_ms": lag[ int( len( lag ) * 0.99 ) ] * 1000 if lag else 0.0,
+        "reconnect_all_sec": recovery_time,
+        "reconnected": recovered,
+    }
+
+
+def run( panels: int = PANELS, duration: float = DURATION, seed: int = SEED ) -> dict[ str, float ]:
+    return asyncio.run( bench_fleet( panels, duration, seed ) )
+
+
+def main():
+    panels = int( sys.argv[ 1 ] ) if len( sys.argv ) > 1 else PANELS
+    for name, value in run( panels ).items():
+        print( f"{name:>24}: {value:,.4f}" )
+
+
+if __name__ == "__main__":
+    main()
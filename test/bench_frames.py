@@ -0,0 +1,124 @@
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.commands import IntegraCommand, IntegraCmdRawData
+from satel_integra_api.const import FRAME_SYNC, FRAME_SYNC_END, FRAME_SYNC_ESC, FRAME_READ_CHUNK
+from satel_integra_api.frames import IntegraFrameDecoder
+from satel_integra_api.messages import IntegraRequest
+
+FRAMES_COUNT = 20000
+
+
+def build_stream( count: int, seed: int = 1 ) -> tuple[ bytes, list[ bytes ] ]:
+    """Build raw channel data with a mix of zones (33 bytes) and troubles (48 bytes) frames"""
+    rnd = random.Random( seed )
+    frames = [ ]
+    for index in range( count ):
+        if index % 3 == 2:
+            command, size = IntegraCommand.READ_TROUBLES_PART1, 47
+        else:
+            command, size = IntegraCommand.READ_ZONES_VIOLATION, 32
+        data = bytes( rnd.choice( [ 0x00, 0x00, 0x01, 0x80, 0xFE, rnd.randrange( 256 ) ] ) for _ in range( size ) )
+        frames.append( IntegraRequest( command, IntegraCmdRawData( data ) ).get_payload() )
+    return b"".join( frames ), frames
+
+
+async def legacy_read_plain( reader: asyncio.StreamReader ) -> bytes:
+    """Byte-at-a-time reader as used by EncryptionHandler before the incremental decoder"""
+    in_message: bool = False
+    sync_bytes: int = 0
+    buffer: bytes = bytes()
+    raw: bytes = bytes()
+
+    while True:
+        read_chunk = await reader.read( 1 )
+        if len( read_chunk ) == 0:
+            raise EOFError()
+        raw += read_chunk
+        read_byte = read_chunk[ 0 ]
+
+        if read_byte == FRAME_SYNC:
+            if in_message:
+                if sync_bytes != 0:
+                    in_message = False
+                    buffer = bytes()
+                    raw = bytes()
+            sync_bytes += 1
+        else:
+            if in_message:
+                if sync_bytes == 0:
+                    buffer += bytes( [ read_byte ] )
+                elif sync_bytes == 1:
+                    if read_byte == FRAME_SYNC_ESC:
+                        buffer += bytes( [ FRAME_SYNC ] )
+                    elif read_byte == FRAME_SYNC_END:
+                        break
+                    else:
+                        in_message = False
+                        buffer = bytes()
+                        raw = bytes()
+            elif sync_bytes >= 2:
+                in_message = True
+                buffer += bytes( [ read_byte ] )
+            sync_bytes = 0
+
+    return buffer
+
+
+def make_reader( data: bytes ) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader( limit=len( data ) + 1 )
+    reader.feed_data( data )
+    reader.feed_eof()
+    return reader
+
+
+async def bench_legacy( data: bytes, count: int ) -> tuple[ float, list[ bytes ] ]:
+    reader = make_reader( data )
+    result = [ ]
+    begin = time.perf_counter()
+    for _ in range( count ):
+        result.append( await legacy_read_plain( reader ) )
+    return time.perf_counter() - begin, result
+
+
+async def bench_decoder( data: bytes, count: int ) -> tuple[ float, list[ bytes ] ]:
+    reader = make_reader( data )
+    decoder = IntegraFrameDecoder()
+    result = [ ]
+    begin = time.perf_counter()
+    while len( result ) < count:
+        chunk = await reader.read( FRAME_READ_CHUNK )
+        if not chunk:
+            break
+        result.extend( decoder.feed( chunk ) )
+    return time.perf_counter() - begin, result
+
+
+def run( count: int = FRAMES_COUNT ) -> dict[ str, float ]:
+    data, frames = build_stream( count )
+    legacy_time, legacy_frames = asyncio.run( bench_legacy( data, count ) )
+    decoder_time, decoder_frames = asyncio.run( bench_decoder( data, count ) )
+    if legacy_frames != decoder_frames:
+        raise AssertionError( "Decoder output differs from legacy reader" )
+
+    return {
+        "frames": count,
+        "bytes": len( data ),
+        "legacy_frames_per_sec": count / legacy_time,
+        "decoder_frames_per_sec": count / decoder_time,
+        "speedup": legacy_time / decoder_time,
+    }
+
+
+def main():
+    for name, value in run().items():
+        print( f"{name:>24}: {value:,.2f}" )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.base import IntegraMap, IntegraType
+from satel_integra_api.client import IntegraClientOpts
+from satel_integra_api.commands import IntegraCommand, IntegraCmdRawData
+from satel_integra_api.frames import IntegraFrameDecoder
+from satel_integra_api.messages import IntegraRequest, IntegraResponse
+from satel_integra_api.objects import Events, IntegraSystem
+
+FRAMES_COUNT = 5000
+SUBSCRIBERS = 4
+SEED = 1
+
+# state notifications with their data length and a data notification mixed in
+NOTIFY_COMMANDS: list[ tuple[ IntegraCommand, int ] ] = [
+    (IntegraCommand.READ_ZONES_VIOLATION, 16),
+    (IntegraCommand.READ_ZONES_ALARM, 16),
+    (IntegraCommand.READ_OUTPUTS_STATE, 16),
+    (IntegraCommand.READ_PARTS_ARMED_REALLY, 4),
+    (IntegraCommand.READ_DOORS_OPENED, 8),
+]
+
+
+def build_frames( count: int, seed: int ) -> list[ bytes ]:
+    """Raw frames as sent by panel, every frame flips few bits of previous state of the same command"""
+    rnd = random.Random( seed )
+    states = { command: bytearray( size ) for command, size in NOTIFY_COMMANDS }
+    frames = [ ]
+    for index in range( count ):
+        if index % 10 == 9:
+            data = bytes( [ rnd.randint( 1, 128 ), 0x00, rnd.randint( 0x6E, 0xC8 ) ] )
+            frames.append( IntegraRequest.encode_frame( IntegraCommand.READ_ZONE_TEMPERATURE, data ) )
+            continue
+        command, size = NOTIFY_COMMANDS[ rnd.randrange( len( NOTIFY_COMMANDS ) ) ]
+        state = states[ command ]
+        for _ in range( rnd.randint( 1, 3 ) ):
+            bit = rnd.randrange( size * 8 )
+            state[ bit >> 3 ] ^= 1 << (bit & 7)
+        frames.append( IntegraRequest( command, IntegraCmdRawData( bytes( state ) ) ).get_payload() )
+    return frames
+
+
+def make_system( eventloop: asyncio.AbstractEventLoop ) -> IntegraSystem:
+    """System with objects initialized for INTEGRA 128 PLUS, its client is never connected"""
+    system = IntegraSystem.tcp( "127.0.0.1", 7094, eventloop, IntegraClientOpts.create( reconnect=0 ) )
+    system.client._caps = IntegraMap.type_to_caps( IntegraType.INTEGRA_128_PLUS )
+    system._init_system()
+    return system
+
+
+async def bench_propagation( frames: list[ bytes ], subscribers: int ) -> dict[ str, float ]:
+    system = make_system( asyncio.get_running_loop() )
+    client = system.client
+    received = [ 0 ]
+
+    async def on_item_changed( _: str, **kwargs ):
+        received[ 0 ] += 1
+
+    for _ in range( subscribers ):
+        system.subscribe( Events.EVENT_SYS_ITEM_CHANGED, on_item_changed )
+        system.subscribe( Events.EVENT_SYS_EVENT, on_item_changed )
+
+    # first frame of every command reports all items, let objects settle before measuring
+    decoder = IntegraFrameDecoder()
+    for frame in frames[ :len( NOTIFY_COMMANDS ) * 4 ]:
+        for buffer in decoder.feed( frame ):
+            await client._async_do_channel_notification( None, IntegraResponse.from_bytes( buffer ) )
+    received[ 0 ] = 0
+
+    latencies = [ ]
+    begin = time.perf_counter()
+    for frame in frames:
+        frame_begin = time.perf_counter()
+        for buffer in decoder.feed( frame ):
+            await client._async_do_channel_notification( None, IntegraResponse.from_bytes( buffer ) )
+        latencies.append( time.perf_counter() - frame_begin )
+    elapsed = time.perf_counter() - begin
+
+    latencies.sort()
+    return {
+        "frames": len( frames ),
+        "subscribers": subscribers,
+        "deliveries": received[ 0 ],
+        "frames_per_sec": len( frames ) / elapsed,
+        "deliveries_per_sec": received[ 0 ] / elapsed,
+        "frame_latency_p50_us": statistics.median( latencies ) * 1e6,
+        "frame_latency_p99_us": latencies[ int( len( latencies ) * 0.99 ) ] * 1e6,
+    }
+
+
+def run( count: int = FRAMES_COUNT, subscribers: int = SUBSCRIBERS, seed: int = SEED ) -> dict[ str, float ]:
+    return asyncio.run( bench_propagation( build_frames( count, seed ), subscribers ) )
+
+
+def main():
+    for name, value in run().items():
+        print( f"{name:>24}: {value:,.2f}" )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.channel_tcp import IntegraChannelTCP
+from satel_integra_api.commands import IntegraCommand, IntegraCmdRawData, IntegraCmdReadElementData
+from satel_integra_api.elements import IntegraZoneElement
+from satel_integra_api.frames import IntegraFrameDecoder
+from satel_integra_api.messages import IntegraRequest, IntegraResponse
+
+ELEMENTS_COUNT = 256
+NETWORK_RTT = 0.010
+PANEL_PROCESSING = 0.0005
+WINDOWS = [ 1, 2, 4, 8, 16 ]
+
+
+class StandInPanel:
+    """Minimal panel answering ELEMENT_READ_NAME requests in order, each request takes processing time on
+    the panel and response is delivered after network round trip"""
+
+    def __init__( self, rtt: float, processing: float ):
+        self._rtt = rtt
+        self._processing = processing
+        self._busy_until = 0.0
+        self._server: asyncio.Server | None = None
+
+    @property
+    def port( self ) -> int:
+        return self._server.sockets[ 0 ].getsockname()[ 1 ]
+
+    async def async_start( self ):
+        self._server = await asyncio.start_server( self._on_client, "127.0.0.1", 0 )
+
+    async def async_stop( self ):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def _response( self, request: IntegraResponse ) -> bytes:
+        data = request.data[ :2 ] + f"Zone {request.data[ 1 ]:<11}".encode( "ascii" )
+        return IntegraRequest( request.command, IntegraCmdRawData( data ) ).get_payload()
+
+    async def _on_client( self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter ):
+        loop = asyncio.get_running_loop()
+        decoder = IntegraFrameDecoder()
+        while chunk := await reader.read( 4096 ):
+            for frame in decoder.feed( chunk ):
+                request = IntegraResponse.from_bytes( frame )
+                now = loop.time()
+                self._busy_until = max( self._busy_until, now + self._rtt / 2 ) + self._processing
+                loop.call_at( self._busy_until + self._rtt / 2, writer.write, self._response( request ) )
+        writer.close()
+
+
+async def bench_window( panel: StandInPanel, window: int, count: int ) -> float:
+    """Load element names the same way IntegraSystem does, in batches of window size"""
+    loop = asyncio.get_running_loop()
+    channel = IntegraChannelTCP( loop, "127.0.0.1", panel.port, "" )
+    channel.pipeline_window = window
+    await channel.async_connect()
+
+    async def load( element_no: int ):
+        request = IntegraRequest( IntegraCommand.ELEMENT_READ_NAME, IntegraCmdReadElementData( IntegraZoneElement, element_no ) )
+        response = await channel._async_send_request( request, 5.0 )
+        if response.data[ 1 ] != element_no & 0xFF:
+            raise AssertionError( f"Response for element {response.data[ 1 ]} received, expected {element_no}" )
+
+    begin = time.perf_counter()
+    for index in range( 1, count + 1, window ):
+        await asyncio.gather( *[ load( element_no ) for element_no in range( index, min( index + window, count + 1 ) ) ] )
+    elapsed = time.perf_counter() - begin
+
+    await channel.async_disconnect()
+    return elapsed
+
+
+async def bench( count: int, rtt: float, processing: float ) -> dict[ str, float ]:
+    panel = StandInPanel( rtt, processing )
+    await panel.async_start()
+    result: dict[ str, float ] = { "elements": count, "rtt_ms": rtt * 1000 }
+    try:
+        baseline = 0.0
+        for window in WINDOWS:
+            elapsed = await bench_window( panel, window, count )
+            baseline = baseline or elapsed
+            result[ f"window_{window}_load_sec" ] = elapsed
+            result[ f"window_{window}_speedup" ] = baseline / elapsed
+    finally:
+        await panel.async_stop()
+    return result
+
+
+def run( count: int = ELEMENTS_COUNT, rtt: float = NETWORK_RTT, processing: float = PANEL_PROCESSING ) -> dict[ str, float ]:
+    return asyncio.run( bench( count, rtt, processing ) )
+
+
+def main():
+    for name, value in run().items():
+        print( f"{name:>24}: {value:,.3f}" )
+
+
+if __name__ == "__main__":
+    main()
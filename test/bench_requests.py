@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.commands import IntegraCommand, IntegraCmdRawData, IntegraCmdReadElementData, IntegraCmdZoneData
+from satel_integra_api.elements import IntegraZoneElement
+from satel_integra_api.messages import IntegraPreparedRequest, IntegraRequest
+
+ITERATIONS = 50000
+
+
+def polling_requests() -> list[ tuple[ IntegraCommand, object ] ]:
+    """Requests repeated by system monitor and ping task in steady state"""
+    return [
+        (IntegraCommand.READ_SYSTEM_CHANGES, IntegraCmdRawData( bytes( 2 ) )),
+        (IntegraCommand.READ_ZONES_VIOLATION, b"\xff"),
+        (IntegraCommand.READ_OUTPUTS_STATE, b"\xff"),
+        (IntegraCommand.READ_ZONE_TEMPERATURE, IntegraCmdZoneData( 12 )),
+        (IntegraCommand.ELEMENT_READ_NAME, IntegraCmdReadElementData( IntegraZoneElement, 1 )),
+    ]
+
+
+def bench_uncached( requests, iterations: int ) -> float:
+    begin = time.perf_counter()
+    for index in range( iterations ):
+        command, data = requests[ index % len( requests ) ]
+        data_bytes = IntegraRequest( command, data ).get_data_bytes()
+        IntegraRequest.encode_frame( command, data_bytes )
+    return time.perf_counter() - begin
+
+
+def bench_cached( requests, iterations: int ) -> float:
+    begin = time.perf_counter()
+    for index in range( iterations ):
+        command, data = requests[ index % len( requests ) ]
+        IntegraRequest( command, data ).get_payload()
+    return time.perf_counter() - begin
+
+
+def bench_prepared( requests, iterations: int ) -> float:
+    prepared = [ IntegraPreparedRequest( command, data ) for command, data in requests ]
+    begin = time.perf_counter()
+    for index in range( iterations ):
+        prepared[ index % len( prepared ) ].get_payload()
+    return time.perf_counter() - begin
+
+
+def run( iterations: int = ITERATIONS ) -> dict[ str, float ]:
+    requests = polling_requests()
+    for command, data in requests:
+        if IntegraRequest( command, data ).get_payload() != IntegraPreparedRequest( command, data ).get_payload():
+            raise AssertionError( f"Prepared frame differs for {command.name}" )
+
+    uncached = bench_uncached( requests, iterations )
+    cached = bench_cached( requests, iterations )
+    prepared = bench_prepared( requests, iterations )
+    return {
+        "uncached_frames_per_sec": iterations / uncached,
+        "cached_frames_per_sec": iterations / cached,
+        "prepared_frames_per_sec": iterations / prepared,
+        "cached_speedup": uncached / cached,
+        "prepared_speedup": uncached / prepared,
+        "cache_hits": IntegraRequest.frame_cache_info()[ "hits" ],
+    }
+
+
+def main():
+    for name, value in run().items():
+        print( f"{name:>24}: {value:,.2f}" )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.client import IntegraClientOpts
+from satel_integra_api.notify import IntegraNotifyEvent
+from satel_integra_api.objects import Events
+from satel_integra_api.shards import IntegraShardedFleet
+from satel_integra_api.simulator import IntegraSimulator
+
+PANELS = 64
+DURATION = 3.0
+WARMUP = 1.0
+CHURN_RATE = 20.0
+POLL_INTERVAL = 0.005
+SEED = 1
+
+
+def simulators_main( conn, count: int, seed: int ) -> None:
+    """Simulators of one shard run in own process, so panel side does not limit the client side"""
+
+    async def async_main():
+        simulators = [ IntegraSimulator( churn_rate=CHURN_RATE, seed=seed + index ) for index in range( count ) ]
+        for simulator in simulators:
+            await simulator.async_start()
+        conn.send( [ simulator.port for simulator in simulators ] )
+        await asyncio.get_running_loop().run_in_executor( None, conn.recv )
+        for simulator in simulators:
+            await simulator.async_stop()
+
+    asyncio.run( async_main() )
+
+
+async def bench_shards( processes: int, panels: int, duration: float, seed: int ) -> dict[ str, float ]:
+    context = multiprocessing.get_context( "spawn" )
+    hosts = [ ]
+    ports: list[ int ] = [ ]
+    for host_no in range( processes ):
+        conn, child_conn = context.Pipe()
+        host = context.Process( target=simulators_main, args=(child_conn, panels // processes, seed + host_no * panels), daemon=True )
+        host.start()
+        hosts.append( (host, conn) )
+    for _, conn in hosts:
+        ports += await asyncio.get_running_loop().run_in_executor( None, conn.recv )
+
+    sharded = IntegraShardedFleet( asyncio.get_running_loop(), processes=processes, connect_rate=1000.0, connect_concurrency=256, seed=seed )
+    for index, port in enumerate( ports ):
+        await sharded.async_add_tcp( f"panel-{index:03}", "127.0.0.1", port, IntegraClientOpts.create( reconnect=-1 ) )
+
+    changes = [ 0 ]
+
+    async def on_item_changed( _, **__ ):
+        changes[ 0 ] += 1
+
+    sharded.subscribe( Events.EVENT_SYS_ITEM_CHANGED, on_item_changed )
+    await sharded.async_start()
+    results = await sharded.async_connect()
+
+    async def monitor( name: str ) -> None:
+        remote = sharded.remote( name )
+        await remote.async_monitor_start( [ IntegraNotifyEvent.ZONES_VIOLATION, IntegraNotifyEvent.OUTPUTS_STATE ] )
+        await remote.client.async_set( "poll_interval", POLL_INTERVAL )
+
+    await asyncio.gather( *[ monitor( name ) for name in sharded.panels ] )
+    await asyncio.sleep( WARMUP )
+
+    before = await sharded.async_stats()
+    changes[ 0 ] = 0
+    ipc_before = sharded.ipc_rx_bytes
+    begin = time.perf_counter()
+    await asyncio.sleep( duration )
+    after = await sharded.async_stats()
+    elapsed = time.perf_counter() - begin
+    events = changes[ 0 ]
+    ipc_bytes = sharded.ipc_rx_bytes - ipc_before
+
+    await sharded.async_stop()
+    for host, conn in hosts:
+        conn.send( None )
+        host.join( 10.0 )
+
+    requests = sum( shard[ "requests" ] for shard in after ) - sum( shard[ "requests" ] for shard in before )
+    cpu_time = sum( shard[ "cpu_time" ] for shard in after ) - sum( shard[ "cpu_time" ] for shard in before )
+    return {
+        "connected": sum( 1 for result in results.values() if result ),
+        "requests_per_sec": requests / elapsed,
+        "merged_events_per_sec": events / elapsed,
+        "ipc_bytes_per_event": ipc_bytes / events if events else 0.0,
+        "shard_cpu_per_request_us": cpu_time / requests * 1e6 if requests else 0.0,
+    }
+
+
+def process_counts() -> list[ int ]:
+    """1, 2, 4, ... up to number of cores, at least two points"""
+    counts = [ 1, 2 ]
+    while counts[ -1 ] * 2 <= (os.cpu_count() or 1):
+        counts.append( counts[ -1 ] * 2 )
+    return counts
+
+
+def run( panels: int = PANELS, duration: float = DURATION, seed: int = SEED ) -> dict[ str, float ]:
+    result: dict[ str, float ] = { "cpu_count": os.cpu_count() or 1 }
+    base = None
+    for processes in process_counts():
+        metrics = asyncio.run( bench_shards( processes, panels, duration, seed ) )
+        base = metrics[ "requests_per_sec" ] if base is None else base
+        for name, value in metrics.items():
+            result[ f"p{processes}_{name}" ] = value
+        # ideal is number of processes while there are enough cores
+        result[ f"p{processes}_scaling" ] = metrics[ "requests_per_sec" ] / base if base else 0.0
+    return result
+
+
+def main():
+    panels = int( sys.argv[ 1 ] ) if len( sys.argv ) > 1 else PANELS
+    for name, value in run( panels ).items():
+        print( f"{name:>32}: {value:,.4f}" )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.client import IntegraClient, IntegraClientOpts
+from satel_integra_api.commands import IntegraCommand, IntegraCmdData
+from satel_integra_api.notify import IntegraNotifyEvent, IntegraZonesNotifyEvents
+from satel_integra_api.troubles import IntegraTroublesRegionDefs, IntegraTroublesSource
+
+ITERATIONS = 20000
+SEED = 1
+
+ZONES_BITS = 256
+TROUBLES_SIZE = 47
+
+
+def make_client( eventloop: asyncio.AbstractEventLoop ) -> IntegraClient:
+    """Client which is never connected, only its state tracking methods are used"""
+    return IntegraClient.tcp( "127.0.0.1", 7094, eventloop, IntegraClientOpts.create( reconnect=0 ) )
+
+
+def state_sequence( rnd: random.Random, count: int, size: int, flips: int ) -> list[ bytes ]:
+    """Sequence of states where each state differs from previous one by up to given number of bits"""
+    state = bytearray( rnd.randbytes( size ) )
+    result = [ ]
+    for _ in range( count ):
+        for _ in range( rnd.randint( 0, flips ) ):
+            bit = rnd.randrange( size * 8 )
+            state[ bit >> 3 ] ^= 1 << (bit & 7)
+        result.append( bytes( state ) )
+    return result
+
+
+def command_payloads( rnd: random.Random ) -> list[ tuple[ IntegraCommand, bytes ] ]:
+    """Responses decoded by IntegraCmdData.from_command when client passes data change notifications"""
+    return [
+        (IntegraCommand.READ_RTC_AND_STATUS, bytes( [ 0x20, 0x24, 0x03, 0x15, 0x12, 0x30, 0x45, 0x45, 0x02 ] )),
+        (IntegraCommand.READ_ZONE_TEMPERATURE, bytes( [ rnd.randint( 1, 128 ), 0x00, rnd.randint( 0x6E, 0xC8 ) ] )),
+        (IntegraCommand.READ_OUTPUT_POWER, bytes( [ rnd.randint( 1, 128 ), 0x01, rnd.randrange( 256 ) ] )),
+        (IntegraCommand.READ_ZONES_VIOLATION, rnd.randbytes( 32 )),
+        (IntegraCommand.READ_PARTS_ARMED_REALLY, rnd.randbytes( 4 )),
+        (IntegraCommand.READ_TROUBLES_PART1, rnd.randbytes( TROUBLES_SIZE )),
+        (IntegraCommand.READ_INTEGRA_VERSION, bytes( [ 0x48 ] ) + b"12320240315" + bytes( [ 0x00, 0xFF ] )),
+        (IntegraCommand.READ_MODULE_VERSION, b"21020240101" + bytes( [ 0x07 ] )),
+    ]
+
+
+def bench_diff_state( client: IntegraClient, states: list[ bytes ] ) -> tuple[ float, int ]:
+    changes = 0
+    begin = time.perf_counter()
+    for state in states:
+        changes += len( client._get_diff_state( IntegraNotifyEvent.ZONES_VIOLATION, state, ZONES_BITS ) )
+    return time.perf_counter() - begin, changes
+
+
+def bench_full_refresh( client: IntegraClient, rnd: random.Random, refreshes: int ) -> tuple[ float, int ]:
+    """Every zone event of 256 zones panel read at once (resync), changed items are iterated as subscribers do"""
+    states = { notify_event: state_sequence( rnd, refreshes, ZONES_BITS // 8, 8 ) for notify_event in IntegraZonesNotifyEvents }
+    changes = 0
+    begin = time.perf_counter()
+    for index in range( refreshes ):
+        for notify_event, sequence in states.items():
+            for _ in client._get_diff_state( notify_event, sequence[ index ], ZONES_BITS ).items():
+                changes += 1
+    return time.perf_counter() - begin, changes
+
+
+def bench_troubles_changed( client: IntegraClient, states: list[ bytes ] ) -> tuple[ float, int ]:
+    regions = [ region for region in IntegraTroublesRegionDefs.get_regions( IntegraNotifyEvent.TROUBLES_PART1 )
+                if region.source in [ IntegraTroublesSource.ZONES, IntegraTroublesSource.EXPANDERS, IntegraTroublesSource.MANIPULATORS ] ]
+    changes = 0
+    begin = time.perf_counter()
+    for state in states:
+        for region in regions:
+            changes += len( client._get_troubles_changed( region.region_id, region.get_data( state ) ) )
+    return time.perf_counter() - begin, changes
+
+
+def bench_from_command( payloads: list[ tuple[ IntegraCommand, bytes ] ], iterations: int ) -> float:
+    begin = time.perf_counter()
+    for index in range( iterations ):
+        command, data = payloads[ index % len( payloads ) ]
+        IntegraCmdData.from_command( command, data )
+    return time.perf_counter() - begin
+
+
+def run( iterations: int = ITERATIONS, seed: int = SEED ) -> dict[ str, float ]:
+    rnd = random.Random( seed )
+    eventloop = asyncio.new_event_loop()
+    try:
+        client = make_client( eventloop )
+        zones_sparse = state_sequence( rnd, iterations, ZONES_BITS // 8, 2 )
+        zones_dense = state_sequence( rnd, iterations, ZONES_BITS // 8, 64 )
+        troubles = state_sequence( rnd, iterations, TROUBLES_SIZE, 2 )
+        payloads = command_payloads( rnd )
+
+        sparse_time, sparse_changes = bench_diff_state( client, zones_sparse )
+        client._notify_event_states.clear()
+        dense_time, dense_changes = bench_diff_state( client, zones_dense )
+        troubles_time, troubles_changes = bench_troubles_changed( client, troubles )
+        client._notify_event_states.clear()
+        refresh_time, refresh_changes = bench_full_refresh( client, rnd, iterations // 10 )
+        from_command_time = bench_from_command( payloads, iterations )
+    finally:
+        eventloop.close()
+
+    return {
+        "iterations": iterations,
+        "diff_state_sparse_per_sec": iterations / sparse_time,
+        "diff_state_sparse_changes": sparse_changes,
+        "diff_state_dense_per_sec": iterations / dense_time,
+        "diff_state_dense_changes": dense_changes,
+        "troubles_changed_per_sec": iterations / troubles_time,
+        "troubles_changed_changes": troubles_changes,
+        "full_refresh_us": refresh_time / (iterations // 10) * 1e6,
+        "full_refresh_changes": refresh_changes,
+        "from_command_per_sec": iterations / from_command_time,
+    }
+
+
+def main():
+    for name, value in run().items():
+        print( f"{name:>28}: {value:,.2f}" )
+
+
+if __name__ == "__main__":
+    main()
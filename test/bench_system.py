@@ -0,0 +1,65 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.base import IntegraType
+from satel_integra_api.client import IntegraClientOpts
+from satel_integra_api.objects import IntegraSystem
+from satel_integra_api.simulator import IntegraSimulator
+
+INTEGRA_TYPE = IntegraType.INTEGRA_128_PLUS
+PIPELINE_WINDOW = 8
+WARM_RUNS = 3
+SEED = 1
+
+
+async def load( simulator: IntegraSimulator, cache_file: str ) -> tuple[ float, int ]:
+    opts = IntegraClientOpts.create( reconnect=0, pipeline_window=PIPELINE_WINDOW )
+    system = IntegraSystem.tcp( simulator.host, simulator.port, asyncio.get_running_loop(), opts )
+    if not await system.async_connect():
+        raise AssertionError( "Unable to connect to simulator" )
+    try:
+        begin = time.perf_counter()
+        system.system_info_load( cache_file )
+        if not await system.async_system_info_wait_for():
+            raise AssertionError( "System info load failed" )
+        elapsed = time.perf_counter() - begin
+        return elapsed, system._system_info_load.total
+    finally:
+        await system.async_disconnect()
+
+
+async def bench_system_info_load( warm_runs: int, seed: int ) -> dict[ str, float ]:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache_file = os.path.join( temp_dir, "elements.json" )
+        async with IntegraSimulator( integra_type=INTEGRA_TYPE, seed=seed ) as simulator:
+            cold_time, elements = await load( simulator, cache_file )
+            warm_times = [ (await load( simulator, cache_file ))[ 0 ] for _ in range( warm_runs ) ]
+        cache_size = os.path.getsize( cache_file )
+
+    warm_time = min( warm_times )
+    return {
+        "elements": elements,
+        "cache_bytes": cache_size,
+        "cold_load_sec": cold_time,
+        "warm_load_sec": warm_time,
+        "warm_elements_per_sec": elements / warm_time,
+        "warm_speedup": cold_time / warm_time,
+    }
+
+
+def run( warm_runs: int = WARM_RUNS, seed: int = SEED ) -> dict[ str, float ]:
+    return asyncio.run( bench_system_info_load( warm_runs, seed ) )
+
+
+def main():
+    for name, value in run().items():
+        print( f"{name:>24}: {value:,.4f}" )
+
+
+if __name__ == "__main__":
+    main()
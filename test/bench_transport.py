@@ -0,0 +1,95 @@
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.channel import IntegraChannelEvent
+from satel_integra_api.channel_tcp import IntegraChannelTCP, IntegraTcpTransport
+from satel_integra_api.commands import IntegraCommand, IntegraCmdRawData
+from satel_integra_api.messages import IntegraRequest
+
+LATENCY_SAMPLES = 2000
+BURST_FRAMES = 20000
+
+
+def build_frame( index: int ) -> bytes:
+    data = index.to_bytes( 4, "little" ) + bytes( 28 )
+    return IntegraRequest( IntegraCommand.READ_ZONES_VIOLATION, IntegraCmdRawData( data ) ).get_payload()
+
+
+async def bench_transport( transport: IntegraTcpTransport, samples: int, burst: int ) -> dict[ str, float ]:
+    """Measure time from server write to notification callback and CPU time spent per frame"""
+    loop = asyncio.get_running_loop()
+    writers: list[ asyncio.StreamWriter ] = [ ]
+    connected = asyncio.Event()
+    received: list[ float ] = [ ]
+    notify = asyncio.Event()
+
+    async def on_client( _: asyncio.StreamReader, writer: asyncio.StreamWriter ):
+        writers.append( writer )
+        connected.set()
+
+    async def on_event( _, event: IntegraChannelEvent, __ ):
+        if event == IntegraChannelEvent.NOTIFICATION:
+            received.append( time.perf_counter() )
+            notify.set()
+
+    server = await asyncio.start_server( on_client, "127.0.0.1", 0 )
+    port = server.sockets[ 0 ].getsockname()[ 1 ]
+    channel = IntegraChannelTCP( loop, "127.0.0.1", port, "", on_event, transport )
+    await channel.async_connect()
+    await connected.wait()
+    writer = writers[ 0 ]
+
+    frames = [ build_frame( index ) for index in range( max( samples, burst ) ) ]
+
+    latencies = [ ]
+    for index in range( samples ):
+        notify.clear()
+        sent = time.perf_counter()
+        writer.write( frames[ index ] )
+        await notify.wait()
+        latencies.append( received[ -1 ] - sent )
+
+    received.clear()
+    cpu_begin = time.process_time()
+    wall_begin = time.perf_counter()
+    writer.write( b"".join( frames[ :burst ] ) )
+    await writer.drain()
+    while len( received ) < burst:
+        notify.clear()
+        await notify.wait()
+    cpu_time = time.process_time() - cpu_begin
+    wall_time = time.perf_counter() - wall_begin
+
+    await channel.async_disconnect()
+    writer.close()
+    server.close()
+    await server.wait_closed()
+
+    latencies.sort()
+    return {
+        "latency_mean_us": statistics.fmean( latencies ) * 1e6,
+        "latency_p50_us": latencies[ len( latencies ) // 2 ] * 1e6,
+        "latency_p99_us": latencies[ int( len( latencies ) * 0.99 ) ] * 1e6,
+        "cpu_per_frame_us": cpu_time / burst * 1e6,
+        "frames_per_sec": burst / wall_time,
+    }
+
+
+def run( samples: int = LATENCY_SAMPLES, burst: int = BURST_FRAMES ) -> dict[ str, dict[ str, float ] ]:
+    return { transport.value: asyncio.run( bench_transport( transport, samples, burst ) ) for transport in IntegraTcpTransport }
+
+
+def main():
+    for transport, result in run().items():
+        print( f"{transport}:" )
+        for name, value in result.items():
+            print( f"{name:>24}: {value:,.2f}" )
+
+
+if __name__ == "__main__":
+    main()
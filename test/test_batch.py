@@ -0,0 +1,52 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.client import IntegraClientOpts
+from satel_integra_api.diff import IntegraStateDiff
+from satel_integra_api.notify import IntegraNotifyEvent, IntegraNotifySource
+from satel_integra_api.objects import Events, IntegraSystem
+from satel_integra_api.simulator import IntegraSimulator
+
+
+def test_batched_changes():
+    """Changes of one frame arrive in single batch, per item subscribers get every change after the batch"""
+
+    async def async_test():
+        async with IntegraSimulator() as simulator:
+            system = IntegraSystem.tcp( simulator.host, simulator.port, asyncio.get_running_loop(), IntegraClientOpts.create( reconnect=-1 ) )
+            assert await system.async_connect()
+            events = [ ]
+
+            async def on_items_changed( _, changes: list, **__ ):
+                events.append( [ (item.id_str, notify_event, old, new) for item, notify_event, old, new in changes ] )
+
+            async def on_item_changed( _, item, state, previous, **__ ):
+                events.append( (item.id_str, state.value, previous) )
+
+            system.subscribe( Events.EVENT_SYS_ITEMS_CHANGED, on_items_changed )
+            system.subscribe( Events.EVENT_SYS_ITEM_CHANGED, on_item_changed )
+            frame = IntegraStateDiff.compute( 0, 0b10010 )
+            await system._async_client_state_changed_handler( system.client, IntegraNotifySource.ZONES, IntegraNotifyEvent.ZONES_VIOLATION, frame )
+            assert events == [ [ ("zone_2", IntegraNotifyEvent.ZONES_VIOLATION, False, True), ("zone_5", IntegraNotifyEvent.ZONES_VIOLATION, False, True) ],
+                               ("zone_2", True, False), ("zone_5", True, False) ]
+            assert system.batch is None
+
+            # without batching only per item subscribers are called, at once
+            events.clear()
+            system.batch_changes = False
+            frame = IntegraStateDiff.compute( 0b10010, 0b00010 )
+            await system._async_client_state_changed_handler( system.client, IntegraNotifySource.ZONES, IntegraNotifyEvent.ZONES_VIOLATION, frame )
+            assert events == [ ("zone_5", False, True) ]
+            await system.async_disconnect()
+
+    asyncio.run( async_test() )
+
+
+if __name__ == "__main__":
+    for name, test in list( globals().items() ):
+        if name.startswith( "test_" ) and callable( test ):
+            test()
+            print( f"{name}: OK" )
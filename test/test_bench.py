@@ -0,0 +1,50 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert( 0, os.path.dirname( __file__ ) )
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+import bench
+
+
+def test_flatten():
+    """Nested metrics are joined into single level"""
+    assert bench.flatten( { "stream": { "latency_p50_us": 1.0, "burst": { "frames": 2 } }, "total": 3 } ) == { "stream_latency_p50_us": 1.0, "stream_burst_frames": 2, "total": 3 }
+
+
+def test_repeat_and_compare():
+    """Benchmark returning nested metrics runs repeatedly and compares with baseline, also with nested one"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        baseline = os.path.join( temp_dir, "baseline.json" )
+        current = os.path.join( temp_dir, "current.json" )
+        with contextlib.redirect_stderr( io.StringIO() ):
+            bench.main( [ "--only", "transport", "--repeat", "2", "-o", baseline ] )
+        with open( baseline ) as f:
+            results = json.load( f )
+        metrics = results[ "benchmarks" ][ "transport" ][ "metrics" ]
+        assert results[ "environment" ][ "repeat" ] == 2 and metrics[ "stream_latency_p50_us" ] > 0 and metrics[ "protocol_frames_per_sec" ] > 0
+        assert all( isinstance( value, (int, float) ) for value in metrics.values() )
+
+        # baseline stored with nested metrics
+        results[ "benchmarks" ][ "transport" ][ "metrics" ] = { "stream": { "latency_p50_us": metrics[ "stream_latency_p50_us" ] } }
+        nested = os.path.join( temp_dir, "nested.json" )
+        with open( nested, "w" ) as f:
+            json.dump( results, f )
+
+        for base_file, expected in [ (baseline, len( metrics )), (nested, 1) ]:
+            output = io.StringIO()
+            with contextlib.redirect_stdout( output ), contextlib.redirect_stderr( io.StringIO() ):
+                bench.main( [ "--only", "transport", "--repeat", "2", "-o", current, "--compare", base_file ] )
+            lines = [ line for line in output.getvalue().splitlines() if line.strip().startswith( "transport." ) ]
+            assert len( lines ) == expected and any( "transport.stream_latency_p50_us" in line for line in lines )
+
+
+if __name__ == "__main__":
+    for name, test in list( globals().items() ):
+        if name.startswith( "test_" ) and callable( test ):
+            test()
+            print( f"{name}: OK" )
@@ -0,0 +1,116 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.base import IntegraType
+from satel_integra_api.capture import IntegraCaptureDirection, IntegraCaptureReader, IntegraCaptureWriter
+from satel_integra_api.client import IntegraClient, IntegraClientOpts
+from satel_integra_api.commands import IntegraCommand
+from satel_integra_api.notify import IntegraNotifyEvent
+from satel_integra_api.simulator import IntegraSimulator
+
+INTEGRATION_KEY = "Key123456789"
+
+
+def test_writer_reader_round_trip():
+    """Records are read back in order with their direction, command and payload"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_name = os.path.join( temp_dir, "capture.bin" )
+        records = [ (IntegraCaptureDirection.TX, 0x7F, b""), (IntegraCaptureDirection.RX, 0x7F, bytes( 7 )), (IntegraCaptureDirection.RX, 0x00, b"\xfe" * 32) ]
+        with IntegraCaptureWriter( file_name ) as writer:
+            for direction, command, data in records:
+                writer.record( direction, command, data )
+        assert writer.closed and writer.records == len( records )
+
+        read = IntegraCaptureReader( file_name ).records()
+        assert [ (record.direction, record.command, record.data) for record in read ] == records
+        assert all( read[ index ].timestamp <= read[ index + 1 ].timestamp for index in range( len( read ) - 1 ) )
+
+
+async def async_record( simulator: IntegraSimulator, file_name: str, integration_key: str ) -> list[ list[ int ] ]:
+    """Connect to simulator with capture running, change zones and read them, returns violated zones as read"""
+    opts = IntegraClientOpts.create( integration_key=integration_key, reconnect=0 )
+    client = IntegraClient.tcp( "127.0.0.1", simulator.port, asyncio.get_running_loop(), opts )
+    client.capture_start( file_name )
+    assert await client.async_connect()
+    result = [ ]
+    for zone_no in [ 3, 5, 9 ]:
+        simulator.set_zone_violation( zone_no, True )
+        result.append( await client.async_read_zones_violation() )
+    client.capture_stop()
+    await client.async_disconnect()
+    return result
+
+
+async def async_replay( file_name: str, integration_key: str, speed: float ) -> list[ dict[ int, bool ] ]:
+    """Replay capture through client, returns zones violation changes passed by client notification path"""
+    opts = IntegraClientOpts.create( integration_key=integration_key, reconnect=0, resp_timeout=0.2 )
+    client = IntegraClient.replay( file_name, asyncio.get_running_loop(), opts, speed )
+    changes = [ ]
+
+    async def on_state_changed( _, __, notify_event: IntegraNotifyEvent, state: dict[ int, bool ] ):
+        if notify_event == IntegraNotifyEvent.ZONES_VIOLATION:
+            changes.append( state )
+
+    client.on_state_changed = on_state_changed
+    assert await client.async_connect()
+    assert client.integra_version.integra_type == IntegraType.INTEGRA_128_PLUS
+    assert await client._channel.async_wait_finished( 5.0 )
+    await asyncio.sleep( 0.05 )
+    await client.async_disconnect()
+    return changes
+
+
+def test_record_and_replay():
+    """Traffic recorded from simulator is replayed through client notification path at real and maximum speed"""
+
+    async def async_test():
+        for integration_key in [ "", INTEGRATION_KEY ]:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                file_name = os.path.join( temp_dir, "capture.bin" )
+                async with IntegraSimulator( integration_key=integration_key ) as simulator:
+                    read = await async_record( simulator, file_name, integration_key )
+                assert read == [ [ 3 ], [ 3, 5 ], [ 3, 5, 9 ] ]
+
+                records = IntegraCaptureReader( file_name ).records()
+                assert records[ 0 ].direction == IntegraCaptureDirection.TX and records[ 0 ].command == IntegraCommand.READ_INTEGRA_VERSION
+                assert sum( 1 for record in records if record.direction == IntegraCaptureDirection.RX and record.command == IntegraCommand.READ_ZONES_VIOLATION ) == 3
+
+                for speed in [ 1.0, 0.0 ]:
+                    changes = await async_replay( file_name, integration_key, speed )
+                    # first report carries every zone, following ones only changed zones
+                    assert changes[ 0 ][ 3 ] and not changes[ 0 ][ 5 ]
+                    assert changes[ 1: ] == [ { 5: True }, { 9: True } ]
+
+    asyncio.run( async_test() )
+
+
+def test_capture_started_on_connected_client():
+    """Capture started after connect stores version replies, so replay is able to connect"""
+
+    async def async_test():
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_name = os.path.join( temp_dir, "capture.bin" )
+            async with IntegraSimulator() as simulator:
+                client = IntegraClient.tcp( "127.0.0.1", simulator.port, asyncio.get_running_loop(), IntegraClientOpts.create( reconnect=0 ) )
+                assert await client.async_connect()
+                client.capture_start( file_name )
+                simulator.set_zone_violation( 2, True )
+                await client.async_read_zones_violation()
+                client.capture_stop()
+                await client.async_disconnect()
+
+            changes = await async_replay( file_name, "", 0.0 )
+            assert changes[ 0 ][ 2 ]
+
+    asyncio.run( async_test() )
+
+
+if __name__ == "__main__":
+    for name, test in list( globals().items() ):
+        if name.startswith( "test_" ) and callable( test ):
+            test()
+            print( f"{name}: OK" )
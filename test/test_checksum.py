@@ -0,0 +1,61 @@
+import os
+import random
+import sys
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.tools import IntegraHelper
+
+
+def checksum_reference( payload ) -> int:
+    """Checksum as per Satel manual, one bit rotation at a time"""
+    crc = 0x147A
+    for b in payload:
+        crc = ((crc << 1) & 0xFFFF) | (crc & 0x8000) >> 15
+        crc = crc ^ 0xFFFF
+        crc = (crc + (crc >> 8) + b) & 0xFFFF
+    return crc
+
+
+def test_checksum_manual_example():
+    # READ_ZONES_VIOLATION request from Satel integration protocol manual: FE FE 00 D7 E2 FE 0D
+    assert IntegraHelper.checksum( bytes( [ 0x00 ] ) ) == 0xD7E2
+    # ELEMENT_READ_NAME zone 1: FE FE EE 01 01 ...
+    assert IntegraHelper.checksum( bytes( [ 0xEE, 0x01, 0x01 ] ) ) == checksum_reference( bytes( [ 0xEE, 0x01, 0x01 ] ) )
+
+
+def test_checksum_random_payloads():
+    rnd = random.Random( 8 )
+    for length in range( 0, 80 ):
+        for _ in range( 200 ):
+            payload = rnd.randbytes( length )
+            assert IntegraHelper.checksum( payload ) == checksum_reference( payload ), payload.hex()
+
+
+def test_checksum_extreme_payloads():
+    for length in [ 1, 2, 33, 48, 300 ]:
+        for value in [ 0x00, 0x01, 0x7F, 0x80, 0xFE, 0xFF ]:
+            payload = bytes( [ value ] ) * length
+            assert IntegraHelper.checksum( payload ) == checksum_reference( payload ), payload.hex()
+
+
+def test_checksum_accepts_buffers():
+    payload = bytes( range( 48 ) )
+    expected = checksum_reference( payload )
+    assert IntegraHelper.checksum( bytearray( payload ) ) == expected
+    assert IntegraHelper.checksum( memoryview( payload ) ) == expected
+    assert IntegraHelper.checksum( list( payload ) ) == expected
+
+
+def test_checksum_table_compact():
+    """Transition table holds 16-bit values in flat array, not list of int objects"""
+    IntegraHelper.checksum( b"" )
+    table = IntegraHelper._checksum_table
+    assert table.itemsize == 2 and len( table ) == 0x10100 and table[ 0x10000: ] == table[ :0x100 ]
+
+
+if __name__ == "__main__":
+    for name, test in list( globals().items() ):
+        if name.startswith( "test_" ) and callable( test ):
+            test()
+            print( f"{name}: OK" )
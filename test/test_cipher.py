@@ -0,0 +1,56 @@
+import os
+import random
+import sys
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.cipher import IntegraCipher
+
+INTEGRATION_KEY = "IntegraKey12"
+
+# ( key, plain, encrypted ), produced by per-block implementation used before IntegraCipher
+VECTORS = [
+    (INTEGRATION_KEY, bytes( range( 6 ) ), bytes.fromhex( "4a2e664066f638d232e05b125c664e6c" )),
+    (INTEGRATION_KEY, bytes( range( 40 ) ), bytes.fromhex( "1e41b14253a2be9d9219da72d1e16f1afc0f180f80bcde1020026682228f87b61ae22c9a82ddc92b" )),
+    ("short", bytes( 16 ), bytes.fromhex( "0730854be243b0c1e6bf901c55bd0f53" )),
+]
+
+
+def test_vectors():
+    """Fixed key vectors, short data is padded to full block, partial last block is not"""
+    for key, plain, encrypted in VECTORS:
+        cipher = IntegraCipher( key )
+        assert cipher.encrypt( plain ) == encrypted, key
+        assert cipher.decrypt( encrypted ) == plain.ljust( IntegraCipher.BLOCK_LENGTH, b"\x00" )
+    assert IntegraCipher.create( "" ) is None and IntegraCipher.key_bytes( "short" ) == b"short       " * 2
+
+
+def test_round_trip():
+    """PDUs of any length encrypted by one side are decrypted by the other"""
+    rnd = random.Random( 1 )
+    sender = IntegraCipher( INTEGRATION_KEY )
+    receiver = IntegraCipher( INTEGRATION_KEY )
+    for length in list( range( 16, 80 ) ) + [ 255 ]:
+        plain = rnd.randbytes( length )
+        assert receiver.decrypt( sender.encrypt( plain ) ) == plain, length
+
+
+def test_chaining_between_calls():
+    """Chaining restarts from key based vector with every PDU, reused contexts carry no state between calls"""
+    rnd = random.Random( 2 )
+    cipher = IntegraCipher( INTEGRATION_KEY )
+    pdus = [ rnd.randbytes( length ) for length in [ 22, 16, 45, 33, 22 ] ]
+    encrypted = [ cipher.encrypt( pdu ) for pdu in pdus ]
+    assert encrypted == [ IntegraCipher( INTEGRATION_KEY ).encrypt( pdu ) for pdu in pdus ]
+    assert [ cipher.decrypt( data ) for data in reversed( encrypted ) ] == list( reversed( pdus ) )
+
+    # inside PDU blocks are chained, change of the first block changes every following block
+    changed = cipher.encrypt( bytes( [ pdus[ 2 ][ 0 ] ^ 1 ] ) + pdus[ 2 ][ 1: ] )
+    assert all( changed[ pos:pos + 16 ] != encrypted[ 2 ][ pos:pos + 16 ] for pos in range( 0, 45, 16 ) )
+
+
+if __name__ == "__main__":
+    for name, test in list( globals().items() ):
+        if name.startswith( "test_" ) and callable( test ):
+            test()
+            print( f"{name}: OK" )
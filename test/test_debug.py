@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import os
+import random
+import sys
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api import channel
+from satel_integra_api.client import IntegraClient, IntegraClientOpts
+from satel_integra_api.commands import IntegraCommand
+from satel_integra_api.debug import DEBUG_RESPONSES, DEBUG_RESPONSES_TIME, IntegraDebug, IntegraLazyHex
+from satel_integra_api.simulator import IntegraSimulator
+from satel_integra_api.tools import IntegraHelper
+
+
+class ListHandler( logging.Handler ):
+
+    def __init__( self ):
+        super().__init__( logging.DEBUG )
+        self.messages: list[ str ] = [ ]
+
+    def emit( self, record: logging.LogRecord ) -> None:
+        self.messages.append( record.getMessage() )
+
+
+def test_hex_str():
+    """Hex formatter output matches format used so far"""
+    rnd = random.Random( 1 )
+    for size in [ 0, 1, 2, 33 ]:
+        data = rnd.randbytes( size )
+        assert IntegraHelper.hex_str( data ) == ", ".join( f"0x{value:02X}" for value in data )
+        assert IntegraHelper.hex_str( bytearray( data ), "02x", "", " " ) == " ".join( f"{value:02x}" for value in data )
+    assert str( IntegraLazyHex( b"\xfe\x0d" ) ) == "0xFE, 0x0D"
+
+
+def test_filter_tables():
+    """Filters are compiled into lookup tables updated in place, dispatch time follows responses filter"""
+    saved = IntegraDebug.filters()
+    try:
+        assert IntegraDebug.compile_filter( True ) == bytes( [ 1 ] * 256 )
+        assert IntegraDebug.compile_filter( [ 0x00, 0x7F ] )[ 0x7F ] == 1
+        IntegraDebug.configure( responses=[ IntegraCommand.READ_ZONES_VIOLATION ], responses_time=True )
+        assert channel.DEBUG_RESPONSES is DEBUG_RESPONSES
+        assert DEBUG_RESPONSES[ IntegraCommand.READ_ZONES_VIOLATION ] and not DEBUG_RESPONSES[ IntegraCommand.READ_OUTPUTS_STATE ]
+        assert DEBUG_RESPONSES_TIME == DEBUG_RESPONSES
+        IntegraDebug.configure( responses_time=False )
+        assert DEBUG_RESPONSES[ IntegraCommand.READ_ZONES_VIOLATION ] and not any( DEBUG_RESPONSES_TIME )
+    finally:
+        IntegraDebug.configure( **saved )
+
+
+def test_lazy_formatting():
+    """Enabled filters log frames, hex dumps are formatted only when logger emits records"""
+
+    async def async_test():
+        logger = logging.getLogger( channel.__name__ )
+        handler = ListHandler()
+        logger.addHandler( handler )
+        saved = IntegraDebug.filters()
+        try:
+            IntegraDebug.configure( responses=True, responses_raw=True, requests=True, requests_raw=True )
+            async with IntegraSimulator() as simulator:
+                client = IntegraClient.tcp( "127.0.0.1", simulator.port, asyncio.get_running_loop(), IntegraClientOpts.create( reconnect=0 ) )
+                assert await client.async_connect()
+
+                logger.setLevel( logging.WARNING )
+                await client.async_read_zones_violation()
+                assert not handler.messages
+
+                logger.setLevel( logging.DEBUG )
+                await client.async_read_zones_violation()
+                assert any( ">>> 0xFE, 0xFE, 0x00" in message for message in handler.messages )
+                assert any( "<<< [HB] IntegraResponse" in message for message in handler.messages )
+                await client.async_disconnect()
+        finally:
+            IntegraDebug.configure( **saved )
+            logger.removeHandler( handler )
+            logger.setLevel( logging.NOTSET )
+
+    asyncio.run( async_test() )
+
+
+if __name__ == "__main__":
+    for name, test in list( globals().items() ):
+        if name.startswith( "test_" ) and callable( test ):
+            test()
+            print( f"{name}: OK" )
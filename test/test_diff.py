@@ -0,0 +1,66 @@
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.client import IntegraClient, IntegraClientOpts
+from satel_integra_api.diff import IntegraStateDiff
+from satel_integra_api.notify import IntegraNotifyEvent
+from satel_integra_api.troubles import IntegraTroublesRegionId
+
+
+def reference_diff( previous: bytes, current: bytes ) -> dict[ int, bool ]:
+    """Byte and bit walk used before the diff engine"""
+    result = { }
+    for byte_index in range( len( current ) ):
+        byte_diff = previous[ byte_index ] ^ current[ byte_index ]
+        for bit_index in range( 8 ):
+            if byte_diff & (1 << bit_index):
+                result[ byte_index * 8 + bit_index + 1 ] = bool( current[ byte_index ] & (1 << bit_index) )
+    return result
+
+
+def test_state_diff():
+    """XOR of whole blocks gives the same changes as byte walk, mapping view behaves as dict"""
+    rnd = random.Random( 1 )
+    for size in [ 1, 4, 16, 32, 47 ]:
+        for _ in range( 50 ):
+            previous, current = rnd.randbytes( size ), rnd.randbytes( size )
+            diff = IntegraStateDiff.compute( IntegraStateDiff.to_int( previous ), IntegraStateDiff.to_int( current ) )
+            expected = reference_diff( previous, current )
+            assert diff == expected and diff.as_dict() == expected and len( diff ) == len( expected )
+            assert list( diff ) == sorted( expected ) and diff.items() == sorted( expected.items() )
+
+    diff = IntegraStateDiff.compute( 0b1010, 0b0011 )
+    assert diff.changed == 0b1001 and diff.state == 0b0011
+    assert 1 in diff and 4 in diff and 2 not in diff and 0 not in diff
+    assert diff[ 1 ] is True and diff[ 4 ] is False and diff.get( 2 ) is None
+    assert not IntegraStateDiff.compute( 5, 5 ) and len( IntegraStateDiff.compute( 5, 5 ) ) == 0
+
+
+def test_client_diff():
+    """First state reports every item, following ones only changed items, data beyond item count is ignored"""
+    eventloop = asyncio.new_event_loop()
+    try:
+        client = IntegraClient.tcp( "127.0.0.1", 7094, eventloop, IntegraClientOpts.create( reconnect=0 ) )
+        first = bytes( [ 0x01, 0x80 ] + [ 0 ] * 30 )
+        diff = client._get_diff_state( IntegraNotifyEvent.ZONES_VIOLATION, first, 128 )
+        assert len( diff ) == 128 and diff[ 1 ] and diff[ 16 ] and not diff[ 2 ] and 129 not in diff
+
+        second = bytes( [ 0x03, 0x00 ] + [ 0 ] * 14 + [ 0xFF ] * 16 )
+        assert client._get_diff_state( IntegraNotifyEvent.ZONES_VIOLATION, second, 128 ) == { 2: True, 16: False }
+
+        region_id = IntegraTroublesRegionId.P1_R1
+        assert len( client._get_troubles_changed( region_id, bytes( 16 ) ) ) == 128
+        assert client._get_troubles_changed( region_id, bytes( [ 0 ] * 15 + [ 0x40 ] ) ).as_dict() == { 127: True }
+    finally:
+        eventloop.close()
+
+
+if __name__ == "__main__":
+    for name, test in list( globals().items() ):
+        if name.startswith( "test_" ) and callable( test ):
+            test()
+            print( f"{name}: OK" )
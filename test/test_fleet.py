@@ -0,0 +1,165 @@
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.base import IntegraConnectLimiter, IntegraDispatcherPool
+from satel_integra_api.client import IntegraClientOpts, IntegraClientStatus
+from satel_integra_api.fleet import IntegraFleet
+from satel_integra_api.metrics import IntegraMetricsExporter
+from satel_integra_api.objects import Events
+from satel_integra_api.simulator import IntegraSimulator
+
+PANELS = 6
+
+
+def test_connect_limiter():
+    """Attempts are admitted at configured rate and never exceed concurrency"""
+
+    async def async_test():
+        limiter = IntegraConnectLimiter( rate=50.0, concurrency=3 )
+        active = [ ]
+
+        async def attempt():
+            async with limiter.slot():
+                active.append( limiter.active )
+                await asyncio.sleep( 0.05 )
+
+        begin = time.monotonic()
+        await asyncio.gather( *[ attempt() for _ in range( 10 ) ] )
+        elapsed = time.monotonic() - begin
+        # the first token is available immediately, following ones every 20ms
+        assert elapsed >= 9 / 50.0 - 0.01
+        assert max( active ) <= 3 and limiter.attempts == 10 and limiter.active == 0 and limiter.waiting == 0
+        assert limiter.wait_max > 0
+
+    asyncio.run( async_test() )
+
+
+def test_dispatcher_pool_order():
+    """Events of one queue are processed in order, closed queue drops its pending events"""
+
+    async def async_test():
+        pool = IntegraDispatcherPool( 2 )
+        received = { 0: [ ], 1: [ ], 2: [ ] }
+
+        def process_fn( index: int ):
+            async def process( value: int ):
+                await asyncio.sleep( 0 )
+                received[ index ].append( value )
+            return process
+
+        queues = [ pool.create( process_fn( index ) ) for index in range( 3 ) ]
+        assert [ event_queue.worker for event_queue in queues ] == [ 0, 1, 0 ]
+        for value in range( 20 ):
+            for event_queue in queues:
+                await event_queue.put( value=value )
+        await queues[ 2 ].shutdown()
+        while pool.queue_depth:
+            await asyncio.sleep( 0.01 )
+        await asyncio.sleep( 0.01 )
+        assert received[ 0 ] == received[ 1 ] == list( range( 20 ) ) and received[ 2 ] == [ ]
+        assert queues[ 0 ].processed == 20 and queues[ 0 ].queue_depth == 0
+        await pool.shutdown()
+
+    asyncio.run( async_test() )
+
+
+def test_fleet():
+    """Panels connect through shared limiter, events of all panels reach fleet subscribers, panels reconnect after outage"""
+
+    async def async_test():
+        simulators = [ IntegraSimulator() for _ in range( PANELS ) ]
+        for simulator in simulators:
+            await simulator.async_start()
+
+        fleet = IntegraFleet( asyncio.get_running_loop(), connect_rate=100.0, connect_concurrency=2, reconnect_jitter=0.2, workers=2, seed=1 )
+        for index, simulator in enumerate( simulators ):
+            fleet.add_tcp( f"panel-{index}", "127.0.0.1", simulator.port, IntegraClientOpts.create( reconnect=-1 ) )
+
+        client_events = [ ]
+
+        async def on_client_event( _, panel: str, event: IntegraClientStatus, **__ ):
+            client_events.append( (panel, event) )
+
+        fleet.subscribe( Events.EVENT_SYS_CLIENT_EVENT, on_client_event )
+        results = await fleet.async_connect()
+        assert all( results.values() ) and len( results ) == PANELS
+        assert { panel for panel, event in client_events if event == IntegraClientStatus.CONNECTED } == set( fleet.systems )
+        assert fleet.limiter.attempts == PANELS
+        # dispatch workers are shared instead of dispatcher task per panel
+        task_names = [ task.get_name() for task in asyncio.all_tasks() ]
+        assert sum( 1 for name in task_names if name.startswith( "event_queue_pool-" ) ) == fleet.pool.workers
+        assert not any( name.startswith( "event_queue_task-" ) for name in task_names )
+        assert all( isinstance( system.client._event_dispatcher, IntegraDispatcherPool.Queue ) for system in fleet.systems.values() )
+
+        await asyncio.gather( *[ system.client.async_read_zones_violation() for system in fleet.systems.values() ] )
+        stats = fleet.stats
+        assert stats.panels == stats.connected == PANELS
+        # connect reads integra and module version
+        assert stats.requests == PANELS * 3 and stats.latency.count == PANELS * 3
+        assert fleet.panel_stats( "panel-0" ).requests == 3
+        exporter = IntegraMetricsExporter()
+        exporter.add_fleet( fleet )
+        assert 'satel_integra_up{panel="panel-5"} 1' in exporter.render()
+
+        # network outage, every session is dropped at once
+        client_events.clear()
+        for simulator in simulators:
+            for session in simulator.sessions:
+                session.close()
+        for _ in range( 100 ):
+            await asyncio.sleep( 0.05 )
+            if fleet.stats.connected == PANELS and fleet.limiter.reconnects == PANELS:
+                break
+        assert fleet.stats.connected == PANELS and fleet.limiter.reconnects == PANELS
+        assert { panel for panel, event in client_events if event == IntegraClientStatus.RECONNECTING } == set( fleet.systems )
+
+        removed = await fleet.async_remove( "panel-0" )
+        assert removed.status == IntegraClientStatus.DISCONNECTED and "panel-0" not in fleet
+        await fleet.async_shutdown()
+        assert fleet.stats.connected == 0
+        for simulator in simulators:
+            await simulator.async_stop()
+
+    asyncio.run( async_test() )
+
+
+def test_connect_slot_released():
+    """Connect slot is released once channel is connected, reads done on connect do not hold it"""
+
+    async def async_test():
+        rtt = 0.1
+        simulators = [ IntegraSimulator( rtt=rtt ) for _ in range( 3 ) ]
+        for simulator in simulators:
+            await simulator.async_start()
+
+        fleet = IntegraFleet( asyncio.get_running_loop(), connect_rate=100.0, connect_concurrency=1, seed=1 )
+        for index, simulator in enumerate( simulators ):
+            fleet.add_tcp( f"panel-{index}", "127.0.0.1", simulator.port, IntegraClientOpts.create( reconnect=-1 ) )
+        active = [ ]
+
+        async def on_client_event( _, event: IntegraClientStatus, **__ ):
+            if event == IntegraClientStatus.CONNECTED:
+                active.append( fleet.limiter.active )
+
+        fleet.subscribe( Events.EVENT_SYS_CLIENT_EVENT, on_client_event )
+        begin = time.monotonic()
+        assert all( (await fleet.async_connect()).values() )
+        elapsed = time.monotonic() - begin
+        # version reads of all panels overlap, with slot held they would take two round trips per panel in turn
+        assert active == [ 0, 0, 0 ] and elapsed < 4 * rtt, elapsed
+        await fleet.async_shutdown()
+        for simulator in simulators:
+            await simulator.async_stop()
+
+    asyncio.run( async_test() )
+
+
+if __name__ == "__main__":
+    for name, test in list( globals().items() ):
+        if name.startswith( "test_" ) and callable( test ):
+            test()
+            print( f"{name}: OK" )
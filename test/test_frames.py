@@ -0,0 +1,87 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.channel import IntegraChannel, IntegraChannelErrorCode
+from satel_integra_api.commands import IntegraCommand
+from satel_integra_api.const import FRAME_RAW_TAIL
+from satel_integra_api.frames import IntegraFrameDecoder
+from satel_integra_api.messages import IntegraRequest
+
+# data with sync byte, encoded frame holds escaped FE F0 sequence
+DATA = bytes( [ 0x01, 0xFE, 0x02, 0x03 ] )
+FRAME = IntegraRequest.encode_frame( IntegraCommand.READ_ZONES_VIOLATION, DATA )
+PLAIN = FRAME[ 2:-2 ].replace( bytes( [ 0xFE, 0xF0 ] ), bytes( [ 0xFE ] ) )
+
+
+def test_frames_in_one_chunk():
+    """Every frame of chunk is returned in order"""
+    other = IntegraRequest.encode_frame( IntegraCommand.READ_OUTPUTS_STATE, bytes( 16 ) )
+    decoder = IntegraFrameDecoder()
+    frames = decoder.feed( FRAME + other + FRAME )
+    assert frames == [ PLAIN, other[ 2:-2 ], PLAIN ] and decoder.frames == 3
+    assert not decoder.partial and decoder.discards == decoder.resyncs == 0
+
+
+def test_split_frames():
+    """Frame split at any position is decoded once complete, including splits inside escape and trailer"""
+    escape = FRAME.index( bytes( [ 0xFE, 0xF0 ] ) )
+    assert escape > 2
+    for split in [ escape + 1, len( FRAME ) - 1 ] + list( range( 1, len( FRAME ) ) ):
+        decoder = IntegraFrameDecoder()
+        assert decoder.feed( FRAME[ :split ] ) == [ ] and decoder.partial
+        assert decoder.feed( FRAME[ split: ] ) == [ PLAIN ], split
+        assert not decoder.partial
+
+    decoder = IntegraFrameDecoder()
+    frames = [ ]
+    for value in FRAME + FRAME:
+        frames += decoder.feed( bytes( [ value ] ) )
+    assert frames == [ PLAIN, PLAIN ] and decoder.discards == 0
+
+
+def test_garbage_and_resync():
+    """Bytes before sync are skipped, broken frame is discarded and decoder syncs on the next one"""
+    decoder = IntegraFrameDecoder()
+    assert decoder.feed( b"\x00\x10garbage\x0d" + FRAME ) == [ PLAIN ]
+    assert decoder.discards == decoder.resyncs == 0
+
+    # frame interrupted by start of another one
+    assert decoder.feed( FRAME[ :5 ] + FRAME ) == [ PLAIN ]
+    assert decoder.discards == 1 and decoder.resyncs == 1
+
+    # byte other than escape or end after sync byte inside frame
+    assert decoder.feed( FRAME[ :4 ] + bytes( [ 0xFE, 0x55 ] ) + FRAME ) == [ PLAIN ]
+    assert decoder.discards == 2 and decoder.resyncs == 1 and decoder.frames == 3
+
+
+def test_busy_tail():
+    """Textual reply after the last frame is kept in raw tail and recognized as busy panel"""
+
+    async def async_test():
+        channel = IntegraChannel( asyncio.get_running_loop(), "" )
+        handler = channel._handler
+        handler.feed( FRAME + b"\x10Busy!\r\n" )
+        assert handler._decoder.raw_tail == b"\x10Busy!\r\n"
+        assert handler.closed_error().error_code == IntegraChannelErrorCode.REMOTE_BUSY
+
+        handler.reset()
+        handler.feed( b"\x10Bu" )
+        handler.feed( b"sy!\r\n" )
+        assert handler.closed_error().error_code == IntegraChannelErrorCode.REMOTE_BUSY
+
+        handler.reset()
+        handler.feed( FRAME + b"\x00" * (FRAME_RAW_TAIL * 2) )
+        assert len( handler._decoder.raw_tail ) == FRAME_RAW_TAIL
+        assert handler.closed_error().error_code == IntegraChannelErrorCode.REMOTE_CLOSED
+
+    asyncio.run( async_test() )
+
+
+if __name__ == "__main__":
+    for name, test in list( globals().items() ):
+        if name.startswith( "test_" ) and callable( test ):
+            test()
+            print( f"{name}: OK" )
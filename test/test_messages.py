@@ -0,0 +1,57 @@
+import os
+import sys
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.commands import IntegraCommand, IntegraCmdZoneData
+from satel_integra_api.const import FRAME_CACHE_SIZE
+from satel_integra_api.messages import IntegraPreparedRequest, IntegraRequest
+
+
+def test_frame_cache_hits():
+    """Repeated request returns the same encoded frame from cache"""
+    IntegraRequest.frame_cache_setup( FRAME_CACHE_SIZE )
+    request = IntegraRequest( IntegraCommand.READ_ZONE_TEMPERATURE, IntegraCmdZoneData( 3 ) )
+    info = IntegraRequest.frame_cache_info()
+    first = request.get_payload()
+    second = IntegraRequest( IntegraCommand.READ_ZONE_TEMPERATURE, IntegraCmdZoneData( 3 ) ).get_payload()
+    assert first is second and first == IntegraRequest.encode_frame( IntegraCommand.READ_ZONE_TEMPERATURE, IntegraCmdZoneData( 3 ).to_bytes() )
+    assert IntegraRequest.frame_cache_info()[ "hits" ] == info[ "hits" ] + 1
+
+
+def test_frame_cache_eviction():
+    """Cache keeps at most FRAME_CACHE_SIZE frames, the least recently used one is evicted"""
+    IntegraRequest.frame_cache_setup( 0 )
+    IntegraRequest.frame_cache_setup( FRAME_CACHE_SIZE )
+    keep = IntegraRequest( IntegraCommand.READ_OUTPUTS_STATE, bytes( [ 0 ] ) ).get_payload()
+    for value in range( 1, FRAME_CACHE_SIZE ):
+        IntegraRequest( IntegraCommand.READ_OUTPUTS_STATE, value.to_bytes( 2 ) ).get_payload()
+    assert IntegraRequest.frame_cache_info()[ "size" ] == FRAME_CACHE_SIZE
+    # touched frame becomes the most recently used one, the oldest of the rest is evicted
+    assert IntegraRequest( IntegraCommand.READ_OUTPUTS_STATE, bytes( [ 0 ] ) ).get_payload() is keep
+    IntegraRequest( IntegraCommand.READ_OUTPUTS_STATE, bytes( 3 ) ).get_payload()
+    cache = IntegraRequest._frame_cache
+    assert len( cache ) == FRAME_CACHE_SIZE and (IntegraCommand.READ_OUTPUTS_STATE, bytes( [ 0 ] )) in cache
+    assert (IntegraCommand.READ_OUTPUTS_STATE, (1).to_bytes( 2 )) not in cache
+
+    IntegraRequest.frame_cache_setup( 4 )
+    assert IntegraRequest.frame_cache_info()[ "size" ] == 4
+    IntegraRequest.frame_cache_setup( FRAME_CACHE_SIZE )
+
+
+def test_raw_bytes_data():
+    """Request data may be given as raw bytes, prepared request keeps its data as bytes"""
+    request = IntegraRequest( IntegraCommand.READ_SYSTEM_CHANGES, b"\x01\xfe" )
+    assert request.get_payload() == IntegraRequest.encode_frame( IntegraCommand.READ_SYSTEM_CHANGES, b"\x01\xfe" )
+
+    prepared = IntegraPreparedRequest( IntegraCommand.READ_ZONE_TEMPERATURE, IntegraCmdZoneData( 3 ) )
+    assert prepared.data == IntegraCmdZoneData( 3 ).to_bytes() and isinstance( prepared.data, bytes )
+    assert prepared.get_payload() == IntegraRequest( IntegraCommand.READ_ZONE_TEMPERATURE, IntegraCmdZoneData( 3 ) ).get_payload()
+    assert prepared.clone().get_payload() is prepared.get_payload()
+
+
+if __name__ == "__main__":
+    for name, test in list( globals().items() ):
+        if name.startswith( "test_" ) and callable( test ):
+            test()
+            print( f"{name}: OK" )
@@ -0,0 +1,123 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.client import IntegraClientOpts
+from satel_integra_api.metrics import IntegraMetricsExporter, METRICS_CONTENT_TYPE
+from satel_integra_api.objects import IntegraSystem
+from satel_integra_api.simulator import IntegraSimulator
+
+
+def parse_samples( text: str ) -> dict[ str, float ]:
+    """Map of sample name with labels to value, comments are checked for consistency"""
+    result = { }
+    types = { }
+    for line in text.splitlines():
+        if line.startswith( "# TYPE " ):
+            _, _, name, metric_type = line.split( " " )
+            assert name not in types, f"family {name} rendered twice"
+            types[ name ] = metric_type
+        elif line and not line.startswith( "#" ):
+            name, value = line.rsplit( " ", 1 )
+            assert name.split( "{" )[ 0 ].startswith( tuple( types ) )
+            result[ name ] = float( value )
+    return result
+
+
+def test_render_multiple_systems():
+    """Every registered panel is rendered with its labels, metrics follow channel and client state"""
+
+    async def async_test():
+        async with IntegraSimulator() as first, IntegraSimulator() as second:
+            exporter = IntegraMetricsExporter()
+            systems = [ ]
+            for name, simulator in [ ("first", first), ("second", second) ]:
+                system = IntegraSystem.tcp( "127.0.0.1", simulator.port, asyncio.get_running_loop(), IntegraClientOpts.create( reconnect=0 ) )
+                exporter.add( name, system, site="lab" )
+                systems.append( system )
+
+            assert await systems[ 0 ].async_connect()
+            for _ in range( 3 ):
+                await systems[ 0 ].client.async_read_zones_violation()
+
+            text = exporter.render()
+            assert text.endswith( "# EOF\n" )
+            samples = parse_samples( text )
+            assert samples[ 'satel_integra_up{panel="first",site="lab"}' ] == 1
+            assert samples[ 'satel_integra_up{panel="second",site="lab"}' ] == 0
+            assert samples[ 'satel_integra_client_status{panel="second",site="lab",client_status="DISCONNECTED"}' ] == 1
+            assert samples[ 'satel_integra_channel_requests_total{panel="first",site="lab",command="READ_ZONES_VIOLATION"}' ] == 3
+            assert samples[ 'satel_integra_channel_request_latency_seconds_count{panel="first",site="lab",command="READ_ZONES_VIOLATION"}' ] == 3
+            assert samples[ 'satel_integra_channel_request_latency_seconds_bucket{panel="first",site="lab",command="READ_ZONES_VIOLATION",le="+Inf"}' ] == 3
+            assert samples[ 'satel_integra_channel_frames_total{panel="first",site="lab"}' ] >= 5
+            assert samples[ 'satel_integra_scheduler_queue_depth{panel="first",site="lab",priority="CONTROL"}' ] == 0
+            assert 'satel_integra_dispatcher_queue_depth{panel="first",site="lab"}' in samples
+
+            systems[ 0 ].system_info_load()
+            assert await systems[ 0 ].async_system_info_wait_for()
+            samples = parse_samples( exporter.render() )
+            assert samples[ 'satel_integra_elements_loaded{panel="first",site="lab"}' ] == samples[ 'satel_integra_elements{panel="first",site="lab"}' ] > 0
+
+            exporter.remove( "second" )
+            assert 'panel="second"' not in exporter.render()
+            await systems[ 0 ].async_disconnect()
+
+    asyncio.run( async_test() )
+
+
+def test_byte_counters_across_connections():
+    """Byte counters keep growing over reconnects, per connection bytes are gauges"""
+
+    async def async_test():
+        async with IntegraSimulator() as simulator:
+            exporter = IntegraMetricsExporter()
+            system = IntegraSystem.tcp( "127.0.0.1", simulator.port, asyncio.get_running_loop(), IntegraClientOpts.create( reconnect=0 ) )
+            exporter.add( "panel", system )
+            counters = [ ]
+            for _ in range( 2 ):
+                assert await system.async_connect()
+                await system.client.async_read_zones_violation()
+                samples = parse_samples( exporter.render() )
+                counters.append( (samples[ 'satel_integra_channel_rx_bytes_total{panel="panel"}' ], samples[ 'satel_integra_channel_tx_bytes_total{panel="panel"}' ]) )
+                await system.async_disconnect()
+
+            stats = system.get_channel_stats()
+            assert counters[ 1 ][ 0 ] > counters[ 0 ][ 0 ] > 0 and counters[ 1 ][ 1 ] > counters[ 0 ][ 1 ] > 0
+            assert samples[ 'satel_integra_channel_connection_rx_bytes{panel="panel"}' ] == stats.rx_bytes < stats.rx_bytes_total
+            assert "# TYPE satel_integra_channel_connection_tx_bytes gauge" in exporter.render()
+
+    asyncio.run( async_test() )
+
+
+def test_http_listener():
+    """Metrics are served over HTTP, unknown paths get 404"""
+
+    async def async_test():
+        exporter = IntegraMetricsExporter()
+        exporter.add( "panel", IntegraSystem.tcp( "127.0.0.1", 1, asyncio.get_running_loop(), IntegraClientOpts.create( reconnect=0 ) ) )
+        await exporter.async_start( port=0 )
+        try:
+            for path, status in [ ("/metrics", b"200"), ("/other", b"404") ]:
+                reader, writer = await asyncio.open_connection( "127.0.0.1", exporter.port )
+                writer.write( f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode() )
+                response = await reader.read()
+                writer.close()
+                head, body = response.split( b"\r\n\r\n", 1 )
+                assert head.split( b" " )[ 1 ] == status
+                if status == b"200":
+                    assert METRICS_CONTENT_TYPE.encode() in head
+                    assert body.endswith( b"# EOF\n" ) and b'satel_integra_up{panel="panel"} 0' in body
+        finally:
+            await exporter.async_stop()
+        assert exporter.port is None
+
+    asyncio.run( async_test() )
+
+
+if __name__ == "__main__":
+    for name, test in list( globals().items() ):
+        if name.startswith( "test_" ) and callable( test ):
+            test()
+            print( f"{name}: OK" )
@@ -0,0 +1,219 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.base import IntegraArmMode
+from satel_integra_api.client import IntegraClientOpts
+from satel_integra_api.commands import IntegraCommand
+from satel_integra_api.notify import IntegraNotifyEvent
+from satel_integra_api.objects import Events, IntegraSystem
+from satel_integra_api.poll import IntegraPollController, IntegraPollDecision
+from satel_integra_api.resync import IntegraResyncSnapshot
+from satel_integra_api.simulator import IntegraSimulator
+
+RTT = 0.04
+MONITORED = [ IntegraNotifyEvent.ZONES_VIOLATION, IntegraNotifyEvent.ZONES_ALARM, IntegraNotifyEvent.OUTPUTS_STATE, IntegraNotifyEvent.PARTS_ARMED_SUPPRESSED ]
+
+
+def test_pipelined_poll_cycle():
+    """States changed together are read in one round trip after 0x7F and processed together"""
+
+    async def async_test():
+        async with IntegraSimulator( rtt=RTT ) as simulator:
+            opts = IntegraClientOpts.create( reconnect=-1, pipeline_window=8 )
+            system = IntegraSystem.tcp( simulator.host, simulator.port, asyncio.get_running_loop(), opts )
+            batches = [ ]
+
+            async def on_items_changed( _, changes: list, **__ ):
+                batches.append( sorted( (item.id_str, notify_event.name) for item, notify_event, _, _ in changes ) )
+
+            system.subscribe( Events.EVENT_SYS_ITEMS_CHANGED, on_items_changed )
+            assert await system.async_connect()
+            assert await system.async_monitor_start( MONITORED )
+            client = system.client
+
+            # reported by the next 0x7F read, there is no polling configured
+            simulator.set_zone_violation( 2, True )
+            simulator.set_state( IntegraCommand.READ_ZONES_ALARM, 5, True )
+            simulator.set_output( 3, True )
+            simulator.set_state( IntegraCommand.READ_PARTS_ARMED_SUPPRESSED, 1, True )
+            loop = asyncio.get_running_loop()
+            begin = loop.time()
+            await client._async_monitor_job( IntegraCommand.READ_SYSTEM_CHANGES, 0 )
+            elapsed = loop.time() - begin
+
+            # 0x7F read and one pipelined batch of four reads, sequential reads would take five round trips
+            assert elapsed < RTT * 3.5, elapsed
+            assert sorted( batch[ 0 ] for batch in batches ) == [ ("output_3", "OUTPUTS_STATE"), ("part_1", "PARTS_ARMED_SUPPRESSED"),
+                                                                 ("zone_2", "ZONES_VIOLATION"), ("zone_5", "ZONES_ALARM") ]
+            assert system.zones[ 2 ].violation and system.zones[ 5 ].alarm and system.outputs[ 3 ].state
+            assert client.poll_cycle_time.count == 1 and RTT * 2 <= client.poll_cycle_time.max < RTT * 3.5
+
+            # nothing changed, cycle is the 0x7F read alone
+            await client._async_monitor_job( IntegraCommand.READ_SYSTEM_CHANGES, 0 )
+            assert client.poll_cycle_time.count == 2 and len( batches ) == 4
+            await system.async_disconnect()
+
+    asyncio.run( async_test() )
+
+
+def test_poll_cycle_with_resync():
+    """Cycle whose responses are taken by resync is closed at once, it never holds responses to other reads"""
+
+    async def async_test():
+        async with IntegraSimulator( rtt=RTT ) as simulator:
+            opts = IntegraClientOpts.create( reconnect=-1, pipeline_window=8 )
+            system = IntegraSystem.tcp( simulator.host, simulator.port, asyncio.get_running_loop(), opts )
+            assert await system.async_connect()
+            assert await system.async_monitor_start( MONITORED )
+            client = system.client
+
+            simulator.set_zone_violation( 2, True )
+            simulator.set_output( 3, True )
+            await asyncio.gather( client._async_monitor_job( IntegraCommand.READ_SYSTEM_CHANGES, 0 ), client.async_resync() )
+            assert client._poll_cycle is None and client.poll_cycle_time.count == 1
+            assert system.zones[ 2 ].violation and system.outputs[ 3 ].state
+
+            # cycle waiting for its own response does not delay state read by user
+            cycle = IntegraResyncSnapshot( requests=[ client._state_request( IntegraCommand.READ_ZONES_VIOLATION ).clone() ] )
+            client._poll_cycle = cycle
+            simulator.set_zone_violation( 7, True )
+            assert 7 in await client.async_read_zones_violation()
+            await asyncio.sleep( RTT )
+            assert system.zones[ 7 ].violation and client._poll_cycle is cycle and not cycle.responses
+            client._poll_cycle = None
+            await system.async_disconnect()
+
+    asyncio.run( async_test() )
+
+
+def test_poll_cycle_apply_order():
+    """State read while held responses are reported to subscribers is processed after them, never overwritten by them"""
+
+    async def async_test():
+        async with IntegraSimulator( rtt=RTT ) as simulator:
+            opts = IntegraClientOpts.create( reconnect=-1, pipeline_window=8 )
+            system = IntegraSystem.tcp( simulator.host, simulator.port, asyncio.get_running_loop(), opts )
+            assert await system.async_connect()
+            assert await system.async_monitor_start( MONITORED )
+            client = system.client
+
+            # cycle holding older state of both events
+            simulator.set_state( IntegraCommand.READ_ZONES_ALARM, 5, True )
+            simulator.set_output( 3, True )
+            commands = [ IntegraCommand.READ_ZONES_ALARM, IntegraCommand.READ_OUTPUTS_STATE ]
+            requests = [ client._state_request( cmd ).clone() for cmd in commands ]
+            cycle = IntegraResyncSnapshot( requests=requests )
+            client._poll_cycle = cycle
+            await asyncio.gather( *[ client._async_send_request( request ) for request in requests ] )
+            await asyncio.sleep( 0.01 )
+            cycle.expected = { IntegraNotifyEvent.from_command( cmd ) for cmd in commands }
+            assert len( cycle.responses ) == 2
+
+            slow = [ True ]
+
+            async def on_items_changed( *_, **__ ):
+                if slow[ 0 ]:
+                    slow[ 0 ] = False
+                    await asyncio.sleep( RTT * 3 )
+
+            system.subscribe( Events.EVENT_SYS_ITEMS_CHANGED, on_items_changed )
+            simulator.set_state( IntegraCommand.READ_ZONES_ALARM, 5, False )
+            simulator.set_output( 3, False )
+
+            async def async_read_newer():
+                await asyncio.sleep( 0.01 )
+                await asyncio.gather( client.async_read_zones_alarm(), client.async_read_outputs_state() )
+                await asyncio.sleep( RTT )
+
+            # held cycle is applied by the next poll cycle, which itself has nothing to read
+            await asyncio.gather( client._async_poll_cycle( cycle.started, [ ] ), async_read_newer() )
+            await asyncio.sleep( RTT * 3 )
+            assert client._poll_cycle is None and not slow[ 0 ]
+            assert not system.zones[ 5 ].alarm and not system.outputs[ 3 ].state
+            await system.async_disconnect()
+
+    asyncio.run( async_test() )
+
+
+def test_adaptive_poll_interval():
+    """Idle panel is polled less often than with fixed fast interval, change is still detected within the ceiling"""
+    fast, ceiling, idle = 0.05, 0.4, 2.0
+
+    async def async_measure( controller: IntegraPollController | None ) -> tuple[ int, float ]:
+        async with IntegraSimulator( exit_delay=0.5 ) as simulator:
+            system = IntegraSystem.tcp( simulator.host, simulator.port, asyncio.get_running_loop(), IntegraClientOpts.create( reconnect=-1 ) )
+            detected = asyncio.Event()
+
+            async def on_items_changed( _, changes: list, **__ ):
+                if any( item.id_str == "zone_2" for item, _, _, _ in changes ):
+                    detected.set()
+
+            system.subscribe( Events.EVENT_SYS_ITEMS_CHANGED, on_items_changed )
+            assert await system.async_connect()
+            assert await system.async_monitor_start( MONITORED + [ IntegraNotifyEvent.PARTS_EXIT_TIME_ABOVE_10 ] )
+            client = system.client
+            if controller is not None:
+                client.poll_controller = controller
+            else:
+                client.poll_interval = fast
+            await asyncio.sleep( idle )
+            polls = client.stats.commands[ IntegraCommand.READ_SYSTEM_CHANGES ].requests
+
+            loop = asyncio.get_running_loop()
+            begin = loop.time()
+            simulator.set_zone_violation( 2, True )
+            await asyncio.wait_for( detected.wait(), 2.0 )
+            latency = loop.time() - begin
+
+            if controller is not None:
+                # interval is decided once the poll cycle which delivered the change completes
+                await asyncio.sleep( 0.01 )
+                assert controller.decisions[ IntegraPollDecision.CHANGED ] > 0 and client.poll_interval == fast
+                await asyncio.sleep( 0.5 )
+                assert client.poll_interval > fast
+
+                # control command snaps back to fast polling, partition in exit time keeps it there
+                assert await client.async_ctrl_arm( IntegraArmMode.MODE_0, [ 1 ], force=True, user_code="1234" )
+                assert controller.decisions[ IntegraPollDecision.CONTROL ] == 1 and client.poll_interval == fast
+                await asyncio.sleep( 0.4 )
+                assert controller.decisions[ IntegraPollDecision.ACTIVE ] > 0 and client.poll_interval == fast
+            await system.async_disconnect()
+            return polls, latency
+
+    fixed_polls, fixed_latency = asyncio.run( async_measure( None ) )
+    adaptive_polls, adaptive_latency = asyncio.run( async_measure( IntegraPollController( fast=fast, ceiling=ceiling, hold=2 ) ) )
+    assert adaptive_polls * 3 < fixed_polls, (adaptive_polls, fixed_polls)
+    assert fixed_latency < fast + 0.1 and adaptive_latency < ceiling + 0.1, (fixed_latency, adaptive_latency)
+
+
+def test_poll_active_unmonitored():
+    """Exit time is seen only when its event is monitored, otherwise controller backs off after control command"""
+
+    async def async_decisions( monitored: list[ IntegraNotifyEvent ] ) -> IntegraPollController:
+        async with IntegraSimulator( exit_delay=1.0 ) as simulator:
+            system = IntegraSystem.tcp( simulator.host, simulator.port, asyncio.get_running_loop(), IntegraClientOpts.create( reconnect=-1 ) )
+            assert await system.async_connect()
+            assert await system.async_monitor_start( monitored )
+            client = system.client
+            controller = client.poll_controller = IntegraPollController( fast=0.05, ceiling=0.4, hold=1 )
+            await asyncio.sleep( 0.2 )
+            assert await client.async_ctrl_arm( IntegraArmMode.MODE_0, [ 1 ], force=True, user_code="1234" )
+            await asyncio.sleep( 0.5 )
+            await system.async_disconnect()
+            return controller
+
+    controller = asyncio.run( async_decisions( MONITORED + [ IntegraNotifyEvent.PARTS_EXIT_TIME_ABOVE_10 ] ) )
+    assert controller.decisions[ IntegraPollDecision.ACTIVE ] > 0 and controller.interval == controller.fast
+
+    controller = asyncio.run( async_decisions( MONITORED ) )
+    assert controller.decisions[ IntegraPollDecision.ACTIVE ] == 0 and controller.interval > controller.fast
+
+
+if __name__ == "__main__":
+    for name, test in list( globals().items() ):
+        if name.startswith( "test_" ) and callable( test ):
+            test()
+            print( f"{name}: OK" )
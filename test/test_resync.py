@@ -0,0 +1,149 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.client import IntegraClientOpts
+from satel_integra_api.metrics import IntegraMetricsExporter
+from satel_integra_api.notify import IntegraNotifyEvent
+from satel_integra_api.objects import Events, IntegraSystem
+from satel_integra_api.simulator import IntegraSimulator
+
+MONITORED = [ IntegraNotifyEvent.ZONES_VIOLATION, IntegraNotifyEvent.OUTPUTS_STATE, IntegraNotifyEvent.PARTS_ARMED_SUPPRESSED, IntegraNotifyEvent.TROUBLES_PART1,
+              IntegraNotifyEvent.RTC_AND_STATUS ]
+
+
+async def wait_for( condition, timeout: float = 10.0 ) -> bool:
+    for _ in range( int( timeout / 0.05 ) ):
+        if condition():
+            return True
+        await asyncio.sleep( 0.05 )
+    return condition()
+
+
+def test_resync():
+    """Snapshot after (re)connect reports only real changes followed by single resynced marker"""
+
+    async def async_test():
+        async with IntegraSimulator() as simulator:
+            simulator.set_zone_violation( 3, True )
+            simulator.set_output( 2, True )
+
+            system = IntegraSystem.tcp( simulator.host, simulator.port, asyncio.get_running_loop(), IntegraClientOpts.create( reconnect=-1, pipeline_window=4 ) )
+            events = [ ]
+
+            async def on_item_changed( _, item, state, **__ ):
+                events.append( (item.id_str, state.value) )
+
+            async def on_resynced( _, changes: int, duration: float, **__ ):
+                events.append( ("resynced", changes) )
+                assert duration > 0
+
+            async def on_snapshot( _, events: list, store, **__ ):
+                snapshots.append( sorted( events ) )
+                assert store is system.store
+
+            snapshots = [ ]
+            system.subscribe( Events.EVENT_SYS_ITEM_CHANGED, on_item_changed )
+            system.subscribe( Events.EVENT_SYS_RESYNCED, on_resynced )
+            system.subscribe( Events.EVENT_SYS_SNAPSHOT, on_snapshot )
+            assert await system.async_connect()
+            assert await wait_for( lambda: ("resynced", 0) in events )
+
+            # newly monitored state is read at once and delivered in single snapshot, no item reports change
+            events.clear()
+            assert await system.async_monitor_start( MONITORED )
+            assert events == [ ("resynced", 0) ]
+            assert snapshots == [ sorted( [ IntegraNotifyEvent.ZONES_VIOLATION, IntegraNotifyEvent.OUTPUTS_STATE, IntegraNotifyEvent.PARTS_ARMED_SUPPRESSED ] ) ]
+            assert system.zones[ 3 ].violation and not system.zones[ 4 ].violation and system.outputs[ 2 ].state
+
+            # changes not seen before connection is lost (there is no polling) are reported after reconnect, nothing else
+            events.clear()
+            simulator.set_zone_violation( 3, False )
+            simulator.set_zone_violation( 7, True )
+            for session in simulator.sessions:
+                session.close()
+            assert await wait_for( lambda: events and events[ -1 ][ 0 ] == "resynced" )
+            assert sorted( events[ :-1 ] ) == [ ("zone_3", False), ("zone_7", True) ] and events[ -1 ] == ("resynced", 2)
+            assert len( snapshots ) == 1
+
+            client = system.client
+            assert client.resync_time.count == 3 and client.resync_time.max > 0
+            exporter = IntegraMetricsExporter()
+            exporter.add( "panel", system )
+            assert 'satel_integra_resync_seconds_count{panel="panel"} 3' in exporter.render()
+            await system.async_disconnect()
+
+    asyncio.run( async_test() )
+
+
+def test_resync_apply_order():
+    """State read while snapshot is reported to subscribers is processed after it, snapshot never overwrites it"""
+    rtt = 0.04
+
+    async def async_test():
+        async with IntegraSimulator( rtt=rtt ) as simulator:
+            system = IntegraSystem.tcp( simulator.host, simulator.port, asyncio.get_running_loop(), IntegraClientOpts.create( reconnect=-1, pipeline_window=4 ) )
+            assert await system.async_connect()
+            assert await system.async_monitor_start( MONITORED )
+            client = system.client
+            slow = [ False ]
+
+            async def on_item_changed( *_, **__ ):
+                if slow[ 0 ]:
+                    slow[ 0 ] = False
+                    await asyncio.sleep( rtt * 5 )
+
+            system.subscribe( Events.EVENT_SYS_ITEM_CHANGED, on_item_changed )
+            simulator.set_zone_violation( 2, True )
+            simulator.set_output( 3, True )
+            slow[ 0 ] = True
+
+            async def async_read_newer():
+                # snapshot reads are answered, its first subscriber is running
+                await asyncio.sleep( rtt * 1.5 )
+                simulator.set_zone_violation( 2, False )
+                simulator.set_output( 3, False )
+                await asyncio.gather( client.async_read_zones_violation(), client.async_read_outputs_state() )
+
+            await asyncio.gather( client.async_resync(), async_read_newer() )
+            await asyncio.sleep( rtt * 2 )
+            assert not slow[ 0 ] and client._resync is None
+            assert not system.zones[ 2 ].violation and not system.outputs[ 3 ].state
+            await system.async_disconnect()
+
+    asyncio.run( async_test() )
+
+
+def test_initial_snapshot():
+    """First states of many items arrive in one snapshot, with snapshot disabled every set item reports change"""
+
+    async def async_run( initial_snapshot: bool ) -> tuple[ int, int ]:
+        async with IntegraSimulator() as simulator:
+            for zone_no in range( 1, 17 ):
+                simulator.set_zone_violation( zone_no, True )
+            opts = IntegraClientOpts.create( reconnect=-1, pipeline_window=4, initial_snapshot=initial_snapshot )
+            system = IntegraSystem.tcp( simulator.host, simulator.port, asyncio.get_running_loop(), opts )
+            counts = { Events.EVENT_SYS_ITEM_CHANGED: 0, Events.EVENT_SYS_SNAPSHOT: 0 }
+
+            async def on_event( event, **__ ):
+                counts[ event ] += 1
+
+            for event in counts:
+                system.subscribe( event, lambda _, event=event, **kwargs: on_event( event, **kwargs ) )
+            assert await system.async_connect()
+            assert await system.async_monitor_start( [ IntegraNotifyEvent.ZONES_VIOLATION ] )
+            assert len( system.store[ IntegraNotifyEvent.ZONES_VIOLATION ] ) == 16 and system.zones[ 16 ].violation
+            await system.async_disconnect()
+            return counts[ Events.EVENT_SYS_ITEM_CHANGED ], counts[ Events.EVENT_SYS_SNAPSHOT ]
+
+    assert asyncio.run( async_run( True ) ) == (0, 1)
+    assert asyncio.run( async_run( False ) ) == (16, 0)
+
+
+if __name__ == "__main__":
+    for name, test in list( globals().items() ):
+        if name.startswith( "test_" ) and callable( test ):
+            test()
+            print( f"{name}: OK" )
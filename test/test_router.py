@@ -0,0 +1,141 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.channel import IntegraChannelError, IntegraChannelErrorCode
+from satel_integra_api.client import IntegraClient, IntegraClientOpts
+from satel_integra_api.commands import IntegraCommand, IntegraCmdZoneData
+from satel_integra_api.messages import IntegraRequest, IntegraResponse, IntegraResponseErrorCode
+from satel_integra_api.router import IntegraResponseRouter
+from satel_integra_api.simulator import IntegraSimulator
+
+
+def result( error_code: IntegraResponseErrorCode ) -> IntegraResponse:
+    return IntegraResponse( IntegraCommand.READ_RESULT, bytes( [ error_code.value ] ) )
+
+
+def test_fifo_per_command():
+    """Responses of one command complete requests in order they were registered, other commands are independent"""
+
+    async def async_test():
+        router = IntegraResponseRouter( asyncio.get_running_loop() )
+        requests = [ IntegraRequest( IntegraCommand.READ_ZONES_VIOLATION ) for _ in range( 3 ) ]
+        futures = [ router.register( request ) for request in requests ]
+        outputs = router.register( IntegraRequest( IntegraCommand.READ_OUTPUTS_STATE ) )
+        assert router.pending == 4
+
+        responses = [ IntegraResponse( IntegraCommand.READ_ZONES_VIOLATION, bytes( [ index ] ) ) for index in range( 3 ) ]
+        assert router.route( IntegraResponse( IntegraCommand.READ_OUTPUTS_STATE ) ) is outputs
+        for response, future in zip( responses, futures ):
+            assert router.route( response ) is future
+        assert [ future.result().data for future in futures ] == [ bytes( [ 0 ] ), bytes( [ 1 ] ), bytes( [ 2 ] ) ]
+        assert [ future.result().request for future in futures ] == requests
+
+        # nobody waits for it, response is notification only
+        assert router.route( IntegraResponse( IntegraCommand.READ_ZONES_VIOLATION ) ) is None
+        for future in futures + [ outputs ]:
+            router.unregister( future )
+        assert router.pending == 0
+
+    asyncio.run( async_test() )
+
+
+def test_read_result():
+    """READ_RESULT goes to the oldest request answered with result codes, to pending read only when none of them waits"""
+
+    async def async_test():
+        router = IntegraResponseRouter( asyncio.get_running_loop() )
+        read = router.register( IntegraRequest( IntegraCommand.READ_ZONES_VIOLATION ) )
+        first = router.register( IntegraRequest( IntegraCommand.EXEC_OUTPUTS_ON ) )
+        second = router.register( IntegraRequest( IntegraCommand.EXEC_ARM_MODE_0 ) )
+        setup = router.register( IntegraRequest( IntegraCommand.READ_SYSTEM_CHANGES, bytes( 10 ), result_allowed=True ) )
+
+        assert router.route( result( IntegraResponseErrorCode.COMMAND_ACCEPTED ) ) is first
+        assert router.route( result( IntegraResponseErrorCode.CANNOT_ARM ) ) is second
+        assert router.route( result( IntegraResponseErrorCode.NO_ERROR ) ) is setup
+        assert not read.done() and second.result().request.command == IntegraCommand.EXEC_ARM_MODE_0
+        # panel rejected the read
+        assert router.route( result( IntegraResponseErrorCode.OTHER_ERROR ) ) is read
+        assert router.route( result( IntegraResponseErrorCode.OTHER_ERROR ) ) is None
+
+        # control command answered with its own command is matched by command queue and leaves result queue
+        event = router.register( IntegraRequest( IntegraCommand.EXEC_READ_EVENT ) )
+        control = router.register( IntegraRequest( IntegraCommand.EXEC_OUTPUTS_OFF ) )
+        assert router.route( IntegraResponse( IntegraCommand.EXEC_READ_EVENT, bytes( 14 ) ) ) is event
+        assert router.route( result( IntegraResponseErrorCode.COMMAND_ACCEPTED ) ) is control
+        assert not IntegraRequest( IntegraCommand.READ_OUTPUTS_STATE ).result_allowed and IntegraRequest( IntegraCommand.ELEMENT_READ_NAME ).result_allowed
+
+    asyncio.run( async_test() )
+
+
+def test_rejected_read():
+    """Read rejected by panel with READ_RESULT fails with its error code at once, it does not wait for timeout"""
+
+    async def async_test():
+        async with IntegraSimulator() as simulator:
+            client = IntegraClient.tcp( "127.0.0.1", simulator.port, asyncio.get_running_loop(), IntegraClientOpts.create( reconnect=0, resp_timeout=1.0 ) )
+            assert await client.async_connect()
+            loop = asyncio.get_running_loop()
+            begin = loop.time()
+            # zone out of range of simulated panel
+            response = await client._async_send_request( IntegraRequest( IntegraCommand.READ_ZONE_TEMPERATURE, IntegraCmdZoneData( 250 ) ) )
+            assert loop.time() - begin < 0.5 and not response.success
+            assert response.error_code == IntegraResponseErrorCode.OTHER_ERROR and response.request.command == IntegraCommand.READ_ZONE_TEMPERATURE
+            assert client.stats[ IntegraCommand.READ_ZONE_TEMPERATURE ].timeouts == 0
+            await client.async_disconnect()
+
+    asyncio.run( async_test() )
+
+
+def test_lazy_purge():
+    """Timed out and cancelled requests are skipped, response goes to the next request still waiting"""
+
+    async def async_test():
+        router = IntegraResponseRouter( asyncio.get_running_loop() )
+        timed_out = router.register( IntegraRequest( IntegraCommand.EXEC_OUTPUTS_ON ) )
+        cancelled = router.register( IntegraRequest( IntegraCommand.EXEC_OUTPUTS_ON ) )
+        waiting = router.register( IntegraRequest( IntegraCommand.EXEC_OUTPUTS_ON ) )
+        try:
+            await asyncio.wait_for( timed_out, 0.01 )
+            assert False, "future resolved without response"
+        except asyncio.TimeoutError:
+            pass
+        router.unregister( timed_out )
+        cancelled.cancel()
+        router.unregister( cancelled )
+
+        assert router.route( IntegraResponse( IntegraCommand.EXEC_OUTPUTS_ON ) ) is waiting
+        assert router.route( result( IntegraResponseErrorCode.NO_ERROR ) ) is None
+        router.unregister( waiting )
+
+        # entries of finished requests are dropped on next registration, queues do not grow
+        for _ in range( 100 ):
+            router.unregister( router.register( IntegraRequest( IntegraCommand.EXEC_OUTPUTS_ON ) ) )
+        assert len( router._commands[ IntegraCommand.EXEC_OUTPUTS_ON ] ) <= 1 and len( router._results ) <= 1 and router.pending == 0
+
+    asyncio.run( async_test() )
+
+
+def test_fail_all():
+    """Every request still waiting receives the error, finished ones keep their results"""
+
+    async def async_test():
+        router = IntegraResponseRouter( asyncio.get_running_loop() )
+        answered = router.register( IntegraRequest( IntegraCommand.READ_ZONES_VIOLATION ) )
+        router.route( IntegraResponse( IntegraCommand.READ_ZONES_VIOLATION ) )
+        waiting = [ router.register( IntegraRequest( command ) ) for command in [ IntegraCommand.READ_ZONES_VIOLATION, IntegraCommand.EXEC_OUTPUTS_ON ] ]
+        error = IntegraChannelError( "test", IntegraChannelErrorCode.REMOTE_CLOSED )
+        router.fail_all( error )
+        assert isinstance( answered.result(), IntegraResponse ) and all( future.result() is error for future in waiting )
+        assert router.route( result( IntegraResponseErrorCode.NO_ERROR ) ) is None
+
+    asyncio.run( async_test() )
+
+
+if __name__ == "__main__":
+    for name, test in list( globals().items() ):
+        if name.startswith( "test_" ) and callable( test ):
+            test()
+            print( f"{name}: OK" )
@@ -0,0 +1,252 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.commands import IntegraCommand
+from satel_integra_api.client import IntegraClient, IntegraClientOpts
+from satel_integra_api.messages import IntegraResponseErrorCode
+from satel_integra_api.objects import IntegraSystem
+from satel_integra_api.scheduler import IntegraJobScheduler, IntegraRequestPriority, IntegraRequestScheduler
+from satel_integra_api.simulator import IntegraSimulator
+
+RESPONSE_TIME = 0.005
+WINDOW = 4
+
+
+async def _async_request( scheduler: IntegraRequestScheduler, command: IntegraCommand, log: list | None = None, tag=None ) -> float:
+    """Acquire slot and hold it for simulated response time, returns time spent waiting for slot"""
+    loop = asyncio.get_running_loop()
+    begin = loop.time()
+    async with scheduler.slot( command ):
+        waited = loop.time() - begin
+        if log is not None:
+            log.append( tag )
+        await asyncio.sleep( RESPONSE_TIME )
+    return waited
+
+
+def test_control_latency_bounded_under_load():
+    """Disarm issued during saturating element load waits at most for the current window to drain"""
+
+    async def async_test():
+        scheduler = IntegraRequestScheduler( asyncio.get_running_loop(), WINDOW )
+        background = [ asyncio.create_task( _async_request( scheduler, IntegraCommand.ELEMENT_READ_NAME ) ) for _ in range( 400 ) ]
+        latencies = [ ]
+        for _ in range( 5 ):
+            await asyncio.sleep( RESPONSE_TIME * 7 )
+            assert scheduler.stats.queue_depth( IntegraRequestPriority.CONFIG ) > 0
+            latencies.append( await _async_request( scheduler, IntegraCommand.EXEC_DISARM ) )
+        await asyncio.gather( *background )
+        return latencies, scheduler
+
+    latencies, scheduler = asyncio.run( async_test() )
+    # load alone takes 400 / 4 * 5ms = 500ms, control waits only for in flight requests
+    assert max( latencies ) < RESPONSE_TIME * 4, latencies
+    assert scheduler.stats[ IntegraRequestPriority.CONTROL ].requests == 5
+    assert scheduler.stats[ IntegraRequestPriority.CONFIG ].requests == 400
+    assert scheduler.stats.queue_depth() == 0
+    assert scheduler.in_flight == 0
+
+
+def test_priority_order_and_fifo_within_class():
+
+    async def async_test():
+        scheduler = IntegraRequestScheduler( asyncio.get_running_loop(), 1 )
+        log = [ ]
+        blocker = asyncio.create_task( _async_request( scheduler, IntegraCommand.READ_ZONES_VIOLATION ) )
+        await asyncio.sleep( 0 )
+        tasks = [ ]
+        for tag, command in [ ("keepalive", IntegraCommand.ELEMENT_READ_NAME), ("config1", IntegraCommand.READ_INTEGRA_VERSION),
+                              ("sensor", IntegraCommand.READ_ZONE_TEMPERATURE), ("state1", IntegraCommand.READ_SYSTEM_CHANGES),
+                              ("config2", IntegraCommand.ELEMENT_READ_NAME), ("state2", IntegraCommand.READ_OUTPUTS_STATE),
+                              ("control", IntegraCommand.EXEC_ARM_MODE_0) ]:
+            priority = IntegraRequestPriority.KEEPALIVE if tag == "keepalive" else None
+
+            async def request( tag=tag, command=command, priority=priority ):
+                async with scheduler.slot( command, priority ):
+                    log.append( tag )
+                    await asyncio.sleep( 0 )
+
+            tasks.append( asyncio.create_task( request() ) )
+            await asyncio.sleep( 0 )
+        await asyncio.gather( blocker, *tasks )
+        return log
+
+    log = asyncio.run( async_test() )
+    assert log == [ "control", "state1", "state2", "sensor", "config1", "config2", "keepalive" ], log
+
+
+def test_exclusive_command_not_pipelined():
+
+    async def async_test():
+        scheduler = IntegraRequestScheduler( asyncio.get_running_loop(), WINDOW )
+        in_flight = [ ]
+
+        async def request( command: IntegraCommand ):
+            async with scheduler.slot( command ):
+                in_flight.append( (command, scheduler.in_flight) )
+                await asyncio.sleep( RESPONSE_TIME )
+
+        await asyncio.gather( *[ request( command ) for command in [ IntegraCommand.READ_ZONES_ALARM, IntegraCommand.ELEMENT_READ_NAME,
+                                                                      IntegraCommand.EXEC_OUTPUTS_ON, IntegraCommand.READ_OUTPUTS_STATE ] ] )
+        return in_flight
+
+    in_flight = asyncio.run( async_test() )
+    assert (IntegraCommand.EXEC_OUTPUTS_ON, 1) in in_flight, in_flight
+
+
+def test_cancelled_waiter_released():
+
+    async def async_test():
+        scheduler = IntegraRequestScheduler( asyncio.get_running_loop(), 1 )
+        holder = asyncio.create_task( _async_request( scheduler, IntegraCommand.READ_ZONES_ALARM ) )
+        await asyncio.sleep( 0 )
+        waiter = asyncio.create_task( _async_request( scheduler, IntegraCommand.ELEMENT_READ_NAME ) )
+        await asyncio.sleep( 0 )
+        assert scheduler.stats.queue_depth( IntegraRequestPriority.CONFIG ) == 1
+        waiter.cancel()
+        await asyncio.gather( holder, waiter, return_exceptions=True )
+        return scheduler
+
+    scheduler = asyncio.run( async_test() )
+    assert scheduler.waiting == 0 and scheduler.in_flight == 0
+    assert scheduler.stats.queue_depth() == 0
+
+
+class FakeClock:
+
+    def __init__( self ):
+        self.now: float = 100.0
+
+    def __call__( self ) -> float:
+        return self.now
+
+
+def run_jobs( jobs: IntegraJobScheduler, clock: FakeClock, until: float, step: float ) -> list[ tuple[ float, object, float ] ]:
+    result = [ ]
+    while clock.now < until:
+        while (due := jobs.take()) is not None:
+            result.append( (clock.now, due[ 0 ], due[ 1 ]) )
+        clock.now += step
+    return result
+
+
+def test_request_window_with_simulator():
+    """Channel keeps at most window requests in flight, control commands go alone, timed out request frees its slot"""
+
+    async def async_test():
+        rtt = 0.05
+        async with IntegraSimulator( rtt=rtt ) as simulator:
+            opts = IntegraClientOpts.create( reconnect=0, pipeline_window=3, user_code="1234" )
+            client = IntegraClient.tcp( "127.0.0.1", simulator.port, asyncio.get_running_loop(), opts )
+            assert await client.async_connect()
+            scheduler = client.channel.scheduler
+            samples = [ ]
+
+            async def sample():
+                while True:
+                    samples.append( (scheduler.in_flight, scheduler._exclusive) )
+                    await asyncio.sleep( 0.002 )
+
+            sampler = asyncio.create_task( sample() )
+            loop = asyncio.get_running_loop()
+            begin = loop.time()
+            await asyncio.gather( *[ client.async_read_zones_violation() for _ in range( 6 ) ] )
+            elapsed = loop.time() - begin
+            # two full windows, sequential reads would take six round trips
+            assert max( in_flight for in_flight, _ in samples ) == 3 and rtt * 2 <= elapsed < rtt * 4, elapsed
+
+            samples.clear()
+            begin = loop.time()
+            results = await asyncio.gather( *[ client.async_ctrl_outputs_on( [ output_no ] ) for output_no in range( 1, 4 ) ],
+                                            *[ client.async_read_outputs_state() for _ in range( 3 ) ] )
+            elapsed = loop.time() - begin
+            assert all( result for result in results[ :3 ] ) and all( simulator.get_state( IntegraCommand.READ_OUTPUTS_STATE, no ) for no in range( 1, 4 ) )
+            assert all( in_flight == 1 for in_flight, exclusive in samples if exclusive ) and any( exclusive for _, exclusive in samples )
+            assert elapsed >= rtt * 4, elapsed
+            sampler.cancel()
+
+            # with single slot the next request is sent as soon as the previous one times out
+            scheduler.size = 1
+            simulator.processing = 0.5
+            timed_out = await client.channel.async_send_command( IntegraCommand.READ_ZONES_ALARM, timeout=0.1 )
+            simulator.processing = 0.0
+            assert timed_out.error_code == IntegraResponseErrorCode.NO_RESPONSE and scheduler.in_flight == 0
+            response = await asyncio.wait_for( client.channel.async_send_command( IntegraCommand.READ_OUTPUTS_STATE, timeout=2.0 ), 2.0 )
+            assert response.success and scheduler.in_flight == 0
+            await client.async_disconnect()
+
+    asyncio.run( async_test() )
+
+
+def test_job_scheduler_phase_and_drift():
+    """Jobs of the same interval are spread over it, runs keep to schedule regardless of when they are taken"""
+    clock = FakeClock()
+    jobs = IntegraJobScheduler( clock=clock )
+    for zone_no in range( 1, 101 ):
+        jobs.schedule( ("temp", zone_no), 10.0 )
+    first = { }
+    for when, key, _ in run_jobs( jobs, clock, 140.0, 0.5 ):
+        first.setdefault( key, when )
+    # first runs are spread over the whole interval, so no half second holds more than a few of them
+    buckets = [ 0 ] * 21
+    for when in first.values():
+        buckets[ int( (when - 100.0) / 0.5 ) ] += 1
+    assert len( first ) == 100 and max( buckets ) <= 8, buckets
+    assert 390 <= jobs.runs <= 400 and jobs.missed == 0 and len( jobs._heap ) == 100
+
+    # reconfiguration replaces the job, late take skips missed runs
+    assert jobs.schedule( ("temp", 1), 1.0 ) and not jobs.schedule( ("temp", 1), 1.0 ) and jobs.interval( ("temp", 1) ) == 1.0
+    assert jobs.unschedule( ("temp", 2) ) and ("temp", 2) not in jobs and len( jobs ) == 99
+    clock.now += 5.5
+    runs = jobs.runs
+    taken = run_jobs( jobs, clock, clock.now + 0.1, 0.5 )
+    assert sum( 1 for _, key, _ in taken if key == ("temp", 1) ) == 1 and jobs.missed >= 4
+    assert max( lateness for _, _, lateness in taken ) >= 5.0 and jobs.runs == runs + len( taken )
+
+
+def test_job_scheduler_jitter_and_scale():
+    """Jitter only delays runs, thousands of jobs are rescheduled without rebuilding the heap"""
+    clock = FakeClock()
+    jobs = IntegraJobScheduler( jitter=0.2, seed=1, clock=clock )
+    jobs.schedule( "poll", 1.0, delay=0.0 )
+    runs = [ when for when, _, _ in run_jobs( jobs, clock, 120.0, 0.01 ) ]
+    gaps = [ later - earlier for earlier, later in zip( runs, runs[ 1: ] ) ]
+    assert len( runs ) == 20 and min( gaps ) > 0.75 and max( gaps ) < 1.25 and jobs.missed == 0
+
+    for job_no in range( 5000 ):
+        jobs.schedule( job_no, 1.0 + job_no % 7 )
+    for job_no in range( 0, 5000, 2 ):
+        jobs.schedule( job_no, 30.0 )
+    assert len( jobs ) == 5001 and len( jobs._heap ) <= 2 * len( jobs ) + 64
+    assert jobs.next_delay() == 0.0 and jobs.take() is not None
+
+
+def test_client_monitor_jobs():
+    """Temperature and power monitors set on client are polled by system monitor"""
+
+    async def async_test():
+        async with IntegraSimulator() as simulator:
+            system = IntegraSystem.tcp( simulator.host, simulator.port, asyncio.get_running_loop(), IntegraClientOpts.create( reconnect=-1 ) )
+            assert await system.async_connect()
+            client = system.client
+            assert client.temp_monitor_set( { 1: 0.05, 2: 0.05 } ) and client.power_monitor_set( { 3: 0.05 } )
+            assert not client.temp_monitor_set( { 1: 0.05 } ) and client.temp_monitor_get( 2 ) == 0.05
+            assert len( client.monitor_jobs ) == 3
+            await asyncio.sleep( 0.3 )
+            assert client.stats[ IntegraCommand.READ_ZONE_TEMPERATURE ].requests >= 6
+            assert client.stats[ IntegraCommand.READ_OUTPUT_POWER ].requests >= 3
+            assert client.temp_monitor_set( None ) and client.power_monitor_set( { 3: 0 } ) and len( client.monitor_jobs ) == 0
+            assert client.monitor_lag.count >= 9
+            await system.async_disconnect()
+
+    asyncio.run( async_test() )
+
+
+if __name__ == "__main__":
+    for name, test in list( globals().items() ):
+        if name.startswith( "test_" ) and callable( test ):
+            test()
+            print( f"{name}: OK" )
@@ -0,0 +1,177 @@
+import asyncio
+import marshal
+import os
+import sys
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.base import IntegraArmMode
+from satel_integra_api.client import IntegraClientOpts, IntegraClientStatus
+from satel_integra_api.commands import IntegraCommand
+from satel_integra_api.notify import IntegraNotifyEvent
+from satel_integra_api.objects import Events
+from satel_integra_api.shards import SHARD_EVENT_ITEM, SHARD_FRAME_HEADER, IntegraShardLink, IntegraShardedFleet
+from satel_integra_api.simulator import IntegraSimulator
+
+PANELS = 4
+PROCESSES = 2
+
+
+def test_link_frames():
+    """Event batches and control messages pass framed link intact"""
+
+    async def async_test():
+        server_link: list[ IntegraShardLink ] = [ ]
+        connected = asyncio.Event()
+
+        async def on_client( reader, writer ):
+            server_link.append( IntegraShardLink( reader, writer ) )
+            connected.set()
+
+        server = await asyncio.start_server( on_client, "127.0.0.1", 0 )
+        reader, writer = await asyncio.open_connection( "127.0.0.1", server.sockets[ 0 ].getsockname()[ 1 ] )
+        link = IntegraShardLink( reader, writer )
+        await connected.wait()
+
+        events = [ (SHARD_EVENT_ITEM, 3, 2, 17, IntegraNotifyEvent.ZONES_VIOLATION.value, True, False) ] * 100
+        link.send_events( events )
+        link.send_control( (5, True, { "panel-0": True, "mode": IntegraArmMode.MODE_2 }) )
+        assert await server_link[ 0 ].receive() == (1, events)
+        assert await server_link[ 0 ].receive() == (2, (5, True, { "panel-0": True, "mode": IntegraArmMode.MODE_2 }))
+        # compact encoding, well under 20 bytes per event
+        assert link.tx_bytes == server_link[ 0 ].rx_bytes and len( marshal.dumps( events ) ) + SHARD_FRAME_HEADER.size < 20 * len( events )
+
+        await link.close()
+        assert await server_link[ 0 ].receive() is None
+        await server_link[ 0 ].close()
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run( async_test() )
+
+
+def test_sharded_fleet():
+    """Panels run in shard processes, status and item changes are merged, control calls reach owning shard"""
+
+    async def async_test():
+        simulators = [ IntegraSimulator() for _ in range( PANELS ) ]
+        for simulator in simulators:
+            await simulator.async_start()
+
+        sharded = IntegraShardedFleet( asyncio.get_running_loop(), processes=PROCESSES, connect_rate=100.0, reconnect_jitter=0.2, seed=1, batch_interval=0.005 )
+        for index, simulator in enumerate( simulators ):
+            assert await sharded.async_add_tcp( f"panel-{index}", simulator.host, simulator.port, IntegraClientOpts.create( reconnect=-1, user_code="1234" ) ) == index % PROCESSES
+
+        client_events = [ ]
+        item_events = [ ]
+
+        async def on_client_event( _, panel: str, event: IntegraClientStatus ):
+            client_events.append( (panel, event) )
+
+        async def on_item_changed( _, **kwargs ):
+            item_events.append( kwargs )
+
+        sharded.subscribe( Events.EVENT_SYS_CLIENT_EVENT, on_client_event )
+        async with sharded:
+            sharded.subscribe( Events.EVENT_SYS_ITEM_CHANGED, on_item_changed )
+            results = await sharded.async_connect()
+            assert all( results.values() ) and len( results ) == PANELS
+            assert sharded.connected == PANELS
+            assert { panel for panel, event in client_events if event == IntegraClientStatus.CONNECTED } == set( sharded.panels )
+            stats = await sharded.async_stats()
+            assert len( { shard[ "pid" ] for shard in stats } | { os.getpid() } ) == PROCESSES + 1
+            assert [ shard[ "panels" ] for shard in stats ] == [ PANELS // PROCESSES ] * PROCESSES
+
+            for name in sharded.panels:
+                remote = sharded.remote( name )
+                assert await remote.async_monitor_start( [ IntegraNotifyEvent.ZONES_VIOLATION, IntegraNotifyEvent.PARTS_ARMED_SUPPRESSED ] )
+                await remote.client.async_set( "poll_interval", 0.05 )
+            await asyncio.sleep( 0.2 )
+
+            simulators[ 1 ].set_zone_violation( 5, True )
+            assert await sharded.remote( "panel-2" ).parts[ 1 ].async_arm( IntegraArmMode.MODE_0 )
+            assert simulators[ 2 ].get_state( IntegraCommand.READ_PARTS_ARMED_SUPPRESSED, 1 )
+            for _ in range( 50 ):
+                await asyncio.sleep( 0.05 )
+                if len( item_events ) >= 2:
+                    break
+            changes = { (event[ "panel" ], event[ "set_name" ], event[ "item_no" ], event[ "notify_event" ]): event[ "value" ] for event in item_events }
+            assert changes[ ("panel-1", "zones", 5, IntegraNotifyEvent.ZONES_VIOLATION) ] is True
+            assert changes[ ("panel-2", "parts", 1, IntegraNotifyEvent.PARTS_ARMED_SUPPRESSED) ] is True
+            assert sharded.batches > 0 and sharded.events >= PANELS + 2
+
+            try:
+                await sharded.remote( "panel-0" ).zones[ 999 ].async_bypass()
+                assert False, "missing zone accepted"
+            except KeyError:
+                pass
+
+            # outage of single panel, its shard reconnects it
+            client_events.clear()
+            for session in simulators[ 3 ].sessions:
+                session.close()
+            for _ in range( 100 ):
+                await asyncio.sleep( 0.05 )
+                if (("panel-3", IntegraClientStatus.CONNECTED)) in client_events:
+                    break
+            assert ("panel-3", IntegraClientStatus.RECONNECTING) in client_events and sharded.connected == PANELS
+
+        assert not sharded.running and sharded.connected == 0
+        for simulator in simulators:
+            await simulator.async_stop()
+
+    asyncio.run( async_test() )
+
+
+def test_shard_lost():
+    """Requests in flight to dead shard fail, its panels are reported disconnected, other shards keep running"""
+
+    async def async_test():
+        simulators = [ IntegraSimulator() for _ in range( PROCESSES ) ]
+        for simulator in simulators:
+            await simulator.async_start()
+
+        sharded = IntegraShardedFleet( asyncio.get_running_loop(), processes=PROCESSES, connect_rate=100.0, seed=1, batch_interval=0.005 )
+        for index, simulator in enumerate( simulators ):
+            await sharded.async_add_tcp( f"panel-{index}", simulator.host, simulator.port, IntegraClientOpts.create( reconnect=-1 ) )
+        client_events = [ ]
+
+        async def on_client_event( _, panel: str, event: IntegraClientStatus ):
+            client_events.append( (panel, event) )
+
+        sharded.subscribe( Events.EVENT_SYS_CLIENT_EVENT, on_client_event )
+        async with sharded:
+            assert all( (await sharded.async_connect()).values() )
+
+            # read held by slow panel while its shard process is killed
+            simulators[ 0 ].rtt = 3.0
+            call = asyncio.create_task( sharded.async_call( "panel-0", ("client",), "async_read_zones_violation" ) )
+            await asyncio.sleep( 0.2 )
+            sharded._workers[ sharded.shard_of( "panel-0" ) ].kill()
+            try:
+                await asyncio.wait_for( call, 2.0 )
+                assert False, "request to dead shard succeeded"
+            except ConnectionError:
+                pass
+
+            assert sharded.status == { "panel-0": IntegraClientStatus.DISCONNECTED, "panel-1": IntegraClientStatus.CONNECTED }
+            assert client_events[ -1 ] == ("panel-0", IntegraClientStatus.DISCONNECTED)
+            try:
+                await asyncio.wait_for( sharded.async_stats(), 2.0 )
+                assert False, "request to dead shard succeeded"
+            except ConnectionError:
+                pass
+            assert await sharded.async_call( "panel-1", ("client",), "async_read_zones_violation" ) == [ ]
+
+        assert not sharded.running
+        for simulator in simulators:
+            await simulator.async_stop()
+
+    asyncio.run( async_test() )
+
+
+if __name__ == "__main__":
+    for name, test in list( globals().items() ):
+        if name.startswith( "test_" ) and callable( test ):
+            test()
+            print( f"{name}: OK" )
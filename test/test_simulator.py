@@ -0,0 +1,111 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.base import IntegraArmMode, IntegraType
+from satel_integra_api.channel import IntegraChannelError, IntegraChannelErrorCode
+from satel_integra_api.client import IntegraClient, IntegraClientOpts
+from satel_integra_api.commands import IntegraCommand
+from satel_integra_api.simulator import IntegraSimulator
+
+INTEGRATION_KEY = "Key123456789"
+
+
+async def _async_client( simulator: IntegraSimulator, integration_key: str = "", user_code: str = "1234" ) -> IntegraClient:
+    opts = IntegraClientOpts.create( integration_key=integration_key, user_code=user_code, reconnect=0, resp_timeout=2.0 )
+    client = IntegraClient.tcp( "127.0.0.1", simulator.port, asyncio.get_running_loop(), opts )
+    assert await client.async_connect()
+    return client
+
+
+def test_versions_and_elements():
+    """Version replies match configured type, element names are served only for elements allowed by caps"""
+
+    async def async_test():
+        async with IntegraSimulator( integra_type=IntegraType.INTEGRA_64_PLUS ) as simulator:
+            for integration_key in [ "", INTEGRATION_KEY ]:
+                simulator._integration_key = integration_key
+                client = await _async_client( simulator, integration_key )
+                assert client.integra_version.integra_type == IntegraType.INTEGRA_64_PLUS
+                assert client.support_troubles8
+                zone = await client.async_read_zone_with_parts_data( simulator.caps.zones )
+                assert zone.name == f"Zone {simulator.caps.zones}" and zone.part_no == simulator.part_of_zone( simulator.caps.zones )
+                assert (await client.async_read_expander_data( 2 )).expander_no == 2
+                assert (await client.async_read_admin_data( 1 )).name == "Admin 1"
+                assert not (await client.async_read_zone_data( simulator.caps.zones + 1 )).valid
+                await client.async_disconnect()
+
+    asyncio.run( async_test() )
+
+
+def test_system_changes():
+    """Every state is reported once after connect, later only changed commands are reported"""
+
+    async def async_test():
+        async with IntegraSimulator( integration_key=INTEGRATION_KEY ) as simulator:
+            client = await _async_client( simulator, INTEGRATION_KEY )
+            initial = await client.async_read_system_changes()
+            assert IntegraCommand.READ_ZONES_VIOLATION in initial and IntegraCommand.READ_TROUBLES_PART8 in initial
+            assert await client.async_read_system_changes() == [ ]
+            simulator.set_zone_violation( 7, True )
+            simulator.set_output( 3, True )
+            assert set( await client.async_read_system_changes() ) == { IntegraCommand.READ_ZONES_VIOLATION, IntegraCommand.READ_PARTS_WITH_VIOLATED_ZONES,
+                                                                       IntegraCommand.READ_OUTPUTS_STATE }
+            assert await client.async_read_zones_violation() == [ 7 ]
+            await client.async_disconnect()
+
+    asyncio.run( async_test() )
+
+
+def test_control_result_codes():
+    """Control commands are validated against user codes and change panel state"""
+
+    async def async_test():
+        async with IntegraSimulator( user_codes={ "1234": 1 } ) as simulator:
+            client = await _async_client( simulator, user_code="1234" )
+            assert await client.async_ctrl_outputs_on( [ 5 ] )
+            assert await client.async_read_outputs_state() == [ 5 ]
+            with client.request_no_error():
+                assert not await client.async_ctrl_outputs_off( [ 5 ], user_code="9999" )
+            assert await client.async_read_outputs_state() == [ 5 ]
+
+            simulator.set_zone_violation( 1, True )
+            with client.request_no_error():
+                assert not await client.async_ctrl_arm( IntegraArmMode.MODE_0, [ 1 ] )
+            assert await client.async_ctrl_arm( IntegraArmMode.MODE_0, [ 1 ], force=True )
+            assert await client.async_read_parts_armed_really() == [ 1 ]
+            assert await client.async_ctrl_disarm( [ 1 ] )
+            assert await client.async_read_parts_armed_really() == [ ]
+            await client.async_disconnect()
+
+    asyncio.run( async_test() )
+
+
+def test_busy_and_churn():
+    """Second connection gets busy reply, churn changes state at configured rate"""
+
+    async def async_test():
+        async with IntegraSimulator( churn_rate=200.0, seed=7 ) as simulator:
+            client = await _async_client( simulator )
+            other = IntegraClient.tcp( "127.0.0.1", simulator.port, asyncio.get_running_loop(), IntegraClientOpts.create( reconnect=0, resp_timeout=1.0 ) )
+            try:
+                await other.async_connect()
+                busy = False
+            except IntegraChannelError as err:
+                busy = err.error_code == IntegraChannelErrorCode.REMOTE_BUSY
+            assert busy or simulator.rejected == 1
+            await asyncio.sleep( 0.2 )
+            assert simulator.changes > 10
+            assert len( await client.async_read_system_changes() ) > 0
+            await client.async_disconnect()
+
+    asyncio.run( async_test() )
+
+
+if __name__ == "__main__":
+    for name, test in list( globals().items() ):
+        if name.startswith( "test_" ) and callable( test ):
+            test()
+            print( f"{name}: OK" )
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.client import IntegraClientOpts
+from satel_integra_api.commands import IntegraCommand
+from satel_integra_api.messages import IntegraResponseErrorCode
+from satel_integra_api.objects import IntegraSystem
+from satel_integra_api.simulator import IntegraSimulator
+from satel_integra_api.stats import IntegraHistogram
+
+
+def test_histogram_percentiles():
+    """Percentiles estimated from buckets stay within bucket of exact value"""
+    rnd = random.Random( 1 )
+    histogram = IntegraHistogram()
+    samples = sorted( rnd.expovariate( 1 / 0.02 ) for _ in range( 10000 ) )
+    for sample in samples:
+        histogram.add( sample )
+
+    assert histogram.count == len( samples ) and abs( histogram.sum - sum( samples ) ) < 1e-6
+    assert histogram.min == samples[ 0 ] and histogram.max == samples[ -1 ]
+    for percent in [ 50, 95, 99 ]:
+        exact = samples[ int( len( samples ) * percent / 100 ) - 1 ]
+        index = next( index for index, bound in enumerate( histogram.bounds ) if exact <= bound )
+        lower = histogram.bounds[ index - 1 ] if index > 0 else 0.0
+        assert lower <= histogram.percentile( percent ) <= histogram.bounds[ index ]
+    assert histogram.p50 <= histogram.p95 <= histogram.p99 <= histogram.max
+
+    empty = IntegraHistogram()
+    assert empty.p99 == 0.0 and empty.avg == 0.0
+
+
+def test_channel_stats():
+    """Requests, errors, timeouts, frames, lock wait and reconnects are counted and exposed by IntegraSystem"""
+
+    async def async_test():
+        async with IntegraSimulator() as simulator:
+            opts = IntegraClientOpts.create( reconnect=0, resp_timeout=0.2, user_code="1234" )
+            system = IntegraSystem.tcp( "127.0.0.1", simulator.port, asyncio.get_running_loop(), opts )
+            client = system.client
+            for _ in range( 2 ):
+                assert await system.async_connect()
+                await system.async_disconnect()
+            assert await system.async_connect()
+
+            for _ in range( 5 ):
+                await client.async_read_zones_violation()
+            with client.request_no_error():
+                await client.async_ctrl_outputs_on( [ 1 ], user_code="9999" )
+            simulator.processing = 0.3
+            with client.request_no_error():
+                await client.async_read_outputs_state()
+            simulator.processing = 0.0
+            await asyncio.sleep( 0.2 )
+
+            stats = system.get_channel_stats()
+            assert stats is client.stats
+            assert stats.reconnects == 2
+            zones = stats[ IntegraCommand.READ_ZONES_VIOLATION ]
+            assert zones.requests == 5 and zones.timeouts == 0 and zones.latency.count == 5
+            assert stats[ IntegraCommand.EXEC_OUTPUTS_ON ].errors == { IntegraResponseErrorCode.USER_CODE_NOT_FOUND: 1 }
+            assert stats[ IntegraCommand.READ_OUTPUTS_STATE ].timeouts == 1
+            assert stats[ IntegraCommand.READ_INTEGRA_VERSION ].requests == 3
+            assert stats.timeouts == 1 and stats.errors == 1
+            assert stats.frames >= stats.latency.count and stats.resyncs == 0 and stats.discards == 0
+            assert stats.lock_wait.count == stats.requests
+            assert 0 < stats.latency.p50 <= stats.latency.p99
+            assert "Requests" in str( stats )
+            await system.async_disconnect()
+
+    asyncio.run( async_test() )
+
+
+if __name__ == "__main__":
+    for name, test in list( globals().items() ):
+        if name.startswith( "test_" ) and callable( test ):
+            test()
+            print( f"{name}: OK" )
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.base import IntegraMap, IntegraType
+from satel_integra_api.client import IntegraClientOpts
+from satel_integra_api.diff import IntegraStateDiff
+from satel_integra_api.notify import IntegraNotifyEvent
+from satel_integra_api.objects import Events, IntegraSystem
+from satel_integra_api.simulator import IntegraSimulator
+from satel_integra_api.store import IntegraStateSet, IntegraStateStore
+
+
+def test_state_set():
+    """Set operations work on whole bitmaps, complement is bounded by size"""
+    first = IntegraStateSet.of( [ 1, 3, 5, 200 ], 8 )
+    second = IntegraStateSet.of( [ 3, 4 ], 8 )
+    assert list( first ) == [ 1, 3, 5 ] and len( first ) == 3 and 5 in first and 2 not in first
+    assert first & second == { 3 } and first | second == { 1, 3, 4, 5 } and first ^ second == { 1, 4, 5 }
+    assert first - second == { 1, 5 } and ~first == { 2, 4, 6, 7, 8 }
+    assert not IntegraStateSet( 0, 8 ) and IntegraStateSet.of( [ 2 ], 8 ).bits == 0b10
+
+
+def test_store():
+    """Store is sized by caps, changes bump versions, bulk apply reports only real changes"""
+    store = IntegraStateStore()
+    store.configure( IntegraMap.type_to_caps( IntegraType.INTEGRA_32 ) )
+    zones = store.size( IntegraNotifyEvent.ZONES_VIOLATION )
+    assert zones > 0 and IntegraNotifyEvent.ZONES_VIOLATION in store and IntegraNotifyEvent.ZONE_TEMPERATURE not in store
+
+    assert store.set( IntegraNotifyEvent.ZONES_VIOLATION, 2, True ) and not store.set( IntegraNotifyEvent.ZONES_VIOLATION, 2, True )
+    assert not store.set( IntegraNotifyEvent.ZONES_VIOLATION, zones + 1, True )
+    assert store.get( IntegraNotifyEvent.ZONES_VIOLATION, 2 ) and store.version == 1
+    version = store.version
+
+    changes = store.apply( IntegraNotifyEvent.ZONES_BYPASS, IntegraStateDiff.compute( 0, 0b110 | (1 << zones) ) )
+    assert changes == { 2: True, 3: True } and store.version_of( IntegraNotifyEvent.ZONES_BYPASS ) == version + 1
+    assert store.changed_since( version ) == [ IntegraNotifyEvent.ZONES_BYPASS ]
+    assert not store.apply( IntegraNotifyEvent.ZONES_BYPASS, IntegraStateDiff.compute( 0, 0b110 ) ) and store.version == version + 1
+
+    violated_bypassed = store[ IntegraNotifyEvent.ZONES_VIOLATION ] & store[ IntegraNotifyEvent.ZONES_BYPASS ]
+    assert violated_bypassed == { 2 } and len( ~store[ IntegraNotifyEvent.ZONES_BYPASS ] ) == zones - 2
+
+
+def test_item_views():
+    """Item properties read store, bulk update notifies only items which changed"""
+
+    async def async_test():
+        async with IntegraSimulator() as simulator:
+            system = IntegraSystem.tcp( simulator.host, simulator.port, asyncio.get_running_loop(), IntegraClientOpts.create( reconnect=-1 ) )
+            assert await system.async_connect()
+            await async_check( system )
+            await system.async_disconnect()
+
+    async def async_check( system: IntegraSystem ):
+        assert system.store.size( IntegraNotifyEvent.ZONES_VIOLATION ) == system.caps.zones == len( system.zones ) > 0
+        events = [ ]
+
+        async def on_item_changed( _, item, state, previous, **__ ):
+            events.append( (item.id_str, state.value, previous) )
+
+        system.subscribe( Events.EVENT_SYS_ITEM_CHANGED, on_item_changed )
+        await system.zones.process_state_change( IntegraNotifyEvent.ZONES_VIOLATION, IntegraStateDiff.compute( 0, 0b1001 ) )
+        assert events == [ ("zone_1", True, False), ("zone_4", True, False) ]
+        assert system.zones[ 4 ].violation and not system.zones[ 2 ].violation
+        assert system.store[ IntegraNotifyEvent.ZONES_VIOLATION ] == { 1, 4 }
+
+        events.clear()
+        await system.zones.process_state_change( IntegraNotifyEvent.ZONES_VIOLATION, IntegraStateDiff( 0b1111, 0b0001 ) )
+        assert events == [ ("zone_4", False, True) ] and not system.zones[ 4 ].violation
+
+        events.clear()
+        await system.outputs.process_state_change( IntegraNotifyEvent.OUTPUTS_STATE, { 3: True } )
+        assert events == [ ("output_3", True, False) ] and system.store.get( IntegraNotifyEvent.OUTPUTS_STATE, 3 )
+        assert system.zones.in_part( 0 ) == set( zone.no for zone in system.zones )
+
+    asyncio.run( async_test() )
+
+
+if __name__ == "__main__":
+    for name, test in list( globals().items() ):
+        if name.startswith( "test_" ) and callable( test ):
+            test()
+            print( f"{name}: OK" )
@@ -0,0 +1,138 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), ".." ) )
+
+from satel_integra_api.channel import IntegraChannel
+from satel_integra_api.client import IntegraClient, IntegraClientOpts
+from satel_integra_api.commands import IntegraCommand
+from satel_integra_api.messages import IntegraPreparedRequest, IntegraRequest, IntegraResponseErrorCode
+from satel_integra_api.simulator import IntegraSimulator
+from satel_integra_api.tracing import IntegraTraceEvent, IntegraTraceOutcome, IntegraTraceRing
+
+INTEGRATION_KEY = "Key123456789"
+
+
+def check_span_order( span ) -> None:
+    times = [ span[ event ] for event in IntegraTraceEvent ]
+    assert None not in times, f"missing event in {span.as_dict()}"
+    assert times == sorted( times ), f"events out of order in {span.as_dict()}"
+
+
+def test_request_spans():
+    """Every request produces span with ordered lifecycle events, command, sizes and outcome"""
+
+    async def async_test():
+        for integration_key in [ "", INTEGRATION_KEY ]:
+            async with IntegraSimulator( integration_key=integration_key ) as simulator:
+                opts = IntegraClientOpts.create( integration_key=integration_key, reconnect=0, resp_timeout=0.2, pipeline_window=4 )
+                client = IntegraClient.tcp( "127.0.0.1", simulator.port, asyncio.get_running_loop(), opts )
+                ring = IntegraTraceRing( 16 )
+                client.tracer = ring
+                assert await client.async_connect()
+
+                await asyncio.gather( *[ client.async_read_zones_violation() for _ in range( 3 ) ], client.async_read_outputs_state() )
+                with client.request_no_error():
+                    await client.async_ctrl_outputs_on( [ 1 ], user_code="9999" )
+                simulator.processing = 0.3
+                with client.request_no_error():
+                    await client.async_read_zones_alarm()
+                simulator.processing = 0.0
+                await asyncio.sleep( 0.2 )
+
+                spans = { }
+                for span in ring.spans:
+                    spans.setdefault( span.command, [ ] ).append( span )
+
+                for span in spans[ IntegraCommand.READ_ZONES_VIOLATION ] + spans[ IntegraCommand.READ_OUTPUTS_STATE ]:
+                    check_span_order( span )
+                    assert span.outcome == IntegraTraceOutcome.SUCCESS and span.size == 0 and span.response_size >= 16
+                    assert span.total > 0 and abs( span.timestamp( IntegraTraceEvent.FINISHED ) - span.started - span.total ) < 1e-6
+
+                control = spans[ IntegraCommand.EXEC_OUTPUTS_ON ][ 0 ]
+                check_span_order( control )
+                assert control.outcome == IntegraTraceOutcome.RESULT and control.error_code == IntegraResponseErrorCode.USER_CODE_NOT_FOUND
+                assert control.size > 8
+
+                timeout = spans[ IntegraCommand.READ_ZONES_ALARM ][ 0 ]
+                assert timeout.outcome == IntegraTraceOutcome.TIMEOUT
+                assert timeout[ IntegraTraceEvent.WRITTEN ] is not None and timeout[ IntegraTraceEvent.FIRST_BYTE ] is None
+                assert timeout.as_dict()[ "outcome" ] == "TIMEOUT" and "DECODED" not in timeout.as_dict()[ "events" ]
+                # connect reads integra and module version
+                assert ring.total == len( ring ) == 8
+
+                client.tracer = None
+                await client.async_read_zones_violation()
+                assert ring.total == 8 and not client.channel._traces
+                await client.async_disconnect()
+
+    asyncio.run( async_test() )
+
+
+def test_prepared_request_spans():
+    """Prepared request in flight twice gets two complete spans"""
+
+    async def async_test():
+        async with IntegraSimulator( rtt=0.02 ) as simulator:
+            opts = IntegraClientOpts.create( reconnect=0, pipeline_window=4 )
+            client = IntegraClient.tcp( "127.0.0.1", simulator.port, asyncio.get_running_loop(), opts )
+            assert await client.async_connect()
+            ring = IntegraTraceRing()
+            client.tracer = ring
+            request = IntegraPreparedRequest( IntegraCommand.READ_OUTPUTS_STATE )
+            responses = await asyncio.gather( *[ client.channel.async_send_request( request ) for _ in range( 2 ) ] )
+            assert all( response.success for response in responses ) and len( ring.spans ) == 2
+            for span in ring.spans:
+                check_span_order( span )
+                assert span.outcome == IntegraTraceOutcome.SUCCESS
+            assert not client.channel._traces
+            await client.async_disconnect()
+
+    asyncio.run( async_test() )
+
+
+def test_failed_request_span():
+    """Request failing with exception is traced with FAILED outcome"""
+
+    async def async_test():
+        async with IntegraSimulator() as simulator:
+            client = IntegraClient.tcp( "127.0.0.1", simulator.port, asyncio.get_running_loop(), IntegraClientOpts.create( reconnect=0 ) )
+            ring = IntegraTraceRing()
+            client.tracer = ring
+            try:
+                await client.channel.async_send_command( IntegraCommand.READ_ZONES_VIOLATION )
+            except BaseException:
+                pass
+            assert ring.spans[ 0 ].outcome == IntegraTraceOutcome.FAILED
+            assert ring.spans[ 0 ][ IntegraTraceEvent.WRITTEN ] is None
+
+    asyncio.run( async_test() )
+
+
+def test_response_rx_times():
+    """Frames decoded from the same chunk keep their own receive times until they are routed"""
+
+    async def async_test():
+        channel = IntegraChannel( asyncio.get_running_loop(), "" )
+        channel.tracer = IntegraTraceRing()
+        handler = channel._handler
+        first = IntegraRequest.encode_frame( IntegraCommand.READ_ZONES_VIOLATION, bytes( 16 ) )
+        second = IntegraRequest.encode_frame( IntegraCommand.READ_OUTPUTS_STATE, bytes( 16 ) )
+        handler.feed( first[ :5 ] )
+        await asyncio.sleep( 0.01 )
+        handler.feed( first[ 5: ] + second )
+        responses = [ handler.pop_response(), handler.pop_response() ]
+        assert [ response.command for response in responses ] == [ IntegraCommand.READ_ZONES_VIOLATION, IntegraCommand.READ_OUTPUTS_STATE ]
+        (first_byte, first_decoded), (second_byte, second_decoded) = [ response.rx_times for response in responses ]
+        # first frame started in earlier chunk
+        assert second_byte - first_byte >= 0.009 and first_byte < first_decoded <= second_decoded
+
+    asyncio.run( async_test() )
+
+
+if __name__ == "__main__":
+    for name, test in list( globals().items() ):
+        if name.startswith( "test_" ) and callable( test ):
+            test()
+            print( f"{name}: OK" )